@@ -14,6 +14,10 @@
 # Copyright (c) 2021 ScyllaDB
 
 # pylint: disable=too-many-lines
+# NOTE: import backends, cloud SDKs, results analyzers, etc. in the commands which use them, to keep startup of
+#       the CLI fast: it's run for every Jenkins stage and for every config file by `lint-yamls'.
+#       test_sct_startup.py checks that `import sct' doesn't pull them in again.
+# pylint: disable=import-outside-toplevel
 import os
 import re
 import sys
@@ -30,58 +34,13 @@ from functools import partial
 from typing import Optional
 from uuid import UUID
 
-import pytest
 import click
 import click_completion
 from prettytable import PrettyTable
 
-from sdcm.localhost import LocalHost
-from sdcm.remote import LOCALRUNNER
-from sdcm.results_analyze import PerformanceResultsAnalyzer, BaseResultsAnalyzer
 from sdcm.sct_config import SCTConfiguration
-from sdcm.sct_provision.common.layout import SCTProvisionLayout, create_sct_configuration
-from sdcm.sct_runner import AwsSctRunner, GceSctRunner, AzureSctRunner, get_sct_runner, clean_sct_runners
-from sdcm.utils.azure_utils import AzureService
-from sdcm.utils.azure_region import AzureRegion, region_name_to_location
-from sdcm.utils.cloud_monitor import cloud_report, cloud_qa_report
-from sdcm.utils.cloud_monitor.cloud_monitor import cloud_non_qa_report
-from sdcm.utils.common import (
-    all_aws_regions,
-    aws_tags_to_dict,
-    clean_cloud_resources,
-    clean_resources_according_post_behavior,
-    format_timestamp,
-    gce_meta_to_dict,
-    get_all_gce_regions,
-    get_branched_ami,
-    get_branched_gce_images,
-    get_builder_by_test_id,
-    get_s3_scylla_repos_mapping,
-    get_scylla_ami_versions,
-    get_scylla_gce_images_versions,
-    get_testrun_dir,
-    list_clusters_eks,
-    list_clusters_gke,
-    list_elastic_ips_aws,
-    list_instances_aws,
-    list_instances_gce,
-    list_logs_by_test_id,
-    list_resources_docker,
-    search_test_id_in_latest,
-)
 from sdcm.utils.net import get_sct_runner_ip
-from sdcm.utils.jepsen import JepsenResults
-from sdcm.utils.docker_utils import docker_hub_login
-from sdcm.monitorstack import (restore_monitoring_stack, get_monitoring_stack_services,
-                               kill_running_monitoring_stack_services)
 from sdcm.utils.log import setup_stdout_logger
-from sdcm.utils.aws_region import AwsRegion
-from sdcm.utils.get_username import get_username
-from sdcm.send_email import get_running_instances_for_email_report, read_email_data_from_file, build_reporter, \
-    send_perf_email
-from utils.build_system.create_test_release_jobs import JenkinsPipelines  # pylint: disable=no-name-in-module
-from utils.get_supported_scylla_base_versions import UpgradeBaseVersion  # pylint: disable=no-name-in-module
-from utils.mocks.aws_mock import AwsMock  # pylint: disable=no-name-in-module
 
 
 SUPPORTED_CLOUDS = ("aws", "gce", "azure",)
@@ -96,7 +55,7 @@ click_completion.init()
 
 
 def get_test_config():
-    from sdcm.cluster import TestConfig  # pylint: disable=import-outside-toplevel; avoid import for `--help' option
+    from sdcm.cluster import TestConfig
 
     return TestConfig()
 
@@ -149,6 +108,9 @@ class CloudRegion(click.ParamType):
         self.cloud_provider = cloud_provider
 
     def convert(self, value, param, ctx):
+        from sdcm.utils.azure_region import region_name_to_location
+        from sdcm.utils.azure_utils import AzureService
+        from sdcm.utils.common import all_aws_regions, get_all_gce_regions
         cloud_provider = self.cloud_provider or ctx.params["cloud_provider"]
         if cloud_provider == "aws":
             regions = all_aws_regions()
@@ -178,6 +140,8 @@ class CloudRegion(click.ParamType):
               expose_value=False,
               help="Install paths for extra python packages to install, scylla-cluster-plugins for example")
 def cli():
+    from sdcm.remote import LOCALRUNNER
+    from sdcm.utils.docker_utils import docker_hub_login
     LOGGER.info("install-bash-completion current path: %s", os.getcwd())
     docker_hub_login(remoter=LOCALRUNNER)
 
@@ -187,6 +151,8 @@ def cli():
 @click.option('-t', '--test-name', type=str, help="Test name")
 @click.option('-c', '--config', multiple=True, type=click.Path(exists=True), help="Test config .yaml to use, can have multiple of those")
 def provision_resources(backend, test_name: str, config: str):
+    from sdcm.localhost import LocalHost
+    from sdcm.sct_provision.common.layout import SCTProvisionLayout, create_sct_configuration
     if config:
         os.environ['SCT_CONFIG_FILES'] = str(list(config))
     if backend:
@@ -243,6 +209,8 @@ def clean_resources(ctx, post_behavior, user, test_id, logdir, dry_run, backend)
 
     Also you can add --dry-run option to see what should be cleaned.
     """
+    from sdcm.utils.common import clean_cloud_resources, clean_resources_according_post_behavior, \
+        search_test_id_in_latest
     add_file_logger()
 
     user_param = {"RunByUser": user} if user else {}
@@ -295,10 +263,14 @@ def clean_resources(ctx, post_behavior, user, test_id, logdir, dry_run, backend)
 @click.option('--get-all-running', is_flag=True, default=False, help='All running resources')
 @sct_option('--test-id', 'test_id', help='test id to filter by')
 @click.option('--verbose', is_flag=True, default=False, help='if enable, will log progress')
+@click.option('--max-age', type=int, default=0, show_default=True,
+              help='use listings of AWS resources which were cached not more than so many seconds ago')
 @click.pass_context
-def list_resources(ctx, user, test_id, get_all, get_all_running, verbose):
+def list_resources(ctx, user, test_id, get_all, get_all_running, verbose, max_age):
     # pylint: disable=too-many-locals,too-many-arguments,too-many-branches,too-many-statements
 
+    from sdcm.utils.common import aws_tags_to_dict, gce_meta_to_dict, list_clusters_eks, list_clusters_gke, \
+        list_elastic_ips_aws, list_instances_aws, list_instances_gce, list_resources_docker
     add_file_logger()
 
     params = {}
@@ -316,7 +288,7 @@ def list_resources(ctx, user, test_id, get_all, get_all_running, verbose):
         table_header = ["Name", "Region-AZ", "State", "TestId", "RunByUser", "LaunchTime"]
 
     click.secho("Checking AWS EC2...", fg='green')
-    aws_instances = list_instances_aws(tags_dict=params, running=get_all_running, verbose=verbose)
+    aws_instances = list_instances_aws(tags_dict=params, running=get_all_running, verbose=verbose, max_age=max_age)
 
     if aws_instances:
         aws_table = PrettyTable(table_header)
@@ -339,7 +311,7 @@ def list_resources(ctx, user, test_id, get_all, get_all_running, verbose):
         click.secho("Nothing found for selected filters in AWS!", fg="yellow")
 
     click.secho("Checking AWS Elastic IPs...", fg='green')
-    elastic_ips_aws = list_elastic_ips_aws(tags_dict=params, verbose=verbose)
+    elastic_ips_aws = list_elastic_ips_aws(tags_dict=params, verbose=verbose, max_age=max_age)
     if elastic_ips_aws:
         aws_table = PrettyTable(["AllocationId", "PublicIP", "TestId", "RunByUser", "InstanceId (attached to)"])
         aws_table.align = "l"
@@ -462,6 +434,7 @@ def list_resources(ctx, user, test_id, get_all, get_all_running, verbose):
               default='eu-west-1',
               help="a region to look for AMIs (default: eu-west-1)")
 def list_ami_versions(region):
+    from sdcm.utils.common import get_scylla_ami_versions
     add_file_logger()
 
     tbl = PrettyTable(field_names=["Name", "ImageId", "CreationDate"], align="l")
@@ -478,6 +451,7 @@ def list_ami_versions(region):
               help="a region to look for AMIs (default: eu-west-1)")
 @click.argument('version', type=str, default='branch-3.1:all')
 def list_ami_branch(region, version):
+    from sdcm.utils.common import get_branched_ami
     add_file_logger()
 
     def get_tags(ami):
@@ -499,6 +473,7 @@ def list_ami_branch(region, version):
 
 @cli.command("list-gce-images-versions", help="list Scylla formal GCE images versions")
 def list_gce_images_versions():
+    from sdcm.utils.common import get_scylla_gce_images_versions
     add_file_logger()
 
     tbl = PrettyTable(field_names=["Name", "ImageId", "CreationDate"], align="l")
@@ -511,6 +486,7 @@ def list_gce_images_versions():
     \n\n[VERSION] is a branch version to look for, ex. 'branch-2019.1:latest', 'branch-3.1:all'""")
 @click.argument("version", type=str, default="branch-3.1:all")
 def list_gce_images_branch(version):
+    from sdcm.utils.common import get_branched_gce_images
     add_file_logger()
 
     if ":" not in version:
@@ -535,6 +511,7 @@ def list_gce_images_branch(version):
                                                          'jessie', 'stretch', 'buster', 'bullseye']),  # Debian
               default=None, help='deb style versions')
 def list_repos(dist_type, dist_version):
+    from sdcm.utils.common import get_s3_scylla_repos_mapping
     add_file_logger()
 
     if not dist_type == 'centos' and dist_version is None:
@@ -566,6 +543,7 @@ def get_scylla_base_versions(scylla_version, scylla_repo, linux_distro, only_pri
     get the base versions according to the scylla repo and distro type, then we don't need to hardcode
     the base version for each branch.
     """
+    from utils.get_supported_scylla_base_versions import UpgradeBaseVersion  # pylint: disable=no-name-in-module
     add_file_logger()
 
     version_detector = UpgradeBaseVersion(scylla_repo, linux_distro, scylla_version)
@@ -724,6 +702,9 @@ def conf_docs(output_format):
 @click.option("-e", "--emails", required=True, type=str, help="Comma separated list of emails. Example a@b.com,c@d.com")
 @click.option("-l", "--logdir", required=True, type=str, help="Dir configured to store SCT logs")
 def perf_regression_report(es_id, emails, logdir):
+    from sdcm.results_analyze import PerformanceResultsAnalyzer
+    from sdcm.send_email import read_email_data_from_file, send_perf_email
+    from sdcm.utils.common import format_timestamp, list_logs_by_test_id
     add_file_logger()
     emails = emails.split(',')
     if not emails:
@@ -752,6 +733,7 @@ def investigate():
 @click.argument('test_id')
 @click.option('-o', '--output-format', type=click.Choice(["table", "markdown"]), default="table", help="type of the output")
 def show_log(test_id, output_format):
+    from sdcm.utils.common import list_logs_by_test_id
     add_file_logger()
 
     files = list_logs_by_test_id(test_id)
@@ -773,6 +755,8 @@ def show_log(test_id, output_format):
 @click.option("--date-time", type=str, required=False, help='Datetime of monitor-set archive is collected')
 @click.option("--kill", type=bool, required=False, help='Kill and remove containers')
 def show_monitor(test_id, date_time, kill):
+    from sdcm.monitorstack import get_monitoring_stack_services, kill_running_monitoring_stack_services, \
+        restore_monitoring_stack
     add_file_logger()
 
     click.echo('Search monitoring stack archive files for test id {} and restoring...'.format(test_id))
@@ -800,6 +784,7 @@ def show_monitor(test_id, date_time, kill):
 @investigate.command('show-jepsen-results', help="Run a server with Jepsen results")
 @click.argument('test_id')
 def show_jepsen_results(test_id):
+    from sdcm.utils.jepsen import JepsenResults
     add_file_logger()
 
     click.secho(message=f"\nSearch Jepsen results archive files for test id {test_id} and restoring...\n", fg="green")
@@ -818,6 +803,7 @@ def show_jepsen_results(test_id):
 @investigate.command('search-builder', help='Search builder where test run with test-id located')
 @click.argument('test-id')
 def search_builder(test_id):
+    from sdcm.utils.common import get_builder_by_test_id
     logging.getLogger("paramiko").setLevel(logging.CRITICAL)
     add_file_logger()
 
@@ -837,6 +823,7 @@ def search_builder(test_id):
 @click.option("--last-n", type=int, required=False, help="return last n lines from events.log file")
 @click.option("--save-to", type=str, required=False, help="Download events.log file and save to provided dir")
 def show_events(test_id: str, follow: bool = False, last_n: int = None, save_to: str = None):
+    from sdcm.utils.common import get_builder_by_test_id
     logging.getLogger("paramiko").setLevel(logging.CRITICAL)
     add_file_logger()
     builders = get_builder_by_test_id(test_id)
@@ -871,6 +858,7 @@ cli.add_command(investigate)
 @click.option("-t", "--test", required=False, default="",
               help="Run specific test file from unit-tests directory")
 def unit_tests(test):
+    import pytest
     sys.exit(pytest.main(['-v', '-p', 'no:warnings', 'unit_tests/{}'.format(test)]))
 
 
@@ -931,6 +919,7 @@ def run_test(argv, backend, config, logdir):
 @click.option('-c', '--config', multiple=True, type=click.Path(exists=True), help="Test config .yaml to use, can have multiple of those")
 @click.option('-l', '--logdir', help="Directory to use for logs")
 def run_pytest(target, backend, config, logdir):
+    import pytest
     if config:
         os.environ['SCT_CONFIG_FILES'] = str(list(config))
     if backend:
@@ -956,6 +945,8 @@ def run_pytest(target, backend, config, logdir):
 @click.option("-u", "--user", required=False, type=str, default="",
               help="User or instance owner. Applicable for last-7-days-* reports")
 def cloud_usage_report(emails, report_type, user):
+    from sdcm.utils.cloud_monitor import cloud_qa_report, cloud_report
+    from sdcm.utils.cloud_monitor.cloud_monitor import cloud_non_qa_report
     add_file_logger()
 
     email_list = emails.split(",")
@@ -1026,6 +1017,7 @@ def store_logs_in_argus(test_id: UUID, logs: dict[str, list[list[str] | str]]):
 
 
 def get_test_results_for_failed_test(test_status, start_time):
+    from sdcm.utils.common import format_timestamp
     return {
         "job_url": os.environ.get("BUILD_URL"),
         "subject": f"{test_status}: {os.environ.get('JOB_NAME')}: {start_time}",
@@ -1050,6 +1042,11 @@ def get_test_results_for_failed_test(test_status, start_time):
 @click.option('--logdir', help='Directory where to find testrun folder')
 def send_email(test_id=None, test_status=None, start_time=None, started_by=None, runner_ip=None,
                email_recipients=None, logdir=None):
+    from sdcm.results_analyze import BaseResultsAnalyzer
+    from sdcm.send_email import build_reporter, get_running_instances_for_email_report, \
+        read_email_data_from_file, send_perf_email
+    from sdcm.utils.common import format_timestamp, get_testrun_dir, list_logs_by_test_id
+    from sdcm.utils.get_username import get_username
     if started_by is None:
         started_by = get_username()
     add_file_logger()
@@ -1141,6 +1138,7 @@ def send_email(test_id=None, test_status=None, start_time=None, started_by=None,
 @click.option('--sct_branch', default='master', type=str)
 @click.option('--sct_repo', default='git@github.com:scylladb/scylla-cluster-tests.git', type=str)
 def create_operator_test_release_jobs(branch, username, password, sct_branch, sct_repo):
+    from utils.build_system.create_test_release_jobs import JenkinsPipelines  # pylint: disable=no-name-in-module
     add_file_logger()
 
     base_job_dir = "scylla-operator"
@@ -1174,6 +1172,7 @@ def create_operator_test_release_jobs(branch, username, password, sct_branch, sc
 @click.option('--sct_branch', default='master', type=str)
 @click.option('--sct_repo', default='git@github.com:scylladb/scylla-cluster-tests.git', type=str)
 def create_test_release_jobs(branch, username, password, sct_branch, sct_repo):
+    from utils.build_system.create_test_release_jobs import JenkinsPipelines  # pylint: disable=no-name-in-module
     add_file_logger()
 
     base_job_dir = f'{branch}'
@@ -1222,6 +1221,7 @@ def create_test_release_jobs(branch, username, password, sct_branch, sct_repo):
 @click.option('--sct_branch', default='master', type=str)
 @click.option('--sct_repo', default='git@github.com:scylladb/scylla-cluster-tests.git', type=str)
 def create_test_release_jobs_enterprise(branch, username, password, sct_branch, sct_repo):
+    from utils.build_system.create_test_release_jobs import JenkinsPipelines  # pylint: disable=no-name-in-module
     add_file_logger()
 
     base_job_dir = f'{branch}'
@@ -1248,6 +1248,8 @@ def create_test_release_jobs_enterprise(branch, username, password, sct_branch,
 @cloud_provider_option
 @click.option("-r", "--region", required=True, type=CloudRegion(), help="Cloud region")
 def prepare_region(cloud_provider, region):
+    from sdcm.utils.aws_region import AwsRegion
+    from sdcm.utils.azure_region import AzureRegion
     add_file_logger()
     if cloud_provider == "aws":
         region = AwsRegion(region_name=region)
@@ -1259,15 +1261,14 @@ def prepare_region(cloud_provider, region):
 
 
 @cli.command("create-runner-image",
-             help=f"Create an SCT runner image in the selected cloud region."
-                  f" If the requested region is not a source region"
-                  f" (aws: {AwsSctRunner.SOURCE_IMAGE_REGION}, gce: {GceSctRunner.SOURCE_IMAGE_REGION},"
-                  f" azure: {AzureSctRunner.SOURCE_IMAGE_REGION}) the image will be first created in the"
-                  f" source region and then copied to the chosen one.")
+             help="Create an SCT runner image in the selected cloud region."
+                  " If the requested region is not the source region of the cloud provider"
+                  " the image will be first created in the source region and then copied to the chosen one.")
 @cloud_provider_option
 @click.option("-r", "--region", required=True, type=CloudRegion(), help="Cloud region")
 @click.option("-z", "--availability-zone", default="", type=str, help="Name of availability zone, ex. 'a'")
 def create_runner_image(cloud_provider, region, availability_zone):
+    from sdcm.sct_runner import get_sct_runner
     if cloud_provider == "aws" and availability_zone != "":
         assert len(availability_zone) == 1, f"Invalid AZ: {availability_zone}, availability-zone is one-letter a-z."
     add_file_logger()
@@ -1283,6 +1284,7 @@ def create_runner_image(cloud_provider, region, availability_zone):
 @click.option("-t", "--test-id", required=True, type=str, help="Test ID")
 @click.option("-d", "--duration", required=True, type=int, help="Test duration in MINUTES")
 def create_runner_instance(cloud_provider, region, availability_zone, instance_type, test_id, duration):
+    from sdcm.sct_runner import get_sct_runner
     if cloud_provider == "aws":
         assert len(availability_zone) == 1, f"Invalid AZ: {availability_zone}, availability-zone is one-letter a-z."
     add_file_logger()
@@ -1314,6 +1316,7 @@ def create_runner_instance(cloud_provider, region, availability_zone, instance_t
 @click.option("-ip", "--runner-ip", required=False, type=str, default="")
 @click.option('--dry-run', is_flag=True, default=False, help='dry run')
 def clean_runner_instances(test_status, runner_ip, dry_run):
+    from sdcm.sct_runner import clean_sct_runners
     add_file_logger()
     clean_sct_runners(test_status=test_status, test_runner_ip=runner_ip, dry_run=dry_run)
 
@@ -1329,6 +1332,7 @@ def clean_runner_instances(test_status, runner_ip, dry_run):
 @click.option("-f", "--force", is_flag=True, default=False, help="don't check aws_mock_ip")
 @click.option("-t", "--test-id", required=False, help="SCT Test ID")
 def run_aws_mock(mock_region: list[str], force: bool = False, test_id: str | None = None) -> None:
+    from utils.mocks.aws_mock import AwsMock  # pylint: disable=no-name-in-module
     add_file_logger()
     if test_id is None:
         test_id = str(uuid.uuid4())
@@ -1348,6 +1352,7 @@ def run_aws_mock(mock_region: list[str], force: bool = False, test_id: str | Non
 @click.option('--verbose', is_flag=True, default=False, help="if enable, will log progress")
 @click.option("--dry-run", is_flag=True, default=False, help="dry run")
 def clean_aws_mocks(test_id: str | None, all_mocks: bool, verbose: bool, dry_run: bool) -> None:
+    from utils.mocks.aws_mock import AwsMock  # pylint: disable=no-name-in-module
     add_file_logger()
     AwsMock.clean(test_id=test_id, all_mocks=all_mocks, verbose=verbose, dry_run=dry_run)
 
@@ -33,20 +33,14 @@ class CassandraHarryStressEventsPublisher(FileFollowerThread):
         self.harry_log_filename = harry_log_filename
         self.node = str(node)
 
-    def run(self):
-        while not self.stopped():
-            exists = os.path.isfile(self.harry_log_filename)
-            if not exists:
-                time.sleep(0.5)
-                continue
-
-            for line_number, line in enumerate(self.follow_file(self.harry_log_filename)):
-                if self.stopped():
-                    break
-
-                for pattern, event in CASSANDRA_HARRY_ERROR_EVENTS_PATTERNS:
-                    if pattern.search(line):
-                        event.add_info(node=self.node, line=line, line_number=line_number).publish()
+    @property
+    def followed_file(self):
+        return self.harry_log_filename
+
+    def handle_line(self, line_number, line):
+        for pattern, event in CASSANDRA_HARRY_ERROR_EVENTS_PATTERNS:
+            if pattern.search(line):
+                event.add_info(node=self.node, line=line, line_number=line_number).publish()
 
 
 #  pylint: disable=too-many-instance-attributes
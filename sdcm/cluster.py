@@ -65,6 +65,7 @@ from sdcm.provision.scylla_yaml.scylla_yaml import ScyllaYaml
 from sdcm.provision.helpers.certificate import install_client_certificate, install_encryption_at_rest_files
 from sdcm.remote import RemoteCmdRunnerBase, LOCALRUNNER, NETWORK_EXCEPTIONS, shell_script_cmd
 from sdcm.remote.remote_file import remote_file, yaml_file_to_dict, dict_to_yaml_file
+from sdcm.rest.topology_client import TopologyClient
 from sdcm import wait, mgmt
 from sdcm.sct_config import SCTConfiguration
 from sdcm.sct_events.continuous_event import ContinuousEventsRegistry
@@ -72,7 +73,7 @@ from sdcm.utils import properties
 from sdcm.utils.common import (
     S3Storage,
     ScyllaCQLSession,
-    PageFetcher,
+    PagedReader,
     deprecation,
     get_data_dir_path,
     verify_scylla_repo_file,
@@ -88,9 +89,9 @@ from sdcm.utils.ci_tools import get_test_name
 from sdcm.utils.distro import Distro
 from sdcm.utils.install import InstallMode
 from sdcm.utils.docker_utils import ContainerManager, NotFound, docker_hub_login
-from sdcm.utils.health_checker import check_nodes_status, check_node_status_in_gossip_and_nodetool_status, \
-    check_schema_version, check_nulls_in_peers, check_schema_agreement_in_gossip_and_peers, \
-    CHECK_NODE_HEALTH_RETRIES, CHECK_NODE_HEALTH_RETRY_DELAY
+from sdcm.utils.health_checker import check_nodes_status, check_schema_agreement_in_gossip_and_peers, \
+    CHECK_NODE_HEALTH_RETRIES
+from sdcm.utils.cluster_health import ClusterHealthEngine
 from sdcm.utils.decorators import NoValue, retrying, log_run_info, optional_cached_property
 from sdcm.utils.remotewebbrowser import WebDriverContainerMixin
 from sdcm.test_config import TestConfig
@@ -955,7 +956,8 @@ class BaseNode(AutoSshContainerMixin, WebDriverContainerMixin):  # pylint: disab
             node_name=str(self.name),
             system_event_patterns=SYSTEM_ERROR_EVENTS_PATTERNS,
             decoding_queue=self.test_config.DECODING_QUEUE,
-            log_lines=self.parent_cluster.params.get('logs_transport') in ['rsyslog', 'syslog-ng']
+            log_lines=self.parent_cluster.params.get('logs_transport') in ['rsyslog', 'syslog-ng'],
+            checkpoint_path=os.path.join(self.logdir, "db_log_reader.checkpoint"),
         )
         self._db_log_reader_thread.start()
 
@@ -2606,29 +2608,8 @@ class BaseNode(AutoSshContainerMixin, WebDriverContainerMixin):  # pylint: disab
                     raise
 
     def node_health_events(self) -> Iterator[ClusterHealthValidatorEvent]:
-        nodes_status = self.get_nodes_status()
-        peers_details = self.get_peers_info() or {}
-        gossip_info = self.get_gossip_info() or {}
-
-        return itertools.chain(
-            check_nodes_status(
-                nodes_status=nodes_status,
-                current_node=self,
-                removed_nodes_list=self.parent_cluster.dead_nodes_ip_address_list),
-            check_node_status_in_gossip_and_nodetool_status(
-                gossip_info=gossip_info,
-                nodes_status=nodes_status,
-                current_node=self),
-            check_schema_version(
-                gossip_info=gossip_info,
-                peers_details=peers_details,
-                nodes_status=nodes_status,
-                current_node=self),
-            check_nulls_in_peers(
-                gossip_info=gossip_info,
-                peers_details=peers_details,
-                current_node=self),
-        )
+        health_engine = self.parent_cluster.health_engine
+        return health_engine.node_health_events(health_engine.gather_node_view(self))
 
     def check_node_health(self, retries: int = CHECK_NODE_HEALTH_RETRIES) -> None:
         # Task 1443: ClusterHealthCheck is bottle neck in scale test and create a lot of noise in 5000 tables test.
@@ -2636,25 +2617,7 @@ class BaseNode(AutoSshContainerMixin, WebDriverContainerMixin):  # pylint: disab
         if not self.parent_cluster.params.get('cluster_health_check'):
             return
 
-        for retry_n in range(1, retries+1):
-            LOGGER.debug("Check the health of the node `%s' [attempt #%d]", self.name, retry_n)
-            events = self.node_health_events()
-            event = next(events, None)
-            if event is None:
-                LOGGER.debug("Node `%s' is healthy", self.name)
-                break
-            if retry_n == retries:  # publish health validation events on the last retry.
-                LOGGER.debug("One or more node `%s' health validation has failed", self.name)
-                event.publish()
-                for event in events:
-                    event.publish()
-                break
-
-            event.dont_publish()
-
-            LOGGER.debug("Wait for %d secs before next try to validate the health of the node `%s'",
-                         CHECK_NODE_HEALTH_RETRY_DELAY, self.name)
-            time.sleep(CHECK_NODE_HEALTH_RETRY_DELAY)
+        self.parent_cluster.health_engine.check(nodes=[self], retries=retries)
 
     def get_nodes_status(self):
         nodes_status = {}
@@ -2673,8 +2636,26 @@ class BaseNode(AutoSshContainerMixin, WebDriverContainerMixin):  # pylint: disab
             ).publish()
         return nodes_status
 
+    @cached_property
+    def topology_client(self) -> TopologyClient:
+        return TopologyClient(node=self)
+
     @retrying(n=5, sleep_time=5, raise_on_exceeded=False)
     def get_peers_info(self):
+        try:
+            with self.parent_cluster.cql_connection_exclusive(self, verbose=False) as session:
+                rows = session.execute(
+                    'select peer, data_center, host_id, rack, release_version, rpc_address, schema_version, '
+                    'supported_features from system.peers')
+                # Keep the cqlsh representation of values: check_nulls_in_peers() looks for 'null' values.
+                return {str(row.peer): {column: 'null' if value is None else str(value)
+                                        for column, value in row._asdict().items() if column != 'peer'}
+                        for row in rows}
+        except Exception as exc:  # pylint: disable=broad-except
+            self.log.debug("Unable to read system.peers using CQL driver, use cqlsh: %s", exc)
+        return self._get_peers_info_by_cqlsh()
+
+    def _get_peers_info_by_cqlsh(self):
         cql_result = self.run_cqlsh('select peer, data_center, host_id, rack, release_version, '
                                     'rpc_address, schema_version, supported_features from system.peers',
                                     split=True, verbose=False)
@@ -2705,6 +2686,14 @@ class BaseNode(AutoSshContainerMixin, WebDriverContainerMixin):  # pylint: disab
 
     @retrying(n=5, sleep_time=10, raise_on_exceeded=False)
     def get_gossip_info(self):
+        try:
+            return {state.rpc_address: {'schema': state.schema, 'status': state.status, 'dc': state.datacenter}
+                    for state in self.topology_client.get_gossip().values() if state.schema and state.status}
+        except Exception as exc:  # pylint: disable=broad-except
+            self.log.debug("Unable to get gossip info using the REST API, use nodetool: %s", exc)
+        return self._get_gossip_info_by_nodetool()
+
+    def _get_gossip_info_by_nodetool(self):
         gossip_info = self.run_nodetool('gossipinfo', verbose=False, warning_event_on_exception=(Exception,),
                                         publish_event=False)
         gossip_node_schemas = {}
@@ -3311,9 +3300,7 @@ class BaseCluster:  # pylint: disable=too-many-instance-attributes,too-many-publ
 
             session.default_fetch_size = 1000
             session.default_consistency_level = ConsistencyLevel.ONE
-            execute_result = session.execute_async(cmd)
-            fetcher = PageFetcher(execute_result).request_all()
-            current_rows = fetcher.all_data()
+            current_rows = PagedReader(session.execute_async(cmd))
 
             # for row in cql_session.execute(cmd).current_rows:
             for row in current_rows:
@@ -3514,6 +3501,10 @@ class BaseScyllaCluster:  # pylint: disable=too-many-public-methods, too-many-in
     def get_rack_nodes(self, rack: int) -> list:
         return sorted([node for node in self.nodes if node.rack == rack], key=lambda n: n.name)
 
+    @cached_property
+    def health_engine(self) -> ClusterHealthEngine:
+        return ClusterHealthEngine(cluster=self)
+
     @cached_property
     def proposed_scylla_yaml(self) -> ScyllaYaml:
         """
@@ -3800,9 +3791,9 @@ class BaseScyllaCluster:  # pylint: disable=too-many-public-methods, too-many-in
         return node_info_list
 
     @retrying(n=3, sleep_time=5)
-    def get_nodetool_status(self, verification_node=None):  # pylint: disable=too-many-locals
+    def get_nodetool_status(self, verification_node=None):
         """
-            Runs nodetool status and generates status structure.
+            Gets status of nodes (using the REST API, falls back to nodetool status) and generates status structure.
             Status format:
             status = {
                 "datacenter1": {
@@ -3816,11 +3807,21 @@ class BaseScyllaCluster:  # pylint: disable=too-many-public-methods, too-many-in
                     }
                 }
             }
-        :param verification_node: node to run the nodetool on
+        :param verification_node: node to get the status from
         :return: dict
         """
         if not verification_node:
             verification_node = random.choice(self.nodes)
+        try:
+            return {dc: {ip: endpoint.as_nodetool_status() for ip, endpoint in dc_status.items()}
+                    for dc, dc_status in verification_node.topology_client.get_status().items()}
+        except Exception as exc:  # pylint: disable=broad-except
+            self.log.debug("Unable to get status of nodes using the REST API of %s, use nodetool: %s",
+                           verification_node.name, exc)
+        return self._get_nodetool_status_by_nodetool(verification_node)
+
+    @staticmethod
+    def _get_nodetool_status_by_nodetool(verification_node):  # pylint: disable=too-many-locals
         status = {}
         res = verification_node.run_nodetool('status', warning_event_on_exception=(Exception,), publish_event=False)
         data_centers = res.stdout.strip().split("Datacenter: ")
@@ -3856,12 +3857,16 @@ class BaseScyllaCluster:  # pylint: disable=too-many-public-methods, too-many-in
     @staticmethod
     def get_nodetool_info(node):
         """
-            Runs nodetool info and generates status structure.
+            Gets information about the node (using the REST API, falls back to nodetool info).
             Info format:
 
-            :param node: node to run the nodetool on
+            :param node: node to get the information from
             :return: dict
         """
+        try:
+            return node.topology_client.get_node_info().as_nodetool_info()
+        except Exception as exc:  # pylint: disable=broad-except
+            LOGGER.debug("Unable to get info of %s using the REST API, use nodetool: %s", node.name, exc)
         res = node.run_nodetool('info')
         # Removing unnecessary lines from the output
         proper_yaml_output = "\n".join([line for line in res.stdout.splitlines() if ":" in line])
@@ -3879,8 +3884,7 @@ class BaseScyllaCluster:  # pylint: disable=too-many-public-methods, too-many-in
             # Don't run health check in case parallel nemesis.
             # TODO: find how to recognize, that nemesis on the node is running
             if self.nemesis_count == 1:
-                for node in self.nodes:
-                    node.check_node_health()
+                self.health_engine.check()
             else:
                 chc_event.message = "Test runs with parallel nemesis. Nodes health checks are disabled."
                 return
@@ -67,8 +67,13 @@ from sdcm.utils.k8s import (
     get_helm_pool_affinity_values,
     get_pool_affinity_modifiers,
     get_preferred_pod_anti_affinity_values,
+    has_ready_condition,
+    api_call_priority,
+    get_kubectl_call_priority,
+    ApiCallPriority,
     ApiCallRateLimiter,
     JSON_PATCH_TYPE,
+    KubernetesInformer,
     KubernetesOps,
     KUBECTL_TIMEOUT,
     HelmValues,
@@ -274,6 +279,9 @@ class KubernetesCluster(metaclass=abc.ABCMeta):  # pylint: disable=too-many-publ
         self.k8s_scylla_cluster_name = self.params.get('k8s_scylla_cluster_name')
         self.scylla_config_lock = RLock()
         self.scylla_restart_required = False
+        self._informers: Dict[Tuple[str, Optional[str]], KubernetesInformer] = {}
+        self._informers_lock = RLock()
+        self._informers_stopped = False
         self.perf_pods_labels = [
             ('app.kubernetes.io/name', 'scylla-node-config'),
             ('app.kubernetes.io/name', 'node-config'),
@@ -315,7 +323,7 @@ class KubernetesCluster(metaclass=abc.ABCMeta):  # pylint: disable=too-many-publ
     def kubectl(self, *command, namespace=None, timeout=KUBECTL_TIMEOUT, remoter=None, ignore_status=False,
                 verbose=True):
         if self.api_call_rate_limiter:
-            self.api_call_rate_limiter.wait()
+            self.api_call_rate_limiter.wait(priority=get_kubectl_call_priority(*command), caller="kubectl")
         return KubernetesOps.kubectl(self, *command, namespace=namespace, timeout=timeout, remoter=remoter,
                                      ignore_status=ignore_status, verbose=verbose)
 
@@ -349,26 +357,26 @@ class KubernetesCluster(metaclass=abc.ABCMeta):  # pylint: disable=too-many-publ
     def kubectl_multi_cmd(self, *command, namespace=None, timeout=KUBECTL_TIMEOUT, remoter=None, ignore_status=False,
                           verbose=True):
         if self.api_call_rate_limiter:
-            self.api_call_rate_limiter.wait()
+            self.api_call_rate_limiter.wait(priority=get_kubectl_call_priority(*command), caller="kubectl")
         return KubernetesOps.kubectl_multi_cmd(self, *command, namespace=namespace, timeout=timeout, remoter=remoter,
                                                ignore_status=ignore_status, verbose=verbose)
 
     @property
     def helm(self):
         if self.api_call_rate_limiter:
-            self.api_call_rate_limiter.wait()
+            self.api_call_rate_limiter.wait(priority=ApiCallPriority.CONTROL_PLANE, caller="helm")
         return partial(self.test_config.tester_obj().localhost.helm, self)
 
     @property
     def helm_install(self):
         if self.api_call_rate_limiter:
-            self.api_call_rate_limiter.wait()
+            self.api_call_rate_limiter.wait(priority=ApiCallPriority.CONTROL_PLANE, caller="helm")
         return partial(self.test_config.tester_obj().localhost.helm_install, self)
 
     @property
     def helm_upgrade(self):
         if self.api_call_rate_limiter:
-            self.api_call_rate_limiter.wait()
+            self.api_call_rate_limiter.wait(priority=ApiCallPriority.CONTROL_PLANE, caller="helm")
         return partial(self.test_config.tester_obj().localhost.helm_upgrade, self)
 
     @cached_property
@@ -1118,6 +1126,10 @@ class KubernetesCluster(metaclass=abc.ABCMeta):  # pylint: disable=too-many-publ
 
     @log_run_info
     def gather_k8s_logs(self) -> None:
+        with api_call_priority(ApiCallPriority.BACKGROUND):
+            self._gather_k8s_logs()
+
+    def _gather_k8s_logs(self) -> None:
         # NOTE: reuse data where possible to minimize spent time due to API limiter restrictions
         LOGGER.info("K8S-LOGS: starting logs gathering")
         logdir = Path(self.logdir)
@@ -1188,9 +1200,35 @@ class KubernetesCluster(metaclass=abc.ABCMeta):  # pylint: disable=too-many-publ
                                      f"{logfile}-previous.log",
                                      namespace=namespace, ignore_status=True)
 
+    def get_informer(self, kind: str, namespace: Optional[str] = None) -> KubernetesInformer:
+        """Running informer of `kind' objects in the namespace, shared by all consumers of this k8s cluster.
+
+        After `stop_informers()' no new informers are started: the stopped ones keep the last known state of
+        objects and are returned as is.
+        """
+
+        with self._informers_lock:
+            informer = self._informers.get((kind, namespace))
+            if self._informers_stopped:
+                if informer is None:
+                    raise RuntimeError(f"Informers of {self.name} are stopped, no informer of `{kind}' objects")
+                return informer
+            if informer is None or not informer.is_alive():
+                informer = self._informers[(kind, namespace)] = KubernetesInformer(self, kind, namespace=namespace)
+                informer.start()
+            return informer
+
+    def stop_informers(self, timeout=10):
+        with self._informers_lock:
+            self._informers_stopped = True
+            informers = list(self._informers.values())
+        for informer in informers:
+            informer.stop(timeout)
+
     @log_run_info
     def stop_k8s_task_threads(self, timeout=10):
         LOGGER.info("Stop k8s task threads")
+        self.stop_informers(timeout)
         if self._scylla_manager_journal_thread:
             self._scylla_manager_journal_thread.stop(timeout)
         if self._cert_manager_journal_thread:
@@ -1525,9 +1563,7 @@ class BasePodContainer(cluster.BaseNode):  # pylint: disable=too-many-public-met
 
     @property
     def _pod(self):
-        pods = KubernetesOps.list_pods(self.parent_cluster, namespace=self.parent_cluster.namespace,
-                                       field_selector=f"metadata.name={self.name}")
-        return pods[0] if pods else None
+        return self.parent_cluster.pods_informer.get(self.name)
 
     @property
     def _pod_status(self):
@@ -1537,19 +1573,15 @@ class BasePodContainer(cluster.BaseNode):  # pylint: disable=too-many-public-met
 
     @property
     def _node(self):
-        return KubernetesOps.get_node(self.parent_cluster, self.node_name)
+        return self.parent_cluster.k8s_cluster.get_informer("node").get(self.node_name)
 
     @property
     def _cluster_ip_service(self):
-        services = KubernetesOps.list_services(self.parent_cluster, namespace=self.parent_cluster.namespace,
-                                               field_selector=f"metadata.name={self.name}")
-        return services[0] if services else None
+        return self.parent_cluster.services_informer.get(self.name)
 
     @property
     def _svc(self):
-        services = KubernetesOps.list_services(self.parent_cluster, namespace=self.parent_cluster.namespace,
-                                               field_selector=f"metadata.name={self.name}")
-        return services[0] if services else None
+        return self.parent_cluster.services_informer.get(self.name)
 
     @property
     def _container_status(self):
@@ -1588,55 +1620,35 @@ class BasePodContainer(cluster.BaseNode):  # pylint: disable=too-many-public-met
         """
         if timeout is None:
             timeout = self.pod_replace_timeout
-        wait_for(lambda: self.k8s_pod_uid and self.k8s_pod_uid != ignore_uid, timeout=timeout,
-                 text=f"Wait till host {self} get uid", throw_exc=False)
+        try:
+            self.parent_cluster.pods_informer.wait_for(
+                lambda informer: (pod := informer.get(self.name)) is not None and pod.metadata.uid
+                and str(pod.metadata.uid) != ignore_uid,
+                timeout=timeout,
+                text=f"Wait till host {self} get uid")
+        except TimeoutError as exc:
+            self.log.error(exc)
         return self.k8s_pod_uid
 
     def wait_for_k8s_node_readiness(self):
-        wait_for(self._wait_for_k8s_node_readiness,
-                 text=f"Wait for k8s host {self.node_name} to be ready...",
-                 timeout=self.pod_readiness_timeout * 60,
-                 step=5,
-                 throw_exc=True)
-
-    def _wait_for_k8s_node_readiness(self):
         if self.node_name is None:
             raise RuntimeError(f"Can't find node for pod {self.name}")
-        result = self.parent_cluster.k8s_cluster.kubectl(
-            f"wait node --timeout={self.pod_readiness_timeout // 3}m --for=condition=Ready {self.node_name}",
-            namespace=self.parent_cluster.namespace,
-            timeout=self.pod_readiness_timeout // 3 * 60 + 10
-        )
-        if result.stdout.count('condition met') != 1:
-            raise RuntimeError('Node is not reported as ready')
-        return True
+        self.parent_cluster.k8s_cluster.get_informer("node").wait_for(
+            lambda informer: (node := informer.get(self.node_name)) is not None and has_ready_condition(node),
+            timeout=self.pod_readiness_timeout * 60,
+            text=f"Wait for k8s host {self.node_name} to be ready")
 
     def wait_for_pod_to_appear(self):
-        wait_for(self._wait_for_pod_to_appear,
-                 text="Wait for pod to appear...",
-                 timeout=self.pod_readiness_timeout * 60,
-                 throw_exc=True)
-
-    def _wait_for_pod_to_appear(self):
-        if self._pod is None:
-            raise RuntimeError('Pod is not there')
-        return True
+        self.parent_cluster.pods_informer.wait_for(
+            lambda informer: informer.get(self.name) is not None,
+            timeout=self.pod_readiness_timeout * 60,
+            text=f"Wait for {self.name} pod to appear")
 
     def wait_for_pod_readiness(self):
-        # To make it more informative in worst case scenario it repeat waiting text 5 times
-        wait_for(self._wait_for_pod_readiness,
-                 text=f"Wait for {self.name} pod to be ready...",
-                 timeout=self.pod_readiness_timeout * 60,
-                 throw_exc=True)
-
-    def _wait_for_pod_readiness(self):
-        result = self.parent_cluster.k8s_cluster.kubectl(
-            f"wait --timeout={self.pod_readiness_timeout // 3}m --for=condition=Ready pod {self.name}",
-            namespace=self.parent_cluster.namespace,
-            timeout=self.pod_readiness_timeout // 3 * 60 + 10)
-        if result.stdout.count('condition met') != 1:
-            raise RuntimeError('Pod is not ready')
-        return True
+        self.parent_cluster.pods_informer.wait_for(
+            lambda informer: (pod := informer.get(self.name)) is not None and has_ready_condition(pod),
+            timeout=self.pod_readiness_timeout * 60,
+            text=f"Wait for {self.name} pod to be ready")
 
     @property
     def image(self) -> str:
@@ -1839,15 +1851,10 @@ class BaseScyllaPodContainer(BasePodContainer):  # pylint: disable=abstract-meth
         self.parent_cluster.k8s_cluster.kubectl(cmd, namespace=self.parent_cluster.namespace, ignore_status=True)
 
     def wait_for_svc(self):
-        wait_for(self._wait_for_svc,
-                 text=f"Wait for k8s service {self.name} to be ready...",
-                 timeout=self.pod_readiness_timeout * 60,
-                 throw_exc=True)
-
-    def _wait_for_svc(self):
-        self.parent_cluster.k8s_cluster.kubectl(
-            f"get svc {self.name}", namespace=self.parent_cluster.namespace, verbose=False)
-        return True
+        self.parent_cluster.services_informer.wait_for(
+            lambda informer: informer.get(self.name) is not None,
+            timeout=self.pod_readiness_timeout * 60,
+            text=f"Wait for k8s service {self.name} to be ready")
 
     def refresh_ip_address(self):
         # Invalidate ip address cache
@@ -1924,6 +1931,14 @@ class PodCluster(cluster.BaseCluster):
     def pool_name(self):
         return self.node_pool.get('name', None)
 
+    @property
+    def pods_informer(self) -> KubernetesInformer:
+        return self.k8s_cluster.get_informer("pod", namespace=self.namespace)
+
+    @property
+    def services_informer(self) -> KubernetesInformer:
+        return self.k8s_cluster.get_informer("service", namespace=self.namespace)
+
     @property
     def statefulsets(self):
         return KubernetesOps.list_statefulsets(self.k8s_cluster, namespace=self.namespace)
@@ -1950,7 +1965,7 @@ class PodCluster(cluster.BaseCluster):
         self.wait_for_pods_readiness(pods_to_wait=count, total_pods=len(self.nodes) + count)
 
         # Register new nodes and return whatever was registered
-        k8s_pods = KubernetesOps.list_pods(self, namespace=self.namespace)
+        k8s_pods = self.pods_informer.list()
         nodes = []
         for pod in k8s_pods:
             if not any((x for x in pod.status.container_statuses if x.name == self.container)):
@@ -2311,7 +2326,7 @@ class ScyllaPodCluster(cluster.BaseScyllaCluster, PodCluster):  # pylint: disabl
                 PrometheusDBStats(
                     host=self.k8s_cluster.k8s_monitoring_node_ip,
                     port=self.k8s_cluster.k8s_prometheus_external_port,
-                )
+                ).get_configuration()
             except Exception as exc:  # pylint: disable=broad-except
                 ClusterHealthValidatorEvent.MonitoringStatus(
                     error=f'Failed to connect to kubernetes prometheus server at '
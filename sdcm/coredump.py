@@ -14,19 +14,66 @@
 import os
 import re
 import time
+import hashlib
 from abc import abstractmethod
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Tuple
 from datetime import datetime
 from functools import cached_property
-from threading import Thread, Event
-from dataclasses import dataclass
+from threading import Thread, Event, Lock
+from contextlib import contextmanager
+from collections import defaultdict
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor
+
+import prometheus_client
 
 from sdcm.log import SDCMAdapter
-from sdcm.remote import NETWORK_EXCEPTIONS
 from sdcm.utils.decorators import timeout
 from sdcm.sct_events.system import CoreDumpEvent
 from sdcm.sct_events.decorators import raise_event_on_failure
 
+COMPRESSED_COREDUMP_EXTENSIONS = ('.lz4', '.zip', '.gz', '.gzip', )
+COREDUMP_STAGE_DURATION = prometheus_client.Histogram(
+    "sct_coredump_stage_duration_seconds", "Time spent in the coredump processing stages", ["stage"],
+    buckets=(1, 5, 15, 60, 300, 900, 1800, 3600, float("inf")))
+COREDUMP_DUPLICATES = prometheus_client.Counter(
+    "sct_coredump_duplicates", "Coredumps which were not uploaded because the same crash was uploaded already")
+
+# Frame of a stack trace in `coredumpctl info' output:
+#   #4  0x0000000002ab94e5 _ZN7seastar7reactor3runEv (scylla)
+STACK_FRAME_RE = re.compile(r'^#\d+\s+0x[0-9a-f]+\s+(?P<frame>.+)$')
+# Module line in `coredumpctl info' output of newer systemd versions:
+#   Module /opt/scylladb/libexec/scylla with build-id 1f3b7a1a51b7c56b4e0f5bb2a0e8f3e8fc1c2a4c
+BUILD_ID_RE = re.compile(r'^\s*Module (?P<module>\S+) .*?with build-id (?P<build_id>[0-9a-f]+)', re.MULTILINE)
+
+
+def get_backtrace_hash(coredump_info: str) -> str:
+    """
+    Hash of the first stack trace in the coredump info without addresses, so ASLR doesn't make the same crash unique.
+    """
+    frames = []
+    for line in coredump_info.splitlines():
+        line = line.strip()
+        if line.startswith('Stack trace of thread'):
+            if frames:
+                break
+            continue
+        if match := STACK_FRAME_RE.match(line):
+            frames.append(match.group('frame'))
+    if not frames:
+        return ''
+    return hashlib.sha1('\n'.join(frames).encode()).hexdigest()
+
+
+def get_build_id(coredump_info: str, executable: str = '') -> str:
+    build_ids = {match.group('module'): match.group('build_id') for match in BUILD_ID_RE.finditer(coredump_info)}
+    if not build_ids:
+        return ''
+    for module in (executable, os.path.basename(executable)):
+        if module in build_ids:
+            return build_ids[module]
+    return next(iter(build_ids.values()))
+
 
 # pylint: disable=too-many-instance-attributes
 @dataclass
@@ -41,6 +88,9 @@ class CoreDumpInfo:
     command_line: str = ''
     executable: str = ''
     process_retry: int = 0
+    build_id: str = ''
+    backtrace_hash: str = ''
+    stage_timings: Dict[str, float] = field(default_factory=dict)
 
     def publish_event(self):
         CoreDumpEvent(
@@ -56,6 +106,15 @@ class CoreDumpInfo:
             return f'CoreDump[{self.pid}, {self.corefile}]'
         return f'CoreDump[{self.pid}]'
 
+    @property
+    def signature(self) -> Optional[Tuple[str, str]]:
+        """
+        Cores with the same build-id and backtrace are the same crash, no need to upload all of them.
+        """
+        if not self.backtrace_hash:
+            return None
+        return self.build_id, self.backtrace_hash
+
     # pylint: disable=too-many-arguments
     def update(self,
                node: 'BaseNode' = None,
@@ -66,7 +125,9 @@ class CoreDumpInfo:
                download_url: str = None,
                command_line: str = None,
                executable: str = None,
-               process_retry: int = None):
+               process_retry: int = None,
+               build_id: str = None,
+               backtrace_hash: str = None):
         for attr_name, attr_value in {
             'node': node,
             'corefile': corefile,
@@ -77,15 +138,25 @@ class CoreDumpInfo:
             'command_line': command_line,
             'executable': executable,
             'process_retry': process_retry,
+            'build_id': build_id,
+            'backtrace_hash': backtrace_hash,
         }.items():
             if attr_value is not None:
                 setattr(self, attr_name, attr_value)
 
 
 class CoredumpThreadBase(Thread):  # pylint: disable=too-many-instance-attributes
+    """
+    Cores are processed in stages: detect -> metadata -> compress & upload.
+
+    Metadata of several cores is gathered in parallel and upload of a core starts as soon as its metadata is ready,
+    up to `max_concurrent_cores' cores in each stage per node.  Compression is streamed into the upload, so
+    no compressed copy of a core is written to the node's disk.
+    """
     lookup_period = 30
     upload_retry_limit = 3
     max_coredump_thread_exceptions = 10
+    max_concurrent_cores = 2
 
     def __init__(self, node: 'BaseNode', max_core_upload_limit: int):
         self.node = node
@@ -95,6 +166,10 @@ class CoredumpThreadBase(Thread):  # pylint: disable=too-many-instance-attribute
         self.in_progress: List[CoreDumpInfo] = []
         self.completed: List[CoreDumpInfo] = []
         self.uploaded: List[CoreDumpInfo] = []
+        self.stage_timings: Dict[str, List[float]] = defaultdict(list)
+        self._stage_timings_lock = Lock()
+        self._uploaded_signatures: Dict[Tuple[str, str], CoreDumpInfo] = {}
+        self._pigz_lock = Lock()
         self.termination_event = Event()
         self.exception = None
         super().__init__(daemon=True)
@@ -123,7 +198,8 @@ class CoredumpThreadBase(Thread):  # pylint: disable=too-many-instance-attribute
         if not self.node.remoter.is_up(timeout=60):
             return
         self._process_coredumps(self.in_progress, self.completed, self.uploaded)
-        new_cores = self.extract_info_from_core_pids(self.get_list_of_cores(), exclude_cores=self.found)
+        with self.stage_timer('detect'):
+            new_cores = self.extract_info_from_core_pids(self.get_list_of_cores(), exclude_cores=self.found)
         self.push_new_cores_to_process(new_cores)
 
     def push_new_cores_to_process(self, new_cores: List[CoreDumpInfo]):
@@ -138,6 +214,24 @@ class CoredumpThreadBase(Thread):  # pylint: disable=too-many-instance-attribute
     def is_limit_reached(self):
         return len(self.uploaded) >= self.max_core_upload_limit
 
+    @contextmanager
+    def stage_timer(self, stage: str, core_info: Optional[CoreDumpInfo] = None):
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start_time
+            if core_info is not None:
+                core_info.stage_timings[stage] = duration
+            with self._stage_timings_lock:
+                self.stage_timings[stage].append(duration)
+            COREDUMP_STAGE_DURATION.labels(stage).observe(duration)
+
+    def get_stage_timings_summary(self) -> Dict[str, Dict[str, float]]:
+        with self._stage_timings_lock:
+            return {stage: {'count': len(durations), 'total': sum(durations), 'max': max(durations)}
+                    for stage, durations in self.stage_timings.items() if durations}
+
     def process_coredumps(self):
         self._process_coredumps(self.in_progress, self.completed, self.uploaded)
 
@@ -149,29 +243,92 @@ class CoredumpThreadBase(Thread):  # pylint: disable=too-many-instance-attribute
     ):
         """
         Get core files from node and report them
+
+        Cores are moved to `completed' and `uploaded' in the order of `in_progress', no matter which one
+        finished first.  A core which failed in any stage stays in progress and is retried on the next cycle.
         """
         if not in_progress:
             return
+        upload_slots = self.max_core_upload_limit - len(uploaded)
+        to_process = []
         for core_info in in_progress.copy():
-            if self.is_limit_reached():
+            if upload_slots <= 0:
+                if self.is_limit_reached():
+                    in_progress.remove(core_info)
+                continue  # wait till previous cores are uploaded or failed
+            core_info.process_retry += 1
+            if self.upload_retry_limit < core_info.process_retry:
+                self.log.error(f"Maximum retry uploading is reached for core {str(core_info)}")
                 in_progress.remove(core_info)
+                completed.append(core_info)
                 continue
-            try:
-                core_info.process_retry += 1
-                if self.upload_retry_limit < core_info.process_retry:
-                    self.log.error(f"Maximum retry uploading is reached for core {str(core_info)}")
-                    in_progress.remove(core_info)
-                    completed.append(core_info)
+            to_process.append(core_info)
+            upload_slots -= 1
+        if not to_process:
+            return
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrent_cores,
+                                thread_name_prefix=f"{self.name}-metadata") as metadata_pool, \
+                ThreadPoolExecutor(max_workers=self.max_concurrent_cores,
+                                   thread_name_prefix=f"{self.name}-upload") as upload_pool:
+            metadata_futures = [metadata_pool.submit(self._get_coredump_metadata, core_info)
+                                for core_info in to_process]
+            upload_futures = {}
+            in_flight: Dict[Tuple[str, str], CoreDumpInfo] = {}
+            for core_info, metadata_future in zip(to_process, metadata_futures):
+                if metadata_future.exception() is not None:
+                    continue
+                signature = core_info.signature
+                if signature is not None and (signature in self._uploaded_signatures or signature in in_flight):
+                    continue  # handled below, after the first core with this signature is uploaded
+                if signature is not None:
+                    in_flight[signature] = core_info
+                upload_futures[id(core_info)] = upload_pool.submit(self._upload_coredump_stage, core_info)
+
+            for core_info, metadata_future in zip(to_process, metadata_futures):
+                if metadata_future.exception() is not None:
                     continue
-                self.update_coredump_info_with_more_information(core_info)
-                result = self.upload_coredump(core_info)
+                if (upload_future := upload_futures.get(id(core_info))) is not None:
+                    if upload_future.exception() is not None:
+                        continue
+                    result = upload_future.result()
+                    if result and core_info.signature is not None:
+                        self._uploaded_signatures[core_info.signature] = core_info
+                elif not self._mark_as_duplicate(core_info):
+                    continue  # the same crash failed to upload, the core will be retried on the next cycle
+                else:
+                    result = False
                 completed.append(core_info)
                 in_progress.remove(core_info)
                 if result:
                     uploaded.append(core_info)
                     self.publish_event(core_info)
-            except Exception:  # pylint: disable=broad-except
-                pass
+
+    def _get_coredump_metadata(self, core_info: CoreDumpInfo):
+        with self.stage_timer('metadata', core_info):
+            self.update_coredump_info_with_more_information(core_info)
+            if core_info.coredump_info:
+                core_info.update(build_id=get_build_id(core_info.coredump_info, core_info.executable),
+                                 backtrace_hash=get_backtrace_hash(core_info.coredump_info))
+
+    def _upload_coredump_stage(self, core_info: CoreDumpInfo) -> bool:
+        with self.stage_timer('upload', core_info):
+            result = self.upload_coredump(core_info)
+        if result:
+            self.log.info("%s is uploaded, stage timings: %s", core_info,
+                          ", ".join(f"{stage}={duration:.1f}s" for stage, duration in core_info.stage_timings.items()))
+        return result
+
+    def _mark_as_duplicate(self, core_info: CoreDumpInfo) -> bool:
+        if (original := self._uploaded_signatures.get(core_info.signature)) is None:
+            return False
+        self.log.info("%s is the same crash as %s (build-id: %s, backtrace hash: %s), skip uploading",
+                      core_info, original, core_info.build_id or 'unknown', core_info.backtrace_hash)
+        core_info.update(download_url=original.download_url,
+                         download_instructions=f"Same crash as {original}:\n{original.download_instructions}")
+        COREDUMP_DUPLICATES.inc()
+        self.publish_event(core_info)
+        return True
 
     @abstractmethod
     def get_list_of_cores(self) -> Optional[List[CoreDumpInfo]]:
@@ -201,13 +358,20 @@ class CoredumpThreadBase(Thread):  # pylint: disable=too-many-instance-attribute
     # @retrying(n=10, sleep_time=20, allowed_exceptions=NETWORK_EXCEPTIONS, message="Retrying on uploading coredump")
     def _upload_coredump(self, core_info: CoreDumpInfo):
         coredump = core_info.corefile
-        coredump = self._pack_coredump(coredump)
+        compress = self._should_compress(coredump)
+        if compress:
+            coredump += '.gz'
         base_upload_url = 'upload.scylladb.com/%s/%s'
         coredump_id = os.path.basename(coredump)[:-3]
         upload_url = base_upload_url % (coredump_id, os.path.basename(coredump))
         self.log.info('Uploading coredump %s to %s' % (coredump, upload_url))
-        self.node.remoter.run("sudo curl --request PUT --upload-file "
-                              "'%s' '%s'" % (coredump, upload_url))
+        if compress:
+            # Compressed core goes straight to the upload, the node could have no disk space for its copy.
+            self.node.remoter.run(f"set -o pipefail; sudo pigz --fast --stdout '{core_info.corefile}' | "
+                                  f"curl --request PUT --upload-file - '{upload_url}'")
+        else:
+            self.node.remoter.run("sudo curl --request PUT --upload-file "
+                                  "'%s' '%s'" % (coredump, upload_url))
         download_url = 'https://storage.cloud.google.com/%s' % upload_url
         self.log.info("You can download it by %s (available for ScyllaDB employee)", download_url)
         download_instructions = 'gsutil cp gs://%s .\ngunzip %s' % (upload_url, coredump)
@@ -240,29 +404,20 @@ class CoredumpThreadBase(Thread):  # pylint: disable=too-many-instance-attribute
     def _install_pigz(self):
         if self.node.is_rhel_like():
             self.node.remoter.sudo('yum install -y pigz')
-            self.__dict__['is_pigz_installed'] = True
+            self.__dict__['_is_pigz_installed'] = True
         elif self.node.is_ubuntu() or self.node.is_debian():
             self.node.remoter.sudo('apt install -y pigz')
-            self.__dict__['is_pigz_installed'] = True
+            self.__dict__['_is_pigz_installed'] = True
         else:
             raise RuntimeError("Distro is not supported")
 
-    def _pack_coredump(self, coredump: str) -> str:
-        extensions = ['.lz4', '.zip', '.gz', '.gzip']
-        for extension in extensions:
-            if coredump.endswith(extension):
-                return coredump
-        if not self._is_pigz_installed:
-            self._install_pigz()
-        try:  # pylint: disable=unreachable
-            if not self.node.remoter.run(f'sudo ls {coredump}.gz', verbose=False, ignore_status=True).ok:
-                self.node.remoter.run(f'sudo pigz --fast --keep {coredump}')
-            coredump += '.gz'
-        except NETWORK_EXCEPTIONS:  # pylint: disable=try-except-raise
-            raise
-        except Exception as ex:  # pylint: disable=broad-except
-            self.log.warning("Failed to compress coredump '%s': %s", coredump, ex)
-        return coredump
+    def _should_compress(self, coredump: str) -> bool:
+        if coredump.endswith(COMPRESSED_COREDUMP_EXTENSIONS):
+            return False
+        with self._pigz_lock:
+            if not self._is_pigz_installed:
+                self._install_pigz()
+        return True
 
     def log_coredump(self, core_info: CoreDumpInfo):
         if not core_info.coredump_info:
@@ -13,19 +13,27 @@
 
 # pylint: disable=too-many-lines
 
+import gzip
 import json
 import logging
-import os
 import re
+import time
+from dataclasses import replace
 from functools import cached_property
 from multiprocessing import Process, Event, Queue
-from typing import Optional
+from typing import Iterable, List, Optional, Tuple
 
 from sdcm.remote.base import CommandRunner
 from sdcm.sct_events.base import LogEvent
-from sdcm.sct_events.database import get_pattern_to_event_to_func_mapping, BACKTRACE_RE
+from sdcm.sct_events.database import get_pattern_to_event_to_func_mapping, BACKTRACE_RE, \
+    SYSTEM_ERROR_EVENTS_PATTERNS
 from sdcm.sct_events.decorators import raise_event_on_failure
 from sdcm.utils.common import make_threads_be_daemonic_by_default
+from sdcm.utils.log_tail import LogCheckpoint, LogTail, FileChangeWatcher, LOG_TAIL_READ_CHUNK_SIZE
+from sdcm.utils.pattern_index import PatternIndex
+
+DB_LOG_READER_WAIT_TIMEOUT: float = 0.5  # seconds, the longest wait for a change of the log before reading it
+DB_LOG_READER_CHECKPOINT_INTERVAL: float = 1  # seconds
 
 LOGGER = logging.getLogger(__name__)
 
@@ -56,108 +64,138 @@ class DbLogReader(Process):
                  system_event_patterns: list,
                  decoding_queue: Optional[Queue],
                  log_lines: bool,
+                 checkpoint_path: Optional[str] = None,
                  ):
         self._system_log = system_log
         self._system_event_patterns = system_event_patterns
         self._decoding_queue = decoding_queue
         self._log_lines = log_lines
         self._node_name = node_name
+        self._checkpoint_path = checkpoint_path
 
         self._terminate_event = Event()
         self._last_error: LogEvent | None = None
-        self._last_line_no = -1
-        self._last_log_position = 0
+        self._log_tail: Optional[LogTail] = None
+        self._saved_checkpoint: Optional[LogCheckpoint] = None
+        self._checkpoint_saved_at = 0.0
         self._remoter = remoter
-        self._skipped_end_line = 0
         super().__init__(name=self.__class__.__name__, daemon=True)
 
     @cached_property
     def _continuous_event_patterns(self):
         return get_pattern_to_event_to_func_mapping(node=self._node_name)
 
+    @cached_property
+    def _continuous_event_patterns_index(self) -> PatternIndex:
+        return PatternIndex((item.pattern, item) for item in self._continuous_event_patterns)
+
+    @cached_property
+    def _system_event_patterns_index(self) -> PatternIndex:
+        return PatternIndex(self._system_event_patterns)
+
+    @property
+    def log_tail(self) -> LogTail:
+        if self._log_tail is None:
+            checkpoint = LogCheckpoint.load(self._checkpoint_path) if self._checkpoint_path else None
+            if checkpoint and checkpoint.inode:
+                LOGGER.debug("Continue reading %s from %s", self._system_log, checkpoint)
+            self._log_tail = LogTail(self._system_log, checkpoint=checkpoint)
+            self._saved_checkpoint = replace(self._log_tail.checkpoint)
+        return self._log_tail
+
+    def _save_checkpoint(self, force: bool = False) -> None:
+        if not self._checkpoint_path or self._log_tail is None:
+            return
+        checkpoint = self._log_tail.checkpoint
+        if checkpoint == self._saved_checkpoint:
+            return
+        if not force and time.perf_counter() - self._checkpoint_saved_at < DB_LOG_READER_CHECKPOINT_INTERVAL:
+            return
+        try:
+            checkpoint.save(self._checkpoint_path)
+        except OSError as exc:
+            LOGGER.warning("Failed to save checkpoint of %s: %s", self._system_log, exc)
+            return
+        self._saved_checkpoint = replace(checkpoint)
+        self._checkpoint_saved_at = time.perf_counter()
+
     def _read_and_publish_events(self) -> None:
-        """Search for all known patterns listed in `sdcm.sct_events.database.SYSTEM_ERROR_EVENTS'."""
+        """Search for all known patterns listed in `sdcm.sct_events.database.SYSTEM_ERROR_EVENTS'.
 
-        # pylint: disable=too-many-branches,too-many-locals,too-many-statements
+        Only lines added since the previous call are read.  The position is saved to the checkpoint file after
+        events are published, so a restarted reader doesn't publish them again.
+        """
 
-        backtraces = []
-        index = 0
+        self._publish_backtraces(self._find_events(self.log_tail.read_lines()))
+        self._save_checkpoint()
 
-        if not os.path.exists(self._system_log):
-            return
+    def _find_events(self, lines: Iterable[Tuple[int, str]], continuous_events: bool = True) -> List[dict]:
+        # pylint: disable=too-many-branches,too-many-locals
 
-        with open(self._system_log, encoding="utf-8") as db_file:
-            if self._last_log_position:
-                db_file.seek(self._last_log_position)
-            for index, line in enumerate(db_file, start=self._last_line_no + 1):
-                # Postpone processing line with no ending in case if half of line is written to the disc
-                if line[-1] == '\n' or self._skipped_end_line > 20:
-                    self._skipped_end_line = 0
-                else:
-                    self._skipped_end_line += 1
-                    continue
-                try:
-                    json_log = None
-                    if line[0] == '{':
-                        try:
-                            json_log = json.loads(line)
-                        except Exception:  # pylint: disable=broad-except
-                            pass
-
-                    if self._log_lines:
-                        line = line.strip()
-                        for pattern in self.EXCLUDE_FROM_LOGGING:
-                            if pattern in line:
-                                break
-                        else:
-                            LOGGER.debug(line)
-
-                    if json_log:
-                        continue
-
-                    match = BACKTRACE_RE.search(line)
-                    one_line_backtrace = []
-                    if match and backtraces:
-                        data = match.groupdict()
-                        if data['other_bt']:
-                            backtraces[-1]['backtrace'] += [data['other_bt'].strip()]
-                        if data['scylla_bt']:
-                            backtraces[-1]['backtrace'] += [data['scylla_bt'].strip()]
-                    elif "backtrace:" in line.lower() and "0x" in line:
-                        # This part handles the backtrases are printed in one line.
-                        # Example:
-                        # [shard 2] seastar - Exceptional future ignored: exceptions::mutation_write_timeout_exception
-                        # (Operation timed out for system.paxos - received only 0 responses from 1 CL=ONE.),
-                        # backtrace:   0x3316f4d#012  0x2e2d177#012  0x189d397#012  0x2e76ea0#012  0x2e770af#012
-                        # 0x2eaf065#012  0x2ebd68c#012  0x2e48d5d#012  /opt/scylladb/libreloc/libpthread.so.0+0x94e1#012
-                        splitted_line = re.split("backtrace:", line, flags=re.IGNORECASE)
-                        for trace_line in splitted_line[1].split():
-                            if trace_line.startswith('0x') or 'scylladb/lib' in trace_line:
-                                one_line_backtrace.append(trace_line)
-
-                    # for each line, if it matches a continuous event pattern,
-                    # call the appropriate function with the class tied to that pattern
-                    for item in self._continuous_event_patterns:
-                        if event_match := item.pattern.search(line):
-                            item.period_func(match=event_match)
-                            break
+        backtraces = []
 
-                    # for each line use all regexes to match, and if found send an event
-                    for pattern, event in self._system_event_patterns:
-                        if pattern.search(line):
-                            cloned_event = event.clone().add_info(node=self._node_name, line_number=index, line=line)
-                            backtraces.append(dict(event=cloned_event, backtrace=[]))
-                            break  # Stop iterating patterns to avoid creating two events for one line of the log
+        for index, line in lines:
+            try:
+                json_log = None
+                if line[0] == '{':
+                    try:
+                        json_log = json.loads(line)
+                    except Exception:  # pylint: disable=broad-except
+                        pass
+
+                if self._log_lines:
+                    line = line.strip()
+                    for pattern in self.EXCLUDE_FROM_LOGGING:
+                        if pattern in line:
+                            break
+                    else:
+                        LOGGER.debug(line)
 
-                    if one_line_backtrace and backtraces:
-                        backtraces[-1]['backtrace'] = one_line_backtrace
-                except Exception:  # pylint: disable=broad-except
-                    LOGGER.exception('Processing of %s line of %s failed, line content:\n%s',
-                                     index, self._system_log, line)
+                if json_log:
+                    continue
 
-            if index:
-                self._last_line_no = index
-                self._last_log_position = db_file.tell() + 1
+                lowered_line = line.lower()
+
+                # All backtrace lines have an address in it, no need to run the regex for others.
+                match = BACKTRACE_RE.search(line) if "0x" in lowered_line else None
+                one_line_backtrace = []
+                if match and backtraces:
+                    data = match.groupdict()
+                    if data['other_bt']:
+                        backtraces[-1]['backtrace'] += [data['other_bt'].strip()]
+                    if data['scylla_bt']:
+                        backtraces[-1]['backtrace'] += [data['scylla_bt'].strip()]
+                elif "backtrace:" in lowered_line and "0x" in line:
+                    # This part handles the backtrases are printed in one line.
+                    # Example:
+                    # [shard 2] seastar - Exceptional future ignored: exceptions::mutation_write_timeout_exception
+                    # (Operation timed out for system.paxos - received only 0 responses from 1 CL=ONE.),
+                    # backtrace:   0x3316f4d#012  0x2e2d177#012  0x189d397#012  0x2e76ea0#012  0x2e770af#012
+                    # 0x2eaf065#012  0x2ebd68c#012  0x2e48d5d#012  /opt/scylladb/libreloc/libpthread.so.0+0x94e1#012
+                    splitted_line = re.split("backtrace:", line, flags=re.IGNORECASE)
+                    for trace_line in splitted_line[1].split():
+                        if trace_line.startswith('0x') or 'scylladb/lib' in trace_line:
+                            one_line_backtrace.append(trace_line)
+
+                # for each line, if it matches a continuous event pattern,
+                # call the appropriate function with the class tied to that pattern
+                if continuous_events and \
+                        (found := self._continuous_event_patterns_index.search(line, lowered_line)):
+                    event_match, item = found
+                    item.period_func(match=event_match)
+
+                # for each line find the first matching regex, and if found send an event
+                # (only one event is created for one line of the log)
+                if found := self._system_event_patterns_index.search(line, lowered_line):
+                    _, event = found
+                    cloned_event = event.clone().add_info(node=self._node_name, line_number=index, line=line)
+                    backtraces.append(dict(event=cloned_event, backtrace=[]))
+
+                if one_line_backtrace and backtraces:
+                    backtraces[-1]['backtrace'] = one_line_backtrace
+            except Exception:  # pylint: disable=broad-except
+                LOGGER.exception('Processing of %s line of %s failed, line content:\n%s',
+                                 index, self._system_log, line)
 
         traces_count = 0
         for backtrace in backtraces:
@@ -170,6 +208,9 @@ class DbLogReader(Process):
             self._last_error = None
             backtraces = list(filter(self.filter_backtraces, backtraces))
 
+        return backtraces
+
+    def _publish_backtraces(self, backtraces: List[dict]) -> None:
         for backtrace in backtraces:
             if self._decoding_queue and backtrace["event"].raw_backtrace:
                 scylla_debug_info = self.get_scylla_debuginfo_file()
@@ -182,22 +223,61 @@ class DbLogReader(Process):
             else:
                 backtrace["event"].publish()
 
+    @classmethod
+    def replay(cls,
+               system_log: str,
+               node_name: str,
+               system_event_patterns: Optional[list] = None,
+               publish: bool = False) -> List[LogEvent]:
+        """Find events in a saved db log (e.g., in collected logs of a finished test) without waiting for changes.
+
+        The log can be gzipped.  Continuous events are not tracked and backtraces are not decoded.  Found events
+        are published if `publish' is set.
+        """
+
+        reader = cls(system_log=system_log,
+                     remoter=None,
+                     node_name=node_name,
+                     system_event_patterns=SYSTEM_ERROR_EVENTS_PATTERNS if system_event_patterns is None
+                     else system_event_patterns,
+                     decoding_queue=None,
+                     log_lines=False)
+        if system_log.endswith(".gz"):
+            log_file = gzip.open(system_log, "rb")  # pylint: disable=consider-using-with
+        else:
+            log_file = open(system_log, "rb", buffering=LOG_TAIL_READ_CHUNK_SIZE)  # pylint: disable=consider-using-with
+        with log_file:
+            events = [backtrace["event"] for backtrace in reader._find_events(
+                lines=((index, line.decode("utf-8", errors="replace")) for index, line in enumerate(log_file)),
+                continuous_events=False,
+            )]
+        for event in events:
+            if publish:
+                event.publish()
+            else:
+                event.dont_publish()
+        return events
+
     @raise_event_on_failure
     def run(self):
         """
-        Keep reporting new events from db log, every 30 seconds.
+        Keep reporting new events from db log as the log grows.
         """
         LOGGER.info('Logging for node %s is started with following configuration:\nsystem_log=%s'
-                    '\nlog_lines=%s\ndecoding_queue=%s',
-                    self._node_name, self._system_log, self._log_lines, self._decoding_queue is not None)
+                    '\nlog_lines=%s\ndecoding_queue=%s\ncheckpoint=%s',
+                    self._node_name, self._system_log, self._log_lines, self._decoding_queue is not None,
+                    self._checkpoint_path)
         make_threads_be_daemonic_by_default()
-        while not self._terminate_event.wait(0.1):
-            try:
-                self._read_and_publish_events()
-            except (SystemExit, KeyboardInterrupt) as ex:
-                LOGGER.debug("db_log_reader_thread() stopped by %s", ex.__class__.__name__)
-            except Exception:  # pylint: disable=broad-except
-                LOGGER.exception("failed to read db log")
+        with FileChangeWatcher(self._system_log) as watcher:
+            while not self._terminate_event.is_set():
+                try:
+                    self._read_and_publish_events()
+                except (SystemExit, KeyboardInterrupt) as ex:
+                    LOGGER.debug("db_log_reader_thread() stopped by %s", ex.__class__.__name__)
+                except Exception:  # pylint: disable=broad-except
+                    LOGGER.exception("failed to read db log")
+                watcher.wait(timeout=DB_LOG_READER_WAIT_TIMEOUT)
+        self._save_checkpoint(force=True)
 
     def filter_backtraces(self, backtrace):
         # A filter function to attach the backtrace to the correct error and not to the backtraces.
@@ -17,8 +17,6 @@ import time
 import os
 import platform
 import logging
-import json
-import urllib.parse
 
 from textwrap import dedent
 from math import sqrt
@@ -26,12 +24,14 @@ from typing import Optional
 from functools import cached_property
 from collections import defaultdict
 
-import yaml
-import requests
+import numpy as np
 
 from sdcm.es import ES
 from sdcm.test_config import TestConfig
-from sdcm.utils.common import normalize_ipv6_url
+from sdcm.utils.common import normalize_ipv6_url, ParallelObject
+from sdcm.utils.prometheus_api import PrometheusError, get_prometheus_api
+from sdcm.utils.series_stats import series_stats, steady_state_window
+from sdcm.utils.hdr_histogram import merge_histograms, merge_hdr_intervals, read_hdr_logs
 from sdcm.utils.git import get_git_commit_id
 from sdcm.utils.decorators import retrying
 from sdcm.sct_events.system import ElasticsearchEvent
@@ -195,40 +195,40 @@ class PrometheusDBStats():
     def __init__(self, host, port=9090, alternator=None):
         self.host = host
         self.port = port
-        self.range_query_url = "http://{}:{}/api/v1/query_range?query=".format(normalize_ipv6_url(host), port)
-        self.config = self.get_configuration()
+        self.api = get_prometheus_api(base_url="http://{}:{}/api/v1".format(normalize_ipv6_url(host), port))
         self.alternator = alternator
 
+    @property
+    def config(self):
+        return self.api.configuration
+
     @property
     def scylla_scrape_interval(self):
         return int(self.config["scrape_configs"]["scylla"]["scrape_interval"][:-1])
 
-    @staticmethod
-    @retrying(n=5, sleep_time=7, allowed_exceptions=(requests.ConnectionError, requests.HTTPError))
-    def request(url, post=False):
-        if post:
-            response = requests.post(url)
-        else:
-            response = requests.get(url)
-        response.raise_for_status()
+    def get_configuration(self):
+        """Get the configuration from Prometheus server (not the cached one.)"""
+        return self.api.get_configuration()
 
-        result = json.loads(response.content)
-        LOGGER.debug("Response from Prometheus server: %s", str(result)[:200])
-        if result["status"] == "success":
-            return result
-        else:
-            LOGGER.error("Prometheus returned error: %s", result)
-        return None
+    def query_series(self, query, start, end, scrap_metrics_step=None):
+        """
+        :param query: PromQL query
+        :param start: Start timestamp (unix time)
+        :param end: End timestamp (unix time)
+        :param scrap_metrics_step is the granularity of data requested from Prometheus DB
+        :return: list of PrometheusSeries
+        """
+        return self.query_series_many([query], start, end, scrap_metrics_step=scrap_metrics_step)[0]
 
-    def get_configuration(self):
-        result = self.request(url="http://{}:{}/api/v1/status/config".format(normalize_ipv6_url(self.host), self.port))
-        configs = yaml.safe_load(result["data"]["yaml"])
-        LOGGER.debug("Parsed Prometheus configs: %s", configs)
-        new_scrape_configs = {}
-        for conf in configs["scrape_configs"]:
-            new_scrape_configs[conf["job_name"]] = conf
-        configs["scrape_configs"] = new_scrape_configs
-        return configs
+    def query_series_many(self, queries, start, end, scrap_metrics_step=None):
+        """Run queries for the same time window concurrently and return list of PrometheusSeries for each query."""
+        step = scrap_metrics_step or self.scylla_scrape_interval
+        LOGGER.debug("Queries to PrometheusDB [start=%s, end=%s, step=%s]: %s", start, end, step, queries)
+        try:
+            return self.api.query_range_many([(query, start, end, step) for query in queries])
+        except PrometheusError as exc:
+            LOGGER.error("Prometheus query unsuccessful: %s", exc)
+            return [[] for _ in queries]
 
     def query(self, query, start, end, scrap_metrics_step=None):
         """
@@ -241,18 +241,7 @@ class PrometheusDBStats():
                   values: [[linux_timestamp1, value1], [linux_timestamp2, value2]...[linux_timestampN, valueN]]
                  }
         """
-        url = "http://{}:{}/api/v1/query_range?query=".format(normalize_ipv6_url(self.host), self.port)
-        if not scrap_metrics_step:
-            scrap_metrics_step = self.scylla_scrape_interval
-        _query = "{url}{query}&start={start}&end={end}&step={scrap_metrics_step}".format(
-            url=url, query=query, start=start, end=end, scrap_metrics_step=scrap_metrics_step)
-        LOGGER.debug("Query to PrometheusDB: %s", _query)
-        result = self.request(url=_query)
-        if result:
-            return result["data"]["result"]
-        else:
-            LOGGER.error("Prometheus query unsuccessful!")
-            return []
+        return [series.as_result() for series in self.query_series(query, start, end, scrap_metrics_step)]
 
     @staticmethod
     def _check_start_end_time(start_time, end_time):
@@ -263,9 +252,10 @@ class PrometheusDBStats():
         return True
 
     def _get_query_values(self, query, start_time, end_time, scrap_metrics_step=None):
-        results = self.query(query=query, start=start_time, end=end_time, scrap_metrics_step=scrap_metrics_step)
+        """Values of the first series as NumPy array of (unix time, value) rows."""
+        results = self.query_series(query=query, start=start_time, end=end_time, scrap_metrics_step=scrap_metrics_step)
         if results:
-            return results[0]["values"]
+            return np.column_stack((results[0].timestamps, results[0].values))
         else:
             return []
 
@@ -281,7 +271,7 @@ class PrometheusDBStats():
         if self.alternator:
             query = "sum(irate(scylla_alternator_operation{}[30s]))"
         else:
-            query = "sum(irate(scylla_transport_requests_served{}[30s]))%20%2B%20sum(irate(scylla_thrift_served{}[30s]))"
+            query = "sum(irate(scylla_transport_requests_served{}[30s])) + sum(irate(scylla_thrift_served{}[30s]))"
         return self._get_query_values(query, start_time, end_time, scrap_metrics_step=scrap_metrics_step)
 
     def get_scylla_reactor_utilization(self, start_time, end_time, scrap_metrics_step=None):
@@ -294,11 +284,10 @@ class PrometheusDBStats():
             return []
         query = "avg(scylla_reactor_utilization{})"
         res = self._get_query_values(query, start_time, end_time, scrap_metrics_step=scrap_metrics_step)
-        if res:
-            res = [float(value[1]) for value in res]
-            return sum(res) / len(res)
+        if len(res):
+            return float(np.mean(res[:, 1]))
         else:
-            return res
+            return []
 
     def get_scylla_scheduler_runtime_ms(self, start_time, end_time, node_ip):
         """
@@ -311,11 +300,10 @@ class PrometheusDBStats():
         # the query is taken from the Grafana Dashborad definition
         query = 'avg(irate(scylla_scheduler_runtime_ms{group=~"service_level_.*", instance="%s"}  [30s] )) ' \
             'by (group, instance)' % node_ip
-        results = self.query(query=query, start=start_time, end=end_time)
+        results = self.query_series(query=query, start=start_time, end=end_time)
         res = defaultdict(dict)
         for item in results:
-            res[item['metric']['instance']].update({item['metric']['group']:
-                                                    [float(runtime[1]) for runtime in item['values']]})
+            res[item.metric['instance']].update({item.metric['group']: item.values.tolist()})
         return res
 
     def get_scylla_scheduler_shares_per_sla(self, start_time, end_time, node_ip):  # pylint: disable=invalid-name
@@ -328,19 +316,18 @@ class PrometheusDBStats():
             return {}
         # the query is taken from the Grafana Dashborad definition
         query = 'avg(scylla_scheduler_shares{group=~"service_level_.*", instance="%s"} ) by (group, instance)' % node_ip
-        results = self.query(query=query, start=start_time, end=end_time)
+        results = self.query_series(query=query, start=start_time, end=end_time)
         res = {}
         for item in results:
-            res[item['metric']['group']] = {int(i[1]) for i in item['values']}
+            res[item.metric['group']] = set(item.values.astype(int).tolist())
         return res
 
     def get_scylla_storage_proxy_replica_cross_shard_ops(self, start_time, end_time):
         query = """sum(irate(scylla_storage_proxy_replica_cross_shard_ops{instance=~".+[0-9]{1,3}.[0-9]{1,3}.[0-9]{1,3}.[0-9]{1,3}.+",shard=~"[0-9]+"}[1m])) by (dc)"""  # pylint: disable=line-too-long
-        query = urllib.parse.quote(query)
-        results = self.query(query, start_time, end_time)
+        results = self.query_series(query, start_time, end_time)
         cross_shards_ops_per_node_shard_by_dc = []
         for res in results:
-            cross_shards_ops_per_node_shard_by_dc.extend([float(v) for _, v in res["values"]])
+            cross_shards_ops_per_node_shard_by_dc.extend(res.values.tolist())
 
         return cross_shards_ops_per_node_shard_by_dc
 
@@ -362,8 +349,11 @@ class PrometheusDBStats():
                                 scrap_metrics_step=scrap_metrics_step)
 
     def create_snapshot(self):
-        url = "http://{}:{}/api/v1/admin/tsdb/snapshot".format(normalize_ipv6_url(self.host), self.port)
-        result = self.request(url, True)
+        try:
+            result = {"status": "success", "data": self.api.request("admin/tsdb/snapshot", post=True)}
+        except PrometheusError as exc:
+            LOGGER.error("%s", exc)
+            return None
         LOGGER.debug('Request result: {}'.format(result))
         return result
 
@@ -455,6 +445,9 @@ class TestStatsMixin(Stats):
     PROMETHEUS_STATS_UNITS = {'throughput': "op/s", 'latency_read_99': "us", 'latency_write_99': "us"}
     STRESS_STATS = ('op rate', 'latency mean', 'latency 99th percentile')
     STRESS_STATS_TOTAL = ('op rate', 'Total errors')
+    # Stress stats which are taken from the HDR histogram merged across all stress processes instead of averaging.
+    STRESS_STATS_HDR = {'latency mean': 'mean', 'latency 95th percentile': 'p95', 'latency 99th percentile': 'p99'}
+    HDR_SERVICE_TIME_TAG_SUFFIX = '-st'  # c-s logs service and response times histograms with `-st' and `-rt' tags
 
     def _create_test_id(self, doc_id_with_timestamp=False):
         """Return doc_id equal unified test-id
@@ -564,6 +557,7 @@ class TestStatsMixin(Stats):
             self._test_index = test_index
         self._test_id = self._create_test_id(doc_id_with_timestamp)
         self._stats = self._init_stats()
+        self._hdr_log_files = []
         self._stats['setup_details'] = self.get_setup_details()
         self._stats['versions'] = self.get_scylla_versions()
         self._stats['test_details'] = self.get_test_details()
@@ -611,17 +605,20 @@ class TestStatsMixin(Stats):
 
     def _calc_stats(self, ps_results):
         try:
-            if not ps_results or len(ps_results) <= 3:
+            if len(ps_results) <= 3:
                 self.log.error("Not enough data from Prometheus: %s" % ps_results)
                 return {}
-            stat = {}
-            ops_per_sec = [float(val) for _, val in ps_results if val.lower() != "nan"]  # float("nan") is not a number
-            stat["max"] = max(ops_per_sec)
+            samples = np.asarray(ps_results, dtype=np.float64)
+            timestamps, ops_per_sec = samples[:, 0], samples[:, 1]
             # filter all values that are less than 1% of max
-            ops_filtered = [x for x in ops_per_sec if x >= stat["max"] * 0.01]
-            stat["min"] = min(ops_filtered)
-            stat["avg"] = float(sum(ops_filtered)) / len(ops_filtered)
-            stat["stdev"] = stddev(ops_filtered)
+            ops_filtered = np.where(ops_per_sec >= np.nanmax(ops_per_sec) * 0.01, ops_per_sec, np.nan)
+            stat = series_stats(ops_filtered).as_dict()
+            del stat["count"]
+            if steady_state := steady_state_window(ops_filtered):
+                start, end = steady_state
+                stat["steady_state"] = {"start": timestamps[start].item(),
+                                        "end": timestamps[end - 1].item(),
+                                        **series_stats(ops_filtered[start:end]).as_dict()}
             self.log.debug("Stats: %s", stat)
             return stat
         except Exception as ex:  # pylint: disable=broad-except
@@ -636,11 +633,14 @@ class TestStatsMixin(Stats):
         offset = 120  # 2 minutes offset
         start = int(self._stats["test_details"]["start_time"] + offset)
         end = int(time.time() - offset)
-        prometheus_stats = {}
-        for stat in self.PROMETHEUS_STATS:
+
+        def get_stat(stat):
             stat_calc_func = getattr(prometheus_db_stats, "get_" + stat)
-            prometheus_stats[stat] = self._calc_stats(ps_results=stat_calc_func(start_time=start, end_time=end,
-                                                                                scrap_metrics_step=scrap_metrics_step))
+            return stat_calc_func(start_time=start, end_time=end, scrap_metrics_step=scrap_metrics_step)
+
+        ps_results = ParallelObject(objects=self.PROMETHEUS_STATS, timeout=None,
+                                    num_workers=len(self.PROMETHEUS_STATS), disable_logging=True).run(get_stat)
+        prometheus_stats = {result.obj: self._calc_stats(ps_results=result.result) for result in ps_results}
         self._stats['results'].update(prometheus_stats)
         return prometheus_stats
 
@@ -693,6 +693,46 @@ class TestStatsMixin(Stats):
                 total_stats[stat] = total
         self._stats['results']['stats_total'] = total_stats
 
+    def update_stress_histograms(self, hdr_log_files, windows=()):
+        """
+        Merge HDR histograms logged by all stress processes into cluster-wide ones and store them.
+
+        `hdr_log_files' are added to the ones of the stress queues passed since the stats were created, and the stored
+        histograms are recalculated from all of them, so results of a queue don't hide the ones of the others.
+        Histograms are merged per tag (e.g., `WRITE-st') for the whole run and for each of the `windows'
+        (a list of (name, start, end) tuples, e.g., nemesis runs), and stored with the results as percentiles
+        plus the encoded histogram.  Latency stats of `stats_average' are replaced with the ones of the merged
+        service time histogram, because an average of per-loader percentiles is not a percentile.
+        """
+        self._hdr_log_files.extend(file for file in hdr_log_files if file not in self._hdr_log_files)
+        intervals = read_hdr_logs(self._hdr_log_files)
+        if not intervals:
+            self.log.warning("No HDR histograms found in %s", self._hdr_log_files)
+            return {}
+
+        def histograms_stats(histograms):
+            return {tag: {**histogram.summary(), 'encoded': histogram.encode()}
+                    for tag, histogram in histograms.items()}
+
+        histograms = merge_hdr_intervals(intervals)
+        latency_histograms = {
+            'total': histograms_stats(histograms),
+            'windows': [{'name': name, 'start': start, 'end': end,
+                         'histograms': histograms_stats(merge_hdr_intervals(intervals, start=start, end=end))}
+                        for name, start, end in windows],
+        }
+        self._stats['results']['latency_histograms'] = latency_histograms
+
+        service_time = merge_histograms(histogram for tag, histogram in histograms.items()
+                                        if tag.endswith(self.HDR_SERVICE_TIME_TAG_SUFFIX))
+        if service_time is not None and service_time.total_count:
+            summary = service_time.summary()
+            stats_average = self._stats['results'].setdefault('stats_average', {})
+            for stat, key in self.STRESS_STATS_HDR.items():
+                stats_average[stat] = round(summary[key], 1)
+        self.update(dict(results=self._stats['results']))
+        return latency_histograms
+
     # pylint: disable=too-many-arguments,too-many-locals
     def update_test_details(self, errors=None, coredumps=None, scylla_conf=False, extra_stats=None, alternator=False,
                             scrap_metrics_step=None):
@@ -42,19 +42,15 @@ class GeminiEventsPublisher(FileFollowerThread):
         self.verbose = verbose
         self.event_id = event_id
 
-    def run(self):
-        while not self.stopped():
-            if not os.path.isfile(self.gemini_log_filename):
-                time.sleep(0.5)
-                continue
-            for line_number, line in enumerate(self.follow_file(self.gemini_log_filename), start=1):
-                gemini_event = GeminiStressLogEvent.GeminiEvent(verbose=self.verbose)
-                gemini_event.add_info(node=self.node, line=line, line_number=line_number)
-                gemini_event.event_id = self.event_id
-                gemini_event.publish(warn_not_ready=False)
-
-                if self.stopped():
-                    break
+    @property
+    def followed_file(self):
+        return self.gemini_log_filename
+
+    def handle_line(self, line_number, line):
+        gemini_event = GeminiStressLogEvent.GeminiEvent(verbose=self.verbose)
+        gemini_event.add_info(node=self.node, line=line, line_number=line_number + 1)
+        gemini_event.event_id = self.event_id
+        gemini_event.publish(warn_not_ready=False)
 
 
 class GeminiStressThread:  # pylint: disable=too-many-instance-attributes
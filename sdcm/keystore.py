@@ -11,13 +11,18 @@
 #
 # Copyright (c) 2020 ScyllaDB
 
+from __future__ import annotations
+
 import os
 import json
 from collections import namedtuple
+from typing import TYPE_CHECKING
 
 import boto3
 import paramiko
-from mypy_boto3_s3.service_resource import S3ServiceResource
+
+if TYPE_CHECKING:
+    from mypy_boto3_s3.service_resource import S3ServiceResource
 
 
 KEYSTORE_S3_BUCKET = "scylla-qa-keystore"
@@ -11,10 +11,8 @@
 #
 # Copyright (c) 2016 ScyllaDB
 
-import os
 import re
 from abc import abstractmethod, ABCMeta
-import time
 import logging
 from typing import NamedTuple
 
@@ -89,31 +87,25 @@ class StressExporter(FileFollowerThread, metaclass=ABCMeta):
 
         return value
 
-    def run(self):
-        while not self.stopped():
-            exists = os.path.isfile(self.stress_log_filename)
-            if not exists:
-                time.sleep(0.5)
-                continue
+    @property
+    def followed_file(self) -> str:
+        return self.stress_log_filename
 
-            for line in self.follow_file(self.stress_log_filename):
-                if self.stopped():
-                    break
+    def handle_line(self, line_number: int, line: str) -> None:
+        if self.skip_line(line=line):
+            return
 
-                if self.skip_line(line=line):
-                    continue
+        cols = self.split_line(line=line)
 
-                cols = self.split_line(line=line)
+        for metric in ['lat_mean', 'lat_med', 'lat_perc_95', 'lat_perc_99', 'lat_perc_999', 'lat_max']:
+            if metric_value := self.get_metric_value(columns=cols, metric_name=metric):
+                self.set_metric(metric, convert_metric_to_ms(metric_value))
 
-                for metric in ['lat_mean', 'lat_med', 'lat_perc_95', 'lat_perc_99', 'lat_perc_999', 'lat_max']:
-                    if metric_value := self.get_metric_value(columns=cols, metric_name=metric):
-                        self.set_metric(metric, convert_metric_to_ms(metric_value))
+        if ops := self.get_metric_value(columns=cols, metric_name='ops'):
+            self.set_metric('ops', float(ops))
 
-                if ops := self.get_metric_value(columns=cols, metric_name='ops'):
-                    self.set_metric('ops', float(ops))
-
-                if errors := cols[self.metrics_positions.errors]:
-                    self.set_metric('errors', int(errors))
+        if errors := cols[self.metrics_positions.errors]:
+            self.set_metric('errors', int(errors))
 
 
 class CassandraStressExporter(StressExporter):
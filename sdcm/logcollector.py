@@ -13,6 +13,8 @@
 
 #  pylint: disable=too-many-lines
 import os
+import gzip
+import json
 import time
 import shutil
 import fnmatch
@@ -20,12 +22,14 @@ import logging
 import datetime
 import tarfile
 import tempfile
+import threading
 import traceback
 from typing import Optional
 from pathlib import Path
 from functools import cached_property
 
 import requests
+import prometheus_client
 
 import sdcm.monitorstack.ui as monitoring_ui
 from sdcm.paths import SCYLLA_YAML_PATH
@@ -53,6 +57,16 @@ from sdcm.utils.remotewebbrowser import RemoteBrowser, WebDriverContainerMixin
 
 LOGGER = logging.getLogger(__name__)
 
+ARCHIVE_COMPRESSION_LEVEL = 6  # same as `tar czf'
+ARCHIVE_ZSTD_LEVEL = 3
+
+COLLECTED_ENTITIES = prometheus_client.Counter(
+    "sct_log_collection_entities", "Log entities processed by log collectors", ["cluster", "status"])
+UPLOADED_BYTES = prometheus_client.Counter(
+    "sct_log_collection_uploaded_bytes", "Bytes of log archives uploaded to S3", ["cluster"])
+UPLOAD_THROUGHPUT = prometheus_client.Gauge(
+    "sct_log_collection_upload_throughput", "Throughput of the last log archive upload to S3 (bytes/s)", ["cluster"])
+
 
 class CollectingNode(AutoSshContainerMixin, WebDriverContainerMixin):
     # pylint: disable=too-few-public-methods,too-many-instance-attributes
@@ -90,6 +104,8 @@ class BaseLogEntity:  # pylint: disable=too-few-public-methods
     """
     collect_timeout = 300
     _params = {}
+    # Can be collected at the same time as other entities of the node.
+    concurrent = False
 
     def __init__(self, name, command="", search_locally=False):
         self.name = name
@@ -159,6 +175,7 @@ class CommandLog(BaseLogEntity):  # pylint: disable=too-few-public-methods
     Extends:
         BaseLogEntity
     """
+    concurrent = True
 
     def collect(self, node, local_dst, remote_dst=None, local_search_path=None) -> Optional[str]:
         if not node or not node.remoter or remote_dst is None:
@@ -166,7 +183,11 @@ class CommandLog(BaseLogEntity):  # pylint: disable=too-few-public-methods
         remote_logfile = LogCollector.collect_log_remotely(node=node,
                                                            cmd=self.cmd,
                                                            log_filename=os.path.join(remote_dst, self.name))
-        if archive_logfile := LogCollector.archive_log_remotely(node=node, log_filename=remote_logfile):
+        if not remote_logfile:
+            return None
+        if archive_logfile := LogCollector.archive_log_remotely(node=node,
+                                                                log_filename=remote_logfile,
+                                                                zstd=LogCollector.is_zstd_available(node)):
             LogCollector.receive_log(node=node,
                                      remote_log_path=archive_logfile,
                                      local_dir=local_dst,
@@ -592,6 +613,53 @@ class GrafanaSnapshot(GrafanaEntity):
         self.destory_webdriver_container()
 
 
+class LogCollectionState:
+    """Progress of a log collection saved to a file to resume it if it's interrupted.
+
+    Keeps the run (i.e., the local directory) of the collection and log entities already collected on each node.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.run = None
+        self.collected = set()
+        self._lock = threading.Lock()
+        try:
+            with open(path, encoding="utf-8") as state_file:
+                state = json.load(state_file)
+            self.run = state["run"]
+            self.collected = {tuple(item) for item in state["collected"]}
+        except FileNotFoundError:
+            pass
+        except (ValueError, KeyError, TypeError) as details:
+            LOGGER.warning("Ignore malformed log collection state `%s': %s", path, details)
+
+    def is_collected(self, node_name: str, entity_name: str) -> bool:
+        return (node_name, entity_name) in self.collected
+
+    def mark_collected(self, node_name: str, entity_name: str) -> None:
+        with self._lock:
+            self.collected.add((node_name, entity_name))
+            self._save()
+
+    def start(self, run: str) -> None:
+        with self._lock:
+            self.run = run
+            self._save()
+
+    def _save(self) -> None:
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as state_file:
+            json.dump({"run": self.run, "collected": sorted(self.collected)}, state_file)
+        os.replace(tmp_path, self.path)
+
+    def finish(self) -> None:
+        with self._lock:
+            self.run = None
+            self.collected.clear()
+            remove_files(self.path)
+
+
 class LogCollector:
     """Base class for LogCollector types
 
@@ -611,14 +679,24 @@ class LogCollector:
     log_entities = []
     node_remote_dir = '/tmp'
     collect_timeout = 300
+    collect_nodes_workers = 8
+    collect_entities_workers = 4  # per node
+    _resumed_run = None
+    _zstd_available = {}
+    _zstd_available_lock = threading.Lock()
 
     @property
     def current_run(self):
-        return LogCollector._current_run
+        return self._resumed_run or LogCollector._current_run
 
     def __init__(self, nodes, test_id, storage_dir, params):
         self.test_id = test_id
         self.nodes = nodes
+        self.state = LogCollectionState(
+            os.path.join(storage_dir, f".{self.cluster_log_type}-{self.test_id[:8]}.state.json"))
+        if self.state.run and os.path.isdir(os.path.join(storage_dir, self.state.run)):
+            LOGGER.info("Resume interrupted collection of %s logs (%s)", self.cluster_log_type, self.state.run)
+            self._resumed_run = self.state.run
         self.local_dir = self.create_local_storage_dir(storage_dir)
         self.params = params
         for entity in self.log_entities:
@@ -663,13 +741,33 @@ class LogCollector:
         result = node.remoter.run(f"test -f '{log_filename}'", ignore_status=True)
         return log_filename if result.ok else None
 
+    @classmethod
+    def is_zstd_available(cls, node) -> bool:
+        """Check if logs can be compressed on the node using zstd, which is much faster than gzip."""
+
+        with cls._zstd_available_lock:
+            if (available := cls._zstd_available.get(node.name)) is not None:
+                return available
+        available = bool(node.remoter) and node.remoter.run("command -v zstd", ignore_status=True, verbose=False).ok
+        with cls._zstd_available_lock:
+            cls._zstd_available[node.name] = available
+        return available
+
     @staticmethod
-    def archive_log_remotely(node, log_filename: str, archive_name: Optional[str] = None) -> Optional[str]:
+    def archive_log_remotely(node, log_filename: str, archive_name: Optional[str] = None,
+                             zstd: bool = False) -> Optional[str]:
         if not node.remoter:
             return None
         archive_dir, log_filename = os.path.split(log_filename)
-        archive_name = os.path.join(archive_dir, archive_name or log_filename) + ".tar.gz"
-        if not node.remoter.run(f"tar czf '{archive_name}' -C '{archive_dir}' '{log_filename}'", ignore_status=True).ok:
+        archive_name = os.path.join(archive_dir, archive_name or log_filename)
+        if zstd:
+            archive_name += ".tar.zst"
+            cmd = f"tar cf - -C '{archive_dir}' '{log_filename}' " \
+                  f"| zstd -q -f -T0 -{ARCHIVE_ZSTD_LEVEL} -o '{archive_name}'"
+        else:
+            archive_name += ".tar.gz"
+            cmd = f"tar czf '{archive_name}' -C '{archive_dir}' '{log_filename}'"
+        if not node.remoter.run(cmd, ignore_status=True).ok:
             LOGGER.error("Unable to archive log `%s' to `%s'", log_filename, archive_name)
             return None
         if not check_archive(node.remoter, archive_name):
@@ -685,41 +783,65 @@ class LogCollector:
                                        timeout=timeout)
         return local_dir
 
-    def collect_logs(self, local_search_path: Optional[str] = None) -> list[str]:
-        def collect_logs_per_node(node):
-            LOGGER.info('Collecting logs on host: %s', node.name)
-            remote_node_dir = self.create_remote_storage_dir(node)
-            local_node_dir = os.path.join(self.local_dir, node.name)
-            for log_entity in self.log_entities:
-                try:
-                    log_entity.collect(node, local_node_dir, remote_node_dir, local_search_path=local_search_path)
-                except Exception as details:  # pylint: disable=unused-variable, broad-except
-                    LOGGER.error("Error occured during collecting on host: %s\n%s", node.name, details)
+    def collect_entity(self, node, log_entity, local_node_dir: str, remote_node_dir: str,
+                       local_search_path: Optional[str] = None) -> None:
+        if self.state.is_collected(node.name, log_entity.name):
+            COLLECTED_ENTITIES.labels(self.cluster_log_type, "skipped").inc()
+            return
+        try:
+            log_entity.collect(node, local_node_dir, remote_node_dir, local_search_path=local_search_path)
+        except Exception as details:  # pylint: disable=broad-except
+            COLLECTED_ENTITIES.labels(self.cluster_log_type, "failed").inc()
+            LOGGER.error("Error occured during collecting %s on host: %s\n%s", log_entity.name, node.name, details)
+            return
+        COLLECTED_ENTITIES.labels(self.cluster_log_type, "collected").inc()
+        self.state.mark_collected(node.name, log_entity.name)
+
+    def collect_logs_per_node(self, node, local_search_path: Optional[str] = None) -> None:
+        """Collect log entities of a node: entities which can be collected concurrently first, and then others
+        one by one in the order they are defined."""
+
+        LOGGER.info('Collecting logs on host: %s', node.name)
+        start_time = time.perf_counter()
+        remote_node_dir = self.create_remote_storage_dir(node)
+        local_node_dir = os.path.join(self.local_dir, node.name)
+        os.makedirs(local_node_dir, exist_ok=True)
+        concurrent_entities = [entity for entity in self.log_entities if entity.concurrent]
+        if concurrent_entities:
+            ParallelObject(concurrent_entities, num_workers=self.collect_entities_workers, timeout=None).run(
+                lambda entity: self.collect_entity(node, entity, local_node_dir, remote_node_dir, local_search_path),
+                ignore_exceptions=True)
+        for log_entity in self.log_entities:
+            if not log_entity.concurrent:
+                self.collect_entity(node, log_entity, local_node_dir, remote_node_dir, local_search_path)
+        LOGGER.info("Logs of host %s are collected in %.1fs", node.name, time.perf_counter() - start_time)
 
+    def collect_logs(self, local_search_path: Optional[str] = None) -> list[str]:
         LOGGER.debug("Nodes list %s", [node.name for node in self.nodes])
 
         if not self.nodes and not os.listdir(self.local_dir):
             LOGGER.warning('No nodes found for %s cluster. Logs will not be collected', self.cluster_log_type)
             return []
         if self.nodes:
+            self.state.start(run=self.current_run)
             try:
-                workers_number = int(len(self.nodes) / 2)
-                workers_number = len(self.nodes) if workers_number < 2 else workers_number
-                ParallelObject(self.nodes, num_workers=workers_number, timeout=self.collect_timeout).run(
-                    collect_logs_per_node, ignore_exceptions=True)
+                ParallelObject(self.nodes,
+                               num_workers=min(len(self.nodes), self.collect_nodes_workers),
+                               timeout=self.collect_timeout).run(
+                    lambda node: self.collect_logs_per_node(node, local_search_path), ignore_exceptions=True)
             except Exception as details:  # pylint: disable=broad-except
                 LOGGER.error('Error occured during collecting logs %s', details)
 
         if not os.listdir(self.local_dir):
             LOGGER.warning('Directory %s is empty', self.local_dir)
+            self.state.finish()
             return []
 
-        final_archive = self.archive_to_tarfile(self.local_dir)
-        if not final_archive:
+        if not (s3_link := self.upload_archive(self.local_dir)):
+            LOGGER.warning("Collected logs are kept in %s to resume uploading on the next run", self.local_dir)
             return []
-        s3_link = upload_archive_to_s3(final_archive, f"{self.test_id}/{self.current_run}")
         remove_files(self.local_dir)
-        remove_files(final_archive)
+        self.state.finish()
         return [s3_link]
 
     def collect_logs_for_inactive_nodes(self, local_search_path=None):
@@ -742,14 +864,17 @@ class LogCollector:
     def update_db_info(self):
         pass
 
-    def archive_to_tarfile(self, src_path: str, add_test_id_to_archive: bool = False) -> str:
+    def get_archive_name(self, src_path: str, add_test_id_to_archive: bool = False) -> str:
         src_name = os.path.basename(src_path)
         if add_test_id_to_archive:
             # Add test_id to the archive name when archive is created per log file, like: sct.log, email_data.json
             extension = f".{src_name.split('.')[-1]}"
             if extension in ['.log', '.json']:
                 src_name = src_name.replace(extension, f"-{self.test_id.split('-')[0]}{extension}")
+        return src_name
 
+    def archive_to_tarfile(self, src_path: str, add_test_id_to_archive: bool = False) -> str:
+        src_name = self.get_archive_name(src_path, add_test_id_to_archive)
         archive_name = f"{src_name}.tar.gz"
         try:
             with tarfile.open(archive_name, "w:gz") as tar:
@@ -759,6 +884,47 @@ class LogCollector:
             return None
         return archive_name
 
+    def upload_archive(self, src_path: str, add_test_id_to_archive: bool = False) -> Optional[str]:
+        """Archive a file or a directory and upload it to S3 at the same time.
+
+        The archive is streamed to a multipart upload without writing it to a local file, parts are uploaded
+        while next ones are compressed.
+        """
+        src_name = self.get_archive_name(src_path, add_test_id_to_archive)
+        archive_name = f"{src_name}.tar.gz"
+        dest_dir = f"{self.test_id}/{self.current_run}"
+        s3_storage = S3Storage()
+        uploaded_metric = UPLOADED_BYTES.labels(self.cluster_log_type)
+
+        def report_progress(part_number, part_size):
+            uploaded_metric.inc(part_size)
+            LOGGER.debug("%s: part #%d is uploaded (%.1f MB/s)",
+                         archive_name, part_number, upload.throughput / 1024 / 1024)
+
+        LOGGER.info("Uploading `%s' to %s", src_path, s3_storage.generate_url(archive_name, dest_dir))
+        try:
+            upload = s3_storage.open_multipart_upload(file_name=archive_name, dest_dir=dest_dir,
+                                                      on_part_uploaded=report_progress)
+        except Exception as details:  # pylint: disable=broad-except
+            LOGGER.error("Unable to start upload of %s to S3: %s", archive_name, details)
+            return None
+        try:
+            with gzip.GzipFile(filename=src_name, mode="wb", fileobj=upload,
+                               compresslevel=ARCHIVE_COMPRESSION_LEVEL) as gzip_stream, \
+                    tarfile.open(fileobj=gzip_stream, mode="w|") as tar:
+                tar.add(src_path, arcname=src_name)
+            upload.close()
+            s3_storage.set_public_access(key=upload.key)
+        except Exception as details:  # pylint: disable=broad-except
+            upload.abort()
+            LOGGER.error("Unable to upload %s to S3: %s", archive_name, details)
+            return None
+        UPLOAD_THROUGHPUT.labels(self.cluster_log_type).set(upload.throughput)
+        LOGGER.info("Uploaded %s: %.1f MB in %.1fs (%.1f MB/s)",
+                    archive_name, upload.bytes_uploaded / 1024 / 1024, time.perf_counter() - upload.started,
+                    upload.throughput / 1024 / 1024)
+        return s3_storage.generate_url(archive_name, dest_dir)
+
 
 class ScyllaLogCollector(LogCollector):
     """ScyllaDB cluster log collecting
@@ -972,11 +1138,10 @@ class SCTLogCollector(LogCollector):
         return self.get_files_size() < 3*1024*1024*1024
 
     def create_single_archive_and_upload(self) -> list[str]:
-        final_archive = self.archive_to_tarfile(self.local_dir)
-
-        s3_link = upload_archive_to_s3(final_archive, f"{self.test_id}/{self.current_run}")
+        if not (s3_link := self.upload_archive(self.local_dir)):
+            LOGGER.warning("Collected logs are kept in %s", self.local_dir)
+            return []
         remove_files(self.local_dir)
-        remove_files(final_archive)
         return [s3_link]
 
     def create_archive_per_file_and_upload(self) -> list[str]:
@@ -985,12 +1150,11 @@ class SCTLogCollector(LogCollector):
             for current_file in files:
                 file_path = os.path.join(root, current_file)
                 LOGGER.info(file_path)
-                file_archive = self.archive_to_tarfile(file_path, add_test_id_to_archive=True)
-                LOGGER.info(file_archive)
-                s3_link = upload_archive_to_s3(file_archive, f"{self.test_id}/{self.current_run}")
+                if not (s3_link := self.upload_archive(file_path, add_test_id_to_archive=True)):
+                    LOGGER.warning("File %s is not uploaded and kept", file_path)
+                    continue
                 s3_links.append(s3_link)
                 remove_files(file_path)
-                remove_files(file_archive)
         return s3_links
 
 
@@ -1020,10 +1184,12 @@ class JepsenLogCollector(LogCollector):
             jepsen_node = self.nodes[0]
             if jepsen_archive := self.archive_log_remotely(jepsen_node, "./jepsen-scylla", "jepsen-data"):
                 self.receive_log(jepsen_node, jepsen_archive, self.local_dir)
-                s3_link.append(upload_archive_to_s3(
-                    archive_path=os.path.join(self.local_dir, os.path.basename(jepsen_archive)),
-                    storing_path=f"{self.test_id}/{self.current_run}",
-                ))
+                if link := upload_archive_to_s3(
+                        archive_path=os.path.join(self.local_dir, os.path.basename(jepsen_archive)),
+                        storing_path=f"{self.test_id}/{self.current_run}"):
+                    s3_link.append(link)
+                else:
+                    LOGGER.error("Jepsen data archive `%s' is not uploaded", jepsen_archive)
             remove_files(self.local_dir)
         return s3_link
 
@@ -1279,6 +1445,8 @@ def check_archive(remoter, path: str) -> bool:
 
     if path.endswith(".tar.gz"):
         cmd = f"tar tzf '{path}'"
+    elif path.endswith(".tar.zst"):
+        cmd = f"zstd -dcq '{path}' | tar tf -"
     elif path.endswith(".zip"):
         cmd = f"unzip -qql '{path}'"
     else:
@@ -0,0 +1,369 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+#
+# Copyright (c) 2022 ScyllaDB
+
+"""
+Client of the Scylla Manager REST API.
+
+Tasks, their runs and progress, and health of cluster hosts are returned as dataclasses instead of tables printed
+by `sctool'.  The API of a Manager server is bound to the loopback address of its node only, so requests are sent
+by `curl' on the node, and tasks are cached per cluster: one `GET /cluster/{id}/tasks' refreshes the state of all
+tasks of the cluster, so any number of tasks is watched with one request per poll.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+import shlex
+import urllib.parse
+import logging
+import datetime
+import threading
+from statistics import mean
+from dataclasses import dataclass, field
+from typing import Any, Collection, Dict, List, Optional, Tuple
+
+import dateutil.parser
+
+from sdcm import wait
+from sdcm.mgmt.common import TaskStatus, ScyllaManagerError, HostStatus, HostSsl, HostRestStatus
+
+
+__all__ = ("HostHealth", "ScyllaManagerApi", "TaskInfo", "TaskProgress", "TaskRun",
+           "get_manager_api", )
+
+LOGGER = logging.getLogger(__name__)
+
+MANAGER_API_REQUEST_TIMEOUT: float = 30  # seconds
+MANAGER_API_PING_TIMEOUT: float = 3  # seconds
+MANAGER_API_TASKS_MAX_AGE: float = 5  # seconds, age of a task list which is good enough for a property of a task
+MANAGER_API_RECHECK_INTERVAL: float = 300  # seconds before a next check of a server which was not reachable
+
+FINAL_TASK_STATUSES = (TaskStatus.DONE, TaskStatus.ERROR, TaskStatus.ERROR_FINAL, TaskStatus.STOPPED,
+                       TaskStatus.ABORTED, )
+
+
+def parse_time(value: Optional[str]) -> Optional[datetime.datetime]:
+    """Parse RFC3339 time, Manager sends the zero time of Go for times which are not set."""
+
+    if not value:
+        return None
+    parsed = dateutil.parser.isoparse(value)
+    return None if parsed.year == 1 else parsed
+
+
+@dataclass(frozen=True)
+class TaskInfo:
+    id: str  # pylint: disable=invalid-name
+    type: str
+    name: str = ""
+    status: str = TaskStatus.NEW
+    cause: str = ""
+    enabled: bool = True
+    suspended: bool = False
+    next_activation: Optional[datetime.datetime] = None
+    start_time: Optional[datetime.datetime] = None
+    end_time: Optional[datetime.datetime] = None
+    retry: int = 0
+    properties: Dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> TaskInfo:
+        status = TaskStatus.from_str(data.get("status") or TaskStatus.NEW)
+        next_activation = parse_time(data.get("next_activation"))
+        # `sctool' shows `ERROR (4/4)' when all retries failed, i.e., there is no next activation of the task.
+        if status == TaskStatus.ERROR and next_activation is None:
+            status = TaskStatus.ERROR_FINAL
+        return cls(id=data["id"],
+                   type=data["type"],
+                   name=data.get("name") or "",
+                   status=status,
+                   cause=data.get("cause") or "",
+                   enabled=data.get("enabled", True),
+                   suspended=data.get("suspended", False),
+                   next_activation=next_activation,
+                   start_time=parse_time(data.get("start_time")),
+                   end_time=parse_time(data.get("end_time")),
+                   retry=data.get("retry") or 0,
+                   properties=data.get("properties") or {})
+
+    @property
+    def sctool_id(self) -> str:
+        """ID of the task as `sctool' shows it, e.g., `repair/2a4125d6-5d5a-45b9-9d8d-dec038b3732d'."""
+
+        return f"{self.type}/{self.id}"
+
+
+@dataclass(frozen=True)
+class TaskRun:
+    id: str  # pylint: disable=invalid-name
+    task_id: str
+    type: str
+    status: str
+    cause: str = ""
+    start_time: Optional[datetime.datetime] = None
+    end_time: Optional[datetime.datetime] = None
+
+    @classmethod
+    def from_dict(cls, data: dict) -> TaskRun:
+        return cls(id=data["id"],
+                   task_id=data["task_id"],
+                   type=data["type"],
+                   status=TaskStatus.from_str(data.get("status") or TaskStatus.NEW),
+                   cause=data.get("cause") or "",
+                   start_time=parse_time(data.get("start_time")),
+                   end_time=parse_time(data.get("end_time")))
+
+    @property
+    def duration(self) -> datetime.timedelta:
+        if self.start_time is None:
+            return datetime.timedelta(0)
+        return (self.end_time or datetime.datetime.now(tz=datetime.timezone.utc)) - self.start_time
+
+
+@dataclass(frozen=True)
+class TaskProgress:
+    run: Optional[TaskRun]
+    percent: float = 0.0
+    keyspaces: Dict[str, float] = field(default_factory=dict)  # average progress of tables of a keyspace
+    stage: str = ""  # backup only, e.g., `SNAPSHOT' or `UPLOAD'
+    snapshot_tag: str = ""  # backup only
+
+    @classmethod
+    def from_dict(cls, data: dict) -> TaskProgress:
+        run = TaskRun.from_dict(data["run"]) if data.get("run") else None
+        progress = data.get("progress") or {}
+        if "token_ranges" in progress:  # repair
+            tables_progress = {}
+            for table in progress.get("tables") or []:
+                tables_progress.setdefault(table["keyspace"], []).append(
+                    _percent(table.get("success", 0), table.get("token_ranges", 0)))
+            return cls(run=run,
+                       percent=_percent(progress.get("success", 0), progress["token_ranges"]),
+                       keyspaces={keyspace: mean(tables) for keyspace, tables in tables_progress.items()})
+        if "stage" in progress or "snapshot_tag" in progress:  # backup
+            return cls(run=run,
+                       percent=_percent(progress.get("uploaded", 0) + progress.get("skipped", 0),
+                                        progress.get("size", 0)),
+                       stage=progress.get("stage") or "",
+                       snapshot_tag=progress.get("snapshot_tag") or "")
+        return cls(run=run)
+
+    @property
+    def duration(self) -> datetime.timedelta:
+        return datetime.timedelta(0) if self.run is None else self.run.duration
+
+
+def _percent(done: int, total: int) -> float:
+    return done * 100 / total if total else 0.0
+
+
+@dataclass(frozen=True)
+class HostHealth:  # pylint: disable=too-many-instance-attributes
+    host: str
+    dc: str  # pylint: disable=invalid-name
+    host_id: str
+    status: HostStatus
+    rtt: Optional[float]  # milliseconds
+    ssl: HostSsl
+    rest_status: HostRestStatus
+    rest_rtt: Optional[float]  # milliseconds
+    rest_http_status_code: Optional[int] = None
+
+    @classmethod
+    def from_dict(cls, data: dict) -> HostHealth:
+        return cls(host=data["host"],
+                   dc=data.get("dc") or "",
+                   host_id=data.get("host_id") or "",
+                   status=HostStatus.from_str(data.get("cql_status") or "-"),
+                   rtt=data.get("cql_rtt_ms"),
+                   ssl=HostSsl.ON if data.get("ssl") else HostSsl.OFF,
+                   rest_status=HostRestStatus.from_str(data.get("rest_status") or "-"),
+                   rest_rtt=data.get("rest_rtt_ms"),
+                   rest_http_status_code=data.get("rest_http_status_code") or None)
+
+
+def split_sctool_id(task_id: str) -> Tuple[str, str]:
+    task_type, _, task_uuid = task_id.rpartition("/")
+    if not task_type:
+        raise ScyllaManagerError(f"Task ID should be in `<type>/<id>' format: {task_id}")
+    return task_type, task_uuid
+
+
+class ScyllaManagerApi:
+    def __init__(self, manager_node, timeout: float = MANAGER_API_REQUEST_TIMEOUT):
+        self.manager_node = manager_node
+        self.url = f"http://127.0.0.1:{manager_node.MANAGER_SERVER_PORT}"
+        self.timeout = timeout
+        self._tasks: Dict[str, Tuple[float, Dict[str, TaskInfo]]] = {}  # cluster ID -> (listing time, tasks)
+        self._progress: Dict[Tuple[str, str, str], TaskProgress] = {}  # progress of finished runs
+        self._lock = threading.Lock()
+
+    def _curl(self, method: str, url: str, timeout: float, body: Optional[str] = None) -> Tuple[int, str]:
+        """Send an HTTP request by `curl' on the Manager node and return the status code and the body."""
+
+        cmd = f"curl --silent --show-error --max-time {timeout:g} --request {method} " \
+              f"--write-out '\\n%{{http_code}}'"
+        if body is not None:
+            cmd += f" --header 'Content-Type: application/json' --data-binary {shlex.quote(body)}"
+        result = self.manager_node.remoter.run(f"{cmd} {shlex.quote(url)}", timeout=timeout + 10,
+                                               ignore_status=True, verbose=False)
+        if not result.ok:
+            raise ScyllaManagerError(f"{method} {url} request to Scylla Manager failed: {result.stderr.strip()}")
+        body, _, status_code = result.stdout.rpartition("\n")
+        return int(status_code), body
+
+    def request(self, method: str, path: str, params: Optional[dict] = None, data: Any = None) -> Any:
+        """Send a request to /api/v1/<path> and return the decoded body of the response."""
+
+        url = f"{self.url}/api/v1/{path}"
+        if params:
+            url += f"?{urllib.parse.urlencode(params)}"
+        status_code, body = self._curl(method, url, timeout=self.timeout,
+                                       body=None if data is None else json.dumps(data))
+        if not 200 <= status_code < 300:
+            raise ScyllaManagerError(
+                f"{method} /api/v1/{path} request to Scylla Manager failed with {status_code}: {body}")
+        return json.loads(body) if body.strip() else None
+
+    def ping(self) -> bool:
+        try:
+            return self._curl("GET", f"{self.url}/ping", timeout=MANAGER_API_PING_TIMEOUT)[0] == 204
+        except Exception as exc:  # pylint: disable=broad-except
+            LOGGER.debug("Scylla Manager API on %s is not reachable: %s", self.manager_node, exc)
+            return False
+
+    def list_clusters(self) -> List[dict]:
+        return self.request("GET", "clusters")
+
+    def list_tasks(self, cluster_id: str, max_age: float = 0) -> Dict[str, TaskInfo]:
+        """All tasks of the cluster by their `sctool' IDs, the listing is taken from the cache if not too old."""
+
+        with self._lock:
+            listing_time, tasks = self._tasks.get(cluster_id, (0, {}))
+        if listing_time and time.time() - listing_time <= max_age:
+            return tasks
+        listing_time = time.time()
+        tasks = {task.sctool_id: task for task in map(TaskInfo.from_dict,
+                                                       self.request("GET", f"cluster/{cluster_id}/tasks",
+                                                                    params={"all": "true"}))}
+        with self._lock:
+            self._tasks[cluster_id] = (listing_time, tasks)
+        return tasks
+
+    def invalidate_tasks(self, cluster_id: str) -> None:
+        with self._lock:
+            self._tasks.pop(cluster_id, None)
+
+    def get_task(self, cluster_id: str, task_id: str, max_age: float = 0) -> TaskInfo:
+        tasks = self.list_tasks(cluster_id=cluster_id, max_age=max_age)
+        if task_id not in tasks and max_age:  # can be a task which was added after the listing
+            tasks = self.list_tasks(cluster_id=cluster_id)
+        if task_id not in tasks:
+            raise ScyllaManagerError(f"Task {task_id} not found in cluster {cluster_id}")
+        return tasks[task_id]
+
+    def start_task(self, cluster_id: str, task_id: str, continue_task: bool = True) -> None:
+        task_type, task_uuid = split_sctool_id(task_id)
+        self.request("PUT", f"cluster/{cluster_id}/task/{task_type}/{task_uuid}/start",
+                     params={"continue": str(continue_task).lower()})
+        self.invalidate_tasks(cluster_id)
+
+    def stop_task(self, cluster_id: str, task_id: str) -> None:
+        task_type, task_uuid = split_sctool_id(task_id)
+        self.request("PUT", f"cluster/{cluster_id}/task/{task_type}/{task_uuid}/stop")
+        self.invalidate_tasks(cluster_id)
+
+    def get_task_history(self, cluster_id: str, task_id: str, limit: int = 10) -> List[TaskRun]:
+        """Runs of the task, from the latest to the oldest."""
+
+        task_type, task_uuid = split_sctool_id(task_id)
+        runs = self.request("GET", f"cluster/{cluster_id}/task/{task_type}/{task_uuid}/history",
+                            params={"limit": limit})
+        return [TaskRun.from_dict(run) for run in runs or []]
+
+    def get_task_progress(self, cluster_id: str, task_id: str, run_id: str = "latest") -> TaskProgress:
+        """Progress of a run of the task, progress of finished runs is cached."""
+
+        key = (cluster_id, task_id, run_id)
+        with self._lock:
+            if (progress := self._progress.get(key)) is not None:
+                return progress
+        task_type, task_uuid = split_sctool_id(task_id)
+        progress = TaskProgress.from_dict(
+            self.request("GET", f"cluster/{cluster_id}/task/{task_type}/{task_uuid}/{run_id}"))
+        if run_id != "latest" and progress.run is not None and progress.run.status in FINAL_TASK_STATUSES:
+            with self._lock:
+                self._progress[key] = progress
+        return progress
+
+    def get_hosts_health(self, cluster_id: str) -> Dict[str, HostHealth]:
+        return {host.host: host for host in map(HostHealth.from_dict,
+                                                self.request("GET", f"cluster/{cluster_id}/status") or [])}
+
+    def wait_for_tasks(self,  # pylint: disable=too-many-arguments
+                       cluster_id: str,
+                       task_ids: Collection[str],
+                       list_status: Collection[str],
+                       timeout: float = 3600,
+                       step: float = 10) -> Dict[str, TaskInfo]:
+        """
+        Wait until all tasks reach one of the statuses and return them.
+
+        Every poll lists all tasks of the cluster once, whatever the number of tasks, and changes of statuses are
+        logged as they are seen.
+        """
+
+        last_statuses = {}
+
+        def reached():
+            tasks = self.list_tasks(cluster_id=cluster_id)
+            if missing := set(task_ids) - tasks.keys():
+                raise ScyllaManagerError(f"Tasks {sorted(missing)} not found in cluster {cluster_id}")
+            for task_id in task_ids:
+                if last_statuses.get(task_id) != tasks[task_id].status:
+                    LOGGER.debug("Task %s status: %s -> %s",
+                                 task_id, last_statuses.get(task_id), tasks[task_id].status)
+                    last_statuses[task_id] = tasks[task_id].status
+            if all(status in list_status for status in last_statuses.values()):
+                return {task_id: tasks[task_id] for task_id in task_ids}
+            return None
+
+        return wait.wait_for(func=reached, step=step, timeout=timeout, throw_exc=True,
+                             text=f"Waiting until tasks {list(task_ids)} reach status of: {list(list_status)}")
+
+
+_MANAGER_APIS: Dict[str, Tuple[float, Optional[ScyllaManagerApi]]] = {}
+_MANAGER_APIS_LOCK = threading.Lock()
+
+
+def get_manager_api(manager_node) -> Optional[ScyllaManagerApi]:
+    """
+    Client of the Manager server which runs on the node, shared by all clusters and tasks of the node.
+
+    Return None if the API is not reachable (e.g., for a Manager deployed by Scylla Operator, or if there is no
+    `curl' on the node), then callers use `sctool' on the node instead.  An unreachable server is checked again
+    after a while.
+    """
+
+    if manager_node.is_kubernetes():
+        return None
+    with _MANAGER_APIS_LOCK:
+        check_time, api = _MANAGER_APIS.get(manager_node.name, (0, None))
+        if api is None and time.time() - check_time > MANAGER_API_RECHECK_INTERVAL:
+            api = ScyllaManagerApi(manager_node=manager_node)
+            if not api.ping():
+                LOGGER.info("Scylla Manager API on %s is not reachable, use sctool instead", manager_node)
+                api = None
+            _MANAGER_APIS[manager_node.name] = (time.time(), api)
+    return api
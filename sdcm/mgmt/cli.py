@@ -20,12 +20,14 @@ import datetime
 from re import findall
 from textwrap import dedent
 from statistics import mean
+from typing import Optional
 from contextlib import contextmanager
 
 import requests
 from invoke.exceptions import UnexpectedExit, Failure
 
 from sdcm import wait
+from sdcm.mgmt.api import MANAGER_API_TASKS_MAX_AGE, ScyllaManagerApi, TaskProgress, get_manager_api
 from sdcm.mgmt.common import \
     TaskStatus, ScyllaManagerError, HostStatus, HostSsl, HostRestStatus, duration_to_timedelta, DEFAULT_TASK_TIMEOUT
 from sdcm.utils.distro import Distro
@@ -54,24 +56,41 @@ class ScyllaManagerBase:  # pylint: disable=too-few-public-methods
     def get_property(self, parsed_table, column_name):
         return self.sctool.get_table_value(parsed_table=parsed_table, column_name=column_name, identifier=self.id)
 
+    @property
+    def api(self) -> Optional[ScyllaManagerApi]:
+        """Client of the Manager REST API, or None if it's not reachable and sctool should be used."""
+
+        return get_manager_api(self.manager_node)
+
 
-class ManagerTask:
+def parse_task_status(str_status: str) -> str:
+    # The manager will sometimes retry a task a few times if it's defined this way, and so in the case of
+    # a failure in the task the manager can present the task's status as 'ERROR (#/4)'
+    tmp = str_status.split()
+    # We don't examine the whole string, since sometimes error messages can appear after the status
+    if ' '.join(tmp[0:2]) == 'ERROR (4/4)':
+        return TaskStatus.ERROR_FINAL
+    return TaskStatus.from_str(tmp[0])
+
+
+class ManagerTask(ScyllaManagerBase):
 
     def __init__(self, task_id, cluster_id, manager_node):
-        self.manager_node = manager_node
-        self.sctool = SCTool(manager_node=manager_node)
-        self.id = task_id  # pylint: disable=invalid-name
+        ScyllaManagerBase.__init__(self, id=task_id, manager_node=manager_node)
         self.cluster_id = cluster_id
 
-    def get_property(self, parsed_table, column_name):
-        return self.sctool.get_table_value(parsed_table=parsed_table, column_name=column_name, identifier=self.id)
-
     def stop(self):
-        cmd = "task stop {} -c {}".format(self.id, self.cluster_id)
-        self.sctool.run(cmd=cmd, is_verify_errorless_result=True)
+        if (api := self.api) is not None:
+            api.stop_task(cluster_id=self.cluster_id, task_id=self.id)
+        else:
+            cmd = "task stop {} -c {}".format(self.id, self.cluster_id)
+            self.sctool.run(cmd=cmd, is_verify_errorless_result=True)
         return self.wait_and_get_final_status(timeout=30, step=3)
 
     def start(self, continue_task=True):
+        if (api := self.api) is not None:
+            api.start_task(cluster_id=self.cluster_id, task_id=self.id, continue_task=continue_task)
+            return
         cmd = "task start {} -c {}".format(self.id, self.cluster_id)
         if not continue_task:
             cmd += " --no-continue"
@@ -118,6 +137,9 @@ class ManagerTask:
 
     @property
     def latest_run_id(self):
+        if (api := self.api) is not None:
+            runs = api.get_task_history(cluster_id=self.cluster_id, task_id=self.id, limit=1)
+            return runs[0].id if runs else "N/A"
         history = self.history
         all_dates = self.sctool.get_all_column_values_from_table(history, "start time")
         latest_run_date = self.get_max_date(all_dates)
@@ -144,6 +166,9 @@ class ManagerTask:
         """
         Gets the task's status
         """
+        if (api := self.api) is not None:
+            # A few seconds old state is fine: the status is often read a few times in a row, e.g., by `progress'.
+            return api.get_task(cluster_id=self.cluster_id, task_id=self.id, max_age=MANAGER_API_TASKS_MAX_AGE).status
         cmd = "task list -c {}".format(self.cluster_id)
         # expecting output of:
         # ╭─────────────────────────────────────────────┬───────────────────────────────┬──────┬────────────┬────────╮
@@ -153,14 +178,7 @@ class ManagerTask:
         # │ repair/dd98f6ae-bcf4-4c98-8949-573d533bb789 │                               │ 3    │            │ DONE   │
         # ╰─────────────────────────────────────────────┴───────────────────────────────┴──────┴────────────┴────────╯
         res = self.sctool.run(cmd=cmd)
-        str_status = self.get_property(parsed_table=res, column_name='status')
-        # The manager will sometimes retry a task a few times if it's defined this way, and so in the case of
-        # a failure in the task the manager can present the task's status as 'ERROR (#/4)'
-        tmp = str_status.split()
-        # We don't examine the whole string, since sometimes error messages can appear after the status
-        if ' '.join(tmp[0:2]) == 'ERROR (4/4)':
-            return TaskStatus.ERROR_FINAL
-        return TaskStatus.from_str(tmp[0])
+        return parse_task_status(self.get_property(parsed_table=res, column_name='status'))
 
     @property
     def arguments(self) -> str:
@@ -172,6 +190,15 @@ class ManagerTask:
         arguments_string = self.get_property(parsed_table=res, column_name='arguments')
         return arguments_string.strip()
 
+    @property
+    def progress_info(self) -> TaskProgress:
+        """
+        Gets the progress of the latest run of the task, requires the Manager REST API
+        """
+        if (api := self.api) is None:
+            raise ScyllaManagerError("Scylla Manager REST API is not reachable, use sctool output instead")
+        return api.get_task_progress(cluster_id=self.cluster_id, task_id=self.id)
+
     @property
     def progress(self) -> str:
         """
@@ -179,6 +206,8 @@ class ManagerTask:
         """
         if self.status in [TaskStatus.NEW, TaskStatus.STARTING]:
             return " 0%"
+        if self.api is not None:
+            return f" {round(self.progress_info.percent, 2):g}%"
         cmd = "task progress {} -c {}".format(self.id, self.cluster_id)
         res = self.sctool.run(cmd=cmd)
         # expecting output of:
@@ -235,6 +264,8 @@ class ManagerTask:
     def duration(self) -> datetime.timedelta:
         if self.status in [TaskStatus.NEW, TaskStatus.STARTING]:
             return duration_to_timedelta(duration_string="0")
+        if self.api is not None:
+            return self.progress_info.duration
         cmd = "task progress {} -c {}".format(self.id, self.cluster_id)
         res = self.sctool.run(cmd=cmd)
         duration_string = "0"
@@ -315,6 +346,8 @@ class RepairTask(ManagerTask):
         Since, as of now, the progress table of a repair task shows the progress of every table,
         this function will create an average for each keyspace and return the progress of all of the keyspaces in a dict
         """
+        if self.api is not None:
+            return self.progress_info.keyspaces
         inclusive_table_progress_dict = {}
         for keyspace_name, _, progress_percentage, _ in self.detailed_progress[1:]:  # skip headers
             inclusive_table_progress_dict.setdefault(keyspace_name, []).append(int(progress_percentage.strip()[:-1]))
@@ -331,6 +364,8 @@ class BackupTask(ManagerTask):
         ManagerTask.__init__(self, task_id=task_id, cluster_id=cluster_id, manager_node=manager_node)
 
     def get_snapshot_tag(self, snapshot_index=0):
+        if snapshot_index == 0 and self.api is not None:
+            return self.progress_info.snapshot_tag
         command = f" -c {self.cluster_id} task progress {self.id}"
         res = self.sctool.run(command, parse_table_res=False, is_verify_errorless_result=True)
         snapshot_line = [line for line in res.stdout.splitlines() if "snapshot tag" in line.lower()]
@@ -343,6 +378,8 @@ class BackupTask(ManagerTask):
         return snapshot_tag
 
     def is_task_in_uploading_stage(self):
+        if self.api is not None:
+            return self.progress_info.stage == "UPLOAD"
         full_progress_string = self.sctool.run("task progress {} -c {}".format(self.id, self.cluster_id),
                                                parse_table_res=False,
                                                is_verify_errorless_result=True).stdout.lower()
@@ -657,6 +694,11 @@ class ManagerCluster(ScyllaManagerBase):
         # │ UN │ TIMEOUT SSL             │ TIMEOUT           │ 192.168.100.22 │ 56d2f4c0-9327-487e-b115-c96d3e5c014b │
         # │ UN │ UP SSL (40ms)           │ HTTP (503) (7ms)  │ 192.168.100.23 │ 08152d3d-ed30-469e-bc19-5ab9f4248e9a │
         # ╰────┴─────────────────────────┴───────────────────┴────────────────┴──────────────────────────────────────╯
+        if (api := self.api) is not None:
+            dict_hosts_health = api.get_hosts_health(cluster_id=self.id)
+            LOGGER.debug("Cluster %s Hosts Health is: %s", self.id, dict_hosts_health)
+            return dict_hosts_health
+
         cmd = "status -c {}".format(self.id)
         dict_status_tables = self.sctool.run(cmd=cmd, is_verify_errorless_result=True, is_multiple_tables=True)
 
@@ -712,6 +754,27 @@ class ManagerCluster(ScyllaManagerBase):
             return value_list[0]
         return default_value
 
+    def wait_for_tasks(self, tasks, list_status, timeout=3600, step=60) -> dict[str, str]:
+        """
+        Wait until all of the given tasks reach one of the statuses, and return their statuses by task IDs
+
+        Each poll gets statuses of all of the tasks at once.
+        """
+        task_ids = [task.id for task in tasks]
+        if (api := self.api) is not None:
+            return {task_id: task.status for task_id, task in api.wait_for_tasks(
+                cluster_id=self.id, task_ids=task_ids, list_status=list_status, timeout=timeout, step=step).items()}
+
+        def get_statuses_if_reached():
+            task_list = self._get_task_list()
+            statuses = {task_id: parse_task_status(self.sctool.get_table_value(
+                parsed_table=task_list, column_name="status", identifier=task_id)) for task_id in task_ids}
+            LOGGER.debug("Tasks statuses: %s", statuses)
+            return statuses if all(status in list_status for status in statuses.values()) else None
+
+        return wait.wait_for(func=get_statuses_if_reached, step=step, timeout=timeout, throw_exc=True,
+                             text=f"Waiting until tasks: {task_ids} reach status of: {list_status}")
+
     def suspend(self):
         cmd = f"suspend -c {self.id}"
         self.sctool.run(cmd=cmd)
@@ -144,6 +144,8 @@ class TaskStatus:  # pylint: disable=too-few-public-methods
     ERROR = "ERROR"
     ERROR_FINAL = "ERROR (4/4)"
     STOPPED = "STOPPED"
+    STOPPING = "STOPPING"
+    WAITING = "WAITING"
     STARTING = "STARTING"
     ABORTED = "ABORTED"
 
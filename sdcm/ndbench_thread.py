@@ -14,7 +14,6 @@
 import os
 import re
 import logging
-import time
 import uuid
 from typing import Any
 
@@ -36,30 +35,32 @@ class NdBenchStressEventsPublisher(FileFollowerThread):
         self.ndbench_log_filename = ndbench_log_filename
         self.event_id = event_id
 
-    def run(self) -> None:
-        while not self.stopped():
-            if not os.path.isfile(self.ndbench_log_filename):
-                time.sleep(0.5)
-                continue
+    @property
+    def followed_file(self) -> str:
+        return self.ndbench_log_filename
 
-            for line_number, line in enumerate(self.follow_file(self.ndbench_log_filename)):
-                if self.stopped():
-                    break
+    def handle_line(self, line_number: int, line: str) -> None:
+        for pattern, event in NDBENCH_ERROR_EVENTS_PATTERNS:
+            if self.event_id:
+                # Connect the event to the stress load
+                event.event_id = self.event_id
 
-                for pattern, event in NDBENCH_ERROR_EVENTS_PATTERNS:
-                    if self.event_id:
-                        # Connect the event to the stress load
-                        event.event_id = self.event_id
-
-                    if pattern.search(line):
-                        event.add_info(node=self.node, line=line, line_number=line_number).publish()
-                        break  # Stop iterating patterns to avoid creating two events for one line of the log
+            if pattern.search(line):
+                event.add_info(node=self.node, line=line, line_number=line_number).publish()
+                break  # Stop iterating patterns to avoid creating two events for one line of the log
 
 
 class NdBenchStatsPublisher(FileFollowerThread):
     METRICS = {}
     collectible_ops = ['read', 'write']
 
+    # INFO RPSCount:78 - Read avg: 0.314ms, Read RPS: 7246, Write avg: 0.39ms, Write RPS: 1802, total RPS: 9048, Success Ratio: 100%
+    STAT_REGEX = re.compile(
+        r'Read avg: (?P<read_lat_avg>.*?)ms.*?'
+        r'Read RPS: (?P<read_ops>.*?),.*?'
+        r'Write avg: (?P<write_lat_avg>.*?)ms.*?'
+        r'Write RPS: (?P<write_ops>.*?),', re.IGNORECASE)
+
     def __init__(self, loader_node, loader_idx, ndbench_log_filename):
         super().__init__()
         self.loader_node = loader_node
@@ -82,32 +83,20 @@ class NdBenchStatsPublisher(FileFollowerThread):
         metric = self.METRICS[self.gauge_name(operation)]
         metric.labels(self.loader_node.ip_address, self.loader_idx, name).set(value)
 
-    def run(self):
-        # INFO RPSCount:78 - Read avg: 0.314ms, Read RPS: 7246, Write avg: 0.39ms, Write RPS: 1802, total RPS: 9048, Success Ratio: 100%
-        stat_regex = re.compile(
-            r'Read avg: (?P<read_lat_avg>.*?)ms.*?'
-            r'Read RPS: (?P<read_ops>.*?),.*?'
-            r'Write avg: (?P<write_lat_avg>.*?)ms.*?'
-            r'Write RPS: (?P<write_ops>.*?),', re.IGNORECASE)
-
-        while not self.stopped():
-            exists = os.path.isfile(self.ndbench_log_filename)
-            if not exists:
-                time.sleep(0.5)
-                continue
-
-            for _, line in enumerate(self.follow_file(self.ndbench_log_filename)):
-                if self.stopped():
-                    break
-                try:
-                    match = stat_regex.search(line)
-                    if match:
-                        for key, value in match.groupdict().items():
-                            operation, name = key.split('_', 1)
-                            self.set_metric(operation, name, float(value))
-
-                except Exception as exc:  # pylint: disable=broad-except
-                    LOGGER.warning("Failed to send metric. Failed with exception {exc}".format(exc=exc))
+    @property
+    def followed_file(self):
+        return self.ndbench_log_filename
+
+    def handle_line(self, line_number, line):
+        try:
+            match = self.STAT_REGEX.search(line)
+            if match:
+                for key, value in match.groupdict().items():
+                    operation, name = key.split('_', 1)
+                    self.set_metric(operation, name, float(value))
+
+        except Exception as exc:  # pylint: disable=broad-except
+            LOGGER.warning("Failed to send metric. Failed with exception {exc}".format(exc=exc))
 
 
 class NdBenchStressThread(DockerBasedStressThread):  # pylint: disable=too-many-instance-attributes
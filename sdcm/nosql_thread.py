@@ -13,7 +13,6 @@
 
 import os
 import logging
-import time
 import uuid
 import threading
 
@@ -32,19 +31,14 @@ class NoSQLBenchEventsPublisher(FileFollowerThread):
         self.nb_log_filename = log_filename
         self.node = node
 
-    def run(self) -> None:
-        while not self.stopped():
-            if not os.path.isfile(self.nb_log_filename):
-                time.sleep(0.5)
-                continue
+    @property
+    def followed_file(self) -> str:
+        return self.nb_log_filename
 
-            for line_number, line in enumerate(self.follow_file(self.nb_log_filename)):
-                if self.stopped():
-                    break
-
-                for pattern, event in NOSQLBENCH_EVENT_PATTERNS:
-                    if pattern.search(line):
-                        event.clone().add_info(node=self.node, line=line, line_number=line_number).publish()
+    def handle_line(self, line_number: int, line: str) -> None:
+        for pattern, event in NOSQLBENCH_EVENT_PATTERNS:
+            if pattern.search(line):
+                event.clone().add_info(node=self.node, line=line, line_number=line_number).publish()
 
 
 class NoSQLBenchStressThread(DockerBasedStressThread):  # pylint: disable=too-many-instance-attributes
@@ -12,22 +12,29 @@
 # Copyright (c) 2021 ScyllaDB
 
 
+import argparse
 import json
 import logging
 import re
 import sys
+from array import array
+from collections import Counter
 from pathlib import Path
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import List
+from typing import Iterator
 from enum import Enum
+
+import numpy as np
 from jinja2 import Environment, FileSystemLoader
 
 
 LOGGER = logging.getLogger(__name__)
 
+MAX_RANGES_PER_LABEL = 2000  # lines of the chart with more events are downsampled
+
 env = Environment(
-    loader=FileSystemLoader("templates"),
+    loader=FileSystemLoader(Path(__file__).parent / "templates"),
     autoescape=True
 )
 
@@ -40,6 +47,9 @@ class EventGroup(Enum):
     STRESS_EVENTS = ["CassandraStressEvent", "CassandraStressLogEvent"]
 
 
+EVENT_GROUPS = {base: group for group in EventGroup for base in group.value}
+
+
 # pylint: disable=too-many-instance-attributes
 @dataclass
 class Event:
@@ -144,25 +154,133 @@ class Event:
         return label_string
 
 
+def downsample_ranges(begins: np.ndarray, ends: np.ndarray, values: np.ndarray,
+                      max_ranges: int) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Merges ranges with the same value which begin in the same time bucket, where buckets split the time span
+    of all ranges into `max_ranges` equal parts.
+    Returns begins, ends, values and counts of merged ranges ordered by begin.
+    """
+    if len(begins) <= max_ranges:
+        order = np.argsort(begins, kind="stable")
+        return begins[order], ends[order], values[order], np.ones(len(begins), dtype=np.int64)
+    first = begins.min()
+    width = (begins.max() - first) / max_ranges or 1
+    buckets = np.minimum((begins - first) // width, max_ranges - 1).astype(np.int64)
+    values_count = int(values.max()) + 1
+    keys, inverse = np.unique(buckets * values_count + values, return_inverse=True)
+    merged_begins = np.full(len(keys), np.inf)
+    merged_ends = np.full(len(keys), -np.inf)
+    np.minimum.at(merged_begins, inverse, begins)
+    np.maximum.at(merged_ends, inverse, ends)
+    counts = np.bincount(inverse, minlength=len(keys))
+    order = np.argsort(merged_begins, kind="stable")
+    return merged_begins[order], merged_ends[order], (keys % values_count)[order], counts[order]
+
+
+@dataclass
+class LabelRanges:
+    """
+    Time ranges of events shown in one line of the chart, kept in compact arrays.
+    """
+    sort_key: tuple
+    begins: array = field(default_factory=lambda: array("d"))
+    ends: array = field(default_factory=lambda: array("d"))
+    values: array = field(default_factory=lambda: array("I"))  # indexes of values in TimelineIndex.values
+
+    def append(self, begin: float, end: float, value: int) -> None:
+        self.begins.append(begin)
+        self.ends.append(end)
+        self.values.append(value)
+
+
+@dataclass
+class ChartGroup:
+    name: str
+    sort_key: tuple
+    labels: dict[str, LabelRanges] = field(default_factory=dict)
+    stats: Counter = field(default_factory=Counter)
+
+
+class TimelineIndex:
+    """
+    Ranges of events indexed by chart group (e.g., a node) and chart label.
+    """
+
+    def __init__(self):
+        self.groups: dict[str, ChartGroup] = {}
+        self.values: list[str] = []
+        self._value_ids: dict[str, int] = {}
+
+    def add(self, event: Event, group_name: str, group_sort_key: tuple, label_sort_key: tuple,
+            begin: float, end: float) -> None:
+        if (group := self.groups.get(group_name)) is None:
+            group = self.groups[group_name] = ChartGroup(name=group_name, sort_key=group_sort_key)
+        if (ranges := group.labels.get(event.chart_label)) is None:
+            # The position of a label is defined by the first of its events in the order of sort keys.
+            ranges = group.labels[event.chart_label] = LabelRanges(sort_key=(*label_sort_key, len(group.labels)))
+        if (value := self._value_ids.get(event.chart_value)) is None:
+            value = self._value_ids[event.chart_value] = len(self.values)
+            self.values.append(event.chart_value)
+        ranges.append(begin, end, value)
+        group.stats[event.base] += 1
+
+    def sorted_groups(self) -> list[ChartGroup]:
+        return sorted(self.groups.values(), key=lambda group: group.sort_key)
+
+    @property
+    def labels_count(self) -> int:
+        return sum(len(group.labels) for group in self.groups.values())
+
+
+def _sort_key(*values) -> tuple:
+    return tuple("" if value is None else value for value in values)
+
+
+def _node_number(node_name: str | None) -> int:
+    try:
+        return int(node_name.split("-")[1])
+    except (AttributeError, IndexError, ValueError):
+        return sys.maxsize
+
+
 # pylint: disable=too-many-instance-attributes
 class ParallelTimelinesReportGenerator:
-    def __init__(self, events_file):
+    """
+    Reads the raw events log in one pass and indexes events by chart group and label in compact records.
+
+    Events can be limited by a time window (`start` and `end`, unix time in seconds.)  Lines of the chart with
+    more than `max_ranges_per_label` events are downsampled by merging events of the same value which are close
+    in time.  The chart data is rendered into the report one group at a time.
+    """
+
+    def __init__(self, events_file, start: float | None = None, end: float | None = None,
+                 max_ranges_per_label: int = MAX_RANGES_PER_LABEL):
         self.events_file = Path(events_file)
+        self.start = self._convert_to_milliseconds(start)
+        self.end = self._convert_to_milliseconds(end)
+        self.max_ranges_per_label = max_ranges_per_label
         self.test_id = ""
         self.cluster_name = ""
         self.max_end_timestamp = 0
-        self.events = []
-        self.chart_data = []
+        self.index = TimelineIndex()
         self.template = "pt_report_template.html"
         self.default_report_file_name = "pt_report.html"
 
+    @staticmethod
+    def _convert_to_milliseconds(timestamp: float | None) -> float | None:
+        return timestamp * 1000 if timestamp is not None else None
+
     def read_events_file(self) -> None:
         if not self.events_file.exists():
             LOGGER.critical("File \"%s\" not found!", self.events_file)
             sys.exit(1)
         LOGGER.info("Starting to read file \"%s\"...", self.events_file)
+        rows = 0
+        begin_events = {}  # continuous events with 'begin' records only by event IDs
         with self.events_file.open(encoding="utf-8") as file:
             for line in file:
+                rows += 1
                 event = Event(event_dict=json.loads(line))
                 if event.end_timestamp and event.end_timestamp > self.max_end_timestamp:
                     self.max_end_timestamp = event.end_timestamp
@@ -171,54 +289,69 @@ class ParallelTimelinesReportGenerator:
                 # Getting test_id from the line like this "test_id=fe9c9218-367f-47ba-b59f-0d06c0e81c30"
                 if not self.test_id and event.base == "InfoEvent" and "TEST_START" in event.message:
                     self.test_id = event.message.split("=")[-1]
-                self.events.append(event)
-            LOGGER.info("File \"%s\" has been read successfully. %d rows have been processed.",
-                        self.events_file, len(self.events))
-
-    def prepare_scylla_nodes_event_data(self) -> None:
-        scylla_nodes_events = self._process_raw_data(events_to_process=EventGroup.NODES_RELATED_EVENTS.value)
-        if scylla_nodes_events:
-            LOGGER.info("Preparing Scylla node-related event data...")
-            scylla_nodes_events_sorted = sorted(scylla_nodes_events,
-                                                key=lambda x: (int(x.node_name.split("-")[1]), x.base))
-
-            group_dict = {}
-            stat_dict = {}
-            for event in scylla_nodes_events_sorted:
-                group_dict.setdefault(event.node_name, []).append(event)
-                stat_dict[event.base] = stat_dict.setdefault(event.base, 0) + 1
-
-            for key, value in group_dict.items():
-                self._process_chart_data(event_list=value, group_name=key)
-            stat_string = ', '.join([f"{key}={value}" for key, value in stat_dict.items()])
-            LOGGER.info("All Scylla node-related event data have been successfully prepared")
-            LOGGER.info("Total number of node-related events processed: %s", stat_string)
-
-    def prepare_prometheus_event_data(self) -> None:
-        prometheus_events_data = self._process_raw_data(events_to_process=EventGroup.PROMETHEUS_EVENTS.value)
-        if prometheus_events_data:
-            prometheus_events_data_sorted = sorted(prometheus_events_data, key=lambda x: (x.original_node_name,
-                                                                                          x.alert_name))
-            self._process_chart_data(event_list=prometheus_events_data_sorted, group_name="Prometheus events")
-
-    def prepare_sct_event_data(self) -> None:
-        sct_events_data = self._process_raw_data(events_to_process=EventGroup.SCT_EVENTS.value)
-        if sct_events_data:
-            sct_events_data_sorted = sorted(sct_events_data,
-                                            key=lambda x: (x.base, x.original_node_name, x.nemesis_name))
-            self._process_chart_data(event_list=sct_events_data_sorted, group_name="SCT events")
-
-    def prepare_stress_event_data(self) -> None:
-        stress_events_data = self._process_raw_data(events_to_process=EventGroup.STRESS_EVENTS.value)
-        if stress_events_data:
-            stress_events_data_sorted = sorted(stress_events_data, key=lambda x: (x.base, x.original_node_name,
-                                                                                  x.stress_cmd))
-            self._process_chart_data(event_list=stress_events_data_sorted, group_name="Stress events")
-
-    def _process_chart_data(self, event_list: List[Event], group_name: str) -> None:
+                self._process_event(event=event, begin_events=begin_events)
+        # Evaluate end_timestamp for continuous events which have 'begin' records only.
+        for events in begin_events.values():
+            for event in events:
+                if event.base in ["ScyllaServerStatusEvent", "JMXServiceEvent"]:
+                    event.end_timestamp = self.max_end_timestamp
+                else:
+                    event.end_timestamp = event.begin_timestamp
+                self._add_event(event)
+        LOGGER.info("File \"%s\" has been read successfully. %d rows have been processed.", self.events_file, rows)
+
+    def _process_event(self, event: Event, begin_events: dict[str, list[Event]]) -> None:
+        """
+        If continuous event has both 'begin' and 'end' records, then only 'end' record will be processed.
+        """
+        if event.base not in EVENT_GROUPS:
+            return
+        # Exclude DisruptionEvents with nemesis=RunUniqueSequence from processing
+        if event.base == "DisruptionEvent" and event.nemesis_name == "RunUniqueSequence":
+            return
+        if not event.begin_timestamp:
+            LOGGER.warning("Empty begin_timestamp for event name=%s, id=%s", event.base, event.event_id)
+        elif not event.end_timestamp and event.period_type == 'end':
+            LOGGER.warning("Empty end_timestamp when period_type=end for event name=%s, id=%s", event.base,
+                           event.event_id)
+        # Processing of event records with period_type = None or period_type in ["end", "one-time"]
+        elif event.period_type != "begin":
+            if event.period_type == "end":
+                begin_events.pop(event.event_id, None)
+            self._add_event(event)
+        else:
+            event.event_dict = {}  # don't keep the raw data of pending events
+            begin_events.setdefault(event.event_id, []).append(event)
+
+    def _add_event(self, event: Event) -> None:
+        begin, end = event.begin_timestamp, event.end_timestamp
+        if self.start is not None:
+            if end < self.start:
+                return
+            begin = max(begin, self.start)
+        if self.end is not None:
+            if begin > self.end:
+                return
+            end = min(end, self.end)
+        group = EVENT_GROUPS[event.base]
+        if group is EventGroup.NODES_RELATED_EVENTS:
+            self.index.add(event, group_name=event.node_name, group_sort_key=(0, _node_number(event.node_name)),
+                           label_sort_key=_sort_key(event.base), begin=begin, end=end)
+        elif group is EventGroup.PROMETHEUS_EVENTS:
+            self.index.add(event, group_name="Prometheus events", group_sort_key=(1, ),
+                           label_sort_key=_sort_key(event.original_node_name, event.alert_name), begin=begin, end=end)
+        elif group is EventGroup.SCT_EVENTS:
+            self.index.add(event, group_name="SCT events", group_sort_key=(2, ),
+                           label_sort_key=_sort_key(event.base, event.original_node_name, event.nemesis_name),
+                           begin=begin, end=end)
+        else:
+            self.index.add(event, group_name="Stress events", group_sort_key=(3, ),
+                           label_sort_key=_sort_key(event.base, event.original_node_name, event.stress_cmd),
+                           begin=begin, end=end)
+
+    def iter_chart_data(self) -> Iterator[dict]:
         """
-        The structure of self.chart_data should look like this:
-        [
+        Yields groups of the chart data one by one.  Each group looks like this:
             {group: "group1name",
              data: [
                      {label: "label1name",
@@ -232,104 +365,46 @@ class ParallelTimelinesReportGenerator:
                      {label: "label2name",
                       data: [...]},
                      (...)
-                   ]},
-            {group: "group2name",
-             data: [...]},
-             (...)
-        ]
-        Firstly, we create here an appropriate structure of self.chart_data for the given group of events.
-        Then we populate created group structure with events' data by calling append_group_data().
-        """
-        LOGGER.info("Preparing %s data...", group_name)
-        stat_dict = {}
-
-        # Prepare self.chart_data structure. Add new group dictionary.
-        self.chart_data.append({"group": group_name,
-                                "data": []})
-        current_chart_group = self.chart_data[-1]["data"]
-
-        # Fill self.chart_data with data
-        for event in event_list:
-            if event.chart_label not in [item["label"] for item in current_chart_group]:
-                current_chart_group.append({"label": event.chart_label,
-                                            "data": []})
-            self._append_group_data(group_name=group_name,
-                                    event_data=event)
-            stat_dict[event.base] = stat_dict.setdefault(event.base, 0) + 1
-        stat_string = ', '.join([f"{key}={value}" for key, value in stat_dict.items()])
-        LOGGER.info("All %s data have been successfully prepared.", group_name)
-        LOGGER.info("Number of events processed: %s", stat_string)
-
-    def _append_group_data(self, group_name: str, event_data: Event) -> None:
-        group_by_name_list = list(filter(lambda x: x['group'] == group_name, self.chart_data))
-        for data in group_by_name_list[0]["data"]:
-            if event_data.chart_label == data["label"]:
-                data["data"].append({"timeRange": [event_data.begin_timestamp,
-                                                   event_data.end_timestamp],
-                                     "val": event_data.chart_value})
-
-    def _process_raw_data(self, events_to_process: list) -> List[Event]:
-        """
-        Finds continuous events with 'begin' records only and evaluates 'end_timestamp' for them.
-        If continuous event has both 'begin' and 'end' records, then only 'end' record will be processed.
+                   ]}
         """
-        processed_events = []
-        end_event_id_set = set()
-        begin_event_id_set = set()
-        begin_events = []
-        events_string = ', '.join(events_to_process)
-        LOGGER.info("Processing raw data for events: %s.", events_string)
-        selected_events = list(filter(lambda x: x.base in events_to_process, self.events))
-        for event in selected_events:
-            # Exclude DisruptionEvents with nemesis=RunUniqueSequence from processing
-            if event.base == "DisruptionEvent" and event.nemesis_name == "RunUniqueSequence":
-                continue
-            if not event.begin_timestamp:
-                LOGGER.warning("Empty begin_timestamp for event name=%s, id=%s", event.base, event.event_id)
-            elif not event.end_timestamp and event.period_type == 'end':
-                LOGGER.warning("Empty end_timestamp when period_type=end for event name=%s, id=%s", event.base,
-                               event.event_id)
-            # Processing of event records with period_type = None or period_type in ["end", "one-time"]
-            elif event.period_type != "begin":
-                if event.period_type == "end":
-                    end_event_id_set.add(event.event_id)
-                processed_events.append(event)
-            # Save the continuous events with period_type = "begin" and their IDs
+        for group in self.index.sorted_groups():
+            LOGGER.info("Preparing %s data...", group.name)
+            group_data = []
+            for label, ranges in sorted(group.labels.items(), key=lambda item: item[1].sort_key):
+                begins, ends, values, counts = downsample_ranges(
+                    begins=np.frombuffer(ranges.begins), ends=np.frombuffer(ranges.ends),
+                    values=np.frombuffer(ranges.values, dtype=np.uint32), max_ranges=self.max_ranges_per_label)
+                if len(begins) < len(ranges.begins):
+                    LOGGER.info("%s: %d events of `%s' have been merged into %d ranges",
+                                group.name, len(ranges.begins), label, len(begins))
+                group_data.append({"label": label, "data": [
+                    {"timeRange": [begin, end],
+                     "val": self.index.values[value] if count == 1 else f"{self.index.values[value]} ({count} events)"}
+                    for begin, end, value, count in zip(begins.tolist(), ends.tolist(),
+                                                        values.tolist(), counts.tolist())
+                ]})
+            LOGGER.info("Number of %s events processed: %s",
+                        group.name, ', '.join(f"{key}={value}" for key, value in group.stats.items()))
+            yield {"group": group.name, "data": group_data}
+
+    def create_report_file(self, report_file_name: str | None = None) -> Path:
+        if not report_file_name:
+            if self.cluster_name:
+                report_file_name = self.cluster_name.replace("-db-cluster", "") + "-report.html"
             else:
-                begin_event_id_set.add(event.event_id)
-                begin_events.append(event)
-        # Check if there are event IDs with period_type = "begin" and without period_type = "end"
-        endless_event_id_set = begin_event_id_set.difference(end_event_id_set)
-        if endless_event_id_set:
-            # If endless events exist, evaluate end_timestamp for them
-            endless_events = list(filter(lambda x: x.event_id in endless_event_id_set, begin_events))
-            for event in endless_events:
-                if event.base in ["ScyllaServerStatusEvent", "JMXServiceEvent"]:
-                    event.end_timestamp = self.max_end_timestamp
-                else:
-                    event.end_timestamp = event.begin_timestamp
-                processed_events.append(event)
-        return processed_events
-
-    def create_report_file(self) -> None:
-        if self.cluster_name:
-            report_file_name = self.cluster_name.replace("-db-cluster", "") + "-report.html"
-        else:
-            report_file_name = self.default_report_file_name
+                report_file_name = self.default_report_file_name
         report_file = Path(report_file_name)
         LOGGER.info("Creating report file \"%s\"", report_file)
         max_line_height = 20
-        label_count = 0
-        for group in self.chart_data:
-            label_count += len(group["data"])
-        max_height = max_line_height * label_count + 200
+        max_height = max_line_height * self.index.labels_count + 200
         template = env.get_template(self.template)
-        rendered_template = template.render(chart_data=self.chart_data, max_height=max_height,
-                                            max_line_height=max_line_height, test_id=self.test_id,
-                                            cluster_name=self.cluster_name)
+        stream = template.stream(chart_data=self.iter_chart_data(), max_height=max_height,
+                                 max_line_height=max_line_height, test_id=self.test_id,
+                                 cluster_name=self.cluster_name)
         with report_file.open("w", encoding="utf-8") as file:
-            file.write(rendered_template)
+            stream.dump(file)
         LOGGER.info("Report file has been successfully created")
+        return report_file
 
 
 def setup_logging():
@@ -348,13 +423,18 @@ def setup_logging():
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Generate the parallel timelines report of SCT events")
+    parser.add_argument("events_file", nargs="?", default="raw_events_new.log")
+    parser.add_argument("--start", type=float, help="show events after this time (unix time in seconds)")
+    parser.add_argument("--end", type=float, help="show events before this time (unix time in seconds)")
+    parser.add_argument("--max-ranges-per-label", type=int, default=MAX_RANGES_PER_LABEL,
+                        help="downsample lines of the chart with more events (default: %(default)s)")
+    args = parser.parse_args()
     setup_logging()
-    pt_report_generator = ParallelTimelinesReportGenerator(events_file="raw_events_new.log")
+    pt_report_generator = ParallelTimelinesReportGenerator(events_file=args.events_file, start=args.start,
+                                                           end=args.end,
+                                                           max_ranges_per_label=args.max_ranges_per_label)
     pt_report_generator.read_events_file()
-    pt_report_generator.prepare_scylla_nodes_event_data()
-    pt_report_generator.prepare_prometheus_event_data()
-    pt_report_generator.prepare_sct_event_data()
-    pt_report_generator.prepare_stress_event_data()
     pt_report_generator.create_report_file()
 
 
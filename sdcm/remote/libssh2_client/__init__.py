@@ -99,9 +99,9 @@ class SSHReaderThread(Thread):  # pylint: disable=too-many-instance-attributes
             if perf_counter() > end_time:
                 self.timeout_reached = True
                 break
+            if stdout_size == LIBSSH2_ERROR_EAGAIN and stderr_size == LIBSSH2_ERROR_EAGAIN:
+                session.simple_select(timeout=timeout_read_data)
             with session.lock:
-                if stdout_size == LIBSSH2_ERROR_EAGAIN and stderr_size == LIBSSH2_ERROR_EAGAIN:  # pylint: disable=consider-using-in
-                    session.simple_select(timeout=timeout_read_data)
                 stdout_size, stdout_chunk = channel.read()
                 stderr_size, stderr_chunk = channel.read_stderr()
                 eof_result = channel.eof()
@@ -236,7 +236,8 @@ DEFAULT_FLOOD_PREVENTING = FloodPreventingFacility(hash_items='host', limit=2)
 class Client:  # pylint: disable=too-many-instance-attributes
     """
     SSH2 Client, partially imitates invoke interface.
-    It is not thread safe, so make sure that any given instance is not used by multiple threads.
+    Connecting and disconnecting are not thread safe.  Commands can be run by multiple threads over
+    a connected client: each of them uses its own channel (see `sdcm.remote.libssh2_client.pool'.)
 
     How to use:
 
@@ -474,9 +475,9 @@ class Client:  # pylint: disable=too-many-instance-attributes
                 stderr_size == LIBSSH2_ERROR_EAGAIN or stderr_size > 0:  # pylint: disable=consider-using-in
             if perf_counter() > end_time:
                 return False
+            if stdout_size == LIBSSH2_ERROR_EAGAIN and stderr_size == LIBSSH2_ERROR_EAGAIN:
+                session.simple_select(timeout=timeout_read_data_chunk)
             with session.lock:
-                if stdout_size == LIBSSH2_ERROR_EAGAIN and stderr_size == LIBSSH2_ERROR_EAGAIN:  # pylint: disable=consider-using-in
-                    session.simple_select(timeout=timeout_read_data_chunk)
                 eof_result = channel.wait_eof()
                 stdout_size, stdout_chunk = channel.read()
                 stderr_size, stderr_chunk = channel.read_stderr()
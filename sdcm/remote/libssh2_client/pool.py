@@ -0,0 +1,303 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+#
+# Copyright (c) 2022 ScyllaDB
+
+"""
+Pool of libssh2 connections to a host.
+
+Commands run in channels multiplexed over a few persistent connections instead of a connection per thread:
+a connection is leased for a single command and up to `max_channels' commands run over the same connection
+at the same time.  New connections are opened when all existing ones are busy (up to `max_connections'),
+connections which are not used for `idle_timeout' seconds are closed, and a connection which wasn't used
+for `health_check_interval' seconds is checked before it's leased.  A connection which failed to run
+a command is replaced without affecting commands which run over other connections.
+
+A child process created by `fork()' starts with empty pools: connections of the parent are used by its threads
+and can't be shared.
+"""
+
+import os
+import logging
+import threading
+from time import perf_counter
+from typing import Callable, List, Optional, Iterator, Tuple
+from contextlib import contextmanager
+from dataclasses import dataclass
+from weakref import WeakSet
+
+import prometheus_client
+
+from . import Client
+from .exceptions import ConnectError, FailedToRunCommand, FailedToReadCommandOutput, \
+    OpenChannelTimeout, SocketRecvError
+from .timings import NullableTiming
+
+
+CONNECTION_POOL_MAX_CONNECTIONS: int = 4
+CONNECTION_POOL_MAX_CHANNELS: int = 8  # commands running over one connection at the same time
+CONNECTION_POOL_IDLE_TIMEOUT: float = 300  # seconds
+CONNECTION_POOL_HEALTH_CHECK_INTERVAL: float = 60  # seconds
+CONNECTION_POOL_LEASE_TIMEOUT: NullableTiming = 300  # seconds
+
+# Errors which mean that a connection is not usable anymore.
+CONNECTION_ERRORS: Tuple[type, ...] = (
+    ConnectError, FailedToRunCommand, FailedToReadCommandOutput, OpenChannelTimeout, SocketRecvError, OSError, )
+
+LOGGER = logging.getLogger(__name__)
+
+LEASE_WAIT_TIME = prometheus_client.Histogram(
+    "sct_ssh_pool_lease_wait_seconds", "Time spent waiting for a free SSH channel", ["host"],
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.5, 1, 5, 15, 60, float("inf")))
+CONNECTIONS = prometheus_client.Gauge(
+    "sct_ssh_pool_connections", "Open SSH connections of a pool", ["host"])
+RECONNECTS = prometheus_client.Counter(
+    "sct_ssh_pool_reconnects", "SSH connections replaced because of errors or failed health checks", ["host"])
+
+
+class ConnectionPoolTimeout(ConnectError):
+    pass
+
+
+@dataclass
+class ConnectionPoolStats:  # pylint: disable=too-many-instance-attributes
+    leases: int = 0
+    waits: int = 0
+    wait_time: float = 0
+    max_wait_time: float = 0
+    connects: int = 0
+    reconnects: int = 0
+    evictions: int = 0
+
+
+class _PooledConnection:  # pylint: disable=too-few-public-methods
+    def __init__(self, client: Client):
+        self.client = client
+        self.channels = 0
+        self.last_used = self.last_checked = perf_counter()
+        self.stale = False  # close it when all channels are released
+
+
+class ConnectionPool:  # pylint: disable=too-many-instance-attributes
+    def __init__(self,  # pylint: disable=too-many-arguments
+                 client_factory: Callable[[], Client],
+                 host: str,
+                 max_connections: int = CONNECTION_POOL_MAX_CONNECTIONS,
+                 max_channels: int = CONNECTION_POOL_MAX_CHANNELS,
+                 idle_timeout: float = CONNECTION_POOL_IDLE_TIMEOUT,
+                 health_check_interval: float = CONNECTION_POOL_HEALTH_CHECK_INTERVAL):
+        self.client_factory = client_factory
+        self.host = host
+        self.max_connections = max_connections
+        self.max_channels = max_channels
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+        self.stats = ConnectionPoolStats()
+        self._init_process_state()
+        _ALL_POOLS.add(self)
+        self._wait_time_metric = LEASE_WAIT_TIME.labels(host)
+        self._connections_metric = CONNECTIONS.labels(host)
+        self._reconnects_metric = RECONNECTS.labels(host)
+
+    def _init_process_state(self) -> None:
+        self._connections: List[_PooledConnection] = []
+        self._connecting = 0
+        self._lock = threading.Condition()
+
+    @property
+    def connections(self) -> int:
+        return len(self._connections)
+
+    def _pick(self) -> Optional[_PooledConnection]:
+        candidates = [conn for conn in self._connections if not conn.stale and conn.channels < self.max_channels]
+        if not candidates:
+            return None
+        connection = min(candidates, key=lambda conn: conn.channels)
+        if connection.channels and len(self._connections) + self._connecting < self.max_connections:
+            return None  # spread commands over connections before multiplexing them
+        return connection
+
+    def _acquire(self, timeout: NullableTiming) -> _PooledConnection:
+        start = perf_counter()
+        with self._lock:
+            self.stats.leases += 1
+            while True:
+                if (connection := self._pick()) is not None:
+                    connection.channels += 1
+                    break
+                if len(self._connections) + self._connecting < self.max_connections:
+                    self._connecting += 1
+                    connection = None
+                    break
+                remaining = None if timeout is None else start + timeout - perf_counter()
+                if remaining is not None and remaining <= 0:
+                    raise ConnectionPoolTimeout(
+                        f"No free SSH channel to {self.host} in {timeout} seconds "
+                        f"({len(self._connections)} connections x {self.max_channels} channels are busy)")
+                self._lock.wait(remaining)
+        self._record_wait(perf_counter() - start)
+        if connection is None:
+            return self._connect()
+        return connection
+
+    def _record_wait(self, wait_time: float) -> None:
+        self._wait_time_metric.observe(wait_time)
+        with self._lock:
+            if wait_time > 0.001:
+                self.stats.waits += 1
+            self.stats.wait_time += wait_time
+            self.stats.max_wait_time = max(self.stats.max_wait_time, wait_time)
+
+    def _connect(self) -> _PooledConnection:
+        client = self.client_factory()
+        try:
+            client.connect()
+        except Exception as exc:  # pylint: disable=broad-except
+            with self._lock:
+                self._connecting -= 1
+                self._lock.notify_all()
+            client.disconnect()
+            if isinstance(exc, ConnectError):
+                raise
+            raise ConnectError(f"Failed to connect to {self.host}: {exc}") from exc
+        connection = _PooledConnection(client)
+        connection.channels = 1
+        with self._lock:
+            self._connecting -= 1
+            self._connections.append(connection)
+            self.stats.connects += 1
+            self._connections_metric.set(len(self._connections))
+        return connection
+
+    def _is_healthy(self, connection: _PooledConnection) -> bool:
+        if perf_counter() - connection.last_checked <= self.health_check_interval:
+            return True
+        try:
+            alive = connection.client.check_if_alive()
+        except Exception:  # pylint: disable=broad-except
+            alive = False
+        connection.last_checked = perf_counter()
+        if not alive:
+            LOGGER.debug("SSH connection to %s failed health check, replace it", self.host)
+        return alive
+
+    def _release(self, connection: _PooledConnection, broken: bool) -> None:
+        to_close = []
+        with self._lock:
+            connection.channels -= 1
+            connection.last_used = now = perf_counter()
+            if not broken:
+                connection.last_checked = now  # a command was run successfully, no need to check it soon
+            else:
+                connection.stale = True
+                self.stats.reconnects += 1
+                self._reconnects_metric.inc()
+            if connection.stale and not connection.channels:
+                to_close.append(connection)
+            for idle in self._connections:
+                if not idle.channels and idle.last_used + self.idle_timeout < now and idle not in to_close:
+                    to_close.append(idle)
+                    self.stats.evictions += 1
+            self._remove(to_close)
+            self._lock.notify_all()
+        for idle in to_close:
+            idle.client.disconnect()
+
+    def _remove(self, connections: List[_PooledConnection]) -> None:
+        for connection in connections:
+            self._connections.remove(connection)
+        if connections:
+            self._connections_metric.set(len(self._connections))
+
+    @contextmanager
+    def lease(self, timeout: NullableTiming = CONNECTION_POOL_LEASE_TIMEOUT) -> Iterator[Client]:
+        """Lease a connected client to run a single command."""
+
+        connection = self._acquire(timeout=timeout)
+        while not self._is_healthy(connection):
+            self._release(connection, broken=True)
+            connection = self._acquire(timeout=timeout)
+        broken = False
+        try:
+            yield connection.client
+        except CONNECTION_ERRORS:
+            broken = True
+            raise
+        finally:
+            self._release(connection, broken=broken)
+
+    def reset(self) -> None:
+        """Close all connections.  Connections which are in use are closed when their commands finish."""
+
+        with self._lock:
+            to_close = [connection for connection in self._connections if not connection.channels]
+            for connection in self._connections:
+                connection.stale = True
+            self._remove(to_close)
+            self._lock.notify_all()
+        for connection in to_close:
+            connection.client.disconnect()
+
+    close = reset
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} {self.host}: {self.connections} connections, {self.stats}>"
+
+
+class PooledClient:
+    """Client-like interface to run commands over connections of a pool."""
+
+    def __init__(self, pool: ConnectionPool):
+        self.pool = pool
+
+    def run(self, *args, **kwargs):
+        with self.pool.lease() as client:
+            return client.run(*args, **kwargs)
+
+    def check_if_alive(self, timeout: NullableTiming = None) -> bool:
+        with self.pool.lease() as client:
+            return client.check_if_alive() if timeout is None else client.check_if_alive(timeout)
+
+    def connect(self, timeout: NullableTiming = None) -> None:  # pylint: disable=unused-argument
+        with self.pool.lease():
+            pass
+
+    def disconnect(self) -> None:
+        self.pool.reset()
+
+    open = connect
+    close = disconnect
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.disconnect()
+
+
+_ALL_POOLS: WeakSet[ConnectionPool] = WeakSet()
+
+# Connections inherited from the parent process are kept referenced and never closed by a child: a disconnect
+# or even a garbage collected session would send SSH messages over sockets which are used by the parent.
+_INHERITED_CONNECTIONS: List[_PooledConnection] = []
+
+
+def _reset_after_fork() -> None:
+    # Threads which use connections and hold locks are not copied to a child process, so start from scratch.
+    for pool in list(_ALL_POOLS):
+        _INHERITED_CONNECTIONS.extend(pool._connections)  # pylint: disable=protected-access
+        pool._init_process_state()  # pylint: disable=protected-access
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+__all__ = ("ConnectionPool", "ConnectionPoolStats", "ConnectionPoolTimeout", "PooledClient", "CONNECTION_ERRORS", )
@@ -56,12 +56,13 @@ class Session(LibSSH2Session):  # pylint: disable=too-few-public-methods
     def eagain(self, func, args=(), kwargs={},  # pylint: disable=dangerous-default-value
                timeout: NullableTiming = None) -> int:
         """Running function followed by simple_select up until it return anything but `LIBSSH2_ERROR_EAGAIN`"""
-        with self.lock:
-            ret = func(*args, **kwargs)
-            while ret == LIBSSH2_ERROR_EAGAIN:
-                self.simple_select(timeout=timeout)
+        # Wait for the socket without the lock to let other channels of the session to progress meanwhile.
+        while True:
+            with self.lock:
                 ret = func(*args, **kwargs)
-            return ret
+            if ret != LIBSSH2_ERROR_EAGAIN:
+                return ret
+            self.simple_select(timeout=timeout)
 
     def open_session(self):
         channel = super().open_session()
@@ -14,8 +14,11 @@
 import os
 import time
 import socket
+import threading
+from weakref import WeakSet
 
 from .libssh2_client import Client as LibSSH2Client, Timings
+from .libssh2_client.pool import ConnectionPool, PooledClient
 from .libssh2_client.exceptions import AuthenticationException, UnknownHostException, ConnectError, \
     FailedToReadCommandOutput, CommandTimedOut, FailedToRunCommand, OpenChannelTimeout, SocketRecvError, \
     UnexpectedExit, Failure
@@ -25,12 +28,15 @@ from .remote_base import RemoteCmdRunnerBase
 
 class RemoteLibSSH2CmdRunner(RemoteCmdRunnerBase, ssh_transport='libssh2'):  # pylint: disable=too-many-instance-attributes
     """Remoter that mimic RemoteCmdRunner, under the hood it runs libssh2 client, instead of paramiko
-    Main problem in libssh2 - is that it is not thread safe, we mitigate this problem by having
-      _connection_thread_map - a dictionary in which we bind thread to the libssh2 session.
-    Whenever remoter read self.connection, we return value from _connection_thread_map associated with current thread,
-      And if it is not there, we create it.
+    Commands of all threads run over a pool of persistent connections to the host: each command uses its own
+      channel and up to `connection_pool_channels' channels are multiplexed over one connection.
     """
-    connection: LibSSH2Client
+    connection_pool_size: int = 4
+    connection_pool_channels: int = 8
+    connection_pool_idle_timeout: float = 300
+    # Output of a channel can be read by a thread of another channel of the same connection, so don't wait
+    # for the socket for too long.
+    pooled_read_data_chunk_timeout: float = 0.1
     exception_unexpected = UnexpectedExit
     exception_failure = Failure
     exception_retryable = (
@@ -39,15 +45,61 @@ class RemoteLibSSH2CmdRunner(RemoteCmdRunnerBase, ssh_transport='libssh2'):  # p
         CommandTimedOut, FailedToRunCommand, OpenChannelTimeout, SocketRecvError, socket.timeout
     )
 
-    def _create_connection(self) -> LibSSH2Client:
+    def _prepare(self):
+        self._connection_pool = None
+        self._connection_pool_lock = threading.Lock()
+        _ALL_RUNNERS.add(self)
+
+    def _reset_after_fork(self) -> None:
+        # The pool is emptied by its own fork handler, only state of the runner is reset here.
+        self._connection_pool_lock = threading.Lock()
+        self._pooled_client = None
+
+    @classmethod
+    def set_connection_pool_size(cls, connections: int = None, channels: int = None):
+        if connections is not None:
+            cls.connection_pool_size = connections
+        if channels is not None:
+            cls.connection_pool_channels = channels
+
+    @property
+    def connection_pool(self) -> ConnectionPool:
+        with self._connection_pool_lock:
+            if self._connection_pool is None:
+                self._connection_pool = ConnectionPool(client_factory=self._create_pooled_connection,
+                                                       host=self.hostname,
+                                                       max_connections=self.connection_pool_size,
+                                                       max_channels=self.connection_pool_channels,
+                                                       idle_timeout=self.connection_pool_idle_timeout)
+            return self._connection_pool
+
+    @property
+    def connection(self) -> PooledClient:
+        connection = getattr(self, "_pooled_client", None)
+        if connection is None:
+            connection = self._pooled_client = PooledClient(self.connection_pool)
+            self._bind_generation_to_connection(connection)
+        return connection
+
+    def _close_connection(self):
+        if (connection_pool := getattr(self, "_connection_pool", None)) is not None:
+            connection_pool.reset()
+
+    def _create_connection(self, read_data_chunk_timeout: float = None) -> LibSSH2Client:
+        timings = Timings(keepalive_timeout=0, connect_timeout=self.connect_timeout)
+        if read_data_chunk_timeout is not None:
+            timings.read_data_chunk_timeout = read_data_chunk_timeout
         return LibSSH2Client(
             host=self.hostname,
             user=self.user,
             port=self.port,
             pkey=os.path.expanduser(self.key_file),
-            timings=Timings(keepalive_timeout=0, connect_timeout=self.connect_timeout)
+            timings=timings
         )
 
+    def _create_pooled_connection(self) -> LibSSH2Client:
+        return self._create_connection(read_data_chunk_timeout=self.pooled_read_data_chunk_timeout)
+
     def is_up(self, timeout: float = 30) -> bool:
         end_time = time.perf_counter() + timeout
         while time.perf_counter() <= end_time:
@@ -64,16 +116,18 @@ class RemoteLibSSH2CmdRunner(RemoteCmdRunnerBase, ssh_transport='libssh2'):  # p
 
     def _run_on_retryable_exception(self, exc: Exception, new_session: bool) -> bool:
         self.log.error(exc)
-        if isinstance(exc, FailedToRunCommand) and not new_session:
-            self.log.debug('Reestablish the session...')
-            try:
-                self.connection.disconnect()
-            except Exception:  # pylint: disable=broad-except
-                pass
-            try:
-                self.connection.connect()
-            except Exception:  # pylint: disable=broad-except
-                pass
+        # A broken connection is already dropped by the pool and the next attempt uses another one.
         if self._is_error_retryable(str(exc)) or isinstance(exc, self.exception_retryable):
             raise RetryableNetworkException(str(exc), original=exc)
         return True
+
+
+_ALL_RUNNERS: WeakSet[RemoteLibSSH2CmdRunner] = WeakSet()
+
+
+def _reset_runners_after_fork() -> None:
+    for runner in list(_ALL_RUNNERS):
+        runner._reset_after_fork()  # pylint: disable=protected-access
+
+
+os.register_at_fork(after_in_child=_reset_runners_after_fork)
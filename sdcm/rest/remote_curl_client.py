@@ -1,8 +1,12 @@
-from typing import Literal
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Literal
 
-from sdcm.cluster import BaseNode
 from sdcm.rest.rest_client import RestClient
 
+if TYPE_CHECKING:
+    from sdcm.cluster import BaseNode
+
 
 class RemoteCurlClient(RestClient):
     def __init__(self, host: str, endpoint: str, node: BaseNode):
@@ -18,6 +18,11 @@ class RestClient:
         self._host = host
         self._endpoint = endpoint
 
+    @cached_property
+    def _session(self) -> requests.Session:
+        # Keep connections to the host open between requests.
+        return requests.Session()
+
     @cached_property
     def _base_url(self) -> str:
         return urljoin(f"{self._url_prefix}{self._host}", self._endpoint)
@@ -26,12 +31,12 @@ class RestClient:
         url = f"{self._base_url}/{path}"
         LOGGER.info("Sending a GET request for: %s", url)
 
-        return requests.get(url=url, params=params)
+        return self._session.get(url=url, params=params)
 
     def post(self, path: str, params: Dict[str, str] = None) -> Response:
         url = f"{self._base_url}/{path}"
         LOGGER.info("Sending a POST request for: %s", url)
-        return requests.post(url=url, params=params)
+        return self._session.post(url=url, params=params)
 
     def _prepare_request(self, method: Literal["GET", "POST"], path: str, params: dict[str, str]):
         full_url = f"{self._base_url}/{path}"
@@ -1,10 +1,14 @@
-from typing import Optional
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Optional
 
 from fabric.runners import Result
 
-from sdcm.cluster import BaseNode
 from sdcm.rest.remote_curl_client import RemoteCurlClient
 
+if TYPE_CHECKING:
+    from sdcm.cluster import BaseNode
+
 
 class StorageServiceClient(RemoteCurlClient):
     def __init__(self, node: BaseNode):
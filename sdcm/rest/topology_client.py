@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+import json
+import logging
+import shlex
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from sdcm.rest.remote_curl_client import RemoteCurlClient
+
+if TYPE_CHECKING:
+    from sdcm.cluster import BaseNode
+
+
+# Separates responses of a single curl run which fetches a few URLs over one HTTP connection.
+RESPONSE_SEPARATOR = "\n--- sct-rest-response-end ---\n"
+
+# `gms::application_state' of Scylla, the REST API returns them as numbers.
+APPLICATION_STATES = (
+    "STATUS", "LOAD", "SCHEMA", "DC", "RACK", "RELEASE_VERSION", "REMOVAL_COORDINATOR", "INTERNAL_IP", "RPC_ADDRESS",
+    "X_11_PADDING", "SEVERITY", "NET_VERSION", "HOST_ID", "TOKENS", "SUPPORTED_FEATURES", "CACHE_HITRATES",
+    "SCHEMA_TABLES_VERSION", "RPC_READY", "VIEW_BACKLOG", "SHARD_COUNT", "IGNORE_MSB_BITS", "CDC_GENERATION_ID",
+    "SNITCH_NAME",
+)
+
+LOGGER = logging.getLogger(__name__)
+
+
+class TopologyClientError(Exception):
+    pass
+
+
+def format_size(size: float) -> str:
+    """Format a size the way nodetool does it, but without a space between the value and the unit."""
+
+    for unit, multiplier in (("TB", 1024 ** 4), ("GB", 1024 ** 3), ("MB", 1024 ** 2), ("KB", 1024), ):
+        if size >= multiplier:
+            return f"{size / multiplier:.2f}{unit}"
+    return f"{size:.0f}bytes"
+
+
+@dataclass
+class EndpointStatus:  # pylint: disable=too-many-instance-attributes
+    address: str
+    datacenter: str
+    rack: str
+    host_id: str
+    is_up: bool
+    state: str  # N(ormal), L(eaving), J(oining) or M(oving)
+    load: Optional[float] = None  # bytes
+    tokens: int = 0
+    ownership: Optional[float] = None  # 0..1
+
+    @property
+    def status(self) -> str:
+        """Status as it's shown by `nodetool status', e.g., UN for Up/Normal."""
+
+        return f"{'U' if self.is_up else 'D'}{self.state}"
+
+    def as_nodetool_status(self) -> dict:
+        return {
+            "state": self.status,
+            "load": "?" if self.load is None else format_size(self.load),
+            "tokens": str(self.tokens),
+            "owns": "?" if self.ownership is None else f"{self.ownership * 100:.1f}%",
+            "host_id": self.host_id,
+            "rack": self.rack,
+        }
+
+
+@dataclass
+class GossipEndpointState:  # pylint: disable=too-many-instance-attributes
+    address: str
+    is_alive: bool
+    generation: int
+    application_states: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def status(self) -> str:
+        return self.application_states.get("STATUS", "").split(",")[0]
+
+    @property
+    def schema(self) -> str:
+        return self.application_states.get("SCHEMA", "")
+
+    @property
+    def datacenter(self) -> str:
+        return self.application_states.get("DC", "")
+
+    @property
+    def rack(self) -> str:
+        return self.application_states.get("RACK", "")
+
+    @property
+    def rpc_address(self) -> str:
+        return self.application_states.get("RPC_ADDRESS", "") or self.address
+
+    @property
+    def host_id(self) -> str:
+        return self.application_states.get("HOST_ID", "")
+
+    @property
+    def release_version(self) -> str:
+        return self.application_states.get("RELEASE_VERSION", "")
+
+
+@dataclass
+class NodeInfo:  # pylint: disable=too-many-instance-attributes
+    host_id: str
+    gossip_active: bool
+    native_transport_active: bool
+    load: float  # bytes
+    generation: int
+    uptime: float  # seconds
+    datacenter: str
+    rack: str
+
+    def as_nodetool_info(self) -> dict:
+        return {
+            "ID": self.host_id,
+            "Gossip active": self.gossip_active,
+            "Native Transport active": self.native_transport_active,
+            "Load": format_size(self.load),
+            "Generation No": self.generation,
+            "Uptime (seconds)": int(self.uptime),
+            "Data Center": self.datacenter,
+            "Rack": self.rack,
+        }
+
+
+class TopologyClient(RemoteCurlClient):
+    """Typed view of the cluster topology as it's seen by a node, using the Scylla REST API of the node.
+
+    All data needed for a call is fetched by a single curl run (over a single HTTP connection) instead of
+    starting JVM nodetool for every call.
+    """
+
+    def __init__(self, node: BaseNode, timeout: int = 60):
+        super().__init__(host="localhost:10000", endpoint="", node=node)
+        self._timeout = timeout
+
+    def get_json(self, *paths: str) -> List[Any]:
+        urls = " ".join(shlex.quote(f"{self._base_url}/{path}") for path in paths)
+        result = self._node.remoter.run(
+            f"curl -sS --fail --max-time {self._timeout} -w {shlex.quote(RESPONSE_SEPARATOR)} {urls}",
+            timeout=self._timeout + 30, ignore_status=True, verbose=False)
+        responses = result.stdout.split(RESPONSE_SEPARATOR)[:len(paths)]
+        if len(responses) != len(paths) or not all(response.strip() for response in responses):
+            raise TopologyClientError(
+                f"Failed to get {', '.join(paths)} from REST API of {self._node.name}: {result.stderr.strip()}")
+        try:
+            return [json.loads(response) for response in responses]
+        except ValueError as exc:
+            raise TopologyClientError(f"Malformed response of REST API of {self._node.name}: {exc}") from None
+
+    @staticmethod
+    def _parse_gossip(endpoints: List[dict]) -> Dict[str, GossipEndpointState]:
+        states = {}
+        for endpoint in endpoints:
+            application_states = {}
+            for state in endpoint.get("application_state", []):
+                index = state["application_state"]
+                name = APPLICATION_STATES[index] if index < len(APPLICATION_STATES) else str(index)
+                application_states[name] = state["value"]
+            states[endpoint["addrs"]] = GossipEndpointState(address=endpoint["addrs"],
+                                                            is_alive=endpoint.get("is_alive", False),
+                                                            generation=endpoint.get("generation", 0),
+                                                            application_states=application_states)
+        return states
+
+    def get_gossip(self) -> Dict[str, GossipEndpointState]:
+        """Gossip state of all known endpoints, by address."""
+
+        endpoints, = self.get_json("failure_detector/endpoints/")
+        return self._parse_gossip(endpoints)
+
+    def get_host_ids(self) -> Dict[str, str]:
+        host_ids, = self.get_json("storage_service/host_id")
+        return {item["key"]: item["value"] for item in host_ids}
+
+    def get_ownership(self) -> Dict[str, float]:
+        ownership, = self.get_json("storage_service/ownership/")
+        return {item["key"]: float(item["value"]) for item in ownership}
+
+    def get_schema_versions(self) -> Dict[str, List[str]]:
+        """Addresses of nodes by schema versions."""
+
+        versions, = self.get_json("storage_proxy/schema_versions")
+        return {item["key"]: item["value"] for item in versions}
+
+    def get_status(self) -> Dict[str, Dict[str, EndpointStatus]]:
+        """Status of endpoints by datacenter and address, like `nodetool status' shows it."""
+
+        # pylint: disable=too-many-locals
+        live, down, joining, leaving, moving, load_map, host_ids, tokens, ownership, endpoints = self.get_json(
+            "gossiper/endpoint/live/",
+            "gossiper/endpoint/down/",
+            "storage_service/nodes/joining",
+            "storage_service/nodes/leaving",
+            "storage_service/nodes/moving",
+            "storage_service/load_map",
+            "storage_service/host_id",
+            "storage_service/tokens_endpoint",
+            "storage_service/ownership/",
+            "failure_detector/endpoints/",
+        )
+        gossip = self._parse_gossip(endpoints)
+        load_map = {item["key"]: float(item["value"]) for item in load_map}
+        host_ids = {item["key"]: item["value"] for item in host_ids}
+        tokens = Counter(item["value"] for item in tokens)
+        ownership = {item["key"]: float(item["value"]) for item in ownership}
+        live, joining, leaving, moving = set(live), set(joining), set(leaving), set(moving)
+        LOGGER.debug("Down endpoints according to %s: %s", self._node.name, down)
+
+        status = {}
+        for address in sorted(set(host_ids) | set(tokens) | joining):
+            if address in leaving:
+                state = "L"
+            elif address in joining:
+                state = "J"
+            elif address in moving:
+                state = "M"
+            else:
+                state = "N"
+            endpoint_gossip = gossip.get(address)
+            datacenter = endpoint_gossip.datacenter if endpoint_gossip and endpoint_gossip.datacenter else "unknown"
+            status.setdefault(datacenter, {})[address] = EndpointStatus(
+                address=address,
+                datacenter=datacenter,
+                rack=endpoint_gossip.rack if endpoint_gossip else "",
+                host_id=host_ids.get(address, "") or (endpoint_gossip.host_id if endpoint_gossip else ""),
+                is_up=address in live,
+                state=state,
+                load=load_map.get(address),
+                tokens=tokens.get(address, 0),
+                ownership=ownership.get(address),
+            )
+        return status
+
+    def get_node_info(self) -> NodeInfo:
+        """Information about the node itself, like `nodetool info' shows it."""
+
+        host_id, gossip_active, native_transport_active, load, generation, uptime_ms, datacenter, rack = \
+            self.get_json("storage_service/hostid/local",
+                          "storage_service/gossiping",
+                          "storage_service/native_transport",
+                          "storage_service/load",
+                          "storage_service/generation_number",
+                          "system/uptime_ms",
+                          "snitch/datacenter",
+                          "snitch/rack")
+        return NodeInfo(host_id=host_id,
+                        gossip_active=gossip_active,
+                        native_transport_active=native_transport_active,
+                        load=float(load),
+                        generation=int(generation),
+                        uptime=int(uptime_ms) / 1000,
+                        datacenter=datacenter,
+                        rack=rack)
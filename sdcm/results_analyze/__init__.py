@@ -31,7 +31,9 @@ from sdcm.sct_events import Severity
 from sdcm.utils.es_queries import query_filter, QueryFilter, PerformanceFilterYCSB, PerformanceFilterScyllaBench, \
     PerformanceFilterCS, CDCQueryFilterCS
 from test_lib.utils import MagicList, get_data_by_path
+from .es_access import EsDocsReader
 from .test import TestResultClass
+from .metrics import MetricArray
 
 
 LOGGER = logging.getLogger(__name__)
@@ -43,6 +45,7 @@ class BaseResultsAnalyzer:  # pylint: disable=too-many-instance-attributes
     def __init__(self, es_index, es_doc_type, email_recipients=(), email_template_fp="", query_limit=1000, logger=None,
                  events=None):
         self._es = ES()
+        self._es_docs = EsDocsReader(es=self._es)
         self._conf = self._es._conf  # pylint: disable=protected-access
         self._es_index = es_index
         self._es_doc_type = es_doc_type
@@ -499,13 +502,11 @@ class PerformanceResultsAnalyzer(BaseResultsAnalyzer):
         if not query:
             return False
         self.log.debug("Query to ES: %s", query)
-        filter_path = ['hits.hits._id',
-                       'hits.hits._source.results.stats_average',
-                       'hits.hits._source.results.stats_total',
-                       'hits.hits._source.results.throughput',
-                       'hits.hits._source.versions']
-        tests_filtered = self._es.search(index=self._es_index, q=query, filter_path=filter_path,  # pylint: disable=unexpected-keyword-arg
-                                         size=self._limit, request_timeout=30)
+        source_includes = ['results.stats_average', 'results.stats_total', 'results.throughput', 'versions']
+        tests_filtered = list(self._es_docs.iter_docs(index=self._es_index, query=query,
+                                                      source_includes=source_includes))
+        self.log.debug("Found %d tests with the same parameters, %d of them are from the local cache",
+                       len(tests_filtered), self._es_docs.stats['cached'])
 
         if not tests_filtered:
             self.log.info('Cannot find tests with the same parameters as {}'.format(test_id))
@@ -535,7 +536,7 @@ class PerformanceResultsAnalyzer(BaseResultsAnalyzer):
         #     }
         # }
         # Find best results for each version
-        for row in tests_filtered['hits']['hits']:
+        for row in tests_filtered:
             if row['_id'] == test_id:  # filter the current test
                 continue
             if '_source' not in row:  # non-valid record?
@@ -889,10 +890,10 @@ class PerformanceResultsAnalyzer(BaseResultsAnalyzer):
                 continue
             for metric_path in metrics:
                 # Getting main test of the subtest that showed best score in this metric
-                sorted_subtests = prior_tests.sort_by(f'{metric_path}.betterness')
-                if not sorted_subtests:
+                best_idx = MetricArray.from_instances(prior_tests, metric_path).best_index()
+                if best_idx is None:
                     continue
-                best_subtest = sorted_subtests[-1]
+                best_subtest = prior_tests[best_idx]
                 # Find subtests from any other tests
                 self._add_best_for_info(
                     main_tests_by_id[best_subtest.main_test_id][0],
@@ -945,7 +946,8 @@ class PerformanceResultsAnalyzer(BaseResultsAnalyzer):
         output = collections.OrderedDict()
         for subtest in subtests:
             prior_tests = MagicList(
-                [prior_sub_test for prior_sub_test in subtest.get_prior_tests()
+                [prior_sub_test for prior_sub_test in subtest.get_prior_tests(
+                    data_paths=['main_test_id', 'subtest_name', 'metrics'])
                  if prior_sub_test.metrics and prior_sub_test.metrics.is_valid()
                  ])
             output[subtest] = prior_tests
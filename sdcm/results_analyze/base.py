@@ -1,3 +1,5 @@
+import typing
+
 from test_lib.utils import get_data_by_path
 
 
@@ -5,12 +7,69 @@ class __DEFAULT__:  # pylint: disable=invalid-name,too-few-public-methods
     pass
 
 
+class DataField(typing.NamedTuple):
+    """
+    Compiled data attribute of a ClassBase subclass
+    """
+    name: str
+    data_type: typing.Any
+    # None if ES data is stored under the attribute name, () if the attribute is loaded from the whole ES data
+    es_data_path: typing.Optional[typing.Tuple[str, ...]]
+
+
+def get_class_annotations(cls) -> dict:
+    """
+    Annotations of the class or of its nearest base class which has them, the same as `instance.__annotations__'
+
+    Since Python 3.10 `cls.__annotations__' of a class without own annotations is a new empty dict, which is
+    stored in the class and hides annotations of base classes from its instances as well.
+    """
+    for klass in cls.__mro__:
+        if '__annotations__' in vars(klass):
+            return vars(klass)['__annotations__']
+    return {}
+
+
+def get_es_data_by_keys(es_data, keys: typing.Tuple[str, ...], default=None):
+    current = es_data
+    for idx, key in enumerate(keys):
+        if not isinstance(current, dict):
+            return get_data_by_path(current, data_path='.'.join(keys[idx:]), default=default)
+        current = current.get(key, default)
+        if current is default:
+            return default
+    return current
+
+
 class ClassBase:
     """
     This class that is meant to be used as base for class that could be stored or loaded (in ES or any other backend)
+
+    Data attributes of a subclass are compiled once, when the subclass is created, into `_data_fields' schema
+    which is used to load instances from ES data without walking annotations and data mappings each time.
     """
     _es_data_mapping = {}
     _data_type = None
+    # Not annotated, annotations of the class are its data attributes
+    _data_fields = ()
+    _data_fields_by_name = {}
+    _all_es_data_mapping_cache = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        data_fields = []
+        for data_name, data_type in get_class_annotations(cls).items():
+            data_path = cls._es_data_mapping.get(data_name, __DEFAULT__)
+            if data_path is __DEFAULT__:
+                es_data_path = None
+            elif data_path == '':
+                es_data_path = ()
+            else:
+                es_data_path = tuple(data_path.split('.'))
+            data_fields.append(DataField(name=data_name, data_type=data_type, es_data_path=es_data_path))
+        cls._data_fields = tuple(data_fields)
+        cls._data_fields_by_name = {data_field.name: data_field for data_field in data_fields}
+        cls._all_es_data_mapping_cache = {}
 
     def __init__(self, es_data=None, **kwargs):
         if es_data:
@@ -41,15 +100,13 @@ class ClassBase:
         """
         if not isinstance(es_data, dict):
             raise ValueError(f"Class {self.__class__.__name__} can be loaded only from dict")
-        data_mapping = self._es_data_mapping
-        for data_name, data_type in self.__annotations__.items():  # pylint: disable=no-member
-            data_path = data_mapping.get(data_name, __DEFAULT__)
-            if data_path is __DEFAULT__:
+        for data_name, data_type, es_data_path in self._data_fields:
+            if es_data_path is None:
                 value = es_data.get(data_name, __DEFAULT__)
-            elif data_path == '':
+            elif not es_data_path:
                 value = es_data
             else:
-                value = get_data_by_path(es_data, data_path=data_path, default=__DEFAULT__)
+                value = get_es_data_by_keys(es_data, es_data_path, default=__DEFAULT__)
             if value is __DEFAULT__:
                 continue
             self._apply_data(data_name, data_type, value)
@@ -71,7 +128,9 @@ class ClassBase:
         return output
 
     def _apply_data(self, data_name, data_type, value):
-        setattr(self, data_name, data_type(value))
+        if type(value) is not data_type:  # pylint: disable=unidiomatic-typecheck
+            value = data_type(value)
+        setattr(self, data_name, value)
 
     def is_valid(self):
         for data_name in self.__annotations__.keys():  # pylint: disable=no-member
@@ -92,8 +151,10 @@ class ClassBase:
 
         if max_level == 0:
             return {}
+        if (cached := cls._all_es_data_mapping_cache.get(max_level)) is not None:
+            return dict(cached)
         output = {}
-        for data_name, data_type in cls.__annotations__.items():  # pylint: disable=no-member
+        for data_name, data_type in get_class_annotations(cls).items():
             data_path = cls._es_data_mapping.get(data_name, __DEFAULT__)
             if data_path is __DEFAULT__:
                 data_path = data_name
@@ -115,7 +176,8 @@ class ClassBase:
                         output[f'{data_name}.{child_data_name}'] = child_data_path
             else:
                 output[data_name] = data_path
-        return output
+        cls._all_es_data_mapping_cache[max_level] = output
+        return dict(output)
 
     def _iterate_data(self, callback, data_path=None, es_data_path=None):
         """
@@ -128,17 +190,14 @@ class ClassBase:
         instances = [(self, data_path, es_data_path)]
         while instances:
             current_instance, data_path, es_data_path = instances.pop()
+            data_fields = current_instance._data_fields_by_name  # pylint: disable=protected-access
             for data_name, data_instance in current_instance.__dict__.items():
-                if current_instance.__annotations__.get(data_name, None) is None:  # pylint: disable=no-member
+                if (data_field := data_fields.get(data_name)) is None or data_field.data_type is None:
                     continue
-                es_data_name = current_instance._es_data_mapping.get(  # pylint: disable=protected-access
-                    data_name, None)
-                if es_data_name is None:
+                if data_field.es_data_path is None:
                     es_data_name = es_data_path + [data_name]
-                elif es_data_name == '':
-                    es_data_name = es_data_path
                 else:
-                    es_data_name = es_data_path + es_data_name.split('.')
+                    es_data_name = es_data_path + list(data_field.es_data_path)
                 if not isinstance(data_instance, ClassBase) \
                         or data_instance.__class__.load_from_es_data is not ClassBase.load_from_es_data:
                     callback(data_instance, current_instance, data_path + [data_name], es_data_name, True)
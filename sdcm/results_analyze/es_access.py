@@ -0,0 +1,195 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+#
+# Copyright (c) 2022 ScyllaDB
+
+"""
+Streaming access to test results in ES.
+
+Searches go in two steps: a scroll over matching ids and versions of documents (no sources), and then `mget' of
+sources filtered to the needed paths for documents which are not in the local cache already.  Prior test runs don't
+change, so a regression check which looks at thousands of them transfers only the new ones.
+"""
+
+import os
+import json
+import hashlib
+import logging
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import elasticsearch.helpers
+
+from sdcm.es import ES
+
+
+__all__ = ("ES_DOCS_CACHE_DIR", "EsDocsCache", "EsDocsReader", "EsRecords", "get_source_value", )
+
+LOGGER = logging.getLogger(__name__)
+
+ES_DOCS_CACHE_DIR: Path = Path(os.environ.get("SCT_ES_DOCS_CACHE_DIR", "~/.cache/sct/es_docs")).expanduser()
+ES_SCROLL_PAGE_SIZE: int = 1000  # ids and versions per scroll page
+ES_SCROLL_KEEPALIVE: str = "2m"
+ES_MGET_BATCH_SIZE: int = 200  # sources per `mget' request, they can be big even after filtering
+ES_REQUEST_TIMEOUT: int = 60
+
+
+def get_source_value(source: dict, path: str, default=None):
+    """Value from document source by dot-separated path, keys could have spaces, like in `results.stats_average'."""
+
+    value = source
+    for key in path.split("."):
+        if not isinstance(value, dict) or key not in value:
+            return default
+        value = value[key]
+    return value
+
+
+class EsRecords:
+    """
+    Flat columnar view of ES documents: a list of ids and a column of values for each source path.
+    """
+
+    def __init__(self, ids: List[str], columns: Dict[str, list]):
+        self.ids = ids
+        self.columns = columns
+
+    @classmethod
+    def from_docs(cls, docs: Iterable[dict], paths: Sequence[str]) -> "EsRecords":
+        ids = []
+        columns = {path: [] for path in paths}
+        for doc in docs:
+            ids.append(doc["_id"])
+            source = doc.get("_source", {})
+            for path, column in columns.items():
+                column.append(get_source_value(source, path))
+        return cls(ids=ids, columns=columns)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def column(self, path: str) -> list:
+        return self.columns[path]
+
+    def rows(self) -> Iterator[dict]:
+        for idx, doc_id in enumerate(self.ids):
+            yield {"_id": doc_id, **{path: column[idx] for path, column in self.columns.items()}}
+
+
+class EsDocsCache:
+    """
+    On-disk cache of document sources.
+
+    An entry is keyed by index, document id, the set of requested source paths, and is valid for one document
+    version only: ES increments `_version' on every update, so a test which was updated after caching is re-read.
+    """
+
+    def __init__(self, cache_dir: Path = ES_DOCS_CACHE_DIR):
+        self.cache_dir = Path(cache_dir)
+
+    @staticmethod
+    def _includes_key(source_includes: Optional[Sequence[str]]) -> str:
+        if not source_includes:
+            return "all"
+        return hashlib.sha1("\n".join(sorted(source_includes)).encode()).hexdigest()[:16]
+
+    def _path(self, index: str, doc_id: str, source_includes: Optional[Sequence[str]]) -> Path:
+        return self.cache_dir / index / self._includes_key(source_includes) / f"{doc_id}.json"
+
+    def get(self, index: str, doc_id: str, version: int, source_includes: Optional[Sequence[str]]) -> Optional[dict]:
+        try:
+            with self._path(index, doc_id, source_includes).open(encoding="utf-8") as cache_file:
+                entry = json.load(cache_file)
+        except (OSError, ValueError):
+            return None
+        if entry.get("_version") != version:
+            return None
+        return entry.get("_source")
+
+    def put(self, index: str, doc_id: str, version: int, source_includes: Optional[Sequence[str]], source: dict):
+        path = self._path(index, doc_id, source_includes)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile("w", dir=path.parent, suffix=".tmp", delete=False,
+                                             encoding="utf-8") as tmp_file:
+                json.dump({"_version": version, "_source": source}, tmp_file)
+            os.replace(tmp_file.name, path)
+        except OSError as exc:
+            LOGGER.debug("Unable to cache ES document %s/%s: %s", index, doc_id, exc)
+
+
+class EsDocsReader:
+    def __init__(self, es: Optional[ES] = None, cache: Optional[EsDocsCache] = None):
+        self._es = es
+        self.cache = EsDocsCache() if cache is None else cache
+        self.stats = {"cached": 0, "fetched": 0}
+
+    @property
+    def es(self) -> ES:
+        if self._es is None:
+            self._es = ES()
+        return self._es
+
+    def iter_doc_versions(self, index: str, query: str) -> Iterator[Tuple[str, str, int]]:
+        """Index, id and version of every document matching the Lucene query."""
+
+        for hit in elasticsearch.helpers.scan(self.es, index=index, q=query, _source=False, version=True,
+                                              size=ES_SCROLL_PAGE_SIZE, scroll=ES_SCROLL_KEEPALIVE,
+                                              request_timeout=ES_REQUEST_TIMEOUT):
+            yield hit["_index"], hit["_id"], hit.get("_version")
+
+    def iter_docs(self, index: str, query: str, source_includes: Optional[Sequence[str]] = None) -> Iterator[dict]:
+        """
+        Documents matching the Lucene query in the form of search hits, with sources filtered by `source_includes'.
+
+        Documents are yielded in the order of the scroll, no matter if they came from the cache or not.
+        """
+
+        pending, missing = [], []
+        for doc_index, doc_id, version in self.iter_doc_versions(index=index, query=query):
+            source = self.cache.get(doc_index, doc_id, version, source_includes) if version is not None else None
+            if source is None:
+                missing.append((doc_index, doc_id))
+                pending.append((doc_index, doc_id, None))
+            else:
+                self.stats["cached"] += 1
+                pending.append((doc_index, doc_id, {"_index": doc_index, "_id": doc_id, "_version": version,
+                                                    "_source": source}))
+            if len(missing) >= ES_MGET_BATCH_SIZE or len(pending) >= ES_SCROLL_PAGE_SIZE:
+                yield from self._resolve_pending(pending, missing, source_includes)
+                pending, missing = [], []
+        yield from self._resolve_pending(pending, missing, source_includes)
+
+    def _resolve_pending(self, pending: list, missing: list, source_includes: Optional[Sequence[str]]):
+        fetched = {(doc["_index"], doc["_id"]): doc for doc in self._fetch_docs(missing, source_includes)}
+        for doc_index, doc_id, doc in pending:
+            if doc is None:
+                doc = fetched.get((doc_index, doc_id))
+            if doc is not None:
+                yield doc
+
+    def _fetch_docs(self, batch: List[Tuple[str, str]], source_includes: Optional[Sequence[str]]) -> Iterator[dict]:
+        if not batch:
+            return
+        kwargs = {"_source_includes": list(source_includes)} if source_includes else {}
+        response = self.es.mget(body={"docs": [{"_index": doc_index, "_id": doc_id} for doc_index, doc_id in batch]},
+                                request_timeout=ES_REQUEST_TIMEOUT, **kwargs)
+        for doc in response["docs"]:
+            if not doc.get("found"):
+                continue
+            source = doc.get("_source", {})
+            self.cache.put(doc["_index"], doc["_id"], doc.get("_version"), source_includes, source)
+            self.stats["fetched"] += 1
+            yield {"_index": doc["_index"], "_id": doc["_id"], "_version": doc.get("_version"), "_source": source}
+
+    def get_records(self, index: str, query: str, paths: Sequence[str]) -> EsRecords:
+        return EsRecords.from_docs(self.iter_docs(index=index, query=query, source_includes=paths), paths=paths)
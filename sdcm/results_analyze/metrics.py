@@ -1,3 +1,6 @@
+import numpy as np
+
+from test_lib.utils import get_data_by_path
 from .base import ClassBase
 
 
@@ -80,6 +83,80 @@ class MetricBase(ClassBase):
         return self.value is not None
 
 
+class MetricArray:
+    """
+    Values of the same metric of many tests stored in numpy array, to compare them all at once
+
+    Missing metrics and values are stored as NaN, they are never better and never the best.
+    """
+
+    def __init__(self, metric_class, values, subtype=None):
+        self.metric_class = metric_class
+        self.subtype = subtype
+        self.values = np.asarray(values, dtype=np.float64)
+
+    @classmethod
+    def from_instances(cls, instances, metric_path):
+        metric_class = subtype = None
+        values = np.full(len(instances), np.nan)
+        for idx, instance in enumerate(instances):
+            metric = get_data_by_path(instance, metric_path, default=None)
+            if not isinstance(metric, MetricBase) or metric.value is None:
+                continue
+            if metric_class is None:
+                metric_class, subtype = metric.__class__, metric.subtype
+            values[idx] = metric.value
+        return cls(metric_class=metric_class, values=values, subtype=subtype)
+
+    def __len__(self):
+        return len(self.values)
+
+    @property
+    def inverted_betterness(self):
+        return self.metric_class is not None and self.metric_class.inverted_betterness
+
+    @property
+    def betterness(self):
+        if self.inverted_betterness:
+            return - self.values
+        return self.values
+
+    def _same_type(self, other):
+        return self.metric_class is other.metric_class and self.subtype == other.subtype
+
+    def _other_values(self, other):
+        if isinstance(other, MetricArray):
+            if not self._same_type(other):
+                raise ValueError("Can be compared only to exact same metric")
+            return other.values
+        if not isinstance(other, self.metric_class) or other.subtype != self.subtype:
+            raise ValueError("Can be compared only to exact same metric")
+        return np.float64(np.nan if other.value is None else other.value)
+
+    def better(self, other):
+        other_values = self._other_values(other)
+        if self.inverted_betterness:
+            return self.values < other_values
+        return self.values > other_values
+
+    def rdiff(self, other):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return 100 * (self.values - self._other_values(other)) / np.abs(self.values)
+
+    def rate(self, other):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return 100 * self._other_values(other) / self.values
+
+    def best_index(self):
+        """
+        Index of the best value, the last one if there are several, like the last one of instances sorted by betterness
+        """
+        betterness = self.betterness[::-1]
+        if np.isnan(betterness).all():
+            return None
+        return len(betterness) - 1 - int(np.nanargmax(betterness))
+
+
 class MetricDiffBase(MetricBase):
     base_value: float = None
     other_value: float = None
@@ -13,12 +13,14 @@
 
 import re
 import typing
+import functools
 from datetime import datetime
 import logging
 
 from sdcm.es import ES
 from test_lib.utils import get_class_by_path
 from .base import ClassBase, __DEFAULT__
+from .es_access import EsDocsReader, EsRecords
 from .metrics import ScyllaTestMetrics
 
 
@@ -28,6 +30,12 @@ LOGGER = logging.getLogger(__name__)
 ES_LUCENE_ESCAPE_REGEXP = re.compile(r'([^0-9a-zA-Z_.])')
 
 
+@functools.lru_cache(maxsize=4096)
+def parse_date(value: str, date_format: str) -> datetime:
+    # Many prior tests were run on the same version or on the same day, no need to parse their dates each time
+    return datetime.strptime(value, date_format)
+
+
 class DateClassBase(ClassBase):
     value: datetime.date = None
 
@@ -98,7 +106,7 @@ class StrDateClassBase(DateClassBase):
 
     def load_from_es_data(self, es_data):
         try:
-            self.value = datetime.strptime(es_data, self._format)
+            self.value = parse_date(es_data, self._format)
         except ValueError:
             pass
 
@@ -555,24 +563,43 @@ class TestResultClass(ClassBase):
             ])
         return self._get_es_query_from_self(list_of_attributes)
 
-    def get_prior_tests(self, filter_path=None) -> typing.List['TestResultClass']:
+    @classmethod
+    def get_es_source_paths(cls, data_paths: typing.Sequence[str] = None) -> typing.Dict[str, str]:
+        """
+        Source paths of ES documents which are needed to load data paths of the class, all of them by default.
+
+        Data path could be a prefix, i.e., `metrics.cs_metrics' gives source paths of all cassandra-stress metrics.
+        """
+        source_paths = {}
+        for data_path, es_data_path in cls._get_all_es_data_mapping().items():
+            if data_paths is not None and not any(
+                    data_path == path or data_path.startswith(path + '.') for path in data_paths):
+                continue
+            if es_data_path.startswith('_source.'):
+                source_paths[data_path] = es_data_path[len('_source.'):]
+        return source_paths
+
+    def get_prior_tests(self, data_paths: typing.Sequence[str] = None) -> typing.List['TestResultClass']:
+        """
+        Tests with same parameters.  Data paths limit the data loaded from ES to only needed ones.
+        """
         output = []
+        source_includes = sorted(set(self.get_es_source_paths(data_paths).values()))
         try:
             es_query = self.get_same_tests_query()
-            es_result = ES().search(  # pylint: disable=unexpected-keyword-arg; pylint doesn't understand Elasticsearch code
-                index=self._es_data['_index'],
-                q=es_query,
-                size=10000,
-                filter_path=filter_path,
-            )
-            es_result = es_result.get('hits', {}).get('hits', None) if es_result else None
+            for es_data in EsDocsReader().iter_docs(index=self._es_data['_index'], query=es_query,
+                                                    source_includes=source_includes):
+                output.append(TestResultClass(es_data))
         except Exception as exc:  # pylint: disable=broad-except
             LOGGER.warning("Unable to find ES data: %s", exc)
-            es_result = None
-
-        if not es_result:
-            return output
-        for es_data in es_result:  # pylint: disable=not-an-iterable
-            test = TestResultClass(es_data)
-            output.append(test)
         return output
+
+    def get_prior_records(self, data_paths: typing.Sequence[str]) -> EsRecords:
+        """
+        Values of data paths of tests with same parameters as flat columns, without building instances of the class.
+        """
+        source_paths = self.get_es_source_paths(data_paths)
+        records = EsDocsReader().get_records(index=self._es_data['_index'], query=self.get_same_tests_query(),
+                                             paths=sorted(set(source_paths.values())))
+        return EsRecords(ids=records.ids, columns={data_path: records.column(source_path)
+                                                   for data_path, source_path in source_paths.items()})
@@ -23,8 +23,6 @@ import getpass
 import pathlib
 from typing import List, Union, Set
 
-from distutils.util import strtobool
-
 import anyconfig
 
 from sdcm import sct_abs_path
@@ -91,7 +89,12 @@ def boolean(value):
     if isinstance(value, bool):
         return value
     elif isinstance(value, str):
-        return bool(strtobool(value))
+        value = value.lower()
+        if value in ("y", "yes", "t", "true", "on", "1"):
+            return True
+        if value in ("n", "no", "f", "false", "off", "0"):
+            return False
+        raise ValueError("invalid truth value {!r}".format(value))
     else:
         raise ValueError("{} isn't a boolean".format(type(value)))
 
@@ -389,6 +392,9 @@ class SCTConfiguration(dict):
              help="""Turn on sct profiling"""),
         dict(name="ssh_transport", env="SSH_TRANSPORT", type=str,
              help="""Set type of ssh library to use. Could be 'fabric' (default) or 'libssh2'"""),
+        dict(name="ssh_connection_pool_size", env="SCT_SSH_CONNECTION_POOL_SIZE", type=int,
+             help="""Max number of SSH connections to a node used by 'libssh2' transport,
+             up to 8 commands run over each connection at the same time"""),
         # should be removed once stress commands would be refactored
         dict(name="bench_run", env="SCT_BENCH_RUN", type=boolean,
              help="""If true would kill the scylla-bench thread in the test teardown"""),
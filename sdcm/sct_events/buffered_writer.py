@@ -0,0 +1,205 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+#
+# Copyright (c) 2022 ScyllaDB
+
+"""
+Buffered writers for events log files.
+
+Files are kept open and data is written in batches.  Guarantees:
+
+  - data written by a process appears in the file in the same order as it was passed to `write()';
+    batches from different processes are not interleaved if the writer is created with an inter-process lock,
+    but the order between processes is the order of flushes (each record has its own timestamp anyway);
+  - data is written to the file not later than `flush_interval' seconds after `write()' call, or immediately
+    if `write()' is called with `flush=True' or `flush_interval' is 0;
+  - all pending data is written on `flush()'/`close()' and on normal exit of a process (including processes
+    started using `multiprocessing'.)  Data written during last `flush_interval' seconds can be lost only if
+    a process is killed.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+import logging
+import threading
+import multiprocessing.util
+from typing import Callable, Optional, List, BinaryIO, Union
+from pathlib import Path
+from weakref import WeakSet
+
+
+BUFFERED_WRITER_FLUSH_INTERVAL: float = 0.05  # seconds
+BUFFERED_WRITER_MAX_BUFFER_SIZE: int = 1024 * 1024  # bytes
+BUFFERED_WRITER_EXIT_PRIORITY: int = 100  # flush before other multiprocessing finalizers
+
+LOGGER = logging.getLogger(__name__)
+
+
+class BufferedWriter:
+    """Append data to a file which is kept open and flush it in batches."""
+
+    def __init__(self,
+                 path: Path | str,
+                 flush_interval: float = BUFFERED_WRITER_FLUSH_INTERVAL,
+                 max_buffer_size: int = BUFFERED_WRITER_MAX_BUFFER_SIZE,
+                 lock: Optional[multiprocessing.RLock] = None):
+        self.path = Path(path)
+        self.flush_interval = flush_interval
+        self.max_buffer_size = max_buffer_size
+        self._lock = lock  # used to serialize flushes to a file shared between processes
+        self._init_process_state()
+        _ALL_WRITERS.add(self)
+
+    def _init_process_state(self) -> None:
+        self._pid = None
+        self._buffer_lock = threading.RLock()
+        self._buffer: List[bytes] = []
+        self._buffer_size = 0
+        self._file: Optional[BinaryIO] = None
+        self.flush_deadline: Optional[float] = None
+
+    def _register_in_process(self) -> None:
+        if self._pid == (pid := os.getpid()):
+            return
+        self._pid = pid
+        multiprocessing.util.Finalize(self, self.close, exitpriority=BUFFERED_WRITER_EXIT_PRIORITY)
+
+    def _open(self) -> BinaryIO:
+        return open(self.path, "ab", buffering=0)  # pylint: disable=consider-using-with
+
+    def write(self, data: bytes, flush: bool = False) -> None:
+        with self._buffer_lock:
+            self._register_in_process()
+            self._append(data)
+            flush = flush or not self.flush_interval or self._buffer_size >= self.max_buffer_size
+            schedule = not flush and self.flush_deadline is None
+            if schedule:
+                self.flush_deadline = time.perf_counter() + self.flush_interval
+            if flush:
+                self.flush()
+        if schedule:
+            get_flusher().wakeup()
+
+    def _append(self, data: bytes) -> None:
+        self._buffer.append(data)
+        self._buffer_size += len(data)
+
+    def _take_buffer(self) -> List[bytes]:
+        buffer, self._buffer, self._buffer_size, self.flush_deadline = self._buffer, [], 0, None
+        return buffer
+
+    def _write_to_file(self, data: bytes) -> None:
+        if self._file is None:
+            self._file = self._open()
+        if self._lock is None:
+            self._file.write(data)
+        else:
+            with self._lock:
+                self._file.write(data)
+
+    def flush(self) -> None:
+        with self._buffer_lock:
+            if buffer := self._take_buffer():
+                self._write_to_file(b"".join(buffer))
+
+    def close(self) -> None:
+        with self._buffer_lock:
+            try:
+                self.flush()
+            finally:
+                if self._file is not None:
+                    self._file.close()
+                    self._file = None
+
+
+class SnapshotWriter(BufferedWriter):
+    """Keep only the last written data and atomically replace the file content with it on flush.
+
+    The data can be a callable which returns the content of the file.  It's called on flush only, so a snapshot
+    of a state which changes often is serialized once per `flush_interval' instead of on every change.
+    """
+
+    def _append(self, data: Union[bytes, Callable[[], bytes]]) -> None:
+        self._buffer[:] = [data]
+        self._buffer_size = 0 if callable(data) else len(data)
+
+    def flush(self) -> None:
+        with self._buffer_lock:
+            if buffer := self._take_buffer():
+                data = buffer[-1]
+                self._write_to_file(data() if callable(data) else data)
+
+    def _write_to_file(self, data: bytes) -> None:
+        tmp_path = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        tmp_path.write_bytes(data)
+        tmp_path.replace(self.path)
+
+
+class BufferedWritersFlusher(threading.Thread):
+    """Flush buffers of all writers of the process when their flush deadlines come."""
+
+    def __init__(self):
+        super().__init__(name=self.__class__.__name__, daemon=True)
+        self._wakeup = threading.Event()
+
+    def wakeup(self) -> None:
+        self._wakeup.set()
+
+    def run(self) -> None:
+        while True:
+            now = time.perf_counter()
+            next_deadline = None
+            for writer in list(_ALL_WRITERS):
+                if (deadline := writer.flush_deadline) is None:
+                    continue
+                if deadline <= now:
+                    try:
+                        writer.flush()
+                    except Exception:  # pylint: disable=broad-except
+                        LOGGER.exception("Failed to flush %s", writer.path)
+                elif next_deadline is None or deadline < next_deadline:
+                    next_deadline = deadline
+            self._wakeup.wait(timeout=None if next_deadline is None else next_deadline - now)
+            self._wakeup.clear()
+
+
+_ALL_WRITERS: WeakSet[BufferedWriter] = WeakSet()
+_FLUSHER_LOCK = threading.Lock()
+_FLUSHER: Optional[BufferedWritersFlusher] = None
+
+
+def get_flusher() -> BufferedWritersFlusher:
+    global _FLUSHER  # pylint: disable=global-statement
+
+    with _FLUSHER_LOCK:
+        if _FLUSHER is None:
+            _FLUSHER = BufferedWritersFlusher()
+            _FLUSHER.start()
+        return _FLUSHER
+
+
+def _reset_after_fork() -> None:
+    global _FLUSHER, _FLUSHER_LOCK  # pylint: disable=global-statement
+
+    # Threads are not copied to a child process and locks can be in a locked state, so start from scratch.
+    # Data buffered by the parent process will be written by the parent process.
+    _FLUSHER_LOCK = threading.Lock()
+    _FLUSHER = None
+    for writer in list(_ALL_WRITERS):
+        writer._init_process_state()  # pylint: disable=protected-access
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+__all__ = ("BufferedWriter", "SnapshotWriter", "get_flusher", )
@@ -16,16 +16,18 @@
 import time
 import queue
 import ctypes
-import pickle
 import logging
 import multiprocessing
-from typing import Optional, Generator, Any, Tuple, Callable, cast, Dict
+from typing import Optional, Generator, Any, Tuple, Callable, cast, Deque, List, Sequence
+from collections import deque
 from pathlib import Path
 from functools import cached_property, partial
-from uuid import UUID
 
 import zmq
 
+from sdcm.sct_events import Severity
+from sdcm.sct_events.buffered_writer import BufferedWriter
+from sdcm.sct_events.wire_format import encode_event, decode_event
 from sdcm.sct_events.events_processes import \
     EVENTS_MAIN_DEVICE_ID, StopEvent, EventsProcessesRegistry, \
     start_events_process, get_events_process, verbose_suppress, suppress_interrupt
@@ -37,7 +39,10 @@ SUB_POLLING_TIMEOUT: int = 1000  # milliseconds
 PUB_QUEUE_WAIT_TIMEOUT: float = 1  # seconds
 PUB_QUEUE_EVENTS_RATE: float = 0  # seconds
 PUBLISH_EVENT_TIMEOUT: float = 5  # seconds
-FILTERS_GC_PERIOD: float = 60  # Cleanup old filters once in a while
+FILTERS_STATS_REPORT_PERIOD: float = 60  # Report time spent on filtering once in a while
+RAW_EVENTS_LOG_FLUSH_INTERVAL: float = 0.05  # seconds
+DELIVERY_VERIFICATION_BATCH_SIZE: int = 100  # verify delivery of published events in batches of this size
+EVENTS_BUS_HWM: int = 1_000_000  # max number of messages queued by ZMQ for a subscriber
 
 EVENTS_LOG_DIR: str = "events_log"
 RAW_EVENTS_LOG: str = "raw_events.log"
@@ -51,6 +56,7 @@ class EventsDevice(multiprocessing.Process):
     sub_polling_timeout = SUB_POLLING_TIMEOUT
     pub_queue_wait_timeout = PUB_QUEUE_WAIT_TIMEOUT
     pub_queue_events_rate = PUB_QUEUE_EVENTS_RATE
+    delivery_verification_batch_size = DELIVERY_VERIFICATION_BATCH_SIZE
 
     def __init__(self, _registry: EventsProcessesRegistry):
         self._registry = _registry
@@ -62,6 +68,12 @@ class EventsDevice(multiprocessing.Process):
         self._raw_events_lock = multiprocessing.RLock()
         self.events_log_base_dir.mkdir(parents=True, exist_ok=True)
 
+        # The writer is shared by all processes which publish events: each process has own buffer and
+        # the lock guarantees that batches from different processes are not interleaved.
+        self._raw_events_writer = BufferedWriter(path=self.raw_events_log,
+                                                 flush_interval=RAW_EVENTS_LOG_FLUSH_INTERVAL,
+                                                 lock=self._raw_events_lock)
+
         super().__init__(daemon=True)
 
     @property
@@ -76,7 +88,13 @@ class EventsDevice(multiprocessing.Process):
     def raw_events_log(self) -> Path:
         return self.events_log_base_dir / RAW_EVENTS_LOG
 
+    def flush_raw_events_log(self) -> None:
+        """Write events published by the current process and still buffered to the raw events log."""
+        with verbose_suppress("%s: failed to flush %s", self, self.raw_events_log):
+            self._raw_events_writer.flush()
+
     def stop(self, timeout: Optional[float] = None) -> None:
+        self.flush_raw_events_log()
         self._running.clear()
         self.join(timeout)
 
@@ -89,93 +107,139 @@ class EventsDevice(multiprocessing.Process):
     def run(self):
         with suppress_interrupt(), verbose_suppress("EventsDevice failed"):
             with zmq.Context() as ctx, ctx.socket(zmq.PUB) as pub, ctx.socket(zmq.SUB) as sub:
+                pub.setsockopt(zmq.SNDHWM, EVENTS_BUS_HWM)
                 self._sub_port.value = pub.bind_to_random_port("tcp://*")
                 self._running.set()
 
                 LOGGER.info("EventsDevice listen on %s", self.subscribe_address)
 
                 # Delivery verification subscriber.
+                sub.setsockopt(zmq.RCVHWM, EVENTS_BUS_HWM)
                 sub.connect(self.subscribe_address)
                 sub.subscribe(b"")
 
                 time.sleep(self.start_delay)
 
+                unverified = deque()
                 while self._running.is_set() or not self._queue.empty():
                     try:
-                        event = self._queue.get(timeout=self.pub_queue_wait_timeout)
-                        try:
-                            pub.send(event)
-                        except zmq.ZMQError:
-                            LOGGER.exception("EventsDevice failed to send %s", pickle.loads(event))
-                        else:
-                            try:
-                                if sub.poll(timeout=self.sub_polling_timeout) and sub.recv(zmq.NOBLOCK) == event:
-                                    continue  # everything is OK, we can go to send next event in the queue.
-                            except zmq.ZMQError:
-                                pass
-                            LOGGER.error("EventsDevice failed to verify delivery of %s", pickle.loads(event))
-                        time.sleep(self.pub_queue_events_rate)
+                        frames = self._queue.get(timeout=self.pub_queue_wait_timeout)
                     except queue.Empty:
-                        pass
+                        self._verify_delivery(sub=sub, unverified=unverified)
+                        continue
+                    try:
+                        pub.send_multipart(frames)
+                    except zmq.ZMQError:
+                        LOGGER.exception("EventsDevice failed to send %s", self._decode_for_log(frames))
+                    else:
+                        unverified.append(frames)
+                        if len(unverified) >= self.delivery_verification_batch_size:
+                            self._verify_delivery(sub=sub, unverified=unverified)
+                    time.sleep(self.pub_queue_events_rate)
+                self._verify_delivery(sub=sub, unverified=unverified)
+
+    def _verify_delivery(self, sub: zmq.Socket, unverified: Deque[List[bytes]]) -> None:
+        """Check that all sent events received by the delivery verification subscriber.
+
+        PUB/SUB keeps the order of messages, so if some message received, all unverified messages before it
+        are lost.
+        """
+        deadline = time.perf_counter() + self.sub_polling_timeout / 1000
+        while unverified and (timeout := deadline - time.perf_counter()) > 0:
+            try:
+                if not sub.poll(timeout=timeout * 1000):
+                    break
+                received = sub.recv_multipart(zmq.NOBLOCK)
+            except zmq.ZMQError:
+                break
+            while unverified:
+                if (frames := unverified.popleft()) == received:
+                    break
+                LOGGER.error("EventsDevice failed to verify delivery of %s", self._decode_for_log(frames))
+        while unverified:
+            LOGGER.error("EventsDevice failed to verify delivery of %s", self._decode_for_log(unverified.popleft()))
+
+    @staticmethod
+    def _decode_for_log(frames: Sequence[bytes]) -> Any:
+        try:
+            return decode_event(frames)
+        except Exception:  # pylint: disable=broad-except
+            return frames[0]
 
     def publish_event(self, event, timeout=PUBLISH_EVENT_TIMEOUT) -> None:
         with verbose_suppress("%s: failed to write %s to %s", self, event, self.raw_events_log):
-            with self._raw_events_lock, open(self.raw_events_log, "ab+", buffering=0) as log_file:
-                log_file.write(event.to_json().encode("utf-8") + b"\n")
+            # Don't postpone critical events: the test can be aborted right after them.
+            self._raw_events_writer.write(event.to_json().encode("utf-8") + b"\n",
+                                          flush=event.severity == Severity.CRITICAL)
 
         with verbose_suppress("%s: failed to publish %s", self, event):
-            self._queue.put(pickle.dumps(event), timeout=timeout)
+            self._queue.put(encode_event(event), timeout=timeout)
             self._events_counter.value += 1
 
-    def _sub_socket(self, ctx: zmq.Context) -> zmq.Socket:
-        LOGGER.info("Subscribe to %s", self.subscribe_address)
+    def _sub_socket(self, ctx: zmq.Context, topics: Optional[Sequence[bytes]] = None) -> zmq.Socket:
+        LOGGER.info("Subscribe to %s (topics: %s)", self.subscribe_address, "all" if topics is None else topics)
         sub = ctx.socket(zmq.SUB)
+        sub.setsockopt(zmq.RCVHWM, EVENTS_BUS_HWM)
         sub.connect(self.subscribe_address)
-        sub.subscribe(b"")
+        for topic in (b"", ) if topics is None else topics:
+            sub.subscribe(topic)
         return sub
 
-    def inbound_events(self, stop_event: StopEvent) -> Generator[Any, None, None]:
-        with zmq.Context() as ctx, self._sub_socket(ctx) as sub:
+    def inbound_events(self,
+                       stop_event: StopEvent,
+                       topics: Optional[Sequence[bytes]] = None) -> Generator[Any, None, None]:
+        with zmq.Context() as ctx, self._sub_socket(ctx, topics=topics) as sub:
             while not stop_event.is_set():
                 while sub.poll(timeout=self.sub_polling_timeout):
-                    yield sub.recv_pyobj(flags=zmq.NOBLOCK)
+                    frames = sub.recv_multipart(flags=zmq.NOBLOCK)
+                    try:
+                        event = decode_event(frames)
+                    except Exception:  # pylint: disable=broad-except
+                        LOGGER.exception("%s: failed to decode an event with topic %s", self, frames[0])
+                        continue
+                    yield event
 
     # pylint: disable=import-outside-toplevel
     def outbound_events(self,
                         stop_event: StopEvent,
-                        events_counter: multiprocessing.Value) -> Generator[Tuple[str, Any], None, None]:
+                        events_counter: multiprocessing.Value,
+                        topics: Optional[Sequence[bytes]] = None) -> Generator[Tuple[str, Any], None, None]:
+        """Generate events received from the bus after filtering.
+
+        If `topics' is given, subscribe only to these topic prefixes (see `sdcm.sct_events.wire_format'.)
+        """
         from sdcm.sct_events.base import max_severity
         from sdcm.sct_events.system import SystemEvent
-        from sdcm.sct_events.filters import BaseFilter
+        from sdcm.sct_events.filters import BaseFilter, EventsFiltersIndex
 
-        filters: Dict[UUID, BaseFilter] = {}
-        filters_gc_next_hit = time.perf_counter() + FILTERS_GC_PERIOD
+        filters = EventsFiltersIndex()
+        filters_stats_next_report = time.perf_counter() + FILTERS_STATS_REPORT_PERIOD
 
         with suppress_interrupt():
-            for events_counter.value, obj in enumerate(self.inbound_events(stop_event=stop_event), start=1):
-                if filters_gc_next_hit < time.perf_counter():
-                    # Run filter GC once in FILTERS_GC_PERIOD seconds
-                    for filter_key, filter_obj in list(filters.items()):
-                        if filter_obj.is_deceased():
-                            del filters[filter_key]
-                    filters_gc_next_hit = time.perf_counter() + FILTERS_GC_PERIOD
+            for events_counter.value, obj in enumerate(self.inbound_events(stop_event=stop_event, topics=topics),
+                                                       start=1):
+                filters.expire()
 
                 if isinstance(obj, BaseFilter):
                     if obj.clear_filter and not obj.expire_time:
                         LOGGER.debug("%s: delete filter with uuid=%s", self, obj.uuid)
-                        filters.pop(obj.uuid, None)
+                        filters.remove(obj.uuid)
                     elif obj.clear_filter and obj.expire_time and obj.uuid in filters:
                         LOGGER.debug("%s: set expire_time to %s for filter with uuid=%s",
                                      self, obj.expire_time, obj.uuid)
-                        filters[obj.uuid].expire_time = obj.expire_time
+                        filters.set_expire_time(obj.uuid, obj.expire_time)
                     else:
                         LOGGER.debug("%s: add filter %s with uuid=%s", self, obj, obj.uuid)
-                        filters[obj.uuid] = obj
+                        filters.add(obj)
 
                 if isinstance(obj, SystemEvent):
                     continue
 
-                obj_filtered = any(f.eval_filter(obj) for f in filters.values())
+                obj_filtered = filters.is_filtered(obj)
+
+                if filters_stats_next_report < time.perf_counter():
+                    self._report_filters_stats(filters)
+                    filters_stats_next_report = time.perf_counter() + FILTERS_STATS_REPORT_PERIOD
 
                 if obj_filtered:
                     continue
@@ -186,6 +250,13 @@ class EventsDevice(multiprocessing.Process):
 
                 yield obj.base, obj
 
+    def _report_filters_stats(self, filters) -> None:
+        if filters.evaluated_events:
+            LOGGER.debug("%s: %d active filters, %d events filtered in %.3fs (avg %.1fus, max %.1fus per event)",
+                         self, len(filters), filters.evaluated_events, filters.filtering_time,
+                         filters.filtering_time / filters.evaluated_events * 1e6, filters.max_filtering_time * 1e6)
+        filters.reset_stats()
+
     def is_alive(self) -> bool:
         return self._running.is_set()
 
@@ -19,7 +19,7 @@ import ctypes
 import logging
 import threading
 import multiprocessing
-from typing import Union, Generator, Protocol, TypeVar, Generic, Type, Optional, cast
+from typing import Union, Generator, Protocol, TypeVar, Generic, Type, Optional, Tuple, cast
 from pathlib import Path
 from contextlib import contextmanager
 
@@ -59,6 +59,7 @@ class OutboundEventsProtocol(Protocol[T_outbound_events_protocol]):
 
 class BaseEventsProcess(Generic[T_inbound_event, T_outbound_event], abc.ABC):
     inbound_events_process = EVENTS_MAIN_DEVICE_ID
+    inbound_events_topics: Optional[Tuple[bytes, ...]] = None  # topic prefixes to subscribe to, None for all events
     stop_event: StopEvent
 
     def __init__(self, _registry: EventsProcessesRegistry):
@@ -79,9 +80,11 @@ class BaseEventsProcess(Generic[T_inbound_event, T_outbound_event], abc.ABC):
         return self._events_counter.value
 
     def inbound_events(self) -> InboundEventsGenerator:
+        # Only EventsDevice supports subscription to topics.
+        kwargs = {} if self.inbound_events_topics is None else {"topics": self.inbound_events_topics}
         yield from cast(OutboundEventsProtocol[T_inbound_event],
                         get_events_process(name=self.inbound_events_process, _registry=self._registry)) \
-            .outbound_events(stop_event=self.stop_event, events_counter=self._events_counter)
+            .outbound_events(stop_event=self.stop_event, events_counter=self._events_counter, **kwargs)
 
     # pylint: disable=unused-argument,no-self-use
     def outbound_events(self, stop_event: StopEvent,
@@ -25,6 +25,7 @@ from collections import deque
 from sdcm.sct_events import Severity
 from sdcm.sct_events.base import SctEvent
 from sdcm.sct_events.system import TestResultEvent
+from sdcm.sct_events.buffered_writer import BufferedWriter, SnapshotWriter
 from sdcm.sct_events.events_device import get_events_main_device
 from sdcm.sct_events.events_processes import \
     EVENTS_FILE_LOGGER_ID, EventsProcessesRegistry, BaseEventsProcess, \
@@ -39,6 +40,9 @@ WARNING_LOG: str = "warning.log"
 NORMAL_LOG: str = "normal.log"
 DEBUG_LOG: str = "debug.log"
 
+EVENTS_LOG_FLUSH_INTERVAL: float = 0.05  # seconds
+SUMMARY_LOG_UPDATE_INTERVAL: float = 0.05  # seconds
+
 LINE_START_RE = re.compile(r"^\d{4}-\d{2}-\d{2} ")  # date in YYYY-MM-DD format
 
 LOGGER = logging.getLogger(__name__)
@@ -60,6 +64,11 @@ class EventsFileLogger(BaseEventsProcess[Tuple[str, Any], None], multiprocessing
         self.events_summary = collections.defaultdict(int)
         self.events_summary_log = base_dir / SUMMARY_LOG
 
+        self._writers = {log_file: BufferedWriter(path=log_file, flush_interval=EVENTS_LOG_FLUSH_INTERVAL)
+                         for log_file in chain((self.events_log, ), self.events_logs_by_severity.values())}
+        self._events_summary_writer = SnapshotWriter(path=self.events_summary_log,
+                                                     flush_interval=SUMMARY_LOG_UPDATE_INTERVAL)
+
         super().__init__(_registry=_registry)
 
     def run(self) -> None:
@@ -68,10 +77,19 @@ class EventsFileLogger(BaseEventsProcess[Tuple[str, Any], None], multiprocessing
         for log_file in chain((self.events_log, self.events_summary_log, ), self.events_logs_by_severity.values(), ):
             log_file.touch()
 
-        for event_tuple in self.inbound_events():
-            with verbose_suppress("EventsFileLogger failed to process %s", event_tuple):
-                _, event = event_tuple  # try to unpack event from EventsDevice
-                self.write_event(event=event)
+        try:
+            for event_tuple in self.inbound_events():
+                with verbose_suppress("EventsFileLogger failed to process %s", event_tuple):
+                    _, event = event_tuple  # try to unpack event from EventsDevice
+                    self.write_event(event=event)
+        finally:
+            for writer in chain(self._writers.values(), (self._events_summary_writer, )):
+                with verbose_suppress("%s: failed to flush %s", self, writer.path):
+                    writer.close()
+
+    def _write_to_log(self, event: SctEvent, log_file: Path, message_bin: bytes) -> None:
+        with verbose_suppress("%s: failed to write %s to %s", self, event, log_file):
+            self._writers[log_file].write(message_bin, flush=event.severity == Severity.CRITICAL)
 
     def write_event(self, event: SctEvent) -> None:
         if event.source_timestamp:
@@ -90,20 +108,19 @@ class EventsFileLogger(BaseEventsProcess[Tuple[str, Any], None], multiprocessing
 
         # Write event to events.log file
         if getattr(event, 'save_to_files', False):
-            with verbose_suppress("%s: failed to write %s to %s", self, event, self.events_log):
-                with self.events_log.open("ab+", buffering=0) as fobj:
-                    fobj.write(message_bin)
+            self._write_to_log(event=event, log_file=self.events_log, message_bin=message_bin)
 
             if log_file := self.events_logs_by_severity.get(event.severity):
-                with verbose_suppress("%s: failed to write %s to %s", self, event, log_file):
-                    with log_file.open("ab+", buffering=0) as fobj:
-                        fobj.write(message_bin)
+                self._write_to_log(event=event, log_file=log_file, message_bin=message_bin)
 
-        # Update summary.log file (statistics.)
+        # Update summary.log file (statistics.)  Only the counter is updated per event, the file is rewritten
+        # with the counters once in SUMMARY_LOG_UPDATE_INTERVAL and on exit.
         self.events_summary[Severity(event.severity).name] += 1
         with verbose_suppress("%s: failed to update %s", self, self.events_summary_log):
-            with self.events_summary_log.open("wb", buffering=0) as fobj:
-                fobj.write(json.dumps(dict(self.events_summary), indent=4).encode("utf-8"))
+            self._events_summary_writer.write(self._dump_events_summary)
+
+    def _dump_events_summary(self) -> bytes:
+        return json.dumps(dict(self.events_summary), indent=4).encode("utf-8")
 
     def get_events_by_category(self, limit: Optional[int] = None) -> Dict[str, List[str]]:
         output = {}
@@ -13,11 +13,31 @@
 
 import re
 import time
-from typing import Optional, Type, Union
+import heapq
+import itertools
+from typing import Optional, Type, Union, Callable, Dict, List, Tuple, Iterable
 from functools import cached_property
 
 from sdcm.sct_events import Severity
-from sdcm.sct_events.base import SctEvent, SctEventProtocol, BaseFilter, LogEventProtocol
+from sdcm.sct_events.base import \
+    SctEvent, SctEventProtocol, BaseFilter, LogEventProtocol, FILTER_EVENT_DECAY_TIME
+
+
+class LazyEventStr:
+    """Render an event to a string on first call and reuse the result while the severity is not changed."""
+
+    __slots__ = ("event", "_severity", "_str", )
+
+    def __init__(self, event: SctEventProtocol):
+        self.event = event
+        self._severity = None
+        self._str = None
+
+    def __call__(self) -> str:
+        if self._str is None or self._severity is not self.event.severity:
+            self._severity = self.event.severity  # can be changed by EventsSeverityChangerFilter
+            self._str = str(self.event)
+        return self._str
 
 
 class DbEventsFilter(BaseFilter):
@@ -94,14 +114,14 @@ class EventsFilter(BaseFilter):
             self.expire_time = time.time() + self.extra_time_to_expiration
         super().cancel_filter()
 
-    def eval_filter(self, event: SctEventProtocol) -> bool:
+    def eval_filter(self, event: SctEventProtocol, event_str: Optional[Callable[[], str]] = None) -> bool:
         if self.expire_time and event.timestamp and self.expire_time < event.timestamp:
             return False
 
         result = not self.event_class or (type(event).__name__ + ".").startswith(self.event_class)
 
-        if self._regex:
-            result &= self._regex.match(str(event)) is not None
+        if result and self._regex:
+            result = self._regex.match(event_str() if event_str else str(event)) is not None
 
         return result
 
@@ -125,7 +145,128 @@ class EventsSeverityChangerFilter(EventsFilter):
 
         self.new_severity = new_severity
 
-    def eval_filter(self, event: SctEventProtocol) -> bool:
-        if super().eval_filter(event) and self.new_severity:
+    def eval_filter(self, event: SctEventProtocol, event_str: Optional[Callable[[], str]] = None) -> bool:
+        if super().eval_filter(event, event_str) and self.new_severity:
             event.severity = self.new_severity
         return False
+
+
+_FilterEntry = Tuple[int, BaseFilter]  # (sequence number, filter)
+
+
+class EventsFiltersIndex:
+    """Active filters indexed by db event type and node, and by event class name prefix.
+
+    Only filters which can match an event are evaluated, in the order they were added (severity changers
+    and regex filters depend on it.)  The event is rendered to a string at most once per severity.
+    Deceased filters are expired incrementally using a heap ordered by expiration time.
+    """
+
+    def __init__(self):
+        self._filters: Dict[str, _FilterEntry] = {}
+        self._db_events_filters: Dict[str, Dict[Optional[str], Dict[str, _FilterEntry]]] = {}
+        self._events_filters: Dict[str, Dict[str, _FilterEntry]] = {}
+        self._other_filters: Dict[str, _FilterEntry] = {}  # should be evaluated for all events
+        self._expiration_heap: List[Tuple[float, int, str]] = []
+        self._sequence = itertools.count()
+
+        self.evaluated_events = 0
+        self.filtering_time = 0.0
+        self.max_filtering_time = 0.0
+
+    def __len__(self) -> int:
+        return len(self._filters)
+
+    def __contains__(self, uuid: str) -> bool:
+        return uuid in self._filters
+
+    def _bucket(self, filter_obj: BaseFilter) -> Optional[Dict[str, _FilterEntry]]:
+        if isinstance(filter_obj, DbEventsFilter):
+            if not filter_obj.filter_type:
+                return None  # never matches an event
+            nodes = self._db_events_filters.setdefault(filter_obj.filter_type, {})
+            return nodes.setdefault(filter_obj.filter_node, {})
+        if isinstance(filter_obj, EventsFilter) and filter_obj.event_class:
+            return self._events_filters.setdefault(filter_obj.event_class, {})
+        return self._other_filters
+
+    def add(self, filter_obj: BaseFilter) -> None:
+        self.remove(filter_obj.uuid)
+        entry = (next(self._sequence), filter_obj, )
+        self._filters[filter_obj.uuid] = entry
+        if (bucket := self._bucket(filter_obj)) is not None:
+            bucket[filter_obj.uuid] = entry
+        if filter_obj.expire_time:
+            heapq.heappush(self._expiration_heap, (filter_obj.expire_time, entry[0], filter_obj.uuid, ))
+
+    def remove(self, uuid: str) -> Optional[BaseFilter]:
+        if (entry := self._filters.pop(uuid, None)) is None:
+            return None
+        filter_obj = entry[1]
+        if (bucket := self._bucket(filter_obj)) is not None:
+            bucket.pop(uuid, None)
+        return filter_obj
+
+    def set_expire_time(self, uuid: str, expire_time: float) -> None:
+        if (entry := self._filters.get(uuid)) is None:
+            return
+        entry[1].expire_time = expire_time
+        heapq.heappush(self._expiration_heap, (expire_time, entry[0], uuid, ))
+
+    def expire(self, now: Optional[float] = None) -> int:
+        """Remove deceased filters and return the number of removed filters."""
+
+        deadline = (time.time() if now is None else now) - FILTER_EVENT_DECAY_TIME
+        removed = 0
+        while self._expiration_heap and self._expiration_heap[0][0] <= deadline:
+            expire_time, sequence, uuid = heapq.heappop(self._expiration_heap)
+            entry = self._filters.get(uuid)
+            # Skip outdated heap items: the filter was removed/re-added or its expire time was changed.
+            if entry is not None and entry[0] == sequence and entry[1].expire_time == expire_time:
+                self.remove(uuid)
+                removed += 1
+        return removed
+
+    def _candidates(self, event: SctEventProtocol) -> Iterable[_FilterEntry]:
+        buckets = []
+        if self._other_filters:
+            buckets.append(self._other_filters)
+        if self._db_events_filters and (nodes := self._db_events_filters.get(getattr(event, "type", None))):
+            node = getattr(event, "node", None)
+            if isinstance(node, str):
+                buckets.extend(bucket for key in (None, *node.split()) if (bucket := nodes.get(key)))
+            else:
+                buckets.extend(nodes.values())  # let the filter decide
+        if self._events_filters:
+            prefix = ""
+            for part in type(event).__name__.split("."):
+                prefix += part + "."
+                if bucket := self._events_filters.get(prefix):
+                    buckets.append(bucket)
+        if len(buckets) == 1:
+            return buckets[0].values()
+        return sorted(entry for bucket in buckets for entry in bucket.values())
+
+    def is_filtered(self, event: SctEventProtocol) -> bool:
+        """Evaluate matching filters in order until one of them filters the event out."""
+
+        start = time.perf_counter()
+        try:
+            event_str = LazyEventStr(event)
+            for _, filter_obj in self._candidates(event):
+                if isinstance(filter_obj, EventsFilter):
+                    if filter_obj.eval_filter(event, event_str):
+                        return True
+                elif filter_obj.eval_filter(event):
+                    return True
+            return False
+        finally:
+            elapsed = time.perf_counter() - start
+            self.evaluated_events += 1
+            self.filtering_time += elapsed
+            self.max_filtering_time = max(self.max_filtering_time, elapsed)
+
+    def reset_stats(self) -> None:
+        self.evaluated_events = 0
+        self.filtering_time = 0.0
+        self.max_filtering_time = 0.0
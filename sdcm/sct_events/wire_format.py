@@ -0,0 +1,151 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+#
+# Copyright (c) 2022 ScyllaDB
+
+"""
+Wire format of SCT events sent over the events bus (ZMQ PUB/SUB.)
+
+Each event is sent as a multipart message of 3 frames:
+
+  1. topic: `<SEVERITY> <event class name>' (e.g., `ERROR DatabaseLogEvent.BACKTRACE') or
+     `SYSTEM <event class name>' for system events (filters, etc.)  Subscribers can use prefixes of topics
+     to filter events at the ZMQ level (see `topic_prefixes()'.)  Note that the severity is the severity of
+     the event at the time of publishing: severity filters and max severity limits are applied by subscribers.
+  2. header: format version (1 byte), payload encoding (1 byte) and name of the module of the event class.
+  3. payload: for `ENCODING_MARSHAL' it's a tuple of the name of the event class (as registered
+     in `SctEventTypesRegistry'), the state of the event (public attributes) and names of attributes which
+     are instances of `Severity' (sent as their values) serialized using `marshal' module.  All SCT processes
+     run by the same interpreter, so the format of `marshal' is the same for all of them.  Events with
+     attributes which can't be serialized by `marshal' (e.g., custom objects) and events with custom pickling
+     are sent using `ENCODING_PICKLE'.
+"""
+
+from __future__ import annotations
+
+import pickle
+import struct
+import marshal
+import importlib
+from typing import List, Optional, Sequence, Iterable, Type, Dict
+
+from sdcm.sct_events import Severity
+from sdcm.sct_events.base import SctEvent, SystemEvent
+
+
+WIRE_FORMAT_VERSION: int = 1
+MARSHAL_VERSION: int = 4
+ENCODING_MARSHAL: bytes = b"M"
+ENCODING_PICKLE: bytes = b"P"
+SYSTEM_TOPIC: str = "SYSTEM"
+
+_HEADER = struct.Struct("!Bc")
+_EVENT_CLASSES_CACHE: Dict[str, Type[SctEvent]] = {}
+
+
+class WireFormatError(Exception):
+    pass
+
+
+def event_topic(event: SctEvent) -> bytes:
+    category = SYSTEM_TOPIC if isinstance(event, SystemEvent) else Severity(event.severity).name
+    return f"{category} {type(event).__name__}".encode("utf-8")
+
+
+def topic_prefixes(severities: Optional[Iterable[Severity]] = None,
+                   event_classes: Optional[Iterable[Type[SctEvent]]] = None,
+                   system_events: bool = True) -> List[bytes]:
+    """
+    Build a list of ZMQ subscription prefixes.
+
+    Subscribe to all events of given severities and/or event classes (and their subtypes.)  System events
+    (e.g., filters) are included by default because they are required to process other events correctly.
+    """
+    categories = [severity.name for severity in severities] if severities is not None else [s.name for s in Severity]
+    if event_classes is None:
+        prefixes = [f"{category} " for category in categories] if severities is not None else [""]
+    else:
+        prefixes = [f"{category} {event_class.__name__}" for category in categories for event_class in event_classes]
+    if system_events and "" not in prefixes:
+        prefixes.append(f"{SYSTEM_TOPIC} ")
+    return [prefix.encode("utf-8") for prefix in prefixes]
+
+
+def _has_custom_pickling(event_class: Type[SctEvent]) -> bool:
+    return event_class.__reduce__ is not object.__reduce__ or event_class.__reduce_ex__ is not object.__reduce_ex__ \
+        or hasattr(event_class, "__setstate__")
+
+
+def _marshal_payload(event: SctEvent) -> Optional[bytes]:
+    if _has_custom_pickling(type(event)):
+        return None
+    state = event.__getstate__()
+    severity_fields = tuple(name for name, value in state.items() if type(value) is Severity)
+    for name in severity_fields:
+        state[name] = state[name].value
+    try:
+        return marshal.dumps((type(event).__name__, state, severity_fields), MARSHAL_VERSION)
+    except ValueError:  # some value is not supported by marshal
+        return None
+
+
+def encode_event(event: SctEvent) -> List[bytes]:
+    """Encode an event to a list of frames: topic, header and payload."""
+
+    if (payload := _marshal_payload(event)) is not None:
+        encoding = ENCODING_MARSHAL
+    else:
+        encoding = ENCODING_PICKLE
+        payload = pickle.dumps(event)
+    header = _HEADER.pack(WIRE_FORMAT_VERSION, encoding) + type(event).__module__.encode("utf-8")
+    return [event_topic(event), header, payload]
+
+
+def _get_event_class(name: str, module: str) -> Type[SctEvent]:
+    if (event_class := _EVENT_CLASSES_CACHE.get(name)) is not None:
+        return event_class
+    registry = SctEvent._sct_event_types_registry  # pylint: disable=protected-access
+    if name not in registry:
+        importlib.import_module(module)  # the class can be defined in a module not imported by the subscriber yet
+    try:
+        event_class = registry[name].__mro__[0]  # the registry keeps weak proxies, get the class itself
+    except KeyError:
+        raise WireFormatError(f"Unknown event class `{name}'") from None
+    _EVENT_CLASSES_CACHE[name] = event_class
+    return event_class
+
+
+def decode_event(frames: Sequence[bytes]) -> SctEvent:
+    """Decode an event from frames produced by `encode_event()'."""
+
+    try:
+        _, header, payload = frames
+        version, encoding = _HEADER.unpack_from(header)
+    except (ValueError, struct.error) as exc:
+        raise WireFormatError(f"Malformed event message: {exc}") from None
+    if version != WIRE_FORMAT_VERSION:
+        raise WireFormatError(f"Unsupported wire format version: {version}")
+    if encoding == ENCODING_PICKLE:
+        return pickle.loads(payload)
+    if encoding != ENCODING_MARSHAL:
+        raise WireFormatError(f"Unsupported payload encoding: {encoding!r}")
+
+    class_name, state, severity_fields = marshal.loads(payload)
+    event_class = _get_event_class(name=class_name, module=bytes(header[_HEADER.size:]).decode("utf-8"))
+    for name in severity_fields:
+        state[name] = Severity(state[name])
+    event = event_class.__new__(event_class)
+    event.__dict__.update(state)
+    return event
+
+
+__all__ = ("WIRE_FORMAT_VERSION", "WireFormatError",
+           "event_topic", "topic_prefixes", "encode_event", "decode_event", )
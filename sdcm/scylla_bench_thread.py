@@ -52,24 +52,18 @@ class ScyllaBenchStressEventsPublisher(FileFollowerThread):
         self.node = str(node)
         self.event_id = event_id
 
-    def run(self):
-        while not self.stopped():
-            exists = os.path.isfile(self.sb_log_filename)
-            if not exists:
-                time.sleep(0.5)
-                continue
-
-            for line_number, line in enumerate(self.follow_file(self.sb_log_filename)):
-                if self.stopped():
-                    break
-
-                for pattern, event in SCYLLA_BENCH_ERROR_EVENTS_PATTERNS:
-                    if self.event_id:
-                        # Connect the event to the stress load
-                        event.event_id = self.event_id
-
-                    if pattern.search(line):
-                        event.add_info(node=self.node, line=line, line_number=line_number).publish()
+    @property
+    def followed_file(self):
+        return self.sb_log_filename
+
+    def handle_line(self, line_number, line):
+        for pattern, event in SCYLLA_BENCH_ERROR_EVENTS_PATTERNS:
+            if self.event_id:
+                # Connect the event to the stress load
+                event.event_id = self.event_id
+
+            if pattern.search(line):
+                event.add_info(node=self.node, line=line, line_number=line_number).publish()
 
 
 class ScyllaBenchThread:  # pylint: disable=too-many-instance-attributes
@@ -18,7 +18,7 @@ import uuid
 import random
 import logging
 import concurrent.futures
-from typing import Any
+from typing import Any, Dict, List, Optional, Tuple
 from itertools import chain
 
 from sdcm.loader import CassandraStressExporter
@@ -48,27 +48,25 @@ class CassandraStressEventsPublisher(FileFollowerThread):
         self.cs_log_filename = cs_log_filename
         self.event_id = event_id
 
-    def run(self) -> None:
-        while not self.stopped():
-            if not os.path.isfile(self.cs_log_filename):
-                time.sleep(0.5)
-                continue
-
-            for line_number, line in enumerate(self.follow_file(self.cs_log_filename)):
-                if self.stopped():
-                    break
+    @property
+    def followed_file(self) -> str:
+        return self.cs_log_filename
 
-                for pattern, event in chain(CS_NORMAL_EVENTS_PATTERNS, CS_ERROR_EVENTS_PATTERNS):
-                    if self.event_id:
-                        # Connect the event to the stress load
-                        event.event_id = self.event_id
+    def handle_line(self, line_number: int, line: str) -> None:
+        for pattern, event in chain(CS_NORMAL_EVENTS_PATTERNS, CS_ERROR_EVENTS_PATTERNS):
+            if self.event_id:
+                # Connect the event to the stress load
+                event.event_id = self.event_id
 
-                    if pattern.search(line):
-                        event.add_info(node=self.node, line=line, line_number=line_number).publish()
-                        break  # Stop iterating patterns to avoid creating two events for one line of the log
+            if pattern.search(line):
+                event.add_info(node=self.node, line=line, line_number=line_number).publish()
+                break  # Stop iterating patterns to avoid creating two events for one line of the log
 
 
 class CassandraStressThread:  # pylint: disable=too-many-instance-attributes
+    # Suboptions of c-s options by (loader name, option), c-s is asked once per loader instead of once per process.
+    _available_suboptions: Dict[Tuple[str, str], List[str]] = {}
+
     def __init__(self, loader_set, stress_cmd, timeout, stress_num=1, keyspace_num=1, keyspace_name='',  # pylint: disable=too-many-arguments
                  profile=None, node_list=None, round_robin=False, client_encrypt=False, stop_test_on_failure=True):
         if not node_list:
@@ -87,6 +85,7 @@ class CassandraStressThread:  # pylint: disable=too-many-instance-attributes
 
         self.executor = None
         self.results_futures = []
+        self.hdr_log_files = []  # local copies of HDR histogram logs of all stress processes
         self.shell_marker = generate_random_string(20)
         #  This marker is used to mark shell commands, in order to be able to kill them later
         self.max_workers = 0
@@ -128,22 +127,48 @@ class CassandraStressThread:  # pylint: disable=too-many-instance-attributes
         return stress_cmd
 
     @staticmethod
-    def _add_errors_option(stress_cmd: str, to_add: list) -> str:
+    def _add_option(stress_cmd: str, option: str, to_add: list) -> str:
         """
-        Add suboption to -errors option, if such suboption is there, does not add or change it
+        Add suboptions to the option (e.g., -errors), if such suboption is there, does not add or change it
         """
         to_add = list(to_add)
-        current_error_option = next((option for option in stress_cmd.split(' -') if option.startswith('errors ')), None)
-        if current_error_option is None:
-            return f"{stress_cmd} -errors {' '.join(to_add)}"
-        current_error_suboptions = current_error_option.split()[1:]
-        new_error_suboptions = \
-            list({suboption.split('=', 1)[0]: suboption for suboption in to_add + current_error_suboptions}.values())
-        if len(new_error_suboptions) == len(current_error_suboptions):
+        current_option = next((opt for opt in stress_cmd.split(' -') if opt.startswith(f'{option} ')), None)
+        if current_option is None:
+            return f"{stress_cmd} -{option} {' '.join(to_add)}"
+        current_suboptions = current_option.split()[1:]
+        new_suboptions = \
+            list({suboption.split('=', 1)[0]: suboption for suboption in to_add + current_suboptions}.values())
+        if len(new_suboptions) == len(current_suboptions):
             return stress_cmd
-        return stress_cmd.replace(current_error_option, 'errors ' + ' '.join(new_error_suboptions))
+        return stress_cmd.replace(current_option, f'{option} ' + ' '.join(new_suboptions))
+
+    @classmethod
+    def _add_errors_option(cls, stress_cmd: str, to_add: list) -> str:
+        return cls._add_option(stress_cmd, 'errors', to_add)
+
+    def _add_hdr_log_option(self, node, stress_cmd: str, log_file_name: str) -> Tuple[str, Optional[str]]:
+        """
+        Make c-s log HDR histograms to a file on the loader, return the command and the path of the file
+        """
+        if match := re.search(r'hdrfile=(\S+)', stress_cmd):
+            return stress_cmd, match.group(1)
+        if 'hdrfile' not in self._get_available_suboptions(node, '-log'):
+            return stress_cmd, None
+        hdr_file_name = os.path.join('/tmp', os.path.splitext(os.path.basename(log_file_name))[0] + '.hdr')
+        return self._add_option(stress_cmd, 'log', [f'hdrfile={hdr_file_name}']), hdr_file_name
+
+    def _receive_hdr_log(self, node, hdr_file_name: str, log_file_name: str) -> None:
+        local_hdr_file_name = os.path.splitext(log_file_name)[0] + '.hdr'
+        try:
+            node.remoter.receive_files(src=hdr_file_name, dst=local_hdr_file_name)
+        except Exception as exc:  # pylint: disable=broad-except
+            LOGGER.warning("Failed to get HDR histogram log %s from %s: %s", hdr_file_name, node, exc)
+            return
+        self.hdr_log_files.append(local_hdr_file_name)
 
     def _get_available_suboptions(self, node, option):
+        if (suboptions := self._available_suboptions.get((node.name, option))) is not None:
+            return suboptions
         try:
             result = node.remoter.run(
                 cmd=f'cassandra-stress help {option} | grep "^Usage:"',
@@ -151,7 +176,9 @@ class CassandraStressThread:  # pylint: disable=too-many-instance-attributes
                 ignore_status=True).stdout
         except Exception:  # pylint: disable=broad-except
             return []
-        return re.findall(r' *\[([\w-]+?)[=?]*] *', result)
+        suboptions = re.findall(r' *\[([\w-]+?)[=?]*] *', result)
+        CassandraStressThread._available_suboptions[(node.name, option)] = suboptions
+        return suboptions
 
     def _run_stress(self, node, loader_idx, cpu_idx, keyspace_idx):  # pylint: disable=too-many-locals
         stress_cmd = self.create_stress_cmd(node, loader_idx, keyspace_idx)
@@ -173,6 +200,8 @@ class CassandraStressThread:  # pylint: disable=too-many-instance-attributes
 
         LOGGER.debug('cassandra-stress local log: %s', log_file_name)
 
+        stress_cmd, hdr_file_name = self._add_hdr_log_option(node, stress_cmd, log_file_name)
+
         # This tag will be output in the header of c-stress result,
         # we parse it to know the loader & cpu info in _parse_cs_summary().
         tag = f'TAG: loader_idx:{loader_idx}-cpu_idx:{cpu_idx}-keyspace_idx:{keyspace_idx}'
@@ -199,6 +228,8 @@ class CassandraStressThread:  # pylint: disable=too-many-instance-attributes
             except Exception as exc:  # pylint: disable=broad-except
                 cs_stress_event.severity = Severity.CRITICAL if self.stop_test_on_failure else Severity.ERROR
                 cs_stress_event.add_error(errors=[format_stress_cmd_error(exc)])
+        if hdr_file_name:
+            self._receive_hdr_log(node, hdr_file_name, log_file_name)
 
         return node, result, cs_stress_event
 
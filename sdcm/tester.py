@@ -28,6 +28,7 @@ import threading
 import signal
 import sys
 import json
+import itertools
 
 import yaml
 from invoke.exceptions import UnexpectedExit, Failure
@@ -56,7 +57,7 @@ from sdcm.cassandra_harry_thread import CassandraHarryThread
 from sdcm.utils.aws_utils import init_monitoring_info_from_params, get_ec2_network_configuration, get_ec2_services, \
     get_common_params, init_db_info_from_params, ec2_ami_get_root_device_name
 from sdcm.utils.common import format_timestamp, wait_ami_available, tag_ami, update_certificates, \
-    download_dir_from_cloud, get_post_behavior_actions, get_testrun_status, download_encrypt_keys, PageFetcher, \
+    download_dir_from_cloud, get_post_behavior_actions, get_testrun_status, download_encrypt_keys, PagedReader, \
     rows_to_list, make_threads_be_daemonic_by_default, ParallelObject, clear_out_all_exit_hooks
 from sdcm.utils.get_username import get_username
 from sdcm.utils.decorators import log_run_info, retrying
@@ -87,7 +88,7 @@ from sdcm.send_email import build_reporter, read_email_data_from_file, get_runni
     save_email_data_to_file
 from sdcm.utils import alternator
 from sdcm.utils.profiler import ProfilerFactory
-from sdcm.remote import RemoteCmdRunnerBase
+from sdcm.remote import RemoteCmdRunnerBase, RemoteLibSSH2CmdRunner
 from sdcm.utils.gce_utils import get_gce_services
 from sdcm.keystore import KeyStore
 from sdcm.utils.latency import calculate_latency
@@ -267,6 +268,7 @@ class ClusterTester(db_stats.TestStatsMixin, unittest.TestCase):  # pylint: disa
         self.test_config.set_tester_obj(self)
         self._init_logging()
         RemoteCmdRunnerBase.set_default_ssh_transport(self.params.get('ssh_transport'))
+        RemoteLibSSH2CmdRunner.set_connection_pool_size(self.params.get('ssh_connection_pool_size'))
 
         self._profile_factory = None
         if self.params.get('enable_test_profiling'):
@@ -1620,8 +1622,17 @@ class ClusterTester(db_stats.TestStatsMixin, unittest.TestCase):  # pylint: disa
         results = queue.get_results()
         if store_results and self.create_stats:
             self.update_stress_results(results)
+            if hdr_log_files := getattr(queue, "hdr_log_files", None):
+                self.update_stress_histograms(hdr_log_files, windows=self.get_nemesis_windows())
         return results
 
+    def get_nemesis_windows(self):
+        """(name, start, end) of all finished nemesis runs."""
+        return [(operation["operation"], operation["start"], operation["end"])
+                for nemesis in getattr(self.db_cluster, "nemesis", [])
+                for operation in nemesis.operation_log
+                if operation["end"] and operation["subtype"] != "skipped"]
+
     def get_stress_results_bench(self, queue):
         results = queue.get_stress_results_bench()
         if self.create_stats:
@@ -2008,20 +2019,32 @@ class ClusterTester(db_stats.TestStatsMixin, unittest.TestCase):  # pylint: disa
                 return True
             return False
 
+    def iter_all_rows(self, session, default_fetch_size, statement, verbose=True):
+        """
+        Yield all rows returned by the statement.
+
+        Next pages are fetched in background while the rows of the current one are consumed, but only
+        a limited number of rows are kept in the memory (see `PagedReader'.)
+        """
+        if verbose:
+            self.log.debug("Iterate over all rows by statement: %s", statement)
+        session.default_fetch_size = default_fetch_size
+        session.default_consistency_level = ConsistencyLevel.QUORUM
+        reader = PagedReader(session.execute_async(statement))
+        yield from reader
+        if verbose:
+            self.log.debug("Fetched %s rows in %s pages", reader.retrieved_rows, reader.retrieved_pages)
+
     @retrying(n=4, sleep_time=5, message='Fetch all rows', raise_on_exceeded=False)
     def fetch_all_rows(self, session, default_fetch_size, statement, verbose=True):
         """
         ******* Caution *******
         All data from table will be read to the memory
         BE SURE that the builder has enough memory and your dataset will be less then 2Gb.
+        Use `iter_all_rows()' if the rows can be processed one by one.
         """
-        if verbose:
-            self.log.debug("Fetch all rows by statement: %s", statement)
-        session.default_fetch_size = default_fetch_size
-        session.default_consistency_level = ConsistencyLevel.QUORUM
-        result = session.execute_async(statement)
-        fetcher = PageFetcher(result).request_all()
-        current_rows = fetcher.all_data()
+        current_rows = list(self.iter_all_rows(session=session, default_fetch_size=default_fetch_size,
+                                               statement=statement, verbose=verbose))
         if verbose and current_rows:
             dataset_size = sum(sys.getsizeof(e) for e in current_rows[0]) * len(current_rows)
             self.log.debug("Size of fetched rows: %s bytes", dataset_size)
@@ -2044,14 +2067,9 @@ class ClusterTester(db_stats.TestStatsMixin, unittest.TestCase):  # pylint: disa
             result = session.execute(statement + ' LIMIT 1')
             columns = result.column_names
 
-            # Fetch all rows from view / table
-            source_table_rows = self.fetch_all_rows(session=session, default_fetch_size=5000, statement=statement)
-            if not source_table_rows:
-                self.log.error("Can't copy data from %s. Fetch all rows failed, see error above", src_table)
-                return False
-
-            # TODO: Temporary function. Will be removed
-            self.log.debug('Rows in the {} MV before saving: {}'.format(src_table, len(source_table_rows)))
+            # Stream rows from view / table: they are inserted while next pages are fetched
+            fetch_size = 5000
+            source_table_rows = self.iter_all_rows(session=session, default_fetch_size=fetch_size, statement=statement)
 
             insert_statement = session.prepare(
                 'insert into {keyspace}.{name} ({columns}) '
@@ -2071,29 +2089,38 @@ class ClusterTester(db_stats.TestStatsMixin, unittest.TestCase):  # pylint: disa
 
             session.default_consistency_level = ConsistencyLevel.QUORUM
 
-            results = execute_concurrent_with_args(session=session, statement=insert_statement,
-                                                   parameters=source_table_rows,
-                                                   concurrency=max_workers, results_generator=True)
-
+            # Rows are taken from the reader by batches in this thread: the driver consumes `parameters' in its
+            # IO thread, which would wait there for a next page that has to be received by the same IO thread.
+            source_rows_count = succeeded_rows = 0
             try:
-                succeeded_rows = sum(1 for (success, result) in results if success)
-                if succeeded_rows != len(source_table_rows):
-                    self.log.warning('Problem during copying data. Not all rows were inserted. '
-                                     'Rows expected to be inserted: %s; '
-                                     'Actually inserted rows: %s.',
-                                     len(source_table_rows), succeeded_rows)
-                    return False
+                while rows := list(itertools.islice(source_table_rows, fetch_size)):
+                    source_rows_count += len(rows)
+                    results = execute_concurrent_with_args(session=session, statement=insert_statement,
+                                                           parameters=rows, concurrency=max_workers,
+                                                           results_generator=True)
+                    succeeded_rows += sum(1 for (success, result) in results if success)
             except Exception as exc:  # pylint: disable=broad-except
                 self.log.warning('Problem during copying data: %s', exc)
                 return False
+            if not source_rows_count:
+                self.log.error("Can't copy data from %s: no rows fetched", src_table)
+                return False
+            # TODO: Temporary function. Will be removed
+            self.log.debug('Rows in the {} MV before saving: {}'.format(src_table, source_rows_count))
+            if succeeded_rows != source_rows_count:
+                self.log.warning('Problem during copying data. Not all rows were inserted. '
+                                 'Rows expected to be inserted: %s; '
+                                 'Actually inserted rows: %s.',
+                                 source_rows_count, succeeded_rows)
+                return False
 
             result = session.execute(f"SELECT count(*) FROM {dest_keyspace}.{dest_table}")
             if result:
-                if result.current_rows[0].count != len(source_table_rows):
+                if result.current_rows[0].count != source_rows_count:
                     self.log.warning('Problem during copying data. '
                                      'Rows in source table: %s; '
                                      'Rows in destination table: %s.',
-                                     len(source_table_rows), len(result.current_rows))
+                                     source_rows_count, result.current_rows[0].count)
                     return False
         self.log.debug('All rows have been copied from %s to %s', src_table, dest_table)
         return True
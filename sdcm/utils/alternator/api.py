@@ -1,16 +1,20 @@
+from __future__ import annotations
+
 import logging
 from concurrent.futures.thread import ThreadPoolExecutor
 from itertools import chain
 from pprint import pformat
-from typing import NamedTuple
+from typing import NamedTuple, TYPE_CHECKING
 
 import boto3
-from mypy_boto3_dynamodb import DynamoDBClient, DynamoDBServiceResource
-from mypy_boto3_dynamodb.service_resource import Table
 
 from sdcm.utils.alternator import schemas, enums, consts
 from sdcm.utils.common import normalize_ipv6_url
 
+if TYPE_CHECKING:
+    from mypy_boto3_dynamodb import DynamoDBClient, DynamoDBServiceResource
+    from mypy_boto3_dynamodb.service_resource import Table
+
 LOGGER = logging.getLogger(__name__)
 
 
@@ -11,16 +11,21 @@
 #
 # Copyright (c) 2021 ScyllaDB
 
+from __future__ import annotations
+
 import logging
 from ipaddress import ip_network
 from functools import cached_property
+from typing import TYPE_CHECKING
 
 import boto3
 import botocore
-from mypy_boto3_ec2 import EC2Client, EC2ServiceResource
 
 from sdcm.keystore import KeyStore
 
+if TYPE_CHECKING:
+    from mypy_boto3_ec2 import EC2Client, EC2ServiceResource
+
 
 LOGGER = logging.getLogger(__name__)
 
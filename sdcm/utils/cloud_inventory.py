@@ -0,0 +1,292 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+#
+# Copyright (c) 2022 ScyllaDB
+
+"""
+Listings of cloud resources with an on-disk cache shared by SCT processes.
+
+AWS resources are listed using paginators of boto3 with all filters applied server-side.  Every listing is stored
+as a JSON file per kind of resources, region and filters, and a caller decides how old listing it can accept:
+cleaning of resources always lists them again, reports and resolution of images accept older ones.  Because the
+entries are per region, a listing of all regions refreshes only regions which have no fresh enough entries.
+"""
+
+from __future__ import annotations
+
+import os
+import json
+import time
+import fcntl
+import hashlib
+import logging
+import datetime
+import tempfile
+import itertools
+from pathlib import Path
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional, TYPE_CHECKING
+
+import boto3
+import jmespath
+from botocore.config import Config
+
+if TYPE_CHECKING:
+    from libcloud.compute.drivers.gce import GCENodeDriver, GCENodeImage
+    from mypy_boto3_ec2 import EC2Client
+    from mypy_boto3_ec2.service_resource import Image as EC2Image
+
+
+__all__ = ("CLOUD_INVENTORY_CACHE_DIR", "IMAGES_MAX_AGE", "AwsInventory", "GceInventory", "InventoryCache",
+           "aws_tag_filters", )
+
+LOGGER = logging.getLogger(__name__)
+
+CLOUD_INVENTORY_CACHE_DIR: Path = \
+    Path(os.environ.get("SCT_CLOUD_INVENTORY_CACHE_DIR", "~/.cache/sct/cloud_inventory")).expanduser()
+IMAGES_MAX_AGE: int = 600  # seconds, images are only added and a new build is found after 10 minutes at most
+REGIONS_MAX_AGE: int = 24 * 60 * 60  # seconds
+AWS_PAGE_SIZE: int = 1000  # maximum for `describe_instances' and `describe_images'
+
+# Adaptive retry mode of botocore backs off when requests are throttled, it replaces random sleeps before the calls
+# which were used to not hit the limits when listing all regions in parallel.
+AWS_CLIENT_CONFIG = Config(retries={"max_attempts": 10, "mode": "adaptive"})
+
+# All states but `terminated'.
+AWS_INSTANCE_STATES = ("pending", "running", "shutting-down", "stopping", "stopped", )
+
+
+def _json_default(obj: Any) -> Any:
+    if isinstance(obj, datetime.datetime):
+        return {"__datetime__": obj.isoformat()}
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _json_object_hook(obj: dict) -> Any:
+    if len(obj) == 1 and "__datetime__" in obj:
+        return datetime.datetime.fromisoformat(obj["__datetime__"])
+    return obj
+
+
+def _is_json_value(value: Any) -> bool:
+    try:
+        json.dumps(value, default=_json_default)
+    except (TypeError, ValueError):
+        return False
+    return True
+
+
+class InventoryCache:
+    """
+    On-disk cache of listings of cloud resources.
+
+    An entry is keyed by kind of resources, region (or GCE project) and listing parameters, and keeps the time of the
+    listing.  Entries are replaced atomically, and a process which refreshes an entry holds a lock on it, so parallel
+    processes (e.g., workers of `sct.py lint-yamls') wait for one listing instead of doing the same one each.
+    """
+
+    def __init__(self, cache_dir: Path = CLOUD_INVENTORY_CACHE_DIR):
+        self.cache_dir = Path(cache_dir)
+        self.stats = {"cached": 0, "fetched": 0}
+
+    def _path(self, kind: str, region: str, params: Any) -> Path:
+        params_key = hashlib.sha1(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()[:16]
+        return self.cache_dir / kind / region / f"{params_key}.json"
+
+    @staticmethod
+    def _read(path: Path) -> Optional[dict]:
+        try:
+            with path.open(encoding="utf-8") as cache_file:
+                return json.load(cache_file, object_hook=_json_object_hook)
+        except (OSError, ValueError):
+            return None
+
+    def get(self, kind: str, region: str, params: Any, max_age: float) -> Optional[list]:
+        if max_age <= 0:
+            return None
+        entry = self._read(self._path(kind, region, params))
+        if entry is None or time.time() - entry["time"] > max_age:
+            return None
+        return entry["items"]
+
+    def put(self, kind: str, region: str, params: Any, items: list, listing_time: Optional[float] = None) -> None:
+        path = self._path(kind, region, params)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile("w", dir=path.parent, suffix=".tmp", delete=False,
+                                             encoding="utf-8") as tmp_file:
+                json.dump({"time": listing_time or time.time(), "items": items}, tmp_file, default=_json_default)
+            os.replace(tmp_file.name, path)
+        except OSError as exc:
+            LOGGER.debug("Unable to cache %s listing for %s: %s", kind, region, exc)
+
+    def invalidate(self, kind: str, region: Optional[str] = None) -> None:
+        path = self.cache_dir / kind
+        if region is not None:
+            path /= region
+        for entry in path.rglob("*.json"):
+            entry.unlink(missing_ok=True)
+
+    @contextmanager
+    def _lock(self, path: Path) -> Iterator[None]:
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            lock_file = path.with_suffix(".lock").open("w", encoding="utf-8")  # pylint: disable=consider-using-with
+        except OSError as exc:
+            LOGGER.debug("Unable to lock %s: %s", path, exc)
+            yield
+            return
+        with lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            yield
+
+    def get_or_fetch(self, kind: str, region: str, params: Any, fetch: Callable[[], list], max_age: float) -> list:
+        """
+        Listing not older than `max_age' seconds from the cache, or the result of `fetch()' which is cached then.
+
+        A process which has to fetch the listing waits if another one fetches it already, and takes its result if
+        it's fresh enough: with `max_age' equal to 0 only a listing which started after the call is taken.
+        """
+
+        if (items := self.get(kind, region, params, max_age)) is not None:
+            self.stats["cached"] += 1
+            return items
+        start_time = time.time()
+        path = self._path(kind, region, params)
+        with self._lock(path):
+            entry = self._read(path)
+            if entry is not None and entry["time"] >= start_time - max_age:
+                self.stats["cached"] += 1
+                return entry["items"]
+            listing_time = time.time()
+            items = fetch()
+            self.stats["fetched"] += 1
+            self.put(kind, region, params, items, listing_time=listing_time)
+        return items
+
+
+def aws_tag_filters(tags_dict: Optional[dict]) -> list[dict]:
+    return [{"Name": f"tag:{key}", "Values": [value]} for key, value in (tags_dict or {}).items()]
+
+
+class AwsInventory:
+    def __init__(self,
+                 cache: Optional[InventoryCache] = None,
+                 client_factory: Optional[Callable[[str], EC2Client]] = None):
+        self.cache = InventoryCache() if cache is None else cache
+        self._client_factory = client_factory or self._default_client_factory
+
+    @staticmethod
+    def _default_client_factory(region: str) -> EC2Client:
+        return boto3.client("ec2", region_name=region, config=AWS_CLIENT_CONFIG)
+
+    def client(self, region: str) -> EC2Client:
+        return self._client_factory(region)
+
+    def _paginate(self, region: str, operation: str, expression: str, **kwargs) -> list:
+        client = self.client(region)
+        if client.can_paginate(operation):
+            pages = client.get_paginator(operation).paginate(**kwargs, PaginationConfig={"PageSize": AWS_PAGE_SIZE})
+        else:  # e.g., `describe_images' in older versions of botocore, all items are returned at once then
+            pages = [getattr(client, operation)(**kwargs)]
+        return list(itertools.chain.from_iterable(jmespath.search(expression, page) or [] for page in pages))
+
+    def list_regions(self, region: str, max_age: float = REGIONS_MAX_AGE) -> list[str]:
+        """Names of all regions enabled for the account, as reported by `region'."""
+
+        return self.cache.get_or_fetch(
+            kind="aws-regions", region=region, params=None, max_age=max_age,
+            fetch=lambda: [item["RegionName"] for item in self.client(region).describe_regions()["Regions"]])
+
+    def list_instances(self,
+                       region: str,
+                       tags_dict: Optional[dict] = None,
+                       running: bool = False,
+                       max_age: float = 0) -> list[dict]:
+        """Instances with all tags from `tags_dict', running ones or all but terminated."""
+
+        filters = aws_tag_filters(tags_dict)
+        filters.append({"Name": "instance-state-name", "Values": ["running"] if running else list(AWS_INSTANCE_STATES)})
+        return self.cache.get_or_fetch(
+            kind="aws-instances", region=region, params=filters, max_age=max_age,
+            fetch=lambda: self._paginate(region, "describe_instances", "Reservations[].Instances[]", Filters=filters))
+
+    def list_elastic_ips(self, region: str, tags_dict: Optional[dict] = None, max_age: float = 0) -> list[dict]:
+        filters = aws_tag_filters(tags_dict)
+        return self.cache.get_or_fetch(
+            kind="aws-elastic-ips", region=region, params=filters, max_age=max_age,
+            fetch=lambda: self.client(region).describe_addresses(Filters=filters)["Addresses"])
+
+    def list_images(self,
+                    region: str,
+                    filters: list[dict],
+                    owners: Optional[list[str]] = None,
+                    max_age: float = IMAGES_MAX_AGE) -> list[dict]:
+        """Descriptions of images sorted from the newest to the oldest."""
+
+        kwargs = {"Filters": filters}
+        if owners:
+            kwargs["Owners"] = owners
+        images = self.cache.get_or_fetch(
+            kind="aws-images", region=region, params=kwargs, max_age=max_age,
+            fetch=lambda: self._paginate(region, "describe_images", "Images[]", **kwargs))
+        return sorted(images, key=lambda image: image["CreationDate"], reverse=True)
+
+    def get_images(self,
+                   region: str,
+                   filters: list[dict],
+                   owners: Optional[list[str]] = None,
+                   max_age: float = IMAGES_MAX_AGE) -> list[EC2Image]:
+        """Same as `list_images()', but as boto3 resources which are loaded with the descriptions already."""
+
+        ec2_resource = boto3.resource("ec2", region_name=region)
+        images = []
+        for description in self.list_images(region=region, filters=filters, owners=owners, max_age=max_age):
+            image = ec2_resource.Image(description["ImageId"])
+            image.meta.data = description
+            images.append(image)
+        return images
+
+    def invalidate(self, kind: str, region: Optional[str] = None) -> None:
+        self.cache.invalidate(kind=f"aws-{kind}", region=region)
+
+
+class GceInventory:
+    def __init__(self, driver_factory: Callable[[], GCENodeDriver], cache: Optional[InventoryCache] = None):
+        self.cache = InventoryCache() if cache is None else cache
+        self._driver_factory = driver_factory
+
+    def list_images(self, project: str, filters: str, max_age: float = IMAGES_MAX_AGE) -> list[GCENodeImage]:
+        """
+        Images which match the server-side filter expression, sorted from the newest to the oldest.
+
+        Only the data of the images is cached, so they are detached from the driver: use `GCENodeDriver.ex_get_image()'
+        to do something with an image.
+        """
+
+        # pylint: disable=import-outside-toplevel; the GCE driver module is big and imported by libcloud on demand
+        from libcloud.compute.drivers.gce import GCENodeDriver, GCENodeImage
+
+        def fetch():
+            driver = self._driver_factory()
+            return [{"id": image.id,
+                     "name": image.name,
+                     "extra": {key: value for key, value in image.extra.items() if _is_json_value(value)}}
+                    for image in itertools.chain.from_iterable(
+                        driver.ex_list(list_fn=driver.list_images, ex_project=project).filter(filters))]
+
+        images = self.cache.get_or_fetch(kind="gce-images", region=project, params=filters, fetch=fetch,
+                                         max_age=max_age)
+        # The driver class is enough for `repr()' of the images.
+        return sorted((GCENodeImage(id=image["id"], name=image["name"], driver=GCENodeDriver, extra=image["extra"])
+                       for image in images),
+                      key=lambda image: image.extra["creationTimestamp"],
+                      reverse=True)
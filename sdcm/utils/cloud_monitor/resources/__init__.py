@@ -2,6 +2,8 @@ from datetime import datetime
 from math import ceil
 
 CLOUD_PROVIDERS = ("aws", "gce")
+# Reports which a housekeeping job sends one after another use the same listings of AWS resources.
+CLOUD_LISTING_MAX_AGE = 30 * 60  # seconds
 
 
 class CloudInstance:  # pylint: disable=too-few-public-methods,too-many-instance-attributes
@@ -2,7 +2,7 @@ from logging import getLogger
 from datetime import datetime
 from boto3 import client as boto3_client
 from sdcm.utils.cloud_monitor.common import InstanceLifecycle, NA
-from sdcm.utils.cloud_monitor.resources import CloudInstance, CloudResources
+from sdcm.utils.cloud_monitor.resources import CLOUD_LISTING_MAX_AGE, CloudInstance, CloudResources
 from sdcm.utils.common import aws_tags_to_dict, gce_meta_to_dict, list_instances_aws, list_instances_gce
 from sdcm.utils.pricing import AWSPricing, GCEPricing
 
@@ -96,7 +96,7 @@ class GCEInstance(CloudInstance):
 class CloudInstances(CloudResources):
 
     def get_aws_instances(self):
-        aws_instances = list_instances_aws(verbose=True)
+        aws_instances = list_instances_aws(verbose=True, max_age=CLOUD_LISTING_MAX_AGE)
         self["aws"] = [AWSInstance(instance) for instance in aws_instances]
         self.all.extend(self["aws"])
 
@@ -1,7 +1,7 @@
 from logging import getLogger
 from libcloud.compute.drivers.gce import GCEAddress
 from sdcm.utils.cloud_monitor.common import NA
-from sdcm.utils.cloud_monitor.resources import CloudResources
+from sdcm.utils.cloud_monitor.resources import CLOUD_LISTING_MAX_AGE, CloudResources
 from sdcm.utils.common import list_elastic_ips_aws, aws_tags_to_dict, list_static_ips_gce
 
 
@@ -62,7 +62,7 @@ class StaticIPs(CloudResources):
 
     def get_aws_elastic_ips(self):
         LOGGER.info("Getting AWS Elastic IPs...")
-        eips_grouped_by_region = list_elastic_ips_aws(group_as_region=True, verbose=True)
+        eips_grouped_by_region = list_elastic_ips_aws(group_as_region=True, verbose=True, max_age=CLOUD_LISTING_MAX_AGE)
         self["aws"] = [AwsElasticIP(eip, region) for region, eips in eips_grouped_by_region.items() for eip in eips]
         # identify user by the owner of the resource
         cloud_instances_by_id = {instance.instance_id: instance for instance in self.cloud_instances["aws"]}
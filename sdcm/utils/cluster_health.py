@@ -0,0 +1,193 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+#
+# Copyright (c) 2022 ScyllaDB
+
+"""
+Cluster-wide health check.
+
+A health check round gathers the view of the cluster (status of nodes, gossip and system.peers) from all nodes
+concurrently into one snapshot, and runs checks from `sdcm.utils.health_checker' against it.  Snapshots are
+cached for a short time, so checks which run at the same time (e.g., by parallel nemesis threads) share one.
+"""
+
+from __future__ import annotations
+
+import time
+import logging
+import itertools
+import threading
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional
+from dataclasses import dataclass, field
+
+from sdcm.sct_events.health import ClusterHealthValidatorEvent
+from sdcm.utils.common import ParallelObject
+from sdcm.utils.health_checker import check_nodes_status, check_node_status_in_gossip_and_nodetool_status, \
+    check_schema_version, check_nulls_in_peers, CHECK_NODE_HEALTH_RETRIES, CHECK_NODE_HEALTH_RETRY_DELAY
+
+if TYPE_CHECKING:
+    # pylint: disable=ungrouped-imports
+    from sdcm.cluster import BaseNode, BaseScyllaCluster
+
+
+CLUSTER_HEALTH_SNAPSHOT_TTL: float = 15  # seconds
+CLUSTER_HEALTH_MAX_WORKERS: int = 32  # nodes queried at the same time
+CLUSTER_HEALTH_GATHER_TIMEOUT: float = 15 * 60  # seconds
+
+LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class NodeHealthView:
+    """The cluster as it's seen by a node."""
+
+    node: BaseNode
+    nodes_status: dict = field(default_factory=dict)
+    peers_info: dict = field(default_factory=dict)
+    gossip_info: dict = field(default_factory=dict)
+
+
+@dataclass
+class ClusterHealthSnapshot:
+    views: Dict[str, NodeHealthView]  # by a node name
+    taken_at: float = field(default_factory=time.perf_counter)
+    duration: float = 0
+
+    @property
+    def age(self) -> float:
+        return time.perf_counter() - self.taken_at
+
+    def has_views_of(self, nodes: Iterable[BaseNode]) -> bool:
+        return all(node.name in self.views for node in nodes)
+
+
+class ClusterHealthEngine:
+    def __init__(self,
+                 cluster: BaseScyllaCluster,
+                 snapshot_ttl: float = CLUSTER_HEALTH_SNAPSHOT_TTL,
+                 max_workers: int = CLUSTER_HEALTH_MAX_WORKERS):
+        self.cluster = cluster
+        self.snapshot_ttl = snapshot_ttl
+        self.max_workers = max_workers
+        self._snapshot: Optional[ClusterHealthSnapshot] = None
+        self._snapshot_lock = threading.Lock()
+
+    @staticmethod
+    def gather_node_view(node: BaseNode) -> NodeHealthView:
+        return NodeHealthView(node=node,
+                              nodes_status=node.get_nodes_status(),
+                              peers_info=node.get_peers_info() or {},
+                              gossip_info=node.get_gossip_info() or {})
+
+    def take_snapshot(self, nodes: Optional[Iterable[BaseNode]] = None) -> ClusterHealthSnapshot:
+        """Gather views of all nodes (or of the given nodes only) concurrently."""
+
+        nodes = list(self.cluster.nodes if nodes is None else nodes)
+        start = time.perf_counter()
+        views = {}
+        if nodes:
+            results = ParallelObject(objects=nodes,
+                                     timeout=CLUSTER_HEALTH_GATHER_TIMEOUT,
+                                     num_workers=min(len(nodes), self.max_workers),
+                                     disable_logging=True).run(self.gather_node_view, ignore_exceptions=True)
+            for result in results:
+                if result.exc is not None:
+                    LOGGER.warning("Unable to get the cluster view of `%s': %r", result.obj.name, result.exc)
+                    views[result.obj.name] = NodeHealthView(node=result.obj)
+                else:
+                    views[result.obj.name] = result.result
+        snapshot = ClusterHealthSnapshot(views=views, taken_at=start, duration=time.perf_counter() - start)
+        LOGGER.debug("Cluster views of %d nodes gathered in %.1fs", len(views), snapshot.duration)
+        return snapshot
+
+    def get_snapshot(self, max_age: Optional[float] = None) -> ClusterHealthSnapshot:
+        """Return a snapshot of all nodes which isn't older than `max_age' seconds (the snapshot TTL by default.)
+
+        If another thread is taking a snapshot at the moment, wait for it and use its result.
+        """
+
+        max_age = self.snapshot_ttl if max_age is None else max_age
+        with self._snapshot_lock:
+            snapshot = self._snapshot
+            if snapshot is None or snapshot.age > max_age or not snapshot.has_views_of(self.cluster.nodes):
+                self._snapshot = snapshot = self.take_snapshot()
+            return snapshot
+
+    def invalidate(self) -> None:
+        with self._snapshot_lock:
+            self._snapshot = None
+
+    def node_health_events(self, view: NodeHealthView) -> Iterator[ClusterHealthValidatorEvent]:
+        return itertools.chain(
+            check_nodes_status(
+                nodes_status=view.nodes_status,
+                current_node=view.node,
+                removed_nodes_list=self.cluster.dead_nodes_ip_address_list),
+            check_node_status_in_gossip_and_nodetool_status(
+                gossip_info=view.gossip_info,
+                nodes_status=view.nodes_status,
+                current_node=view.node),
+            check_schema_version(
+                gossip_info=view.gossip_info,
+                peers_details=view.peers_info,
+                nodes_status=view.nodes_status,
+                current_node=view.node),
+            check_nulls_in_peers(
+                gossip_info=view.gossip_info,
+                peers_details=view.peers_info,
+                current_node=view.node),
+        )
+
+    def check(self,
+              nodes: Optional[Iterable[BaseNode]] = None,
+              retries: int = CHECK_NODE_HEALTH_RETRIES) -> List[BaseNode]:
+        """Check the health of the nodes and publish health validation events of the last attempt.
+
+        Nodes which are found unhealthy are checked again with a new snapshot (only their views are gathered)
+        after `CHECK_NODE_HEALTH_RETRY_DELAY' seconds.  Return nodes which are still unhealthy.
+        """
+
+        pending = list(self.cluster.nodes if nodes is None else nodes)
+        for retry_n in range(1, retries + 1):
+            if not pending:
+                break
+            LOGGER.debug("Check the health of %d nodes [attempt #%d]", len(pending), retry_n)
+            if retry_n == 1 and (snapshot := self._snapshot) is not None \
+                    and snapshot.age <= self.snapshot_ttl and snapshot.has_views_of(pending):
+                LOGGER.debug("Use the cluster snapshot taken %.1fs ago", snapshot.age)
+            elif retry_n == 1 and nodes is None:
+                snapshot = self.get_snapshot()
+            else:
+                snapshot = self.take_snapshot(nodes=pending)
+            unhealthy = []
+            for node in pending:
+                events = self.node_health_events(snapshot.views[node.name])
+                event = next(events, None)
+                if event is None:
+                    LOGGER.debug("Node `%s' is healthy", node.name)
+                    continue
+                unhealthy.append(node)
+                if retry_n == retries:  # publish health validation events on the last retry.
+                    LOGGER.debug("One or more node `%s' health validation has failed", node.name)
+                    event.publish()
+                    for event in events:
+                        event.publish()
+                else:
+                    event.dont_publish()
+            pending = unhealthy
+            if pending and retry_n < retries:
+                LOGGER.debug("Wait for %d secs before next try to validate the health of nodes %s",
+                             CHECK_NODE_HEALTH_RETRY_DELAY, ", ".join(node.name for node in pending))
+                time.sleep(CHECK_NODE_HEALTH_RETRY_DELAY)
+        return pending
+
+
+__all__ = ("ClusterHealthEngine", "ClusterHealthSnapshot", "NodeHealthView", )
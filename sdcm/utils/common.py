@@ -13,9 +13,8 @@
 
 # pylint: disable=too-many-lines
 
-from __future__ import absolute_import
+from __future__ import absolute_import, annotations
 
-import atexit
 import itertools
 import os
 import logging
@@ -25,7 +24,6 @@ import time
 import datetime
 import errno
 import threading
-import select
 import shutil
 import copy
 import string
@@ -37,24 +35,20 @@ import uuid
 import zipfile
 import io
 import tempfile
-from typing import Iterable, List, Callable, Optional, Dict, Union, Literal, Any
+from typing import Iterable, Iterator, List, Callable, Optional, Dict, Union, Literal, Any, TYPE_CHECKING
 from urllib.parse import urlparse
 from unittest.mock import Mock
 from textwrap import dedent
 from contextlib import closing
 from functools import wraps, cached_property, lru_cache
-from collections import defaultdict, namedtuple
+from collections import defaultdict, deque, namedtuple
 import concurrent.futures
-from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
-from concurrent.futures.thread import _python_exit
+from concurrent.futures import TimeoutError as FuturesTimeoutError
 import hashlib
 from pathlib import Path
 import requests
 
 import boto3
-from mypy_boto3_s3 import S3Client, S3ServiceResource
-from mypy_boto3_ec2 import EC2Client, EC2ServiceResource
-from mypy_boto3_ec2.service_resource import Image as EC2Image
 import docker  # pylint: disable=wrong-import-order; false warning because of docker import (local file vs. package)
 import libcloud.storage.providers
 import libcloud.storage.types
@@ -66,21 +60,37 @@ from packaging.version import Version
 
 from sdcm.utils.aws_utils import EksClusterCleanupMixin, AwsArchType
 from sdcm.utils.ssh_agent import SSHAgent
+from sdcm.utils.log_tail import LogTail, FileChangeWatcher
+from sdcm.utils.file_tail_service import get_file_tail_service
+from sdcm.utils.parallel_executor import ParallelBatch, ParallelTask
 from sdcm.utils.decorators import retrying
 from sdcm import wait
 from sdcm.utils.ldap import LDAP_PASSWORD, LDAP_USERS, DEFAULT_PWD_SUFFIX, SASLAUTHD_AUTHENTICATOR
 from sdcm.keystore import KeyStore
 from sdcm.utils.docker_utils import ContainerManager
 from sdcm.utils.gce_utils import GcloudContainerMixin
+from sdcm.utils.cloud_inventory import AwsInventory, GceInventory
 from sdcm.remote import LocalCmdRunner
 from sdcm.remote import RemoteCmdRunnerBase
 
+if TYPE_CHECKING:
+    # Type stubs of boto3 take about 0.5s to import, that's too much for every `sct.py' command.
+    from mypy_boto3_s3 import S3Client, S3ServiceResource
+    from mypy_boto3_ec2 import EC2Client, EC2ServiceResource
+    from mypy_boto3_ec2.service_resource import Image as EC2Image
+
 LOGGER = logging.getLogger('utils')
 DEFAULT_AWS_REGION = "eu-west-1"
 DOCKER_CGROUP_RE = re.compile("/docker/([0-9a-f]+)")
 SCYLLA_AMI_OWNER_ID = "797456418907"
 SCYLLA_GCE_IMAGES_PROJECT = "scylla-images"
 MAX_SPOT_DURATION_TIME = 360
+BRANCHED_IMAGES_MAX_AGE = 60  # seconds, a test can be triggered right after a build of images
+PARALLEL_OBJECT_DEFAULT_NUM_WORKERS = min(32, (os.cpu_count() or 1) + 4)  # same as ThreadPoolExecutor's default
+PARALLEL_OBJECT_SLOWEST_TO_LOG = 5
+PAGED_READER_MAX_BUFFERED_ROWS = 50_000  # don't request next pages if so many rows are not consumed yet
+PAGED_READER_PAGE_TIMEOUT = 60  # seconds
+FILE_FOLLOWER_WAIT_TIMEOUT = 0.5  # seconds, read a followed file at least so often
 
 
 def deprecation(message):
@@ -218,6 +228,14 @@ class S3Storage():
             LOGGER.debug("Unable to upload to S3: %s", details)
             return ""
 
+    def open_multipart_upload(self, file_name: str, dest_dir: str = "", **kwargs) -> "S3MultipartUploadWriter":
+        """Open a file-like object to upload data of unknown size to `dest_dir/file_name' by parts."""
+
+        return S3MultipartUploadWriter(client=self._bucket.meta.client,
+                                       bucket_name=self.bucket_name,
+                                       key=f"{dest_dir}/{file_name}",
+                                       **kwargs)
+
     def set_public_access(self, key):
         acl_obj: S3ServiceResource = boto3.resource('s3').ObjectAcl(self.bucket_name, key)
 
@@ -248,6 +266,99 @@ class S3Storage():
             return ""
 
 
+class S3MultipartUploadWriter(io.RawIOBase):  # pylint: disable=too-many-instance-attributes
+    """Binary file-like object which uploads data written to it as parts of an S3 multipart upload.
+
+    Parts are uploaded in background while next ones are written, up to `concurrency' parts are kept
+    in memory.  The object is created on `close()'; if an error occurs the upload is aborted.
+    """
+
+    min_part_size = 5 * 1024 * 1024  # S3 limit for all parts except the last one
+
+    def __init__(self, client: S3Client, bucket_name: str, key: str,  # pylint: disable=too-many-arguments
+                 part_size: int = S3Storage.multipart_chunksize, concurrency: int = 4,
+                 on_part_uploaded: Optional[Callable[[int, int], None]] = None):
+        super().__init__()
+        self.client = client
+        self.bucket_name = bucket_name
+        self.key = key
+        self.part_size = max(part_size, self.min_part_size)
+        self.concurrency = concurrency
+        self.on_part_uploaded = on_part_uploaded
+        self.bytes_written = 0
+        self.bytes_uploaded = 0
+        self.started = time.perf_counter()
+        self._buffer = bytearray()
+        self._parts: List[concurrent.futures.Future] = []
+        self._uploads = concurrent.futures.ThreadPoolExecutor(max_workers=concurrency,
+                                                              thread_name_prefix="S3MultipartUpload")
+        self.upload_id = client.create_multipart_upload(Bucket=bucket_name, Key=key)["UploadId"]
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        if self.closed:
+            raise ValueError("write to closed file")
+        self._buffer += data
+        self.bytes_written += len(data)
+        while len(self._buffer) >= self.part_size:
+            self._submit_part(bytes(self._buffer[:self.part_size]))
+            del self._buffer[:self.part_size]
+        return len(data)
+
+    def _submit_part(self, data: bytes) -> None:
+        in_flight = [part for part in self._parts if not part.done()]
+        if len(in_flight) >= self.concurrency:
+            concurrent.futures.wait(in_flight, return_when=concurrent.futures.FIRST_COMPLETED)
+        for part in self._parts:
+            if part.done() and (exc := part.exception()) is not None:
+                self.abort()
+                raise exc
+        self._parts.append(self._uploads.submit(self._upload_part, len(self._parts) + 1, data))
+
+    def _upload_part(self, part_number: int, data: bytes) -> dict:
+        response = self.client.upload_part(Bucket=self.bucket_name, Key=self.key, UploadId=self.upload_id,
+                                           PartNumber=part_number, Body=data)
+        self.bytes_uploaded += len(data)
+        if self.on_part_uploaded:
+            self.on_part_uploaded(part_number, len(data))
+        return {"PartNumber": part_number, "ETag": response["ETag"]}
+
+    @property
+    def throughput(self) -> float:
+        """Uploaded bytes per second."""
+
+        return self.bytes_uploaded / max(time.perf_counter() - self.started, 1e-9)
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        try:
+            if self._buffer or not self._parts:
+                self._submit_part(bytes(self._buffer))
+                self._buffer.clear()
+            parts = [part.result() for part in self._parts]
+            self.client.complete_multipart_upload(Bucket=self.bucket_name, Key=self.key, UploadId=self.upload_id,
+                                                  MultipartUpload={"Parts": parts})
+        except BaseException:
+            self.abort()
+            raise
+        finally:
+            self._uploads.shutdown(wait=True)
+            super().close()
+
+    def abort(self) -> None:
+        for part in self._parts:
+            part.cancel()
+        self._uploads.shutdown(wait=True)
+        try:
+            self.client.abort_multipart_upload(Bucket=self.bucket_name, Key=self.key, UploadId=self.upload_id)
+        except Exception as details:  # pylint: disable=broad-except
+            LOGGER.warning("Unable to abort multipart upload of %s: %s", self.key, details)
+        super().close()
+
+
 def get_latest_gemini_version():
     bucket_name = 'downloads.scylladb.com'
 
@@ -318,8 +429,7 @@ def all_aws_regions(cached=False):
             'us-west-2'
         ]
     else:
-        client: EC2Client = boto3.client('ec2', region_name=DEFAULT_AWS_REGION)
-        return [region['RegionName'] for region in client.describe_regions()['Regions']]
+        return AwsInventory().list_regions(region=DEFAULT_AWS_REGION)
 
 
 class ParallelObject:
@@ -328,7 +438,7 @@ class ParallelObject:
     """
 
     def __init__(self, objects: Iterable, timeout: int = 6,  # pylint: disable=redefined-outer-name
-                 num_workers: int = None, disable_logging: bool = False):
+                 num_workers: int = None, disable_logging: bool = False, task_timeout: Optional[float] = None):
         """Constructor for ParallelObject
 
         Build instances of Parallel object. Item of objects is used as parameter for
@@ -342,12 +452,59 @@ class ParallelObject:
         :param timeout: global timeout for running all
         :param num_workers: num of parallel threads, defaults to None
         :param disable_logging: disable logging for running func, defaults to False
+        :param task_timeout: timeout for running func on a single object, defaults to None
         """
         self.objects = objects
         self.timeout = timeout
-        self.num_workers = num_workers
+        self.num_workers = num_workers or PARALLEL_OBJECT_DEFAULT_NUM_WORKERS
         self.disable_logging = disable_logging
-        self._thread_pool = ThreadPoolExecutor(max_workers=self.num_workers)  # pylint: disable=consider-using-with
+        self.task_timeout = task_timeout
+        self._batch: Optional[ParallelBatch] = None
+
+    def _wrap_func(self, func: Callable) -> Callable:
+        if self.disable_logging:
+            return func
+
+        @wraps(func)
+        def inner(*args, **kwargs):
+            thread_name = threading.current_thread().name
+            LOGGER.debug("[%s] %s(%s, %s)", thread_name, func.__name__, args, kwargs)
+            return_val = func(*args, **kwargs)
+            LOGGER.debug("[%s] Done.", thread_name)
+            return return_val
+
+        return inner
+
+    def _run_tasks(self, func: Callable, unpack_objects: bool) -> Iterator[ParallelTask]:
+        if not self.disable_logging:
+            LOGGER.debug("Executing in parallel: '%s' on %s", func.__name__, self.objects)
+        func = self._wrap_func(func)
+        self._batch = batch = ParallelBatch(concurrency=self.num_workers)
+        for obj in self.objects:
+            if unpack_objects and isinstance(obj, (list, tuple)):
+                batch.submit(obj, func, *obj)
+            elif unpack_objects and isinstance(obj, dict):
+                batch.submit(obj, func, **obj)
+            else:
+                batch.submit(obj, func, obj)
+        yield from batch.as_completed(timeout=self.timeout, task_timeout=self.task_timeout)
+
+    def as_completed(self, func: Callable, unpack_objects: bool = False) -> Iterator["ParallelObjectResult"]:
+        """Run callable object "func" in parallel and yield results as they are ready
+
+        Results of runs which are not finished in time have `concurrent.futures.TimeoutError' as exc.
+        Objects which are not started yet are cancelled if the iteration is stopped or `cancel()' is called.
+
+        :param func: Callable object to run in parallel
+        :param unpack_objects: set to True when unpacking of objects to the func as args or kwargs needed
+        """
+        for task in self._run_tasks(func=func, unpack_objects=unpack_objects):
+            yield ParallelObjectResult.from_task(task)
+
+    def cancel(self) -> None:
+        """Cancel runs which are not started yet"""
+        if self._batch is not None:
+            self._batch.cancel()
 
     def run(self, func: Callable, ignore_exceptions=False, unpack_objects: bool = False):
         """Run callable object "func" in parallel
@@ -369,51 +526,13 @@ class ParallelObject:
         :rtype: {List[FutureResult]}
         """
 
-        def func_wrap(fun):
-            @wraps(fun)
-            def inner(*args, **kwargs):
-                thread_name = threading.current_thread().name
-                fun_args = args
-                fun_kwargs = kwargs
-                fun_name = fun.__name__
-                LOGGER.debug("[{thread_name}] {fun_name}({fun_args}, {fun_kwargs})".format(thread_name=thread_name,
-                                                                                           fun_name=fun_name,
-                                                                                           fun_args=fun_args,
-                                                                                           fun_kwargs=fun_kwargs))
-                return_val = fun(*args, **kwargs)
-                LOGGER.debug("[{thread_name}] Done.".format(thread_name=thread_name))
-                return return_val
-
-            return inner
-
-        results = []
-
-        if not self.disable_logging:
-            LOGGER.debug("Executing in parallel: '{}' on {}".format(func.__name__, self.objects))
-            func = func_wrap(func)
-
-        futures = []
+        tasks = sorted(self._run_tasks(func=func, unpack_objects=unpack_objects), key=lambda task: task.index)
+        results = [ParallelObjectResult.from_task(task) for task in tasks]
 
-        for obj in self.objects:
-            if unpack_objects and isinstance(obj, (list, tuple)):
-                futures.append((self._thread_pool.submit(func, *obj), obj))
-            elif unpack_objects and isinstance(obj, dict):
-                futures.append((self._thread_pool.submit(func, **obj), obj))
-            else:
-                futures.append((self._thread_pool.submit(func, obj), obj))
-        time_out = self.timeout
-        for future, target_obj in futures:
-            try:
-                result = future.result(time_out)
-            except FuturesTimeoutError as exception:
-                results.append(ParallelObjectResult(obj=target_obj, exc=exception, result=None))
-                time_out = 0.001  # if there was a timeout on one of the futures there is no need to wait for all
-            except Exception as exception:  # pylint: disable=broad-except
-                results.append(ParallelObjectResult(obj=target_obj, exc=exception, result=None))
-            else:
-                results.append(ParallelObjectResult(obj=target_obj, exc=None, result=result))
-
-        self.clean_up(futures)
+        if not self.disable_logging and len(results) > 1:
+            slowest = sorted((r for r in results if r.duration is not None), key=lambda r: r.duration, reverse=True)
+            LOGGER.debug("Slowest runs of '%s': %s", func.__name__,
+                         ", ".join(f"{r.obj} ({r.duration:.3f}s)" for r in slowest[:PARALLEL_OBJECT_SLOWEST_TO_LOG]))
 
         if ignore_exceptions:
             return results
@@ -446,14 +565,6 @@ class ParallelObject:
         """
         return self.run(lambda x: x())
 
-    def clean_up(self, futures):
-        # if there are futures that didn't run  we cancel them
-        for future, _ in futures:
-            future.cancel()
-        self._thread_pool.shutdown(wait=False)
-        # we need to unregister internal function that waits for all threads to finish when interpreter exits
-        atexit.unregister(_python_exit)
-
 
 class ParallelObjectResult:  # pylint: disable=too-few-public-methods
     """Object for result of future in ParallelObject
@@ -463,10 +574,15 @@ class ParallelObjectResult:  # pylint: disable=too-few-public-methods
     and exception if it happened during run.
     """
 
-    def __init__(self, obj, result=None, exc=None):
+    def __init__(self, obj, result=None, exc=None, duration=None):
         self.obj = obj
         self.result = result
         self.exc = exc
+        self.duration = duration  # seconds, None if the run wasn't started
+
+    @classmethod
+    def from_task(cls, task: ParallelTask) -> "ParallelObjectResult":
+        return cls(obj=task.obj, result=task.result, exc=task.exc, duration=task.duration)
 
 
 class ParallelObjectException(Exception):
@@ -644,7 +760,8 @@ def aws_tags_to_dict(tags_list):
     return tags_dict
 
 
-def list_instances_aws(tags_dict=None, region_name=None, running=False, group_as_region=False, verbose=False):
+def list_instances_aws(tags_dict=None, region_name=None, running=False, group_as_region=False, verbose=False,
+                       max_age=0):
     """
     list all instances with specific tags AWS
 
@@ -653,35 +770,25 @@ def list_instances_aws(tags_dict=None, region_name=None, running=False, group_as
     :param running: get all running instances
     :param group_as_region: if True the results would be grouped into regions
     :param verbose: if True will log progress information
+    :param max_age: use listings of regions from the cloud inventory cache if they are not older than so many seconds
 
     :return: instances dict where region is a key
     """
     instances = {}
     aws_regions = [region_name] if region_name else all_aws_regions()
+    inventory = AwsInventory()
 
     def get_instances(region):
         if verbose:
             LOGGER.info('Going to list aws region "%s"', region)
-        time.sleep(random.random())
-        client: EC2Client = boto3.client('ec2', region_name=region)
-        custom_filter = []
-        if tags_dict:
-            custom_filter = [{'Name': 'tag:{}'.format(key), 'Values': [value]} for key, value in tags_dict.items()]
-        response = client.describe_instances(Filters=custom_filter)
-        instances[region] = [instance for reservation in response['Reservations'] for instance in reservation[
-            'Instances']]
+        instances[region] = inventory.list_instances(
+            region=region, tags_dict=tags_dict, running=running, max_age=max_age)
 
         if verbose:
             LOGGER.info("%s: done [%s/%s]", region, len(list(instances.keys())), len(aws_regions))
 
     ParallelObject(aws_regions, timeout=100).run(get_instances, ignore_exceptions=True)
 
-    for curr_region_name in instances:
-        if running:
-            instances[curr_region_name] = [i for i in instances[curr_region_name] if i['State']['Name'] == 'running']
-        else:
-            instances[curr_region_name] = [i for i in instances[curr_region_name]
-                                           if not i['State']['Name'] == 'terminated']
     if not group_as_region:
         instances = list(itertools.chain(*list(instances.values())))  # flatten the list of lists
         total_items = len(instances)
@@ -717,9 +824,11 @@ def clean_instances_aws(tags_dict, dry_run=False):
             if not dry_run:
                 response = client.terminate_instances(InstanceIds=[instance_id])
                 LOGGER.debug("Done. Result: %s\n", response['TerminatingInstances'])
+        if not dry_run:
+            AwsInventory().invalidate(kind="instances", region=region)
 
 
-def list_elastic_ips_aws(tags_dict=None, region_name=None, group_as_region=False, verbose=False):
+def list_elastic_ips_aws(tags_dict=None, region_name=None, group_as_region=False, verbose=False, max_age=0):
     """
     list all elastic ips with specific tags AWS
 
@@ -727,22 +836,18 @@ def list_elastic_ips_aws(tags_dict=None, region_name=None, group_as_region=False
     :param region_name: name of the region to list
     :param group_as_region: if True the results would be grouped into regions
     :param verbose: if True will log progress information
+    :param max_age: use listings of regions from the cloud inventory cache if they are not older than so many seconds
 
     :return: instances dict where region is a key
     """
     elastic_ips = {}
     aws_regions = [region_name] if region_name else all_aws_regions()
+    inventory = AwsInventory()
 
     def get_elastic_ips(region):
         if verbose:
             LOGGER.info('Going to list aws region "%s"', region)
-        time.sleep(random.random())
-        client: EC2Client = boto3.client('ec2', region_name=region)
-        custom_filter = []
-        if tags_dict:
-            custom_filter = [{'Name': 'tag:{}'.format(key), 'Values': [value]} for key, value in tags_dict.items()]
-        response = client.describe_addresses(Filters=custom_filter)
-        elastic_ips[region] = response['Addresses']
+        elastic_ips[region] = inventory.list_elastic_ips(region=region, tags_dict=tags_dict, max_age=max_age)
         if verbose:
             LOGGER.info("%s: done [%s/%s]", region, len(list(elastic_ips.keys())), len(aws_regions))
 
@@ -783,6 +888,8 @@ def clean_elastic_ips_aws(tags_dict, dry_run=False):
             if not dry_run:
                 response = client.release_address(AllocationId=allocation_id)
                 LOGGER.debug("Done. Result: %s\n", response)
+        if not dry_run:
+            AwsInventory().invalidate(kind="elastic-ips", region=region)
 
 
 def get_gce_driver():
@@ -1077,53 +1184,27 @@ def clean_clusters_eks(tags_dict: dict, dry_run: bool = False) -> None:
     ParallelObject(eks_clusters_to_clean, timeout=180).run(delete_cluster, ignore_exceptions=True)
 
 
-_SCYLLA_AMI_CACHE: dict[str, list[EC2Image]] = defaultdict(list)
-
-
 def get_scylla_ami_versions(region_name: str, arch: AwsArchType = 'x86_64') -> list[EC2Image]:
     """Get the list of all the formal scylla ami from specific region."""
 
-    if _SCYLLA_AMI_CACHE[region_name]:
-        return _SCYLLA_AMI_CACHE[region_name]
-
-    ec2_resource: EC2ServiceResource = boto3.resource('ec2', region_name=region_name)
-    _SCYLLA_AMI_CACHE[region_name] = sorted(
-        ec2_resource.images.filter(
-            Owners=[SCYLLA_AMI_OWNER_ID, ],
-            Filters=[
-                {'Name': 'name', 'Values': ['ScyllaDB *']},
-                {'Name': 'architecture', 'Values': [arch]},
-            ],
-        ),
-        key=lambda x: x.creation_date,
-        reverse=True,
+    return AwsInventory().get_images(
+        region=region_name,
+        owners=[SCYLLA_AMI_OWNER_ID, ],
+        filters=[
+            {'Name': 'name', 'Values': ['ScyllaDB *']},
+            {'Name': 'architecture', 'Values': [arch]},
+        ],
     )
-    return _SCYLLA_AMI_CACHE[region_name]
-
-
-_SCYLLA_GCE_IMAGE_CACHE: list[GCEImage] = []
 
 
 def get_scylla_gce_images_versions(project: str = SCYLLA_GCE_IMAGES_PROJECT) -> list[GCEImage]:
-    if not _SCYLLA_GCE_IMAGE_CACHE:
-        # Server-side resource filtering described in Google SDK reference docs:
-        #   API reference: https://cloud.google.com/compute/docs/reference/rest/v1/images/list
-        #   RE2 syntax: https://github.com/google/re2/blob/master/doc/syntax.txt
-        # or you can see brief explanation here:
-        #   https://github.com/apache/libcloud/blob/trunk/libcloud/compute/drivers/gce.py#L274
-        filters = "(family eq 'scylla(-enterprise)?')(name ne .+-build-.+)"
-        compute_engine = get_gce_driver()
-        _SCYLLA_GCE_IMAGE_CACHE.extend(sorted(
-            itertools.chain.from_iterable(
-                compute_engine.ex_list(
-                    list_fn=compute_engine.list_images,
-                    ex_project=project,
-                ).filter(filters)
-            ),
-            key=lambda x: x.extra["creationTimestamp"],
-            reverse=True,
-        ))
-    return _SCYLLA_GCE_IMAGE_CACHE
+    # Server-side resource filtering described in Google SDK reference docs:
+    #   API reference: https://cloud.google.com/compute/docs/reference/rest/v1/images/list
+    #   RE2 syntax: https://github.com/google/re2/blob/master/doc/syntax.txt
+    # or you can see brief explanation here:
+    #   https://github.com/apache/libcloud/blob/trunk/libcloud/compute/drivers/gce.py#L274
+    filters = "(family eq 'scylla(-enterprise)?')(name ne .+-build-.+)"
+    return GceInventory(driver_factory=get_gce_driver).list_images(project=project, filters=filters)
 
 
 _S3_SCYLLA_REPOS_CACHE = defaultdict(dict)
@@ -1209,25 +1290,28 @@ class FileFollowerIterator():  # pylint: disable=too-few-public-methods
         self.thread_obj = thread_obj
 
     def __iter__(self):
-        with open(self.filename, encoding="utf-8") as input_file:
-            line = ''
+        with LogTail(self.filename) as tail, FileChangeWatcher(self.filename) as watcher:
             while not self.thread_obj.stopped():
-                poller = select.poll()  # pylint: disable=no-member
-                poller.register(input_file, select.POLLIN)  # pylint: disable=no-member
-                if poller.poll(100):
-                    line += input_file.readline()
-                if not line or not line.endswith('\n'):
-                    time.sleep(0.1)
-                    continue
-                poller.unregister(input_file)
+                for _, line in tail.read_lines():
+                    yield line
+                watcher.wait(timeout=FILE_FOLLOWER_WAIT_TIMEOUT)
+            for _, line in tail.read_to_end():
                 yield line
-                line = ''
-            yield line
 
 
 class FileFollowerThread():
+    """Follow a log file and handle its lines.
+
+    If a subclass defines `followed_file', lines of that file are passed to `handle_line()' by the tail service
+    shared by all followers (no thread is started per follower), and the rest of the file is handled on `stop()'.
+    Otherwise, `run()' is executed in a dedicated thread and can use `follow_file()' to iterate over lines.
+    """
+
+    followed_file: Optional[str] = None
+
     def __init__(self):
-        self.executor = concurrent.futures.ThreadPoolExecutor(1)  # pylint: disable=consider-using-with
+        self._executor = None
+        self._subscription = None
         self._stop_event = threading.Event()
         self.future = None
 
@@ -1238,15 +1322,30 @@ class FileFollowerThread():
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.stop()
 
+    @property
+    def executor(self):
+        if self._executor is None:
+            self._executor = concurrent.futures.ThreadPoolExecutor(1)  # pylint: disable=consider-using-with
+        return self._executor
+
     def run(self):
         raise NotImplementedError()
 
+    def handle_line(self, line_number: int, line: str) -> None:
+        raise NotImplementedError()
+
     def start(self):
-        self.future = self.executor.submit(self.run)
+        if self.followed_file is None:
+            self.future = self.executor.submit(self.run)
+        else:
+            self._subscription = get_file_tail_service().subscribe(self.followed_file, self.handle_line)
+            self.future = self._subscription.future
         return self.future
 
     def stop(self):
         self._stop_event.set()
+        if self._subscription is not None:
+            self._subscription.stop()
 
     def stopped(self):
         return self._stop_event.is_set()
@@ -1386,12 +1485,7 @@ def get_branched_ami(scylla_version: str, region_name: str, arch: AwsArchType =
         filters.append({'Name': 'tag:build-id', 'Values': [build_id, ], })
 
     LOGGER.info("Looking for AMIs match [%s]", scylla_version)
-    ec2_resource: EC2ServiceResource = boto3.resource("ec2", region_name=region_name)
-    images = sorted(
-        ec2_resource.images.filter(Filters=filters),
-        key=lambda x: x.creation_date,
-        reverse=True,
-    )
+    images = AwsInventory().get_images(region=region_name, filters=filters, max_age=BRANCHED_IMAGES_MAX_AGE)
     images = [image for image in images if not image.name.startswith('debug-image')]
 
     assert images, f"AMIs for {scylla_version=} with {arch} architecture not found in {region_name}"
@@ -1415,17 +1509,8 @@ def get_branched_gce_images(scylla_version: str, project: str = SCYLLA_GCE_IMAGE
         filters += f"(name eq .+-build-{build_id})"  # use BUILD_ID from an image name for now
 
     LOGGER.info("Looking for GCE images match [%s]", scylla_version)
-    compute_engine = get_gce_driver()
-    images = sorted(
-        itertools.chain.from_iterable(
-            compute_engine.ex_list(
-                list_fn=compute_engine.list_images,
-                ex_project=project,
-            ).filter(filters)
-        ),
-        key=lambda x: x.extra["creationTimestamp"],
-        reverse=True,
-    )
+    images = GceInventory(driver_factory=get_gce_driver).list_images(
+        project=project, filters=filters, max_age=BRANCHED_IMAGES_MAX_AGE)
 
     assert images, f"GCE images for {scylla_version=} not found"
     if build_id == "all":
@@ -1931,6 +2016,7 @@ class PageFetcher:
 
     def __init__(self, future):
         self.pages = []
+        self._page_received = threading.Condition()
 
         # the first page is automagically returned (eventually)
         # so we'll count this as a request, but the retrieved count
@@ -1951,21 +2037,21 @@ class PageFetcher:
         self.wait(seconds=30)
 
     def handle_page(self, rows):
-        # occasionally get a final blank page that is useless
-        if rows == []:
-            self.retrieved_empty_pages += 1
-            return
-
-        page = Page()
-        self.pages.append(page)
-
-        for row in rows:
-            page.add_row(row)
-
-        self.retrieved_pages += 1
+        with self._page_received:
+            # occasionally get a final blank page that is useless
+            if rows == []:
+                self.retrieved_empty_pages += 1
+            else:
+                page = Page()
+                page.data = rows
+                self.pages.append(page)
+                self.retrieved_pages += 1
+            self._page_received.notify_all()
 
     def handle_error(self, exc):
-        self.error = exc
+        with self._page_received:
+            self.error = exc
+            self._page_received.notify_all()
         raise exc
 
     def request_one(self):
@@ -2012,16 +2098,13 @@ class PageFetcher:
             assert pages >= 0, error_message('Retrieved too many pages')
             return pages
 
-        missing = missing_pages()
-        if missing <= 0:
-            return self
-        expiry = time.time() + seconds * missing
-
-        while time.time() < expiry:
-            if missing_pages() <= 0:
+        with self._page_received:
+            missing = missing_pages()
+            if missing <= 0:
+                return self
+            if self._page_received.wait_for(lambda: missing_pages() <= 0 or self.error is not None,
+                                            timeout=seconds * missing) and self.error is None:
                 return self
-            # small wait so we don't need excess cpu to keep checking
-            time.sleep(0.1)
 
         raise RuntimeError(error_message('Requested pages were not delivered before timeout'))
 
@@ -2056,11 +2139,7 @@ class PageFetcher:
 
         The page(s) should have already been requested with request_one and/or request_all.
         """
-        all_pages_combined = []
-        for page in self.pages:
-            all_pages_combined.extend(page.data[:])
-
-        return all_pages_combined
+        return list(itertools.chain.from_iterable(page.data for page in self.pages))
 
     @property  # make property to match python driver api
     def has_more_pages(self):
@@ -2070,6 +2149,74 @@ class PageFetcher:
         return self.future.has_more_pages
 
 
+class PagedReader:
+    """
+    Iterate over rows of a paged query result (a future returned by `session.execute_async()') as pages arrive.
+
+    Pages are received using the driver callbacks.  The next page is requested as soon as the previous one
+    arrives (i.e., while it's being consumed) until `max_buffered_rows' rows are waiting for the consumer,
+    so memory usage doesn't depend on the result size.
+    """
+
+    def __init__(self, future, max_buffered_rows: int = PAGED_READER_MAX_BUFFERED_ROWS,
+                 page_timeout: float = PAGED_READER_PAGE_TIMEOUT):
+        self.future = future
+        self.max_buffered_rows = max_buffered_rows
+        self.page_timeout = page_timeout
+        self.retrieved_pages = 0
+        self.retrieved_rows = 0
+        self._pages = deque()
+        self._buffered_rows = 0
+        self._fetching = True  # the first page is requested by `execute_async()'
+        self._finished = False
+        self._error = None
+        self._page_received = threading.Condition()
+        future.add_callbacks(callback=self._handle_page, errback=self._handle_error)
+
+    def _handle_page(self, rows) -> None:
+        with self._page_received:
+            self._fetching = False
+            if rows:  # occasionally get a final blank page
+                self._pages.append(rows)
+                self._buffered_rows += len(rows)
+                self.retrieved_pages += 1
+                self.retrieved_rows += len(rows)
+            self._finished = not self.future.has_more_pages
+            fetch_next_page = self._should_fetch_next_page()
+            self._page_received.notify_all()
+        if fetch_next_page:
+            self.future.start_fetching_next_page()
+
+    def _handle_error(self, exc) -> None:
+        with self._page_received:
+            self._fetching = False
+            self._error = exc
+            self._page_received.notify_all()
+
+    def _should_fetch_next_page(self) -> bool:
+        if self._fetching or self._finished or self._error is not None or self._buffered_rows >= self.max_buffered_rows:
+            return False
+        self._fetching = True
+        return True
+
+    def __iter__(self) -> Iterator:
+        while True:
+            with self._page_received:
+                if not self._page_received.wait_for(
+                        lambda: self._pages or self._finished or self._error is not None, timeout=self.page_timeout):
+                    raise TimeoutError(f"Page #{self.retrieved_pages + 1} was not delivered in {self.page_timeout}s")
+                if self._error is not None:
+                    raise self._error
+                if not self._pages:
+                    return
+                page = self._pages.popleft()
+                self._buffered_rows -= len(page)
+                fetch_next_page = self._should_fetch_next_page()
+            if fetch_next_page:
+                self.future.start_fetching_next_page()
+            yield from page
+
+
 def get_docker_stress_image_name(tool_name=None):
     if not tool_name:
         return None
@@ -13,10 +13,13 @@
 
 # Data validation module may be used with cassandra-stress user profile only
 #
-# **************** Caution **************************************************************
-# BE AWARE: During data validation all materialized views/expected table rows will be read into the memory
-#           Be sure your dataset will be less then 2Gb.
-# ****************************************************************************************
+# Rows are streamed page by page and compared chunk by chunk, so memory usage doesn't depend on the dataset size:
+#   - a view and its expected data table with same partition key are read in token order and merge-compared
+#     partition by partition;
+#   - otherwise (e.g., rows of 2 views which should be found in a table with another partition key) rows are
+#     compared using order independent fingerprints split to buckets by a key hash, and only keys of mismatched
+#     buckets are read again to report them.
+# The token ring can be split to ranges which are validated in parallel (see `validation_workers' parameter.)
 #
 # Here is described Data validation module and requirements for user profile.
 # Please, read the explanation and requirements
@@ -133,15 +136,197 @@
 #
 
 import re
+import hashlib
 import logging
-from sdcm.sct_events import Severity
+import itertools
+from typing import Callable, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple, TypeVar
+from functools import reduce
+from dataclasses import dataclass, field
+from collections import Counter
+
+from cassandra import ConsistencyLevel
+from cassandra.query import SimpleStatement  # pylint: disable=no-name-in-module
 
-from sdcm.utils.common import get_profile_content
+from sdcm.sct_events import Severity
+from sdcm.utils.common import get_profile_content, ParallelObject, PagedReader
+from sdcm.utils.decorators import retrying
 from sdcm.sct_events.health import DataValidatorEvent
 
 
 LOGGER = logging.getLogger(__name__)
 
+TOKEN_RING_MIN = -2 ** 63
+TOKEN_RING_MAX = 2 ** 63 - 1
+HASH_MASK = 2 ** 64 - 1
+
+TokenRange = Tuple[int, int]  # inclusive bounds
+TokenRow = Tuple[int, tuple, tuple]  # token, primary key, row
+T = TypeVar("T")  # pylint: disable=invalid-name
+
+
+def split_token_ring(parts: int) -> List[TokenRange]:
+    """Split the token ring to `parts' inclusive ranges of the same size."""
+
+    step = (TOKEN_RING_MAX - TOKEN_RING_MIN + 1) // parts
+    bounds = [TOKEN_RING_MIN + step * i for i in range(parts)] + [TOKEN_RING_MAX + 1]
+    return [(start, end - 1) for start, end in zip(bounds, bounds[1:])]
+
+
+class TableKeys(NamedTuple):
+    partition_key: List[str]
+    primary_key: List[str]
+    columns: List[str]
+
+
+def get_table_keys(session, keyspace: str, table: str) -> TableKeys:
+    """Get names of partition key and primary key columns of a table or a view."""
+
+    columns = list(session.execute("SELECT column_name, kind, position FROM system_schema.columns "
+                                   "WHERE keyspace_name=%s AND table_name=%s", (keyspace, table, )))
+    partition_key = [column.column_name for column in sorted(columns, key=lambda column: column.position)
+                     if column.kind == "partition_key"]
+    clustering_key = [column.column_name for column in sorted(columns, key=lambda column: column.position)
+                      if column.kind == "clustering"]
+    return TableKeys(partition_key=partition_key,
+                     primary_key=partition_key + clustering_key,
+                     columns=sorted(column.column_name for column in columns))
+
+
+def iter_token_range(session,  # pylint: disable=too-many-arguments
+                     keyspace: str,
+                     table: str,
+                     partition_key: Sequence[str],
+                     columns: Sequence[str] = (),
+                     key_columns: Sequence[str] = (),
+                     token_range: TokenRange = (TOKEN_RING_MIN, TOKEN_RING_MAX),
+                     fetch_size: int = 5000) -> Iterator[TokenRow]:
+    """Yield rows of a token range of a table in token order.
+
+    Rows are fetched by pages of `fetch_size' rows, next pages are fetched in background while the current
+    one is consumed (see `PagedReader'.)  The primary key of each row is built from `key_columns' (the whole
+    row is used as the key if they are not given.)
+    """
+
+    token = f"token({', '.join(partition_key)})"
+    statement = SimpleStatement(f"SELECT {token}, {', '.join(columns) or '*'} FROM {keyspace}.{table} "
+                                f"WHERE {token} >= {token_range[0]} AND {token} <= {token_range[1]}",
+                                fetch_size=fetch_size,
+                                consistency_level=ConsistencyLevel.QUORUM)
+    key_indexes = [list(columns).index(name) for name in key_columns]
+    for row in PagedReader(session.execute_async(statement)):
+        values = tuple(row[1:])
+        yield row[0], tuple(values[i] for i in key_indexes) if key_indexes else values, values
+
+
+class RowMismatch(NamedTuple):
+    key: tuple
+    actual: Optional[tuple]
+    expected: Optional[tuple]
+
+
+@dataclass
+class RowsComparison:
+    max_mismatches: int
+    actual_rows: int = 0
+    expected_rows: int = 0
+    mismatched_rows: int = 0
+    mismatches: List[RowMismatch] = field(default_factory=list)
+    table_rows: Counter = field(default_factory=Counter)
+
+    def add_mismatch(self, mismatch: RowMismatch) -> None:
+        self.mismatched_rows += 1
+        if len(self.mismatches) < self.max_mismatches:
+            self.mismatches.append(mismatch)
+
+    def compare_partition(self, actual: List[TokenRow], expected: List[TokenRow]) -> None:
+        self.actual_rows += len(actual)
+        self.expected_rows += len(expected)
+        if actual == expected:
+            return
+        actual_rows = {key: row for _, key, row in actual}
+        expected_rows = {key: row for _, key, row in expected}
+        for key in itertools.chain(actual_rows, (key for key in expected_rows if key not in actual_rows)):
+            if (actual_row := actual_rows.get(key)) != (expected_row := expected_rows.get(key)):
+                self.add_mismatch(RowMismatch(key=key, actual=actual_row, expected=expected_row))
+
+    def update(self, other: "RowsComparison") -> "RowsComparison":
+        self.actual_rows += other.actual_rows
+        self.expected_rows += other.expected_rows
+        for mismatch in other.mismatches:
+            self.add_mismatch(mismatch)
+        self.mismatched_rows += other.mismatched_rows - len(other.mismatches)
+        return self
+
+    def format_mismatches(self) -> str:
+        return "; ".join(f"key={mismatch.key}: actual={mismatch.actual}, expected={mismatch.expected}"
+                         for mismatch in self.mismatches)
+
+
+def _partitions(rows: Iterable[TokenRow]) -> Iterator[Tuple[int, List[TokenRow]]]:
+    for token, partition in itertools.groupby(rows, key=lambda row: row[0]):
+        yield token, list(partition)
+
+
+def compare_rows_in_token_order(actual: Iterable[TokenRow],
+                                expected: Iterable[TokenRow],
+                                max_mismatches: int) -> RowsComparison:
+    """Merge-compare two streams of rows ordered by token.
+
+    Only rows of one token (i.e., one partition) of each stream are kept in the memory at the same time.
+    """
+
+    comparison = RowsComparison(max_mismatches=max_mismatches)
+    actual, expected = _partitions(actual), _partitions(expected)
+    actual_partition, expected_partition = next(actual, None), next(expected, None)
+    while actual_partition or expected_partition:
+        if expected_partition is None or actual_partition is not None and actual_partition[0] < expected_partition[0]:
+            comparison.compare_partition(actual_partition[1], [])
+            actual_partition = next(actual, None)
+        elif actual_partition is None or expected_partition[0] < actual_partition[0]:
+            comparison.compare_partition([], expected_partition[1])
+            expected_partition = next(expected, None)
+        else:
+            comparison.compare_partition(actual_partition[1], expected_partition[1])
+            actual_partition, expected_partition = next(actual, None), next(expected, None)
+    return comparison
+
+
+def key_digest(key: tuple) -> int:
+    """64-bit digest of the key which is the same in all processes, unlike `hash()' of strings and bytes."""
+
+    return int.from_bytes(hashlib.blake2b(repr(key).encode(), digest_size=8).digest(), "little")
+
+
+class KeysFingerprint:
+    """Order independent fingerprint of a multiset of keys split to buckets by a digest of the key."""
+
+    def __init__(self, buckets: int):
+        self.counts = [0] * buckets
+        self.hashes = [0] * buckets
+
+    def bucket(self, key: tuple) -> int:
+        return key_digest(key) % len(self.counts)
+
+    def add(self, key: tuple) -> None:
+        key_hash = key_digest(key)
+        bucket = key_hash % len(self.counts)
+        self.counts[bucket] += 1
+        self.hashes[bucket] = (self.hashes[bucket] + key_hash) & HASH_MASK
+
+    def update(self, other: "KeysFingerprint") -> "KeysFingerprint":
+        self.counts = [count + other_count for count, other_count in zip(self.counts, other.counts)]
+        self.hashes = [(value + other_value) & HASH_MASK for value, other_value in zip(self.hashes, other.hashes)]
+        return self
+
+    @property
+    def rows(self) -> int:
+        return sum(self.counts)
+
+    def mismatched_buckets(self, other: "KeysFingerprint") -> List[int]:
+        return [bucket for bucket, (count, other_count, value, other_value)
+                in enumerate(zip(self.counts, other.counts, self.hashes, other.hashes))
+                if count != other_count or value != other_value]
+
 
 # pylint: disable=too-many-instance-attributes
 class LongevityDataValidator:
@@ -150,9 +335,12 @@ class LongevityDataValidator:
     SUBSTRING_NOT_UPDATED = '_not_updated'
     SUBSTRING_DELETION = '_deletions'
     DEFAULT_FETCH_SIZE = 5000
+    MAX_REPORTED_MISMATCHES = 10
+    FINGERPRINT_BUCKETS = 65536
+    TOKEN_RANGES_PER_WORKER = 4
 
     def __init__(self, longevity_self_object, user_profile_name, base_table_partition_keys,
-                 stress_cmds_part='prepare_write_cmd'):
+                 stress_cmds_part='prepare_write_cmd', validation_workers=1):
         """
 
         :param longevity_self_object: "self" object of longevity test that inherited from ClusterTester
@@ -160,11 +348,13 @@ class LongevityDataValidator:
         :param stress_cmds_part: name of stress part from test yaml
         :param base_table_partition_keys: used for test of updated rows. List of all primary keys of base table
                                           For example: ['domain', 'published_date']
+        :param validation_workers: number of threads used to validate token ranges in parallel
         """
         self.longevity_self_object = longevity_self_object
         self.user_profile_name = user_profile_name
         self.stress_cmds_part = stress_cmds_part
         self.base_table_partition_keys = base_table_partition_keys
+        self.validation_workers = validation_workers
 
         self._validate_not_updated_data = True
         self._validate_updated_data = True
@@ -367,6 +557,109 @@ class LongevityDataValidator:
                     ).publish()
                 self._validate_updated_per_view.append(True)
 
+    def _run_on_token_ranges(self, func: Callable[[TokenRange], T]) -> List[T]:
+        if self.validation_workers <= 1:
+            return [func((TOKEN_RING_MIN, TOKEN_RING_MAX))]
+        token_ranges = split_token_ring(self.validation_workers * self.TOKEN_RANGES_PER_WORKER)
+        results = ParallelObject(token_ranges, timeout=None, num_workers=self.validation_workers,
+                                 disable_logging=True).run(func)
+        return [result.result for result in results]
+
+    def count_rows(self, session, table: str) -> int:
+        partition_key = get_table_keys(session, self.keyspace_name, table).partition_key
+
+        @retrying(n=4, sleep_time=5, message=f"Count rows of {table}")
+        def count_range(token_range: TokenRange) -> int:
+            return sum(1 for _ in iter_token_range(session=session, keyspace=self.keyspace_name, table=table,
+                                                   partition_key=partition_key, columns=partition_key,
+                                                   token_range=token_range, fetch_size=self.DEFAULT_FETCH_SIZE))
+
+        return sum(self._run_on_token_ranges(count_range))
+
+    def compare_tables(self, session, actual_table: str, expected_table: str, verbose: bool = True) -> RowsComparison:
+        """
+        Compare all rows of two tables (views) with same structure.
+
+        Rows are merge-compared in token order if both tables have same partition key, otherwise fingerprints
+        of rows are compared.
+        """
+        actual_keys = get_table_keys(session, self.keyspace_name, actual_table)
+        expected_keys = get_table_keys(session, self.keyspace_name, expected_table)
+        if actual_keys.partition_key != expected_keys.partition_key:
+            if verbose:
+                LOGGER.debug("Partition keys of %s and %s are different, compare fingerprints of rows",
+                             actual_table, expected_table)
+            return self.compare_keys(session=session, actual_tables=[actual_table], expected_tables=[expected_table],
+                                     columns=actual_keys.columns, verbose=verbose)
+        if verbose:
+            LOGGER.debug("Compare rows of %s and %s in token order", actual_table, expected_table)
+
+        @retrying(n=4, sleep_time=5, message=f"Compare rows of {actual_table} and {expected_table}")
+        def compare_range(token_range: TokenRange) -> RowsComparison:
+            tables_rows = [iter_token_range(session=session, keyspace=self.keyspace_name, table=table,
+                                            partition_key=actual_keys.partition_key, columns=actual_keys.columns,
+                                            key_columns=actual_keys.primary_key, token_range=token_range,
+                                            fetch_size=self.DEFAULT_FETCH_SIZE)
+                           for table in (actual_table, expected_table)]
+            return compare_rows_in_token_order(*tables_rows, max_mismatches=self.MAX_REPORTED_MISMATCHES)
+
+        return reduce(RowsComparison.update, self._run_on_token_ranges(compare_range))
+
+    def compare_keys(self,  # pylint: disable=too-many-arguments
+                     session, actual_tables: List[str], expected_tables: List[str], columns: List[str],
+                     verbose: bool = True) -> RowsComparison:
+        """
+        Compare multisets of `columns' values of all rows of `actual_tables' and of `expected_tables'.
+
+        Order independent fingerprints split to buckets are compared first and, if there are mismatched buckets,
+        keys from some of them are read again to report them.
+        """
+        partition_keys = {table: get_table_keys(session, self.keyspace_name, table).partition_key
+                          for table in {*actual_tables, *expected_tables}}
+
+        def iter_keys(table: str, token_range: TokenRange) -> Iterator[tuple]:
+            for _, key, _ in iter_token_range(session=session, keyspace=self.keyspace_name, table=table,
+                                              partition_key=partition_keys[table], columns=columns,
+                                              token_range=token_range, fetch_size=self.DEFAULT_FETCH_SIZE):
+                yield key
+
+        @retrying(n=4, sleep_time=5, message=f"Fingerprint rows of {actual_tables} and {expected_tables}")
+        def fingerprint_range(token_range: TokenRange) -> Tuple[KeysFingerprint, KeysFingerprint, Counter]:
+            fingerprints = KeysFingerprint(self.FINGERPRINT_BUCKETS), KeysFingerprint(self.FINGERPRINT_BUCKETS)
+            table_rows = Counter()
+            for fingerprint, tables in zip(fingerprints, (actual_tables, expected_tables)):
+                for table in tables:
+                    for key in iter_keys(table, token_range):
+                        fingerprint.add(key)
+                        table_rows[table] += 1
+            return fingerprints + (table_rows, )
+
+        actual, expected, table_rows = reduce(
+            lambda result, other: (result[0].update(other[0]), result[1].update(other[1]), result[2] + other[2]),
+            self._run_on_token_ranges(fingerprint_range))
+        comparison = RowsComparison(max_mismatches=self.MAX_REPORTED_MISMATCHES,
+                                    actual_rows=actual.rows, expected_rows=expected.rows, table_rows=table_rows)
+        if not (mismatched_buckets := actual.mismatched_buckets(expected)):
+            return comparison
+        if verbose:
+            LOGGER.debug("%s mismatched fingerprint buckets, read keys from first %s of them",
+                         len(mismatched_buckets), self.MAX_REPORTED_MISMATCHES)
+        buckets = set(mismatched_buckets[:self.MAX_REPORTED_MISMATCHES])
+
+        @retrying(n=4, sleep_time=5, message=f"Find mismatched keys of {actual_tables} and {expected_tables}")
+        def collect_keys(token_range: TokenRange) -> Tuple[Counter, Counter]:
+            return tuple(Counter(key for table in tables for key in iter_keys(table, token_range)
+                                 if actual.bucket(key) in buckets)
+                         for tables in (actual_tables, expected_tables))
+
+        actual_keys, expected_keys = reduce(lambda result, other: (result[0] + other[0], result[1] + other[1]),
+                                            self._run_on_token_ranges(collect_keys))
+        for key in sorted((actual_keys - expected_keys) + (expected_keys - actual_keys), key=repr):
+            comparison.add_mismatch(RowMismatch(key=key,
+                                                actual=key if actual_keys[key] > expected_keys[key] else None,
+                                                expected=key if expected_keys[key] > actual_keys[key] else None))
+        return comparison
+
     def save_count_rows_for_deletion(self):
         if not self.view_name_for_deletion_data:
             DataValidatorEvent.DataValidator(
@@ -378,14 +671,15 @@ class LongevityDataValidator:
             return
 
         LOGGER.debug('Get rows count in %s MV before stress', self.view_name_for_deletion_data)
-        pk_name = self.base_table_partition_keys[0]
         with self.longevity_self_object.db_cluster.cql_connection_patient(
                 self.longevity_self_object.db_cluster.nodes[0], keyspace=self.keyspace_name) as session:
-            rows_before_deletion = self.longevity_self_object.fetch_all_rows(
-                session=session, default_fetch_size=self.DEFAULT_FETCH_SIZE,
-                statement=f"SELECT {pk_name} FROM {self.view_name_for_deletion_data}")
+            try:
+                rows_before_deletion = self.count_rows(session=session, table=self.view_name_for_deletion_data)
+            except Exception as exc:  # pylint: disable=broad-except
+                LOGGER.error("Failed to count rows in %s: %s", self.view_name_for_deletion_data, exc)
+                return
             if rows_before_deletion:
-                self.rows_before_deletion = len(rows_before_deletion)
+                self.rows_before_deletion = rows_before_deletion
                 LOGGER.debug("%s rows for deletion", self.rows_before_deletion)
 
     def validate_range_not_expected_to_change(self, session, during_nemesis=False):
@@ -407,11 +701,21 @@ class LongevityDataValidator:
         if not during_nemesis:
             LOGGER.debug('Verify immutable rows')
 
-        actual_result = self.longevity_self_object.fetch_all_rows(
-            session=session, default_fetch_size=self.DEFAULT_FETCH_SIZE,
-            statement=f"SELECT * FROM {self.view_name_for_not_updated_data}",
-            verbose=not during_nemesis)
-        if not actual_result:
+        try:
+            comparison = self.compare_tables(session=session,
+                                             actual_table=self.view_name_for_not_updated_data,
+                                             expected_table=self.expected_data_table_name,
+                                             verbose=not during_nemesis)
+        except Exception as exc:  # pylint: disable=broad-except
+            DataValidatorEvent.ImmutableRowsValidator(
+                severity=Severity.WARNING,
+                message=f"Can't validate immutable rows. "
+                        f"Fetch rows from {self.view_name_for_not_updated_data} and {self.expected_data_table_name} "
+                        f"failed: {exc}"
+            ).publish()
+            return
+
+        if not comparison.actual_rows:
             DataValidatorEvent.ImmutableRowsValidator(
                 severity=Severity.WARNING,
                 message=f"Can't validate immutable rows. "
@@ -420,11 +724,7 @@ class LongevityDataValidator:
             ).publish()
             return
 
-        expected_result = self.longevity_self_object.fetch_all_rows(
-            session=session, default_fetch_size=self.DEFAULT_FETCH_SIZE,
-            statement=f"SELECT * FROM {self.expected_data_table_name}",
-            verbose=not during_nemesis)
-        if not expected_result:
+        if not comparison.expected_rows:
             DataValidatorEvent.ImmutableRowsValidator(
                 severity=Severity.WARNING,
                 message=f"Can't validate immutable rows. Fetch all rows from {self.expected_data_table_name} failed. "
@@ -434,21 +734,22 @@ class LongevityDataValidator:
 
         # Issue https://github.com/scylladb/scylla/issues/6181
         # Not fail the test if unexpected additional rows where found in actual result table
-        if len(actual_result) > len(expected_result):
+        if comparison.actual_rows > comparison.expected_rows:
             DataValidatorEvent.ImmutableRowsValidator(
                 severity=Severity.WARNING,
-                message=f"Actual dataset length more then expected ({len(actual_result)} > {len(expected_result)}). "
-                        f"Issue #6181"
+                message=f"Actual dataset length more then expected "
+                        f"({comparison.actual_rows} > {comparison.expected_rows}). Issue #6181"
             ).publish()
         else:
             if not during_nemesis:
-                assert len(actual_result) == len(expected_result), \
+                assert comparison.actual_rows == comparison.expected_rows, \
                     'One or more rows are not as expected, suspected LWT wrong update. ' \
-                    'Actual dataset length: {}, Expected dataset length: {}'.format(len(actual_result),
-                                                                                    len(expected_result))
+                    'Actual dataset length: {}, Expected dataset length: {}'.format(comparison.actual_rows,
+                                                                                    comparison.expected_rows)
 
-                assert actual_result == expected_result, \
-                    'One or more rows are not as expected, suspected LWT wrong update'
+                assert not comparison.mismatched_rows, \
+                    'One or more rows are not as expected, suspected LWT wrong update. ' \
+                    f'{comparison.mismatched_rows} mismatched rows, first of them: {comparison.format_mismatches()}'
 
                 # Raise info event at the end of the test only.
                 DataValidatorEvent.ImmutableRowsValidator(
@@ -456,17 +757,18 @@ class LongevityDataValidator:
                     message="Validation immutable rows finished successfully"
                 ).publish()
             else:
-                if len(actual_result) < len(expected_result):
+                if comparison.actual_rows < comparison.expected_rows:
                     DataValidatorEvent.ImmutableRowsValidator(
                         severity=Severity.ERROR,
                         error=f"Verify immutable rows. "
                               f"One or more rows not found as expected, suspected LWT wrong update. "
-                              f"Actual dataset length: {len(actual_result)}, "
-                              f"Expected dataset length: {len(expected_result)}"
+                              f"Actual dataset length: {comparison.actual_rows}, "
+                              f"Expected dataset length: {comparison.expected_rows}. "
+                              f"First mismatched rows: {comparison.format_mismatches()}"
                     ).publish()
                 else:
                     LOGGER.debug('Verify immutable rows. Actual dataset length: %s, Expected dataset length: %s',
-                                 len(actual_result), len(expected_result))
+                                 comparison.actual_rows, comparison.expected_rows)
 
     def validate_range_expected_to_change(self, session, during_nemesis=False):
         """
@@ -492,8 +794,6 @@ class LongevityDataValidator:
         if not during_nemesis:
             LOGGER.debug('Verify updated rows')
 
-        partition_keys = ', '.join(self.base_table_partition_keys)
-
         # List of tuples of correlated  view names for validation: before update, after update, expected data
         views_list = list(zip(self.view_names_for_updated_data,
                               self.view_names_after_updated_data,
@@ -515,63 +815,51 @@ class LongevityDataValidator:
                 ).publish()
                 return
 
-            before_update_rows = self.longevity_self_object.fetch_all_rows(
-                session=session, default_fetch_size=self.DEFAULT_FETCH_SIZE,
-                statement=f"SELECT {partition_keys} FROM {views_set[0]}",
-                verbose=not during_nemesis)
-            if not before_update_rows:
-                DataValidatorEvent.UpdatedRowsValidator(
-                    severity=Severity.WARNING,
-                    message=f"Can't validate updated rows. Fetch all rows from {views_set[0]} failed. "
-                            f"See error above in the sct.log"
-                ).publish()
-                return
-
-            after_update_rows = self.longevity_self_object.fetch_all_rows(
-                session=session, default_fetch_size=self.DEFAULT_FETCH_SIZE,
-                statement=f"SELECT {partition_keys} FROM {views_set[1]}",
-                verbose=not during_nemesis)
-            if not after_update_rows:
+            try:
+                comparison = self.compare_keys(session=session,
+                                               actual_tables=[views_set[0], views_set[1]],
+                                               expected_tables=[views_set[2]],
+                                               columns=self.base_table_partition_keys,
+                                               verbose=not during_nemesis)
+            except Exception as exc:  # pylint: disable=broad-except
                 DataValidatorEvent.UpdatedRowsValidator(
                     severity=Severity.WARNING,
-                    message=f"Can't validate updated rows. Fetch all rows from {views_set[1]} failed. "
-                            f"See error above in the sct.log"
+                    message=f"Can't validate updated rows. Fetch rows from {views_set[0]}, {views_set[1]} and "
+                            f"{views_set[2]} failed: {exc}"
                 ).publish()
                 return
 
-            expected_rows = self.longevity_self_object.fetch_all_rows(
-                session=session, default_fetch_size=self.DEFAULT_FETCH_SIZE,
-                statement=f"SELECT {partition_keys} FROM {views_set[2]}",
-                verbose=not during_nemesis)
-            if not expected_rows:
-                DataValidatorEvent.UpdatedRowsValidator(
-                    severity=Severity.WARNING,
-                    message=f"Can't validate updated row. Fetch all rows from {views_set[2]} failed. "
-                            f"See error above in the sct.log"
-                ).publish()
-                return
+            for view_name, message_prefix in ((views_set[0], "Can't validate updated rows."),
+                                              (views_set[1], "Can't validate updated rows."),
+                                              (views_set[2], "Can't validate updated row."), ):
+                if not comparison.table_rows[view_name]:
+                    DataValidatorEvent.UpdatedRowsValidator(
+                        severity=Severity.WARNING,
+                        message=f"{message_prefix} Fetch all rows from {view_name} failed. "
+                                f"See error above in the sct.log"
+                    ).publish()
+                    return
 
             # Issue https://github.com/scylladb/scylla/issues/6181
             # Not fail the test if unexpected additional rows where found in actual result table
-            if len(before_update_rows) + len(after_update_rows) > len(expected_rows):
+            if comparison.actual_rows > comparison.expected_rows:
                 DataValidatorEvent.UpdatedRowsValidator(
                     severity=Severity.WARNING,
                     message=f"View {views_set[0]}. "
-                            f"Actual dataset length {len(before_update_rows) + len(after_update_rows)} "
-                            f"more then expected dataset length: {len(expected_rows)}. "
+                            f"Actual dataset length {comparison.actual_rows} "
+                            f"more then expected dataset length: {comparison.expected_rows}. "
                             f"Issue #6181"
                 ).publish()
             else:
-                actual_data = sorted(before_update_rows+after_update_rows)
-                expected_data = sorted(expected_rows)
                 if not during_nemesis:
-                    assert actual_data == expected_data,\
-                        'One or more rows are not as expected, suspected LWT wrong update'
+                    assert not comparison.mismatched_rows, \
+                        'One or more rows are not as expected, suspected LWT wrong update. ' \
+                        f'First mismatched keys: {comparison.format_mismatches()}'
 
-                    assert len(before_update_rows) + len(after_update_rows) == len(expected_rows), \
+                    assert comparison.actual_rows == comparison.expected_rows, \
                         'One or more rows are not as expected, suspected LWT wrong update. '\
-                        f'Actual dataset length: {len(before_update_rows) + len(after_update_rows)}, ' \
-                        f'Expected dataset length: {len(expected_rows)}'
+                        f'Actual dataset length: {comparison.actual_rows}, ' \
+                        f'Expected dataset length: {comparison.expected_rows}'
 
                     # raise info event in the end of test only
                     DataValidatorEvent.UpdatedRowsValidator(
@@ -581,7 +869,7 @@ class LongevityDataValidator:
                 else:
                     LOGGER.debug('Validation updated rows.  View %s. Actual dataset length %s, '
                                  'Expected dataset length: %s.',
-                                 views_set[0], len(before_update_rows) + len(after_update_rows), len(expected_rows))
+                                 views_set[0], comparison.actual_rows, comparison.expected_rows)
 
     def validate_deleted_rows(self, session, during_nemesis=False):
         """
@@ -597,13 +885,14 @@ class LongevityDataValidator:
             LOGGER.debug('Verify deleted rows can\'t be performed as expected rows count had not been saved')
             return
 
-        pk_name = self.base_table_partition_keys[0]
         if not during_nemesis:
             LOGGER.debug('Verify deleted rows')
 
-        actual_result = self.longevity_self_object.fetch_all_rows(session=session, default_fetch_size=self.DEFAULT_FETCH_SIZE,
-                                                                  statement=f"SELECT {pk_name} FROM {self.view_name_for_deletion_data}",
-                                                                  verbose=not during_nemesis)
+        try:
+            actual_result = self.count_rows(session=session, table=self.view_name_for_deletion_data)
+        except Exception as exc:  # pylint: disable=broad-except
+            LOGGER.error("Failed to count rows in %s: %s", self.view_name_for_deletion_data, exc)
+            actual_result = 0
         if not actual_result:
             DataValidatorEvent.DeletedRowsValidator(
                 severity=Severity.ERROR,
@@ -612,7 +901,7 @@ class LongevityDataValidator:
             ).publish()
             return
 
-        if len(actual_result) < self.rows_before_deletion:
+        if actual_result < self.rows_before_deletion:
             if not during_nemesis:
                 # raise info event in the end of test only
                 DataValidatorEvent.DeletedRowsValidator(
@@ -623,5 +912,5 @@ class LongevityDataValidator:
                 LOGGER.debug('Validation deleted rows finished successfully')
         else:
             LOGGER.warning('Deleted row were not found. May be issue #6181. '
-                           'Actual dataset length: {}, Expected dataset length: {}'.format(len(actual_result),
+                           'Actual dataset length: {}, Expected dataset length: {}'.format(actual_result,
                                                                                            self.rows_before_deletion))
@@ -61,7 +61,18 @@ class DockerClient(docker.DockerClient):
         return res
 
 
-_docker = DockerClient.from_env(timeout=DOCKER_API_CALL_TIMEOUT)  # pylint: disable=invalid-name
+@cache
+def get_default_docker_client() -> DockerClient:
+    return DockerClient.from_env(timeout=DOCKER_API_CALL_TIMEOUT)
+
+
+class _DefaultDockerClient:
+    """Connect to Docker daemon on first use only, not on import: most of `sct.py' commands don't need it."""
+
+    # pylint: disable=too-few-public-methods
+
+    def __get__(self, instance, owner) -> DockerClient:
+        return get_default_docker_client()
 
 
 class _Name(SimpleNamespace):
@@ -138,7 +149,7 @@ class ContainerManager:  # pylint: disable=too-many-public-methods)
     # pylint: disable=protected-access
 
     keep_alive_suffix = "---KEEPALIVE"
-    default_docker_client = _docker
+    default_docker_client = _DefaultDockerClient()
 
     @classmethod
     def get_docker_client(cls, instance: object, name: Optional[str] = None) -> DockerClient:
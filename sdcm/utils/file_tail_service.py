@@ -0,0 +1,226 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+#
+# Copyright (c) 2022 ScyllaDB
+
+"""
+Follow many growing files with one thread.
+
+`FileTailService' multiplexes all followed files over one inotify file descriptor (or polls them if inotify
+is not available), reads new data in large chunks with `LogTail' and dispatches complete lines to handlers
+registered with `subscribe()'.  Use `get_file_tail_service()' to get the service shared by the process.
+"""
+
+from __future__ import annotations
+
+import os
+import select
+import logging
+import threading
+from typing import Callable, Dict, List, Optional
+from concurrent.futures import Future, TimeoutError as FuturesTimeoutError
+
+from sdcm.utils.log_tail import LogTail, Inotify, FILE_CHANGE_POLL_INTERVAL, IN_IGNORED, IN_Q_OVERFLOW
+
+
+FILE_TAIL_RESCAN_INTERVAL: float = 1  # seconds, read all files even if there were no inotify events
+FILE_TAIL_STOP_TIMEOUT: float = 10  # seconds, how long to wait for reading of the rest of a file on unsubscribe
+
+LineHandler = Callable[[int, str], None]  # (line number, line)
+
+LOGGER = logging.getLogger(__name__)
+
+
+class TailSubscription:
+    """A file followed by `FileTailService'.
+
+    `future' is resolved when the rest of the file is dispatched after `stop()'.
+    """
+
+    def __init__(self, service: FileTailService, path: str, handler: LineHandler):
+        self.service = service
+        self.path = os.path.abspath(path)
+        self.handler = handler
+        self.tail = LogTail(self.path)
+        self.future = Future()
+        self.future.set_running_or_notify_cancel()
+        self.stopping = threading.Event()
+        self._name = os.fsencode(os.path.basename(self.path))
+
+    @property
+    def dirname(self) -> str:
+        return os.path.dirname(self.path)
+
+    def matches(self, name: bytes) -> bool:
+        return name.startswith(self._name)  # the file itself or its rotated copies
+
+    def dispatch(self, final: bool = False) -> None:
+        lines = self.tail.read_to_end() if final else self.tail.read_lines()
+        for line_number, line in lines:
+            try:
+                self.handler(line_number, line)
+            except Exception:  # pylint: disable=broad-except
+                LOGGER.exception("Failed to handle line #%d of %s", line_number, self.path)
+
+    def stop(self, timeout: Optional[float] = FILE_TAIL_STOP_TIMEOUT) -> None:
+        """Dispatch the rest of the file (including an incomplete last line) and unsubscribe.
+
+        Wait up to `timeout' seconds for it, don't wait if `timeout' is None.
+        """
+
+        self.service.unsubscribe(self)
+        if timeout is not None and threading.current_thread() is not self.service.thread:
+            try:
+                self.future.result(timeout=timeout)
+            except FuturesTimeoutError:
+                LOGGER.warning("%s is still being read after %ss", self.path, timeout)
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} {self.path}>"
+
+
+class FileTailService:
+    """Follow files and dispatch their new lines to handlers, all in one thread.
+
+    The thread is started by the first subscription and exits when there are no subscriptions left.
+    """
+
+    def __init__(self, rescan_interval: float = FILE_TAIL_RESCAN_INTERVAL,
+                 poll_interval: float = FILE_CHANGE_POLL_INTERVAL):
+        self.rescan_interval = rescan_interval
+        self.poll_interval = poll_interval
+        self.thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._subscriptions: List[TailSubscription] = []
+        self._wakeup_read_fd, self._wakeup_write_fd = os.pipe()
+        os.set_blocking(self._wakeup_read_fd, False)
+        try:
+            self._inotify: Optional[Inotify] = Inotify()
+        except OSError as exc:
+            LOGGER.debug("%s, poll followed files every %ss", exc, poll_interval)
+            self._inotify = None
+        self._watches: Dict[str, int] = {}  # watch descriptors by a directory
+
+    @property
+    def uses_inotify(self) -> bool:
+        return self._inotify is not None
+
+    @property
+    def subscriptions(self) -> List[TailSubscription]:
+        with self._lock:
+            return list(self._subscriptions)
+
+    def subscribe(self, path: str, handler: LineHandler) -> TailSubscription:
+        """Call `handler(line_number, line)' for every complete line of the file, starting from its beginning.
+
+        The file doesn't need to exist at the time of the call.
+        """
+
+        subscription = TailSubscription(service=self, path=path, handler=handler)
+        with self._lock:
+            self._subscriptions.append(subscription)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name=self.__class__.__name__, daemon=True)
+                self.thread.start()
+        self._wakeup()
+        return subscription
+
+    def unsubscribe(self, subscription: TailSubscription) -> None:
+        subscription.stopping.set()
+        self._wakeup()
+
+    def _wakeup(self) -> None:
+        os.write(self._wakeup_write_fd, b"\0")
+
+    def _update_watches(self, subscriptions: List[TailSubscription]) -> None:
+        if self._inotify is None:
+            return
+        dirnames = {subscription.dirname for subscription in subscriptions}
+        for dirname in dirnames - self._watches.keys():
+            try:
+                self._watches[dirname] = self._inotify.add_watch(dirname)
+            except OSError as exc:  # e.g., the directory is not created yet; rely on rescans.
+                LOGGER.debug("%s", exc)
+        for dirname in self._watches.keys() - dirnames:
+            self._inotify.remove_watch(self._watches.pop(dirname))
+
+    def _wait(self, timeout: float) -> Optional[List[TailSubscription]]:
+        """Wait for changes and return subscriptions with changed files, or None if all of them should be read."""
+
+        inotify = [] if self._inotify is None else [self._inotify]
+        ready, _, _ = select.select([self._wakeup_read_fd] + inotify, [], [], timeout)
+        woken_up = self._wakeup_read_fd in ready
+        if woken_up:
+            while True:
+                try:
+                    if not os.read(self._wakeup_read_fd, 4096):
+                        break
+                except BlockingIOError:
+                    break
+        if self._inotify is None or self._inotify not in ready:
+            return None
+        events = self._inotify.read_events()
+        if woken_up:  # subscriptions were changed
+            return None
+        dirnames = {watch_descriptor: dirname for dirname, watch_descriptor in self._watches.items()}
+        changed = set()
+        for watch_descriptor, mask, name in events:
+            if mask & IN_Q_OVERFLOW:
+                return None
+            dirname = dirnames.get(watch_descriptor)
+            if mask & IN_IGNORED:  # the directory was removed
+                self._watches.pop(dirname, None)
+                continue
+            changed.add((dirname, name))
+        return [subscription for subscription in self.subscriptions
+                if any(dirname == subscription.dirname and subscription.matches(name) for dirname, name in changed)]
+
+    def _run(self) -> None:
+        timeout = self.rescan_interval if self._inotify is not None else self.poll_interval
+        changed = None
+        while True:
+            with self._lock:
+                subscriptions = list(self._subscriptions)
+                if not subscriptions:
+                    self.thread = None
+                    return
+            self._update_watches(subscriptions)
+            for subscription in subscriptions if changed is None else changed:
+                subscription.dispatch()
+            for subscription in subscriptions:
+                if subscription.stopping.is_set():
+                    self._finish(subscription)
+            changed = self._wait(timeout) if self.subscriptions else None
+
+    def _finish(self, subscription: TailSubscription) -> None:
+        try:
+            subscription.dispatch(final=True)
+        finally:
+            subscription.tail.close()
+            with self._lock:
+                self._subscriptions.remove(subscription)
+            subscription.future.set_result(None)
+
+
+_FILE_TAIL_SERVICE: Optional[FileTailService] = None
+_FILE_TAIL_SERVICE_LOCK = threading.Lock()
+
+
+def get_file_tail_service() -> FileTailService:
+    global _FILE_TAIL_SERVICE  # pylint: disable=global-statement
+
+    with _FILE_TAIL_SERVICE_LOCK:
+        if _FILE_TAIL_SERVICE is None:
+            _FILE_TAIL_SERVICE = FileTailService()
+        return _FILE_TAIL_SERVICE
+
+
+__all__ = ("FileTailService", "TailSubscription", "get_file_tail_service", )
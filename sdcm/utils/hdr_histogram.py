@@ -0,0 +1,421 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+#
+# Copyright (c) 2022 ScyllaDB
+
+"""
+HDR histograms of latencies logged by stress tools.
+
+`HdrHistogram' has the same bucket layout as HdrHistogram (https://hdrhistogram.github.io/HdrHistogram/), so
+histograms logged by cassandra-stress (`-log hdrfile=...') can be decoded, merged across loaders and stress
+processes, and encoded back into the compact V2 compressed format.  Counts are kept in a NumPy array.
+"""
+
+from __future__ import annotations
+
+import math
+import zlib
+import base64
+import struct
+import logging
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from dataclasses import dataclass
+
+import numpy as np
+
+
+HDR_VALUE_UNIT_RATIO: float = 1_000_000  # values logged by cassandra-stress are in ns, report them in ms
+HDR_SUMMARY_PERCENTILES: Tuple[float, ...] = (50, 90, 95, 99, 99.9, 99.99)
+
+V2_ENCODING_COOKIE = 0x1c849303
+V2_COMPRESSED_ENCODING_COOKIE = 0x1c849304
+ENCODING_HEADER = struct.Struct(">iiiiqqd")  # cookie, payload length, normalizing index offset, significant figures,
+# lowest discernible value, highest trackable value, integer to double value conversion ratio
+COMPRESSED_HEADER = struct.Struct(">ii")  # cookie, length of compressed contents
+
+LOGGER = logging.getLogger(__name__)
+
+
+class HdrHistogramError(ValueError):
+    pass
+
+
+def bit_length(values: np.ndarray) -> np.ndarray:
+    """Vectorized int.bit_length() of non-negative int64 values."""
+
+    values = values.astype(np.int64)
+    result = np.zeros(values.shape, dtype=np.int64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        big = values >= (1 << shift)
+        result[big] += shift
+        values = np.where(big, values >> shift, values)
+    return result + (values > 0)
+
+
+def zigzag_leb128_encode(values: np.ndarray) -> bytes:
+    encoded = bytearray()
+    for value in values.tolist():
+        value = ((value << 1) ^ (value >> 63)) & 0xFFFFFFFFFFFFFFFF
+        for _ in range(8):
+            if value < 0x80:
+                break
+            encoded.append(value & 0x7f | 0x80)
+            value >>= 7
+        encoded.append(value)
+    return bytes(encoded)
+
+
+def zigzag_leb128_decode(data: bytes) -> np.ndarray:
+    """Decode ZigZag LEB128 (up to 9 bytes per value, the last one has all 8 bits) encoded int64 values."""
+
+    array = np.frombuffer(data, dtype=np.uint8)
+    if not array.size:
+        return np.zeros(0, dtype=np.int64)
+    ends = np.flatnonzero(array < 0x80)
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    if not ends.size or ends[-1] != array.size - 1 or np.max(ends - starts) >= 8:
+        return zigzag_leb128_decode_slow(data)  # a truncated payload or 9-byte values
+    positions = np.arange(array.size) - np.repeat(starts, ends - starts + 1)
+    parts = (array & 0x7f).astype(np.uint64) << (7 * positions).astype(np.uint64)
+    values = np.add.reduceat(parts, starts)
+    return (values >> np.uint64(1)).astype(np.int64) ^ -(values & np.uint64(1)).astype(np.int64)
+
+
+def zigzag_leb128_decode_slow(data: bytes) -> np.ndarray:
+    values = []
+    index = 0
+    while index < len(data):
+        value = shift = 0
+        for position in range(9):
+            if index >= len(data):
+                raise HdrHistogramError("Truncated histogram payload")
+            byte = data[index]
+            index += 1
+            if position == 8:
+                value |= byte << 56
+                break
+            value |= (byte & 0x7f) << shift
+            shift += 7
+            if byte < 0x80:
+                break
+        values.append((value >> 1) ^ -(value & 1))
+    return np.array(values, dtype=np.int64)
+
+
+class HdrHistogram:  # pylint: disable=too-many-instance-attributes
+    """Histogram of integer values with a fixed relative precision, see HdrHistogram's AbstractHistogram."""
+
+    def __init__(self, lowest_discernible_value: int = 1, highest_trackable_value: int = 2,
+                 significant_figures: int = 3):
+        if lowest_discernible_value < 1:
+            raise HdrHistogramError("Lowest discernible value must be >= 1")
+        if not 0 <= significant_figures <= 5:
+            raise HdrHistogramError("Number of significant figures must be between 0 and 5")
+        self.lowest_discernible_value = lowest_discernible_value
+        self.significant_figures = significant_figures
+        self.unit_magnitude = int(math.floor(math.log2(lowest_discernible_value)))
+        self.sub_bucket_count_magnitude = int(math.ceil(math.log2(2 * 10 ** significant_figures)))
+        self.sub_bucket_half_count_magnitude = max(self.sub_bucket_count_magnitude, 1) - 1
+        self.sub_bucket_count = 1 << self.sub_bucket_count_magnitude
+        self.sub_bucket_half_count = self.sub_bucket_count // 2
+        self.sub_bucket_mask = (self.sub_bucket_count - 1) << self.unit_magnitude
+        self.highest_trackable_value = 0
+        self.counts = np.zeros(0, dtype=np.int64)
+        self._resize(max(highest_trackable_value, 2 * lowest_discernible_value))
+
+    @property
+    def layout(self) -> Tuple[int, int]:
+        return self.lowest_discernible_value, self.significant_figures
+
+    def _resize(self, highest_trackable_value: int) -> None:
+        smallest_untrackable_value = self.sub_bucket_count << self.unit_magnitude
+        buckets_needed = 1
+        while smallest_untrackable_value <= highest_trackable_value:
+            if smallest_untrackable_value > (1 << 62):
+                buckets_needed += 1
+                break
+            smallest_untrackable_value <<= 1
+            buckets_needed += 1
+        length = (buckets_needed + 1) * self.sub_bucket_half_count
+        if length > len(self.counts):
+            self.counts = np.concatenate((self.counts, np.zeros(length - len(self.counts), dtype=np.int64)))
+        self.highest_trackable_value = max(self.highest_trackable_value, highest_trackable_value)
+
+    def _bucket_indexes(self, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        values = np.asarray(values, dtype=np.int64)
+        bucket_indexes = \
+            bit_length(values | self.sub_bucket_mask) - self.unit_magnitude - self.sub_bucket_count_magnitude
+        return bucket_indexes, values >> (bucket_indexes + self.unit_magnitude)
+
+    def counts_index_of(self, values: np.ndarray) -> np.ndarray:
+        bucket_indexes, sub_bucket_indexes = self._bucket_indexes(values)
+        return ((bucket_indexes + 1) << self.sub_bucket_half_count_magnitude) + \
+            sub_bucket_indexes - self.sub_bucket_half_count
+
+    def value_from_index(self, indexes: np.ndarray) -> np.ndarray:
+        indexes = np.asarray(indexes, dtype=np.int64)
+        bucket_indexes = (indexes >> self.sub_bucket_half_count_magnitude) - 1
+        sub_bucket_indexes = (indexes & (self.sub_bucket_half_count - 1)) + self.sub_bucket_half_count
+        first_bucket = bucket_indexes < 0
+        sub_bucket_indexes = np.where(first_bucket, sub_bucket_indexes - self.sub_bucket_half_count, sub_bucket_indexes)
+        bucket_indexes = np.where(first_bucket, 0, bucket_indexes)
+        return sub_bucket_indexes << (bucket_indexes + self.unit_magnitude)
+
+    def _equivalent_range(self, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Lowest equivalent values and sizes of equivalent value ranges."""
+
+        bucket_indexes, sub_bucket_indexes = self._bucket_indexes(values)
+        adjusted_buckets = np.where(sub_bucket_indexes >= self.sub_bucket_count, bucket_indexes + 1, bucket_indexes)
+        return sub_bucket_indexes << (bucket_indexes + self.unit_magnitude), \
+            np.int64(1) << (adjusted_buckets + self.unit_magnitude)
+
+    def lowest_equivalent_value(self, values: np.ndarray) -> np.ndarray:
+        return self._equivalent_range(values)[0]
+
+    def highest_equivalent_value(self, values: np.ndarray) -> np.ndarray:
+        lowest, size = self._equivalent_range(values)
+        return lowest + size - 1
+
+    def median_equivalent_value(self, values: np.ndarray) -> np.ndarray:
+        lowest, size = self._equivalent_range(values)
+        return lowest + (size >> 1)
+
+    def record_values(self, values: Sequence[int], counts: Sequence[int] | int = 1) -> HdrHistogram:
+        values = np.asarray(values, dtype=np.int64)
+        if not values.size:
+            return self
+        if values.min() < 0:
+            raise HdrHistogramError("Histogram values must be non-negative")
+        if (max_value := int(values.max())) > self.highest_trackable_value:
+            self._resize(max_value)
+        np.add.at(self.counts, self.counts_index_of(values), np.broadcast_to(np.asarray(counts, dtype=np.int64),
+                                                                             values.shape))
+        return self
+
+    def add(self, other: HdrHistogram) -> HdrHistogram:
+        """Add counts of the other histogram to this one."""
+
+        if other.layout == self.layout:
+            if other.highest_trackable_value > self.highest_trackable_value:
+                self._resize(other.highest_trackable_value)
+            self.counts[:len(other.counts)] += other.counts
+        else:
+            indexes = np.flatnonzero(other.counts)
+            self.record_values(other.median_equivalent_value(other.value_from_index(indexes)), other.counts[indexes])
+        return self
+
+    @property
+    def total_count(self) -> int:
+        return int(self.counts.sum())
+
+    def _recorded(self) -> Tuple[np.ndarray, np.ndarray]:
+        indexes = np.flatnonzero(self.counts)
+        return self.value_from_index(indexes), self.counts[indexes]
+
+    @property
+    def min(self) -> int:
+        values, _ = self._recorded()
+        if not values.size or values[0] == 0:
+            return 0
+        return int(self.lowest_equivalent_value(values[:1])[0])
+
+    @property
+    def max(self) -> int:
+        values, _ = self._recorded()
+        if not values.size or values[-1] == 0:
+            return 0
+        return int(self.highest_equivalent_value(values[-1:])[0])
+
+    @property
+    def mean(self) -> float:
+        values, counts = self._recorded()
+        if not values.size:
+            return 0.0
+        return float(np.dot(self.median_equivalent_value(values).astype(np.float64), counts) / counts.sum())
+
+    @property
+    def stdev(self) -> float:
+        values, counts = self._recorded()
+        if not values.size:
+            return 0.0
+        deviations = self.median_equivalent_value(values).astype(np.float64) - self.mean
+        return float(math.sqrt(np.dot(deviations ** 2, counts) / counts.sum()))
+
+    def get_values_at_percentiles(self, percentiles: Sequence[float]) -> np.ndarray:
+        """The same as HdrHistogram's getValueAtPercentile() for each of the percentiles."""
+
+        percentiles = np.clip(np.asarray(percentiles, dtype=np.float64), 0, 100)
+        cumulative = np.cumsum(self.counts)
+        total = cumulative[-1] if cumulative.size else 0
+        if not total:
+            return np.zeros(percentiles.shape, dtype=np.int64)
+        counts_at_percentiles = np.maximum(np.ceil(percentiles / 100 * total), 1)
+        values = self.value_from_index(np.searchsorted(cumulative, counts_at_percentiles))
+        return np.where(percentiles == 0, self.lowest_equivalent_value(values), self.highest_equivalent_value(values))
+
+    def get_value_at_percentile(self, percentile: float) -> int:
+        return int(self.get_values_at_percentiles([percentile])[0])
+
+    def summary(self, unit_ratio: float = HDR_VALUE_UNIT_RATIO,
+                percentiles: Sequence[float] = HDR_SUMMARY_PERCENTILES) -> dict:
+        """Statistics of the histogram with values divided by `unit_ratio' (e.g., in ms for values in ns.)"""
+
+        summary = {"count": self.total_count,
+                   "min": self.min / unit_ratio,
+                   "max": self.max / unit_ratio,
+                   "mean": self.mean / unit_ratio,
+                   "stdev": self.stdev / unit_ratio}
+        for percentile, value in zip(percentiles, self.get_values_at_percentiles(percentiles).tolist()):
+            summary[f"p{percentile:g}".replace(".", "")] = value / unit_ratio
+        return summary
+
+    def encode(self) -> str:
+        """Encode the histogram into the base64 string of the V2 compressed format."""
+
+        nonzero_indexes = np.flatnonzero(self.counts)
+        counts = self.counts[:nonzero_indexes[-1] + 1] if nonzero_indexes.size else self.counts[:0]
+
+        # Runs of more than one zero are encoded as negative lengths of the runs.
+        nonzero = counts != 0
+        run_starts = np.flatnonzero(~nonzero & np.concatenate(([True], nonzero[:-1])))
+        run_ends = np.flatnonzero(~nonzero & np.concatenate((nonzero[1:], [True])))
+        keep = nonzero.copy()
+        keep[run_starts] = True
+        words = counts.copy()
+        words[run_starts] = run_starts - run_ends - 1
+        words[run_starts[run_starts == run_ends]] = 0
+        payload = zigzag_leb128_encode(words[keep])
+
+        header = ENCODING_HEADER.pack(V2_ENCODING_COOKIE | 0x10, len(payload), 0, self.significant_figures,
+                                      self.lowest_discernible_value, self.highest_trackable_value, 1.0)
+        compressed = zlib.compress(header + payload)
+        return base64.b64encode(COMPRESSED_HEADER.pack(V2_COMPRESSED_ENCODING_COOKIE | 0x10, len(compressed))
+                                + compressed).decode("ascii")
+
+    @classmethod
+    def decode(cls, encoded: str | bytes) -> HdrHistogram:
+        """Decode a histogram from the base64 string of the V2 compressed format."""
+
+        try:
+            data = base64.b64decode(encoded)
+            cookie, length = COMPRESSED_HEADER.unpack_from(data)
+            if cookie & ~0xf0 != V2_COMPRESSED_ENCODING_COOKIE:
+                raise HdrHistogramError(f"Unsupported histogram encoding cookie: {cookie:#x}")
+            data = zlib.decompress(data[COMPRESSED_HEADER.size:COMPRESSED_HEADER.size + length])
+            cookie, payload_length, offset, significant_figures, lowest, highest, _ = ENCODING_HEADER.unpack_from(data)
+        except (ValueError, struct.error, zlib.error) as exc:
+            raise HdrHistogramError(f"Failed to decode histogram: {exc}") from exc
+        if cookie & ~0xf0 != V2_ENCODING_COOKIE:
+            raise HdrHistogramError(f"Unsupported histogram encoding cookie: {cookie:#x}")
+        if offset:
+            raise HdrHistogramError("Normalizing index offset isn't supported")
+        histogram = cls(lowest_discernible_value=lowest, highest_trackable_value=highest,
+                        significant_figures=significant_figures)
+        words = zigzag_leb128_decode(data[ENCODING_HEADER.size:ENCODING_HEADER.size + payload_length])
+        lengths = np.where(words < 0, -words, 1)
+        counts = np.repeat(np.where(words < 0, 0, words), lengths)
+        if len(counts) > len(histogram.counts):
+            raise HdrHistogramError("Histogram payload has more counts than the histogram can hold")
+        histogram.counts[:len(counts)] = counts
+        return histogram
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} count={self.total_count} max={self.max}>"
+
+
+def merge_histograms(histograms: Iterable[HdrHistogram]) -> Optional[HdrHistogram]:
+    merged = None
+    for histogram in histograms:
+        if merged is None:
+            merged = HdrHistogram(lowest_discernible_value=histogram.lowest_discernible_value,
+                                  highest_trackable_value=histogram.highest_trackable_value,
+                                  significant_figures=histogram.significant_figures)
+        merged.add(histogram)
+    return merged
+
+
+@dataclass
+class HdrInterval:
+    tag: str
+    start: float  # unix time
+    length: float  # seconds
+    histogram: HdrHistogram
+
+    @property
+    def end(self) -> float:
+        return self.start + self.length
+
+
+def parse_hdr_log(lines: Iterable[str]) -> Iterator[HdrInterval]:
+    """Parse intervals of the HdrHistogram log format (v1.2+), as written by HistogramLogWriter.
+
+    Timestamps of intervals are relative to BaseTime (or StartTime if there is no BaseTime.)
+    """
+
+    start_time = base_time = None
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith("#[StartTime: "):
+            start_time = float(line[len("#[StartTime: "):].split()[0])
+            continue
+        if line.startswith("#[BaseTime: "):
+            base_time = float(line[len("#[BaseTime: "):].split()[0])
+            continue
+        if line.startswith(("#", '"')):
+            continue
+        tag = ""
+        if line.startswith("Tag="):
+            tag, line = line[len("Tag="):].split(",", 1)
+        try:
+            timestamp, length, _, encoded = line.split(",", 3)
+            histogram = HdrHistogram.decode(encoded)
+        except (ValueError, HdrHistogramError) as exc:
+            LOGGER.warning("Skip bad line of HDR histogram log: %s", exc)
+            continue
+        offset = base_time if base_time is not None else start_time or 0
+        yield HdrInterval(tag=tag, start=float(timestamp) + offset, length=float(length), histogram=histogram)
+
+
+def read_hdr_log(path: str) -> Iterator[HdrInterval]:
+    with open(path, encoding="utf-8", errors="replace") as log_file:
+        yield from parse_hdr_log(log_file)
+
+
+def merge_hdr_intervals(intervals: Iterable[HdrInterval],
+                        start: Optional[float] = None,
+                        end: Optional[float] = None) -> Dict[str, HdrHistogram]:
+    """Merge intervals which start in [start, end) into one histogram per tag."""
+
+    histograms: Dict[str, HdrHistogram] = {}
+    for interval in intervals:
+        if (start is not None and interval.start < start) or (end is not None and interval.start >= end):
+            continue
+        if interval.tag in histograms:
+            histograms[interval.tag].add(interval.histogram)
+        else:
+            histograms[interval.tag] = merge_histograms([interval.histogram])
+    return histograms
+
+
+def read_hdr_logs(paths: Iterable[str]) -> List[HdrInterval]:
+    intervals = []
+    for path in paths:
+        try:
+            intervals.extend(read_hdr_log(path))
+        except OSError as exc:
+            LOGGER.warning("Failed to read HDR histogram log: %s", exc)
+    return intervals
+
+
+__all__ = ("HdrHistogram", "HdrHistogramError", "HdrInterval", "merge_histograms", "merge_hdr_intervals",
+           "parse_hdr_log", "read_hdr_log", "read_hdr_logs", )
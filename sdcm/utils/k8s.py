@@ -13,21 +13,25 @@
 
 # pylint: disable=too-many-arguments
 import abc
+import enum
 import json
 import os
 import time
 import queue
 import logging
 import re
+import socket
 import threading
-import multiprocessing
 import contextlib
+import collections
+from collections import defaultdict
 from tempfile import NamedTemporaryFile
-from typing import Optional, Union, Callable, List
-from functools import cached_property, partialmethod
+from typing import Optional, Union, Callable, List, Dict, Set, Tuple, Any
+from functools import cached_property, partialmethod, wraps
 from pathlib import Path
 
 import kubernetes as k8s
+import prometheus_client
 import yaml
 from paramiko.config import invoke
 from urllib3.util.retry import Retry
@@ -44,12 +48,27 @@ KUBECTL_BIN = "kubectl"
 HELM_IMAGE = "alpine/helm:3.3.4"
 
 KUBECTL_TIMEOUT = 300  # seconds
+INFORMER_RESYNC_PERIOD = 600  # seconds, full relist to recover from events missed by a watch
+INFORMER_WATCH_TIMEOUT = 300  # seconds, server side timeout of a single watch request
+INFORMER_SYNC_TIMEOUT = 120  # seconds to wait for the first list of an informer
+INFORMER_RETRY_DELAY = 5  # seconds
 
 K8S_CONFIGS_PATH_SCT = sct_abs_path("sdcm/k8s_configs")
 
 JSON_PATCH_TYPE = "application/json-patch+json"
 
 LOGGER = logging.getLogger(__name__)
+
+API_CALLS = prometheus_client.Counter(
+    "sct_k8s_api_calls", "k8s API calls passed through the rate limiter", ["priority", "caller"])
+API_CALLS_REJECTED = prometheus_client.Counter(
+    "sct_k8s_api_calls_rejected", "k8s API calls which waited too long in the rate limiter queue",
+    ["priority", "caller"])
+API_CALLS_QUEUED = prometheus_client.Gauge(
+    "sct_k8s_api_calls_queued", "k8s API calls waiting in the rate limiter queue", ["priority"])
+API_CALL_WAIT_TIME = prometheus_client.Histogram(
+    "sct_k8s_api_call_wait_seconds", "Time k8s API calls spent waiting in the rate limiter queue", ["priority"],
+    buckets=(0.001, 0.01, 0.1, 0.5, 1, 5, 15, 60, 300, float("inf")))
 K8S_MEM_CPU_RE = re.compile('^([0-9]+)([a-zA-Z]*)$')
 K8S_MEM_CONVERSION_MAP = {
     'e': lambda x: x * 1073741824,
@@ -71,10 +90,11 @@ logging.getLogger("kubernetes.client.rest").setLevel(logging.INFO)
 class ApiLimiterClient(k8s.client.ApiClient):
     _api_rate_limiter: 'ApiCallRateLimiter' = None
 
-    def call_api(self, *args, **kwargs):  # pylint: disable=signature-differs
+    def call_api(self, resource_path, method, *args, **kwargs):  # pylint: disable=signature-differs
         if self._api_rate_limiter:
-            self._api_rate_limiter.wait()
-        return super().call_api(*args, **kwargs)
+            self._api_rate_limiter.wait(
+                priority=None if method == "GET" else ApiCallPriority.CONTROL_PLANE, caller="api_client")
+        return super().call_api(resource_path, method, *args, **kwargs)
 
     def bind_api_limiter(self, instance: 'ApiCallRateLimiter'):
         self._api_rate_limiter = instance
@@ -86,7 +106,7 @@ class ApiLimiterRetry(Retry):
     def sleep(self, *args, **kwargs):  # pylint: disable=signature-differs
         super().sleep(*args, **kwargs)
         if self._api_rate_limiter:
-            self._api_rate_limiter.wait()
+            self._api_rate_limiter.wait(caller="urllib_retry")
 
     def new(self, *args, **kwargs):
         result = super().new(*args, **kwargs)
@@ -98,23 +118,86 @@ class ApiLimiterRetry(Retry):
         self._api_rate_limiter = instance
 
 
-class ApiCallRateLimiter(threading.Thread):
-    """Simple and not very accurate rate limiter.
+class ApiCallPriority(enum.IntEnum):
+    CONTROL_PLANE = 0  # changes of k8s objects: create, patch, delete, helm, etc.
+    READINESS = 1  # waits for readiness of pods and nodes, informers, other reads
+    BACKGROUND = 2  # logs and resources gathering
+
+
+# Shares of the rate limit which priority classes get under contention.
+API_CALL_PRIORITY_WEIGHTS = {
+    ApiCallPriority.CONTROL_PLANE: 6,
+    ApiCallPriority.READINESS: 3,
+    ApiCallPriority.BACKGROUND: 1,
+}
+KUBECTL_CONTROL_PLANE_VERBS = frozenset((
+    "annotate", "apply", "autoscale", "cordon", "create", "delete", "drain", "edit", "expose", "label", "patch",
+    "replace", "scale", "set", "taint", "uncordon", ))
+KUBECTL_BACKGROUND_VERBS = frozenset(("cp", "describe", "logs", "top", "version", ))
+
+_API_CALL_PRIORITY = threading.local()
+
+
+@contextlib.contextmanager
+def api_call_priority(priority: ApiCallPriority):
+    """Set priority of k8s API calls made by the current thread which don't have explicit priority."""
+
+    previous = getattr(_API_CALL_PRIORITY, "value", None)
+    _API_CALL_PRIORITY.value = priority
+    try:
+        yield
+    finally:
+        _API_CALL_PRIORITY.value = previous
+
+
+def get_kubectl_call_priority(*command: str) -> Optional[ApiCallPriority]:
+    words = " ".join(command).split()
+    verb = next((word for word in words if not word.startswith("-")), None)
+    if verb in KUBECTL_CONTROL_PLANE_VERBS or verb == "rollout" and "restart" in words:
+        return ApiCallPriority.CONTROL_PLANE
+    if verb in KUBECTL_BACKGROUND_VERBS:
+        return ApiCallPriority.BACKGROUND
+    return None
+
+
+class ApiCallRateLimiter:  # pylint: disable=too-many-instance-attributes
+    """Token bucket rate limiter of k8s API calls with priority classes.
+
+    Tokens are added at `rate_limit' per second up to `burst' tokens and every call takes one.  Calls which can't
+    get a token right away are queued per priority class, the next call to get a token is taken from the class with
+    the smallest virtual time, which grows by 1 / weight on every call of the class (stride scheduling.)  So under
+    contention classes share the rate in proportion to their weights, no class is starved, and calls of the same
+    class are served in FIFO order.
 
-    Allow 1 call each `1 / rate_limit' seconds interval.
     If some call not able to start after `queue_size / rate_limit' seconds then raise `queue.Full' for caller.
     """
 
-    def __init__(self, rate_limit: float, queue_size: int, urllib_retry: int, urllib_backoff_factor: float):
-        super().__init__(name=type(self).__name__, daemon=True)
-        self._lock = multiprocessing.Semaphore(value=1)
-        self._requests_pause_event = multiprocessing.Event()
+    def __init__(self, rate_limit: float, queue_size: int, urllib_retry: int, urllib_backoff_factor: float,
+                 burst: int = 1, priority_weights: Optional[Dict[ApiCallPriority, float]] = None):
+        self._condition = threading.Condition()
+        self._requests_pause_event = threading.Event()
         self.release_requests_pause()
         self.rate_limit = rate_limit  # ops/s
         self.queue_size = queue_size
+        self.burst = burst
+        self.priority_weights = {**API_CALL_PRIORITY_WEIGHTS, **(priority_weights or {})}
         self.urllib_retry = urllib_retry
         self.urllib_backoff_factor = urllib_backoff_factor
         self.running = threading.Event()
+        self.stats = defaultdict(lambda: {"calls": 0, "wait_time": 0.0})  # by (priority, caller)
+        self._tokens = float(burst)
+        self._last_refill_time = time.monotonic()
+        self._queues = {priority: collections.deque() for priority in ApiCallPriority}
+        self._virtual_time = dict.fromkeys(ApiCallPriority, 0.0)
+        self._current_virtual_time = 0.0
+
+    def start(self):
+        LOGGER.info("k8s API call rate limiter started: rate_limit=%s, burst=%s, queue_size=%s",
+                    self.rate_limit, self.burst, self.queue_size)
+        self.running.set()
+
+    def stop(self):
+        self.running.clear()
 
     def put_requests_on_pause(self):
         self._requests_pause_event.clear()
@@ -129,11 +212,67 @@ class ApiCallRateLimiter(threading.Thread):
         yield None
         self.release_requests_pause()
 
-    def wait(self):
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._last_refill_time) * self.rate_limit)
+        self._last_refill_time = now
+
+    def _next_call(self):
+        priority = min((priority for priority, calls in self._queues.items() if calls),
+                       key=lambda priority: (self._virtual_time[priority], priority))
+        return self._queues[priority][0]
+
+    def wait(self, priority: Optional[ApiCallPriority] = None, caller: str = "api"):
+        """Wait for a token for one API call.
+
+        If `priority' is not provided, the one set by `api_call_priority()' for the current thread is used, and
+        READINESS if there is none.
+        """
+
+        if priority is None:
+            priority = getattr(_API_CALL_PRIORITY, "value", None)
+            if priority is None:
+                priority = ApiCallPriority.READINESS
         self._requests_pause_event.wait(15 * 60)
-        if not self._lock.acquire(timeout=self.queue_size / self.rate_limit):  # deepcode ignore E1123: deepcode error
-            LOGGER.error("k8s API call rate limiter queue size limit has been reached")
-            raise queue.Full
+        start_time = time.monotonic()
+        end_time = start_time + self.queue_size / self.rate_limit
+        call = object()
+        calls = self._queues[priority]
+        with self._condition:
+            if not calls:
+                # Idle class doesn't accumulate credit while it's idle.
+                self._virtual_time[priority] = max(self._virtual_time[priority], self._current_virtual_time)
+            calls.append(call)
+            API_CALLS_QUEUED.labels(priority=priority.name).inc()
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    timeout = end_time - now
+                    if self._next_call() is call:
+                        if self._tokens >= 1:
+                            self._tokens -= 1
+                            calls.popleft()
+                            self._current_virtual_time = self._virtual_time[priority]
+                            self._virtual_time[priority] += 1 / self.priority_weights[priority]
+                            self._condition.notify_all()
+                            break
+                        # The next call gets a token in less than 1 / rate_limit seconds, no need to reject it.
+                        timeout = (1 - self._tokens) / self.rate_limit
+                    elif timeout <= 0:
+                        calls.remove(call)
+                        self._condition.notify_all()
+                        API_CALLS_REJECTED.labels(priority=priority.name, caller=caller).inc()
+                        LOGGER.error("k8s API call rate limiter queue size limit has been reached")
+                        raise queue.Full
+                    self._condition.wait(timeout)
+            finally:
+                API_CALLS_QUEUED.labels(priority=priority.name).dec()
+            wait_time = time.monotonic() - start_time
+            stats = self.stats[(priority.name, caller)]
+            stats["calls"] += 1
+            stats["wait_time"] += wait_time
+        API_CALLS.labels(priority=priority.name, caller=caller).inc()
+        API_CALL_WAIT_TIME.labels(priority=priority.name).observe(wait_time)
 
     def _api_test(self, kluster):  # pylint: disable=no-self-use
         logging.getLogger('urllib3.connectionpool').disabled = True
@@ -177,19 +316,6 @@ class ApiCallRateLimiter(threading.Thread):
                 time.sleep(1 / self.rate_limit)
         return passed < num_requests * 0.8
 
-    def stop(self):
-        self.running.clear()
-        self.join()
-
-    def run(self) -> None:
-        LOGGER.info("k8s API call rate limiter started: rate_limit=%s, queue_size=%s",
-                    self.rate_limit, self.queue_size)
-        self.running.set()
-        while self.running.is_set():
-            if self._lock.get_value() == 0:
-                self._lock.release()
-            time.sleep(1 / self.rate_limit)
-
     def get_k8s_configuration(self, kluster) -> k8s.client.Configuration:
         output = KubernetesOps.create_k8s_configuration(kluster)
         output.retries = ApiLimiterRetry(self.urllib_retry, backoff_factor=self.urllib_backoff_factor)
@@ -394,26 +520,20 @@ class KubernetesOps:  # pylint: disable=too-many-public-methods
             raise ValueError(f'Unknown auth-type {auth_type}')
 
     @staticmethod
-    def wait_for_pods_readiness(kluster, total_pods: Union[int, Callable], readiness_timeout: float, namespace: str,
-                                sleep: int = 10):
-        @timeout_decor(message=f"Wait for {total_pods} pod(s) from {namespace} namespace to become ready...",
-                       timeout=readiness_timeout * 60,
-                       sleep_time=sleep)
-        def wait_cluster_is_ready():
-            # To make it more informative in worst case scenario made it repeat 5 times, by readiness_timeout // 5
-            result = kluster.kubectl(
-                f"wait --timeout={readiness_timeout // 5}m --all --for=condition=Ready pod",
-                namespace=namespace,
-                timeout=readiness_timeout * 60 // 5 + 10)
-            count = result.stdout.count('condition met')
+    def wait_for_pods_readiness(kluster, total_pods: Union[int, Callable], readiness_timeout: float, namespace: str):
+        def all_pods_are_ready(informer: KubernetesInformer) -> bool:
+            pods = informer.list()
+            count = sum(1 for pod in pods if has_ready_condition(pod))
+            if count != len(pods):
+                return False
             if isinstance(total_pods, (int, float)):
-                if total_pods != count:
-                    raise RuntimeError('Not all pods reported')
-            elif callable(total_pods):
-                if not total_pods(count):
-                    raise RuntimeError('Not all pods reported')
+                return total_pods == count
+            return bool(total_pods(count))
 
-        wait_cluster_is_ready()
+        kluster.get_informer("pod", namespace=namespace).wait_for(
+            all_pods_are_ready,
+            timeout=readiness_timeout * 60,
+            text=f"Wait for {total_pods} pod(s) from {namespace} namespace to become ready")
 
     @classmethod
     def patch_kube_config(cls, static_token_path, kube_config_path: str = None) -> None:
@@ -595,6 +715,206 @@ class TokenUpdateThread(threading.Thread, metaclass=abc.ABCMeta):
         self.join(timeout)
 
 
+class KubernetesInformer(threading.Thread):  # pylint: disable=too-many-instance-attributes
+    """Local cache of k8s objects of one kind in one namespace which is kept up to date by a watch.
+
+    The cache is filled by a list request and then a watch is started from the resource version of the list
+    to apply ADDED/MODIFIED/DELETED events, BOOKMARK events just move the resource version forward.  When the
+    resource version is too old (410 Gone), the watch fails, or each `resync_period' seconds the cache is relisted.
+
+    Objects are indexed by name, by labels and by k8s node name (for pods.)  Callers which wait for some state
+    use `wait_for()' and are woken up on every change instead of polling the API.
+    """
+
+    # kind: (namespaced list method, cluster-wide list method)
+    LIST_METHODS = {
+        "pod": ("list_namespaced_pod", None),
+        "service": ("list_namespaced_service", None),
+        "node": (None, "list_node"),
+    }
+
+    def __init__(self, kluster, kind: str, namespace: Optional[str] = None,
+                 resync_period: float = INFORMER_RESYNC_PERIOD, watch_timeout: int = INFORMER_WATCH_TIMEOUT):
+        namespaced_method, cluster_method = self.LIST_METHODS[kind]
+        if (namespaced_method if namespace else cluster_method) is None:
+            raise ValueError(f"Informer for `{kind}' objects requires {'a' if namespaced_method else 'no'} namespace")
+        super().__init__(name=f"{type(self).__name__}-{kind}-{namespace or 'cluster'}", daemon=True)
+        self.kluster = kluster
+        self.kind = kind
+        self.namespace = namespace
+        self.resync_period = resync_period
+        self.watch_timeout = watch_timeout
+        self.resource_version = None
+        self.stats = {"lists": 0, "watches": 0, "events": 0}
+        self._list_method_name = namespaced_method if namespace else cluster_method
+        self._objects: Dict[str, Any] = {}
+        self._by_label: Dict[Tuple[str, str], Set[str]] = defaultdict(set)
+        self._by_node: Dict[str, Set[str]] = defaultdict(set)
+        self._condition = threading.Condition()
+        self._synced = threading.Event()
+        self._termination_event = threading.Event()
+        self._relist_required = True
+        self._last_list_time = 0.0
+        self._watch = None
+        self._watch_response = None
+
+    def _list_kwargs(self) -> dict:
+        return {"namespace": self.namespace} if self.namespace else {}
+
+    def run(self):
+        _API_CALL_PRIORITY.value = ApiCallPriority.READINESS
+        k8s_core_v1_api = None
+        while not self._termination_event.is_set():
+            try:
+                if k8s_core_v1_api is None:
+                    k8s_core_v1_api = self.kluster.k8s_core_v1_api
+                list_method = getattr(k8s_core_v1_api, self._list_method_name)
+                if self._relist_required or time.monotonic() - self._last_list_time >= self.resync_period:
+                    self._list(list_method)
+                self._watch_changes(list_method)
+            except k8s.client.ApiException as exc:
+                if exc.status != 410:
+                    LOGGER.warning("%s: watch failed: %s", self.name, exc)
+                    self._termination_event.wait(INFORMER_RETRY_DELAY)
+                self._relist_required = True
+            except Exception as exc:  # pylint: disable=broad-except
+                if self._termination_event.is_set():
+                    break
+                LOGGER.warning("%s: watch failed: %s", self.name, exc)
+                k8s_core_v1_api = None
+                self._relist_required = True
+                self._termination_event.wait(INFORMER_RETRY_DELAY)
+
+    def _list(self, list_method: Callable):
+        result = list_method(watch=False, **self._list_kwargs())
+        with self._condition:
+            self._objects.clear()
+            self._by_label.clear()
+            self._by_node.clear()
+            for obj in result.items:
+                self._store(obj)
+            self.resource_version = result.metadata.resource_version
+            self._relist_required = False
+            self._last_list_time = time.monotonic()
+            self.stats["lists"] += 1
+            self._synced.set()
+            self._condition.notify_all()
+
+    def _watch_changes(self, list_method: Callable):
+        timeout = min(self.watch_timeout, self.resync_period - (time.monotonic() - self._last_list_time))
+
+        @wraps(list_method)
+        def watch_method(*args, **kwargs):
+            # Keep the response of the watch request to be able to interrupt a blocked read of it in `stop()'.
+            self._watch_response = list_method(*args, **kwargs)
+            if self._termination_event.is_set():
+                self._shutdown_watch_response()
+            return self._watch_response
+
+        self._watch = k8s.watch.Watch()
+        self.stats["watches"] += 1
+        for event in self._watch.stream(watch_method, resource_version=self.resource_version,
+                                        allow_watch_bookmarks=True, timeout_seconds=max(int(timeout), 1),
+                                        **self._list_kwargs()):
+            if self._termination_event.is_set() or not self.handle_event(event):
+                self._watch.stop()
+                break
+
+    def handle_event(self, event: dict) -> bool:
+        """Apply a watch event to the cache, return False if the watch should be restarted."""
+
+        raw_object = event.get("raw_object") or {}
+        if event["type"] == "ERROR":
+            if raw_object.get("code") != 410:
+                LOGGER.warning("%s: watch error: %s", self.name, raw_object.get("message"))
+            self._relist_required = True
+            return False
+        with self._condition:
+            if event["type"] in ("ADDED", "MODIFIED", ):
+                self._store(event["object"])
+            elif event["type"] == "DELETED":
+                self._remove(event["object"].metadata.name)
+            if resource_version := raw_object.get("metadata", {}).get("resourceVersion"):
+                self.resource_version = resource_version
+            self.stats["events"] += 1
+            self._condition.notify_all()
+        return True
+
+    def _store(self, obj):
+        name = obj.metadata.name
+        self._remove(name)
+        self._objects[name] = obj
+        for label in (obj.metadata.labels or {}).items():
+            self._by_label[label].add(name)
+        if node_name := getattr(obj.spec, "node_name", None):
+            self._by_node[node_name].add(name)
+
+    def _remove(self, name: str):
+        if (obj := self._objects.pop(name, None)) is None:
+            return
+        for label in (obj.metadata.labels or {}).items():
+            self._by_label[label].discard(name)
+        if node_name := getattr(obj.spec, "node_name", None):
+            self._by_node[node_name].discard(name)
+
+    def wait_for_sync(self, timeout: float = INFORMER_SYNC_TIMEOUT):
+        if not self._synced.wait(timeout):
+            raise TimeoutError(f"{self.name}: no list of objects received in {timeout} seconds")
+
+    def get(self, name: str):
+        self.wait_for_sync()
+        with self._condition:
+            return self._objects.get(name)
+
+    def list(self, labels: Optional[Dict[str, str]] = None, node_name: Optional[str] = None) -> list:
+        """Cached objects which have all `labels' and, if provided, run on k8s node `node_name'."""
+
+        self.wait_for_sync()
+        with self._condition:
+            names = set(self._objects)
+            for label in (labels or {}).items():
+                names &= self._by_label.get(label, set())
+            if node_name is not None:
+                names &= self._by_node.get(node_name, set())
+            return [self._objects[name] for name in sorted(names)]
+
+    def wait_for(self, predicate: Callable[["KubernetesInformer"], Any], timeout: float, text: str = None):
+        """Wait until `predicate(informer)' is true after some change of the cache and return its result."""
+
+        end_time = time.monotonic() + timeout
+        self.wait_for_sync(timeout)
+        with self._condition:
+            while not (result := predicate(self)):
+                if (remaining := end_time - time.monotonic()) <= 0:
+                    raise TimeoutError(f"{text or self.name}: timeout - {timeout} seconds - expired")
+                self._condition.wait(remaining)
+            return result
+
+    def _shutdown_watch_response(self):
+        # `Watch.stop()' is checked between events only, and closing the response doesn't wake up a thread which is
+        # blocked in a read of its socket.  Shut the socket down instead, the read returns and the watch ends.
+        connection = getattr(self._watch_response, "connection", None)
+        if (sock := getattr(connection, "sock", None)) is not None:
+            with contextlib.suppress(OSError):
+                sock.shutdown(socket.SHUT_RDWR)
+
+    def stop(self, timeout=None):
+        self._termination_event.set()
+        if self._watch:
+            self._watch.stop()
+        self._shutdown_watch_response()
+        if self.is_alive():
+            self.join(timeout)
+
+
+def has_ready_condition(obj) -> bool:
+    """True for a pod or a k8s node which is not being deleted and has `Ready' condition."""
+
+    if obj.metadata.deletion_timestamp or not obj.status or not obj.status.conditions:
+        return False
+    return any(condition.type == "Ready" and condition.status == "True" for condition in obj.status.conditions)
+
+
 def convert_cpu_units_to_k8s_value(cpu: Union[float, int]) -> str:
     if isinstance(cpu, float):
         if not cpu.is_integer():
@@ -11,11 +11,10 @@
 #
 # Copyright (c) 2020 ScyllaDB
 
-from sdcm.db_stats import PrometheusDBStats
-
+import numpy as np
 
-def avg(values):
-    return sum(values)/len(values)
+from sdcm.db_stats import PrometheusDBStats
+from sdcm.utils.series_stats import series_stats, per_series_stats
 
 
 # pylint: disable=too-many-arguments,too-many-locals,too-many-nested-blocks,too-many-branches
@@ -26,56 +25,60 @@ def collect_latency(monitor_node, start, end, load_type, cluster, nodes_list):
     cassandra_stress_precision = ['99', '95']  # in the future should include also 'max'
     scylla_precision = ['99']  # in the future should include also '95', '5'
 
+    cs_queries = {}
     for precision in cassandra_stress_precision:
         metric = f'c-s {precision}' if precision == 'max' else f'c-s P{precision}'
         if not precision == 'max':
             precision = f'perc_{precision}'
-        query = f'collectd_cassandra_stress_{load_type}_gauge{{type="lat_{precision}"}}'
-        query_res = prometheus.query(query, start, end)
-        latency_values_lst = []
-        max_latency_values_lst = []
-        for entry in query_res:
-            if not entry['values']:
-                continue
-            sequence = [float(val[-1]) for val in entry['values'] if not val[-1].lower() == 'nan']
-            if not sequence or all(val == sequence[0] for val in sequence):
-                continue
-            latency_values_lst.extend(sequence)
-            max_latency_values_lst.extend(sequence)
-
-        if latency_values_lst:
-            res[metric] = float(format(avg(latency_values_lst), '.2f'))
-        if max_latency_values_lst:
-            res[f'{metric} max'] = float(format(max(max_latency_values_lst), '.2f'))
+        cs_queries[metric] = f'collectd_cassandra_stress_{load_type}_gauge{{type="lat_{precision}"}}'
 
     if load_type == 'mixed':
         load_type = ['read', 'write']
     else:
         load_type = [load_type]
 
+    scylla_queries = {}
     for load in load_type:
         for precision in scylla_precision:
-            query = f'histogram_quantile(0.{precision},sum(rate(scylla_storage_proxy_coordinator_{load}_' \
-                    f'latency_bucket{{}}[{duration}s])) by (instance, le))'
-            query_res = prometheus.query(query, start, end)
-            for entry in query_res:
-                node_ip = entry['metric']['instance'].replace('[', '').replace(']', '')
-                node = cluster.get_node_by_ip(node_ip)
-                if not node:
-                    for db_node in nodes_list:
-                        if db_node.ip_address == node_ip:
-                            node = db_node
-                if node:
-                    node_idx = node.name.split('-')[-1]
-                else:
-                    continue
-                node_name = f'node-{node_idx}'
-                metric = f"Scylla P{precision}_{load} - {node_name}"
-                if not entry['values']:
-                    continue
-                sequence = [float(val[-1]) for val in entry['values'] if not val[-1].lower() == 'nan']
-                if sequence:
-                    res[metric] = float(format(avg(sequence) / 1000, '.2f'))
+            scylla_queries[(load, precision)] = \
+                f'histogram_quantile(0.{precision},sum(rate(scylla_storage_proxy_coordinator_{load}_' \
+                f'latency_bucket{{}}[{duration}s])) by (instance, le))'
+
+    # All queries are for the same time window, run them concurrently.
+    results = prometheus.query_series_many(list(cs_queries.values()) + list(scylla_queries.values()), start, end)
+    cs_results, scylla_results = results[:len(cs_queries)], results[len(cs_queries):]
+
+    for metric, query_res in zip(cs_queries, cs_results):
+        sequences = []
+        for entry in query_res:
+            sequence = entry.valid_values
+            if not sequence.size or (sequence == sequence[0]).all():
+                continue
+            sequences.append(sequence)
+
+        if sequences:
+            stats = series_stats(np.concatenate(sequences))
+            res[metric] = float(format(stats.avg, '.2f'))
+            res[f'{metric} max'] = float(format(stats.max, '.2f'))
+
+    for (load, precision), query_res in zip(scylla_queries, scylla_results):
+        per_node = {}
+        for entry in query_res:
+            node_ip = entry.metric['instance'].replace('[', '').replace(']', '')
+            node = cluster.get_node_by_ip(node_ip)
+            if not node:
+                for db_node in nodes_list:
+                    if db_node.ip_address == node_ip:
+                        node = db_node
+            if node:
+                node_idx = node.name.split('-')[-1]
+            else:
+                continue
+            node_name = f'node-{node_idx}'
+            per_node[f"Scylla P{precision}_{load} - {node_name}"] = entry.values
+        for metric, stats in per_series_stats(per_node).items():
+            if stats:
+                res[metric] = float(format(stats.avg / 1000, '.2f'))
 
     return res
 
@@ -99,10 +102,10 @@ def calculate_latency(latency_results):
                 if metric not in temp_dict:
                     temp_dict[metric] = []
                 temp_dict[metric].append(value)
-        for temp_key, temp_val in temp_dict.items():
+        for temp_key, cycles_stats in per_series_stats(temp_dict).items():
             if 'Cycles Average' not in result_dict[key]:
                 result_dict[key]['Cycles Average'] = {}
-            average = float(format(avg([float(val) for val in temp_val]), '.2f'))
+            average = float(format(cycles_stats.avg if cycles_stats else float('nan'), '.2f'))
             result_dict[key]['Cycles Average'][temp_key] = average
             if 'Relative to Steady' not in result_dict[key]:
                 result_dict[key]['Relative to Steady'] = {}
@@ -0,0 +1,308 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+#
+# Copyright (c) 2022 ScyllaDB
+
+"""
+Incremental reading of growing log files.
+
+`LogTail' reads complete lines added to a log file since the previous call and keeps its position as
+a `LogCheckpoint' (inode, offset and number of lines read) which can be saved to a file and used to continue
+from the same place after a restart.  Like `tail -F', it finishes reading a rotated file before it switches
+to the new one, and starts from the beginning of a truncated file.
+
+`FileChangeWatcher' waits for changes of a file using inotify (polls if inotify is not available.)
+`Inotify' is a minimal binding of inotify(7) for watching of many directories at once.
+"""
+
+from __future__ import annotations
+
+import io
+import os
+import json
+import time
+import errno
+import ctypes
+import select
+import struct
+import logging
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+from dataclasses import dataclass, asdict
+
+
+LOG_TAIL_READ_CHUNK_SIZE: int = 1024 * 1024  # bytes
+FILE_CHANGE_POLL_INTERVAL: float = 0.1  # seconds, used if inotify is not available
+
+# See inotify(7)
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+INOTIFY_EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class LogCheckpoint:
+    inode: int = 0
+    offset: int = 0  # the end of the last read line
+    line_no: int = 0  # number of lines read
+
+    @classmethod
+    def load(cls, path: str) -> LogCheckpoint:
+        try:
+            with open(path, encoding="utf-8") as checkpoint_file:
+                return cls(**json.load(checkpoint_file))
+        except FileNotFoundError:
+            pass
+        except (ValueError, TypeError) as exc:
+            LOGGER.warning("Ignore malformed log checkpoint %s: %s", path, exc)
+        return cls()
+
+    def save(self, path: str) -> None:
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as checkpoint_file:
+            json.dump(asdict(self), checkpoint_file)
+        os.replace(tmp_path, path)
+
+
+class LogTail:
+    """Read lines added to a log file since the last read, survive rotation and truncation of the file."""
+
+    def __init__(self, path: str, checkpoint: Optional[LogCheckpoint] = None,
+                 chunk_size: int = LOG_TAIL_READ_CHUNK_SIZE):
+        self.path = path
+        self.checkpoint = checkpoint or LogCheckpoint()
+        self.chunk_size = chunk_size
+        self._file: Optional[BinaryIO] = None
+        self._buffer = b""  # an incomplete line
+
+    def read_lines(self) -> Iterator[Tuple[int, str]]:
+        """Yield (line number, line) for complete lines added since the last call.
+
+        The checkpoint is advanced with each yielded line.
+        """
+
+        if self._file is None and not self._open(self._find_current_file()):
+            return
+        yield from self._read_available()
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:  # rotated and the new file is not created yet
+            return
+        if stat.st_ino != self.checkpoint.inode:
+            LOGGER.debug("%s was rotated, switch to the new file", self.path)
+            yield from self._read_available(final=True)
+            self.close()
+            if self._open(self.path):
+                yield from self._read_available()
+        elif stat.st_size < self.checkpoint.offset:
+            LOGGER.debug("%s was truncated, read it from the beginning", self.path)
+            self._file.seek(0)
+            self._buffer = b""
+            self.checkpoint = LogCheckpoint(inode=stat.st_ino)
+            yield from self._read_available()
+
+    def read_to_end(self) -> Iterator[Tuple[int, str]]:
+        """Yield all remaining lines, including an incomplete last line."""
+
+        yield from self.read_lines()
+        if self._file is not None:
+            yield from self._read_available(final=True)
+
+    def _find_current_file(self) -> str:
+        # If the file was rotated since the checkpoint was saved, continue with the rotated one if it's still there.
+        if not self.checkpoint.inode:
+            return self.path
+        try:
+            if os.stat(self.path).st_ino == self.checkpoint.inode:
+                return self.path
+            dirname = os.path.dirname(self.path) or "."
+            with os.scandir(dirname) as entries:
+                for entry in entries:
+                    if entry.is_file() and entry.inode() == self.checkpoint.inode:
+                        LOGGER.debug("%s was rotated to %s, continue from the checkpoint", self.path, entry.path)
+                        return entry.path
+        except OSError:
+            pass
+        return self.path
+
+    def _open(self, path: str) -> bool:
+        try:
+            self._file = open(path, "rb")  # pylint: disable=consider-using-with
+        except FileNotFoundError:
+            return False
+        stat = os.fstat(self._file.fileno())
+        if stat.st_ino == self.checkpoint.inode and stat.st_size >= self.checkpoint.offset:
+            self._file.seek(self.checkpoint.offset)
+        else:
+            if self.checkpoint.inode:
+                LOGGER.debug("%s doesn't match the checkpoint %s, read it from the beginning", path, self.checkpoint)
+            self.checkpoint = LogCheckpoint(inode=stat.st_ino)
+        self._buffer = b""
+        return True
+
+    def _read_available(self, final: bool = False) -> Iterator[Tuple[int, str]]:
+        checkpoint = self.checkpoint
+        while chunk := self._file.read(self.chunk_size):
+            data = self._buffer + chunk
+            end = data.rfind(b"\n") + 1
+            self._buffer = data[end:]
+            for line in io.BytesIO(data[:end]):  # split by "\n" only
+                checkpoint.offset += len(line)
+                checkpoint.line_no += 1
+                yield checkpoint.line_no - 1, line.decode("utf-8", errors="replace")
+        if final and self._buffer:
+            line, self._buffer = self._buffer, b""
+            checkpoint.offset += len(line)
+            checkpoint.line_no += 1
+            yield checkpoint.line_no - 1, line.decode("utf-8", errors="replace")
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._buffer = b""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class Inotify:
+    """Minimal binding of inotify(7) which doesn't need any third-party library.
+
+    Raise OSError if inotify is not available.
+    """
+
+    WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+    def __init__(self):
+        try:
+            libc = ctypes.CDLL(None, use_errno=True)
+            inotify_init1 = libc.inotify_init1
+            self._inotify_add_watch, self._inotify_rm_watch = libc.inotify_add_watch, libc.inotify_rm_watch
+        except AttributeError:
+            raise OSError(errno.ENOSYS, "inotify is not available") from None
+        self._fd = inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), f"Failed to initialize inotify: {os.strerror(ctypes.get_errno())}")
+
+    def fileno(self) -> int:
+        return self._fd
+
+    def add_watch(self, path: str, mask: int = WATCH_MASK) -> int:
+        watch_descriptor = self._inotify_add_watch(self._fd, os.fsencode(path), mask)
+        if watch_descriptor < 0:
+            raise OSError(ctypes.get_errno(), f"Failed to watch {path}: {os.strerror(ctypes.get_errno())}")
+        return watch_descriptor
+
+    def remove_watch(self, watch_descriptor: int) -> None:
+        self._inotify_rm_watch(self._fd, watch_descriptor)
+
+    def read_events(self) -> List[Tuple[int, int, bytes]]:
+        """Return (watch descriptor, mask, name) of all pending events without blocking."""
+
+        events = []
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                return events
+            except OSError as exc:
+                if exc.errno == errno.EINTR:
+                    continue
+                raise
+            offset = 0
+            while offset < len(data):
+                watch_descriptor, mask, _, name_len = INOTIFY_EVENT_HEADER.unpack_from(data, offset)
+                offset += INOTIFY_EVENT_HEADER.size
+                events.append((watch_descriptor, mask, data[offset:offset + name_len].rstrip(b"\0")))
+                offset += name_len
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class FileChangeWatcher:
+    """Wait for changes of a file (including its creation, rotation and deletion.)"""
+
+    def __init__(self, path: str, poll_interval: float = FILE_CHANGE_POLL_INTERVAL):
+        self.path = path
+        self.poll_interval = poll_interval
+        self._name = os.fsencode(os.path.basename(path))
+        self._inotify = self._watch(os.path.dirname(path) or ".")
+
+    @property
+    def uses_inotify(self) -> bool:
+        return self._inotify is not None
+
+    @staticmethod
+    def _watch(dirname: str) -> Optional[Inotify]:
+        try:
+            inotify = Inotify()
+        except OSError as exc:
+            LOGGER.debug("%s, poll for changes", exc)
+            return None
+        try:
+            inotify.add_watch(dirname)
+        except OSError as exc:
+            LOGGER.debug("%s, poll for changes", exc)
+            inotify.close()
+            return None
+        return inotify
+
+    def wait(self, timeout: float) -> bool:
+        """Wait for a change of the file up to `timeout' seconds.  Return False if there were no changes."""
+
+        if self._inotify is None:
+            time.sleep(min(timeout, self.poll_interval))
+            return True
+        deadline = time.perf_counter() + timeout
+        while (remaining := deadline - time.perf_counter()) > 0:
+            ready, _, _ = select.select([self._inotify], [], [], remaining)
+            if ready and self._read_events():
+                return True
+        return False
+
+    def _read_events(self) -> bool:
+        changed = False
+        for _, mask, name in self._inotify.read_events():
+            if mask & IN_Q_OVERFLOW or name.startswith(self._name):
+                changed = True
+            elif mask & IN_IGNORED:  # the directory was removed
+                self.close()
+                return True
+        return changed
+
+    def close(self) -> None:
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+__all__ = ("LogCheckpoint", "LogTail", "Inotify", "FileChangeWatcher", )
@@ -0,0 +1,373 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+#
+# Copyright (c) 2022 ScyllaDB
+
+"""
+Shared pool of worker threads used by `ParallelObject'.
+
+Worker threads are started on demand (up to `max_workers' threads running tasks at the same time) and stop
+after `idle_timeout' seconds without work.  A worker thread which waits for results of a nested batch
+(e.g., `ParallelObject.run()' called from a function which runs in parallel itself) doesn't count
+as a running one, so nested batches can't deadlock the pool.
+
+Tasks are grouped to batches.  A batch limits the number of its tasks running at the same time, yields
+finished tasks as they complete, handles global and per-task timeouts and cancels tasks which are not
+started yet.  Python threads can't be interrupted, so a timed out task continues to run in background,
+but its result is dropped and it doesn't take a slot of the pool anymore: a hung call can't starve other batches.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+import queue
+import logging
+import itertools
+import threading
+from enum import Enum
+from typing import Any, Callable, Deque, Dict, Iterator, Optional
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import CancelledError, TimeoutError as FuturesTimeoutError
+
+
+PARALLEL_EXECUTOR_MAX_WORKERS: int = 256
+PARALLEL_EXECUTOR_IDLE_TIMEOUT: float = 60  # seconds
+
+LOGGER = logging.getLogger(__name__)
+
+
+class TaskState(Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    TIMED_OUT = "timed out"
+    CANCELLED = "cancelled"
+
+
+class ParallelTask:  # pylint: disable=too-many-instance-attributes
+    def __init__(self, batch: ParallelBatch, index: int, obj: Any, func: Callable, args: tuple, kwargs: dict):
+        self.batch = batch
+        self.index = index
+        self.obj = obj
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.state = TaskState.PENDING
+        self.result = None
+        self.exc: Optional[BaseException] = None
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.counted = False  # takes a slot of the executor, guarded by the executor's lock
+        self.abandoned = False  # timed out while running, guarded by the executor's lock
+        self.returned = False  # the function returned, guarded by the executor's lock
+
+    @property
+    def duration(self) -> Optional[float]:
+        """Time spent running the task (until now if it's still running.)"""
+
+        if self.started is None:
+            return None
+        return (self.finished or time.perf_counter()) - self.started
+
+    def run(self) -> None:
+        if not self.batch.task_started(self):
+            return
+        try:
+            result, exc = self.func(*self.args, **self.kwargs), None
+        except BaseException as exception:  # pylint: disable=broad-except
+            result, exc = None, exception
+        self.batch.task_finished(self, result, exc)
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} #{self.index} {self.obj!r} {self.state.value}>"
+
+
+class ParallelExecutor:
+    """Bounded pool of worker threads shared by all batches of the process."""
+
+    def __init__(self,
+                 max_workers: int = PARALLEL_EXECUTOR_MAX_WORKERS,
+                 idle_timeout: float = PARALLEL_EXECUTOR_IDLE_TIMEOUT):
+        self.max_workers = max_workers
+        self.idle_timeout = idle_timeout
+        self._lock = threading.Condition()
+        self._queue: Deque[ParallelTask] = deque()  # tasks waiting for a free slot
+        self._handoff: Deque[ParallelTask] = deque()  # tasks given to idle threads
+        self._threads = 0
+        self._idle = 0
+        self._running = 0
+        self._abandoned = 0
+        self._threads_counter = itertools.count(1)
+        self._local = threading.local()
+
+    @property
+    def threads(self) -> int:
+        return self._threads
+
+    @property
+    def abandoned(self) -> int:
+        """Number of timed out tasks which still run in background."""
+
+        return self._abandoned
+
+    def submit(self, task: ParallelTask) -> None:
+        with self._lock:
+            self._queue.append(task)
+            self._dispatch()
+
+    def _dispatch(self) -> None:
+        while self._queue and self._running < self.max_workers:
+            task = self._queue.popleft()
+            if task.state is not TaskState.PENDING:  # cancelled while in the queue
+                continue
+            self._running += 1
+            task.counted = True
+            if self._idle > len(self._handoff):
+                self._handoff.append(task)
+                self._lock.notify()
+            else:
+                self._threads += 1
+                threading.Thread(target=self._worker,
+                                 args=(task, ),
+                                 name=f"ParallelExecutor-{next(self._threads_counter)}",
+                                 daemon=True).start()
+
+    def _worker(self, task: ParallelTask) -> None:
+        while task is not None:
+            self._local.task = task
+            task.run()
+            with self._lock:
+                self._local.task = None
+                task.returned = True
+                if task.counted:
+                    task.counted = False
+                    self._running -= 1
+                if task.abandoned:
+                    self._abandoned -= 1
+                self._idle += 1
+                self._dispatch()
+                deadline = time.perf_counter() + self.idle_timeout
+                while not self._handoff and (timeout := deadline - time.perf_counter()) > 0:
+                    self._lock.wait(timeout)
+                self._idle -= 1
+                if self._handoff:
+                    task = self._handoff.popleft()
+                else:
+                    task = None
+                    self._threads -= 1
+
+    def abandon(self, task: ParallelTask) -> None:
+        """Free the slot of a timed out task, the task continues to run in background."""
+
+        with self._lock:
+            if task.abandoned or task.returned:
+                return
+            task.abandoned = True
+            self._abandoned += 1
+            if task.counted:
+                task.counted = False
+                self._running -= 1
+                self._dispatch()
+        LOGGER.warning("Task %s timed out and is left running in background (%d such tasks)",
+                       task, self._abandoned)
+
+    @contextmanager
+    def waiting(self) -> Iterator[None]:
+        """Don't count the current worker thread as running while it waits for results of other tasks."""
+
+        task = getattr(self._local, "task", None)
+        if task is None:
+            yield
+            return
+        with self._lock:
+            released = task.counted
+            if released:
+                task.counted = False
+                self._running -= 1
+                self._dispatch()
+        try:
+            yield
+        finally:
+            with self._lock:
+                if released and not task.abandoned:
+                    task.counted = True
+                    self._running += 1
+
+
+class ParallelBatch:
+    """Run a group of tasks using an executor with a limit of tasks running at the same time."""
+
+    def __init__(self, concurrency: Optional[int] = None, executor: Optional[ParallelExecutor] = None):
+        self.executor = executor or get_parallel_executor()
+        self.concurrency = concurrency or self.executor.max_workers
+        self._lock = threading.Lock()
+        self._pending: Deque[ParallelTask] = deque()  # tasks not submitted to the executor yet
+        self._in_flight = 0
+        self._unreported: Dict[ParallelTask, None] = {}  # ordered set
+        self._done: queue.SimpleQueue[Optional[ParallelTask]] = queue.SimpleQueue()
+        self._index = itertools.count()
+        self.cancelled = False
+
+    def submit(self, obj: Any, func: Callable, *args, **kwargs) -> ParallelTask:
+        task = ParallelTask(batch=self, index=next(self._index), obj=obj, func=func, args=args, kwargs=kwargs)
+        with self._lock:
+            if self.cancelled:
+                raise RuntimeError("Can't submit a task to a cancelled batch")
+            self._unreported[task] = None
+            if self._in_flight >= self.concurrency:
+                self._pending.append(task)
+                return task
+            self._in_flight += 1
+        self.executor.submit(task)
+        return task
+
+    def task_started(self, task: ParallelTask) -> bool:
+        with self._lock:
+            if task.state is not TaskState.PENDING:
+                return False
+            task.state = TaskState.RUNNING
+            task.started = time.perf_counter()
+            return True
+
+    def task_finished(self, task: ParallelTask, result: Any, exc: Optional[BaseException]) -> None:
+        with self._lock:
+            if task.state is not TaskState.RUNNING:  # timed out: the result is not interesting anymore
+                return
+            task.finished = time.perf_counter()
+            task.state = TaskState.DONE
+            task.result, task.exc = result, exc
+            self._release_slot()
+        self._done.put(task)
+
+    def _release_slot(self) -> None:
+        self._in_flight -= 1
+        while self._pending and not self.cancelled:
+            task = self._pending.popleft()
+            if task.state is TaskState.PENDING:
+                self._in_flight += 1
+                self.executor.submit(task)
+                return
+
+    def cancel(self) -> None:
+        """Cancel all tasks which are not started yet.  Running tasks are not interrupted."""
+
+        with self._lock:
+            if self.cancelled:
+                return
+            self.cancelled = True
+            for task in self._unreported:
+                if task.state is TaskState.PENDING:
+                    task.state = TaskState.CANCELLED
+                    task.exc = CancelledError()
+            self._pending.clear()
+        self._done.put(None)  # wake up as_completed()
+
+    def _expire(self, now: float, deadline: Optional[float], task_timeout: Optional[float]) -> list:
+        expired = []
+        with self._lock:
+            for task in self._unreported:
+                if deadline is not None and deadline <= now:
+                    if task.state is TaskState.PENDING:
+                        task.state = TaskState.CANCELLED
+                    elif task.state is TaskState.RUNNING:
+                        task.state = TaskState.TIMED_OUT
+                    else:
+                        continue
+                elif task_timeout is not None and task.state is TaskState.RUNNING \
+                        and task.started + task_timeout <= now:
+                    task.state = TaskState.TIMED_OUT
+                    self._release_slot()
+                else:
+                    continue
+                task.exc = FuturesTimeoutError()
+                expired.append(task)
+            for task in expired:
+                del self._unreported[task]
+        for task in expired:
+            if task.state is TaskState.TIMED_OUT:
+                self.executor.abandon(task)
+        return expired
+
+    def _cancelled_tasks(self) -> list:
+        with self._lock:
+            cancelled = [task for task in self._unreported if task.state is TaskState.CANCELLED]
+            for task in cancelled:
+                del self._unreported[task]
+        return cancelled
+
+    def _next_deadline(self, deadline: Optional[float], task_timeout: Optional[float]) -> Optional[float]:
+        if task_timeout is not None:
+            with self._lock:
+                started = [task.started for task in self._unreported if task.state is TaskState.RUNNING]
+            if started:
+                task_deadline = min(started) + task_timeout
+                deadline = task_deadline if deadline is None else min(deadline, task_deadline)
+        return deadline
+
+    def as_completed(self,
+                     timeout: Optional[float] = None,
+                     task_timeout: Optional[float] = None) -> Iterator[ParallelTask]:
+        """Yield tasks as they finish.
+
+        Tasks which are not finished in `timeout' seconds from the call or which run longer than `task_timeout'
+        seconds are yielded with `concurrent.futures.TimeoutError' as `exc'; cancelled tasks are yielded with
+        `concurrent.futures.CancelledError'.  Tasks which are not started yet are cancelled when the generator
+        is closed.
+        """
+
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        try:
+            while self._unreported:
+                yield from self._cancelled_tasks()
+                if not self._unreported:
+                    break
+                wait_until = self._next_deadline(deadline, task_timeout)
+                try:
+                    with self.executor.waiting():
+                        task = self._done.get(
+                            timeout=None if wait_until is None else max(0.0, wait_until - time.perf_counter()))
+                except queue.Empty:
+                    yield from self._expire(time.perf_counter(), deadline, task_timeout)
+                    continue
+                if task is not None and task in self._unreported:
+                    del self._unreported[task]
+                    yield task
+        finally:
+            self.cancel()
+
+
+_EXECUTOR_LOCK = threading.Lock()
+_EXECUTOR: Optional[ParallelExecutor] = None
+
+
+def get_parallel_executor() -> ParallelExecutor:
+    global _EXECUTOR  # pylint: disable=global-statement
+
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = ParallelExecutor()
+        return _EXECUTOR
+
+
+def _reset_after_fork() -> None:
+    global _EXECUTOR, _EXECUTOR_LOCK  # pylint: disable=global-statement
+
+    # Worker threads are not copied to a child process.
+    _EXECUTOR_LOCK = threading.Lock()
+    _EXECUTOR = None
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+__all__ = ("ParallelExecutor", "ParallelBatch", "ParallelTask", "TaskState", "get_parallel_executor", )
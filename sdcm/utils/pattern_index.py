@@ -0,0 +1,144 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+#
+# Copyright (c) 2022 ScyllaDB
+
+import re
+from typing import Generic, Iterable, List, NamedTuple, Optional, Pattern, Match, Tuple, TypeVar
+
+try:
+    from re import _parser as sre_parse, _constants as sre_constants  # Python 3.11+
+except ImportError:
+    import sre_parse  # pylint: disable=deprecated-module
+    import sre_constants  # pylint: disable=deprecated-module
+
+T = TypeVar("T")  # pylint: disable=invalid-name
+
+
+def required_literals(pattern: Pattern) -> Optional[List[str]]:
+    """
+    Find literals which a line should contain to be matched by the pattern.
+
+    Return a list of alternatives (at least one of them is in any matched line) or None if the pattern has
+    no such literal.  For case-insensitive patterns literals are lowercased.
+
+    Example:
+        >>> required_literals(re.compile("(mutation_write_|Operation timed out)", re.IGNORECASE))
+        ['mutation_write_', 'operation timed out']
+    """
+    try:
+        parsed = sre_parse.parse(pattern.pattern, pattern.flags)
+    except Exception:  # pylint: disable=broad-except
+        return None
+    ignore_case = bool(parsed.state.flags & re.IGNORECASE)
+    if isinstance(pattern.pattern, bytes) or parsed.state.flags & re.VERBOSE:
+        return None
+    return _sequence_literals(parsed, ignore_case)
+
+
+def _best_alternatives(candidates: List[List[str]]) -> Optional[List[str]]:
+    # Prefer a set of alternatives with the longest shortest literal: it's the most selective one.
+    if not candidates:
+        return None
+    return max(candidates, key=lambda alternatives: min(len(literal) for literal in alternatives))
+
+
+def _sequence_literals(sequence, ignore_case: bool) -> Optional[List[str]]:
+    candidates = []
+    run = []
+
+    def close_run():
+        if run:
+            literal = "".join(run)
+            if not ignore_case or literal.isascii():
+                candidates.append([literal.lower() if ignore_case else literal])
+            run.clear()
+
+    for opcode, argument in sequence:
+        if opcode is sre_constants.LITERAL:
+            run.append(chr(argument))
+            continue
+        close_run()
+        if opcode is sre_constants.SUBPATTERN:
+            _, add_flags, del_flags, subpattern = argument
+            if not add_flags and not del_flags and (alternatives := _sequence_literals(subpattern, ignore_case)):
+                candidates.append(alternatives)
+        elif opcode is sre_constants.BRANCH:
+            branches = [_sequence_literals(branch, ignore_case) for branch in argument[1]]
+            if all(branches):
+                candidates.append([literal for branch in branches for literal in branch])
+        elif opcode in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT, ) and argument[0] > 0:
+            if alternatives := _sequence_literals(argument[2], ignore_case):
+                candidates.append(alternatives)
+    close_run()
+
+    return _best_alternatives(candidates)
+
+
+class IndexedPattern(NamedTuple):
+    pattern: Pattern
+    literals: Optional[Tuple[str, ...]]
+    ignore_case: bool
+
+
+class PatternIndex(Generic[T]):
+    """
+    Ordered list of (pattern, value) pairs which can be searched for the first matching pattern.
+
+    All literals required by the patterns are combined into one regex, so a line which can't be matched
+    by any pattern is rejected by single scan.  Otherwise, only patterns which literals are present in the line
+    are checked (in the original order), so the result is the same as for checking all patterns one by one.
+    """
+
+    def __init__(self, items: Iterable[Tuple[Pattern, T]]):
+        self._entries: List[Tuple[IndexedPattern, T]] = []
+        all_literals = set()
+        has_unconstrained_pattern = False
+        for pattern, value in items:
+            literals = required_literals(pattern)
+            if literals is None:
+                has_unconstrained_pattern = True
+            else:
+                all_literals.update(literal.lower() for literal in literals)
+            indexed_pattern = IndexedPattern(pattern=pattern,
+                                             literals=tuple(literals) if literals else None,
+                                             ignore_case=bool(pattern.flags & re.IGNORECASE))
+            self._entries.append((indexed_pattern, value))
+        if has_unconstrained_pattern:
+            self._prefilter = None
+        else:
+            self._prefilter = re.compile("|".join(re.escape(literal) for literal in sorted(all_literals)))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def search(self, line: str, lowered_line: Optional[str] = None) -> Optional[Tuple[Match, T]]:
+        """
+        Find the first pattern which matches the line.
+
+        :param line: line to match
+        :param lowered_line: `line.lower()', can be passed if already calculated by a caller
+        :return: match object and the value tied to the pattern or None if nothing matched
+        """
+        if not self._entries:
+            return None
+        if lowered_line is None:
+            lowered_line = line.lower()
+        if self._prefilter is not None and not self._prefilter.search(lowered_line):
+            return None
+        for indexed_pattern, value in self._entries:
+            if indexed_pattern.literals is not None:
+                haystack = lowered_line if indexed_pattern.ignore_case else line
+                if not any(literal in haystack for literal in indexed_pattern.literals):
+                    continue
+            if match := indexed_pattern.pattern.search(line):
+                return match, value
+        return None
@@ -0,0 +1,222 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+#
+# Copyright (c) 2022 ScyllaDB
+
+"""
+Client of the Prometheus HTTP API.
+
+All requests to a Prometheus server go through one keep-alive session.  Range queries are split into chunks
+which fit into the limit of points per series, chunks of many queries are fetched concurrently, and results
+of windows which are already in the past are cached.  Series are returned as NumPy arrays.
+"""
+
+from __future__ import annotations
+
+import time
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from functools import cached_property, lru_cache
+from collections import OrderedDict
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+
+import yaml
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+
+from sdcm.utils.decorators import retrying
+
+
+PROMETHEUS_MAX_POINTS_PER_SERIES: int = 11_000  # Prometheus rejects range queries which return more points
+PROMETHEUS_QUERY_WORKERS: int = 8  # concurrent requests to one server
+PROMETHEUS_QUERY_CACHE_SIZE: int = 256  # cached range queries
+PROMETHEUS_QUERY_CACHE_MIN_AGE: float = 60  # seconds, samples of more recent windows may still be coming
+PROMETHEUS_REQUEST_TIMEOUT: float = 120  # seconds
+
+RangeQuery = Tuple[str, float, float, float]  # (query, start, end, step)
+
+LOGGER = logging.getLogger(__name__)
+
+
+class PrometheusError(Exception):
+    pass
+
+
+def format_sample_value(value: float) -> str:
+    """Format a sample value the same way Prometheus does it in responses."""
+
+    if np.isnan(value):
+        return "NaN"
+    if np.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return np.format_float_positional(value, trim="-")
+
+
+@dataclass
+class PrometheusSeries:
+    metric: Dict[str, str]
+    timestamps: np.ndarray  # float64, unix time
+    values: np.ndarray  # float64
+
+    @classmethod
+    def from_result(cls, result: dict) -> PrometheusSeries:
+        samples = np.array(result.get("values") or [], dtype=np.float64).reshape(-1, 2)
+        return cls(metric=result.get("metric", {}), timestamps=samples[:, 0], values=samples[:, 1])
+
+    @property
+    def valid_values(self) -> np.ndarray:
+        return self.values[~np.isnan(self.values)]
+
+    def as_result(self) -> dict:
+        """The series in the format of the Prometheus API response, i.e., values are [timestamp, "value"] pairs."""
+
+        return {"metric": self.metric,
+                "values": [[timestamp.item(), format_sample_value(value)]
+                           for timestamp, value in zip(self.timestamps, self.values)]}
+
+    def __len__(self):
+        return len(self.values)
+
+
+def split_range(start: float, end: float, step: float,
+                max_points: int = PROMETHEUS_MAX_POINTS_PER_SERIES) -> List[Tuple[float, float]]:
+    """Split [start, end] into windows with at most `max_points' steps each, aligned with the original window."""
+
+    windows = []
+    chunk = max_points * step
+    while start <= end:
+        windows.append((start, min(start + chunk - step, end)))
+        start += chunk
+    return windows or [(start, end)]
+
+
+def merge_series(chunks: Iterable[List[PrometheusSeries]]) -> List[PrometheusSeries]:
+    """Merge results of consecutive windows into one series per set of labels."""
+
+    parts: Dict[Tuple, List[PrometheusSeries]] = {}
+    for chunk in chunks:
+        for series in chunk:
+            parts.setdefault(tuple(sorted(series.metric.items())), []).append(series)
+    merged = []
+    for series_parts in parts.values():
+        if len(series_parts) == 1:
+            merged.append(series_parts[0])
+        else:
+            merged.append(PrometheusSeries(metric=series_parts[0].metric,
+                                           timestamps=np.concatenate([part.timestamps for part in series_parts]),
+                                           values=np.concatenate([part.values for part in series_parts])))
+    for series in merged:
+        series.timestamps.flags.writeable = False  # results are cached and shared
+        series.values.flags.writeable = False
+    return merged
+
+
+class PrometheusAPI:
+    def __init__(self, base_url: str,
+                 max_workers: int = PROMETHEUS_QUERY_WORKERS,
+                 cache_size: int = PROMETHEUS_QUERY_CACHE_SIZE,
+                 timeout: float = PROMETHEUS_REQUEST_TIMEOUT):
+        self.base_url = base_url.rstrip("/")
+        self.max_workers = max_workers
+        self.cache_size = cache_size
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=max_workers))
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=max_workers))
+        self._cache: OrderedDict[RangeQuery, List[PrometheusSeries]] = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    @retrying(n=5, sleep_time=7, allowed_exceptions=(requests.ConnectionError, requests.HTTPError))
+    def request(self, path: str, params: Optional[dict] = None, post: bool = False):
+        """Send a request to /api/v1/<path> and return `data' of the response."""
+
+        if post:
+            response = self.session.post(f"{self.base_url}/{path}", data=params, timeout=self.timeout)
+        else:
+            response = self.session.get(f"{self.base_url}/{path}", params=params, timeout=self.timeout)
+        response.raise_for_status()
+        result = response.json()
+        LOGGER.debug("Response from Prometheus server: %s", str(result)[:200])
+        if result.get("status") != "success":
+            raise PrometheusError(f"Prometheus returned error: {result}")
+        return result.get("data")
+
+    def get_configuration(self) -> dict:
+        configs = yaml.safe_load(self.request("status/config")["yaml"])
+        LOGGER.debug("Parsed Prometheus configs: %s", configs)
+        configs["scrape_configs"] = {conf["job_name"]: conf for conf in configs["scrape_configs"]}
+        self.__dict__["configuration"] = configs  # update the cached one
+        return configs
+
+    @cached_property
+    def configuration(self) -> dict:
+        return self.get_configuration()
+
+    def _query_range_window(self, query: str, start: float, end: float, step: float) -> List[PrometheusSeries]:
+        data = self.request("query_range", params={"query": query, "start": start, "end": end, "step": step})
+        return [PrometheusSeries.from_result(result) for result in data["result"]]
+
+    def _get_cached(self, key: RangeQuery) -> Optional[List[PrometheusSeries]]:
+        with self._cache_lock:
+            if (result := self._cache.get(key)) is not None:
+                self._cache.move_to_end(key)
+            return result
+
+    def _put_cached(self, key: RangeQuery, result: List[PrometheusSeries]) -> None:
+        if key[2] > time.time() - PROMETHEUS_QUERY_CACHE_MIN_AGE:
+            return
+        with self._cache_lock:
+            self._cache[key] = result
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def clear_cache(self) -> None:
+        with self._cache_lock:
+            self._cache.clear()
+
+    def query_range(self, query: str, start: float, end: float, step: float) -> List[PrometheusSeries]:
+        return self.query_range_many([(query, start, end, step)])[0]
+
+    def query_range_many(self, queries: Sequence[RangeQuery]) -> List[List[PrometheusSeries]]:
+        """Run range queries concurrently and return their results in the same order.
+
+        Windows which have more than `PROMETHEUS_MAX_POINTS_PER_SERIES' steps are fetched in chunks.
+        """
+
+        keys = [(query, float(start), float(end), float(step)) for query, start, end, step in queries]
+        results: List[Optional[List[PrometheusSeries]]] = [self._get_cached(key) for key in keys]
+        missing = {key: split_range(*key[1:]) for key, result in zip(keys, results) if result is None}
+        tasks = [(key[0], window_start, window_end, key[3])
+                 for key, windows in missing.items() for window_start, window_end in windows]
+        if len(tasks) <= 1:
+            chunks = iter([self._query_range_window(*task) for task in tasks])
+        else:
+            LOGGER.debug("Run %d range queries in %d requests", len(missing), len(tasks))
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(tasks))) as executor:
+                chunks = iter(list(executor.map(lambda task: self._query_range_window(*task), tasks)))
+        fetched = {}
+        for key, windows in missing.items():
+            fetched[key] = merge_series(next(chunks) for _ in windows)
+            self._put_cached(key, fetched[key])
+        return [fetched[key] if result is None else result for key, result in zip(keys, results)]
+
+
+@lru_cache(maxsize=None)
+def get_prometheus_api(base_url: str) -> PrometheusAPI:
+    """Return a client shared by all users of the Prometheus server."""
+
+    return PrometheusAPI(base_url=base_url)
+
+
+__all__ = ("PrometheusAPI", "PrometheusError", "PrometheusSeries", "get_prometheus_api", "split_range", )
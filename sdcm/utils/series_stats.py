@@ -0,0 +1,165 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+#
+# Copyright (c) 2022 ScyllaDB
+
+"""
+Statistics of latency and throughput time series.
+
+All functions work on whole NumPy arrays: statistics of many series (e.g., one per node) are calculated
+at once on a matrix with a row per series, NaN values (gaps in Prometheus data) are ignored.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+from dataclasses import dataclass, asdict
+
+import numpy as np
+
+
+SERIES_STATS_PERCENTILES: Tuple[float, ...] = (50, 90, 95, 99, 99.9)
+SERIES_STATS_TRIM: float = 0.05  # proportion of the lowest and the highest values cut off for the trimmed mean
+STEADY_STATE_WINDOW: int = 60  # points
+STEADY_STATE_MAX_CV: float = 0.1  # max coefficient of variation (stdev / mean) of a steady window
+
+
+@dataclass
+class SeriesStats:  # pylint: disable=too-many-instance-attributes
+    count: int
+    min: float
+    max: float
+    avg: float
+    stdev: float
+    trimmed_avg: float
+    percentiles: Dict[str, float]  # by names like `p99'
+
+    def as_dict(self, ndigits: Optional[int] = None) -> dict:
+        stats = asdict(self)
+        stats.update(stats.pop("percentiles"))
+        if ndigits is not None:
+            stats = {key: round(value, ndigits) if isinstance(value, float) else value for key, value in stats.items()}
+        return stats
+
+
+def percentile_name(percentile: float) -> str:
+    return f"p{percentile:g}".replace(".", "")
+
+
+def to_matrix(series: Sequence[Sequence[float]]) -> np.ndarray:
+    """Stack series into a matrix with a row per series, pad shorter series with NaN."""
+
+    arrays = [np.asarray(values, dtype=np.float64).ravel() for values in series]
+    matrix = np.full((len(arrays), max((len(values) for values in arrays), default=0)), np.nan)
+    for row, values in zip(matrix, arrays):
+        row[:len(values)] = values
+    matrix[np.isinf(matrix)] = np.nan
+    return matrix
+
+
+def matrix_stats(matrix: np.ndarray,
+                 percentiles: Sequence[float] = SERIES_STATS_PERCENTILES,
+                 trim: float = SERIES_STATS_TRIM) -> List[Optional[SeriesStats]]:
+    """Calculate statistics of each row of the matrix (None for rows without values.)"""
+
+    matrix = np.atleast_2d(np.asarray(matrix, dtype=np.float64))
+    ordered = np.sort(matrix, axis=1)  # NaN values go to the end of rows
+    counts = np.count_nonzero(~np.isnan(matrix), axis=1)
+    valid = counts > 0
+    rows = np.flatnonzero(valid)
+    ordered, row_counts = ordered[valid], counts[valid]
+
+    # Percentiles with linear interpolation between the closest ranks, the same as np.percentile() does.
+    ranks = (row_counts[:, None] - 1) * (np.asarray(percentiles, dtype=np.float64)[None, :] / 100)
+    lower = np.floor(ranks).astype(int)
+    upper = np.minimum(lower + 1, row_counts[:, None] - 1)
+    index = np.arange(len(ordered))[:, None]
+    lower_values, upper_values = ordered[index, lower], ordered[index, upper]
+    percentile_values = lower_values + (upper_values - lower_values) * (ranks - lower)
+
+    zeroed = np.where(np.isnan(ordered), 0, ordered)
+    cumsum = np.concatenate((np.zeros((len(ordered), 1)), np.cumsum(zeroed, axis=1)), axis=1)
+    sums = cumsum[np.arange(len(ordered)), row_counts]
+    means = sums / row_counts
+    variances = np.sum(np.where(np.isnan(ordered), 0, (zeroed - means[:, None]) ** 2), axis=1) / row_counts
+    cut = np.floor(row_counts * trim).astype(int)
+    cut = np.where(row_counts - 2 * cut > 0, cut, 0)
+    trimmed_means = (cumsum[np.arange(len(ordered)), row_counts - cut] -
+                     cumsum[np.arange(len(ordered)), cut]) / (row_counts - 2 * cut)
+
+    stats: List[Optional[SeriesStats]] = [None] * len(matrix)
+    names = [percentile_name(percentile) for percentile in percentiles]
+    for i, row in enumerate(rows):
+        stats[row] = SeriesStats(count=int(row_counts[i]),
+                                 min=float(ordered[i, 0]),
+                                 max=float(ordered[i, row_counts[i] - 1]),
+                                 avg=float(means[i]),
+                                 stdev=float(np.sqrt(variances[i])),
+                                 trimmed_avg=float(trimmed_means[i]),
+                                 percentiles=dict(zip(names, percentile_values[i].tolist())))
+    return stats
+
+
+def series_stats(values: Sequence[float], **kwargs) -> Optional[SeriesStats]:
+    return matrix_stats(to_matrix([values]), **kwargs)[0]
+
+
+def per_series_stats(series: Mapping[str, Sequence[float]], **kwargs) -> Dict[str, Optional[SeriesStats]]:
+    """Statistics of many series (e.g., per node) calculated at once."""
+
+    return dict(zip(series, matrix_stats(to_matrix(list(series.values())), **kwargs)))
+
+
+def rolling_mean_std(values: np.ndarray, window: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Mean and stdev of each window of `window' consecutive values (NaN if a window has no values.)"""
+
+    values = np.asarray(values, dtype=np.float64)
+    present = ~np.isnan(values)
+    zeroed = np.where(present, values, 0)
+
+    def window_sums(array):
+        cumsum = np.concatenate(([0], np.cumsum(array)))
+        return cumsum[window:] - cumsum[:-window]
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        counts = window_sums(present.astype(np.float64))
+        means = window_sums(zeroed) / counts
+        variances = np.maximum(window_sums(zeroed ** 2) / counts - means ** 2, 0)
+    return means, np.sqrt(variances)
+
+
+def steady_state_window(values: Sequence[float],
+                        window: int = STEADY_STATE_WINDOW,
+                        max_cv: float = STEADY_STATE_MAX_CV) -> Optional[Tuple[int, int]]:
+    """Find the longest part of the series where every window of `window' points is steady.
+
+    A window is steady if its coefficient of variation (stdev / mean) is at most `max_cv'.
+    Return (start, end) indexes of the part (the end is exclusive) or None if there is no steady window.
+    """
+
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) < window:
+        return None
+    means, stdevs = rolling_mean_std(values, window)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        steady = (stdevs <= max_cv * np.abs(means)) & (means != 0)
+    if not steady.any():
+        return None
+
+    # Find the longest run of steady windows.
+    edges = np.diff(np.concatenate(([0], steady.astype(np.int8), [0])))
+    starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+    longest = np.argmax(ends - starts)
+    return int(starts[longest]), int(ends[longest] - 1 + window)
+
+
+__all__ = ("SeriesStats", "matrix_stats", "series_stats", "per_series_stats", "rolling_mean_std",
+           "steady_state_window", "to_matrix", )
@@ -11,11 +11,13 @@
 #
 # Copyright (c) 2020 ScyllaDB
 
+from __future__ import annotations
+
 import re
 import logging
 from enum import Enum, auto
 from string import Template
-from typing import List, Optional
+from typing import List, Optional, TYPE_CHECKING
 from collections import namedtuple
 from urllib.parse import urlparse
 from functools import lru_cache, wraps
@@ -23,7 +25,6 @@ from functools import lru_cache, wraps
 import boto3
 import requests
 import dateutil.parser
-from mypy_boto3_s3 import S3Client
 from botocore import UNSIGNED
 from botocore.client import Config
 from pkg_resources import parse_version
@@ -33,6 +34,9 @@ from sdcm.utils.common import ParallelObject, DEFAULT_AWS_REGION
 from sdcm.sct_events.system import ScyllaRepoEvent
 from sdcm.utils.decorators import retrying
 
+if TYPE_CHECKING:
+    from mypy_boto3_s3 import S3Client
+
 
 # Examples of ScyllaDB version strings:
 #   - 666.development-0.20200205.2816404f575
@@ -13,7 +13,6 @@
 
 import os
 import re
-import time
 import uuid
 import tempfile
 import logging
@@ -49,6 +48,20 @@ class YcsbStatsPublisher(FileFollowerThread):
                                                                 'Gauge for ycsb metrics',
                                                                 ['instance', 'loader_idx', 'uuid', 'type'])
 
+        # 729.39 current ops/sec;
+        # [READ: Count=510, Max=195327, Min=2011, Avg=4598.69, 90=5743, 99=12583, 99.9=194815, 99.99=195327]
+        # [CLEANUP: Count=5, Max=3, Min=0, Avg=0.6, 90=3, 99=3, 99.9=3, 99.99=3]
+        # [UPDATE: Count=490, Max=190975, Min=2004, Avg=3866.96, 90=4395, 99=6755, 99.9=190975, 99.99=190975]
+        self.regex_dict = {}
+        for operation in self.collectible_ops:
+            self.regex_dict[operation] = re.compile(
+                fr'\[{operation.upper()}:\sCount=(?P<count>\d*?),'
+                fr'.*?Max=(?P<max>\d*?),.*?Min=(?P<min>\d*?),'
+                fr'.*?Avg=(?P<avg>.*?),.*?90=(?P<p90>\d*?),'
+                fr'.*?99=(?P<p99>\d*?),.*?99.9=(?P<p999>\d*?),'
+                fr'.*?99.99=(?P<p9999>\d*?)[\],\s]'
+            )
+
     @staticmethod
     def gauge_name(operation):
         return 'collectd_ycsb_%s_gauge' % operation.replace('-', '_')
@@ -66,50 +79,28 @@ class YcsbStatsPublisher(FileFollowerThread):
             stat = status_match.groupdict()
             self.set_metric('verify', stat['status'], float(stat['value']))
 
-    def run(self):
-        # pylint: disable=too-many-nested-blocks
-
-        # 729.39 current ops/sec;
-        # [READ: Count=510, Max=195327, Min=2011, Avg=4598.69, 90=5743, 99=12583, 99.9=194815, 99.99=195327]
-        # [CLEANUP: Count=5, Max=3, Min=0, Avg=0.6, 90=3, 99=3, 99.9=3, 99.99=3]
-        # [UPDATE: Count=490, Max=190975, Min=2004, Avg=3866.96, 90=4395, 99=6755, 99.9=190975, 99.99=190975]
-
-        regex_dict = {}
-        for operation in self.collectible_ops:
-            regex_dict[operation] = re.compile(
-                fr'\[{operation.upper()}:\sCount=(?P<count>\d*?),'
-                fr'.*?Max=(?P<max>\d*?),.*?Min=(?P<min>\d*?),'
-                fr'.*?Avg=(?P<avg>.*?),.*?90=(?P<p90>\d*?),'
-                fr'.*?99=(?P<p99>\d*?),.*?99.9=(?P<p999>\d*?),'
-                fr'.*?99.99=(?P<p9999>\d*?)[\],\s]'
-            )
-
-        while not self.stopped():
-            exists = os.path.isfile(self.ycsb_log_filename)
-            if not exists:
-                time.sleep(0.5)
-                continue
-
-            for _, line in enumerate(self.follow_file(self.ycsb_log_filename)):
-                if self.stopped():
-                    break
-                try:
-                    for operation, regex in regex_dict.items():
-                        match = regex.search(line)
-                        if match:
-                            if operation == 'verify':
-                                self.handle_verify_metric(line)
-
-                            for key, value in match.groupdict().items():
-                                if not key == 'count':
-                                    try:
-                                        value = float(value) / 1000.0
-                                    except ValueError:
-                                        value = float(0)
-                                self.set_metric(operation, key, float(value))
-
-                except Exception:  # pylint: disable=broad-except
-                    LOGGER.exception("fail to send metric")
+    @property
+    def followed_file(self):
+        return self.ycsb_log_filename
+
+    def handle_line(self, line_number, line):
+        try:
+            for operation, regex in self.regex_dict.items():
+                match = regex.search(line)
+                if match:
+                    if operation == 'verify':
+                        self.handle_verify_metric(line)
+
+                    for key, value in match.groupdict().items():
+                        if not key == 'count':
+                            try:
+                                value = float(value) / 1000.0
+                            except ValueError:
+                                value = float(0)
+                        self.set_metric(operation, key, float(value))
+
+        except Exception:  # pylint: disable=broad-except
+            LOGGER.exception("fail to send metric")
 
 
 class YcsbStressThread(DockerBasedStressThread):  # pylint: disable=too-many-instance-attributes
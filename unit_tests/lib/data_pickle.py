@@ -56,6 +56,9 @@ class Pickler:
             'init_args': {
                 'process_retry': 0,
                 'node': None,
+                'build_id': None,
+                'backtrace_hash': None,
+                'stage_timings': None,
                 '*': PicklerAction.PASSTHROUGH,
             },
             'instance_attrs': {
@@ -76,4 +76,6 @@ class EventsUtilsMixin:
 
     @classmethod
     def get_raw_events_log(cls):
-        return get_events_main_device(_registry=cls.events_processes_registry).raw_events_log
+        events_main_device = get_events_main_device(_registry=cls.events_processes_registry)
+        events_main_device.flush_raw_events_log()
+        return events_main_device.raw_events_log
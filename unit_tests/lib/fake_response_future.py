@@ -0,0 +1,58 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+#
+# Copyright (c) 2022 ScyllaDB
+
+import threading
+
+
+class FakeResponseFuture:
+    """Deliver rows by pages of `fetch_size' rows using callbacks, like `cassandra.cluster.ResponseFuture'.
+
+    Pages are delivered from another thread if `delay' is set and synchronously otherwise.  If `error' is set,
+    it's passed to the errback instead of the page with number `error_page'.
+    """
+
+    def __init__(self, rows, fetch_size, delay=None, error=None, error_page=0):  # pylint: disable=too-many-arguments
+        self.pages = [rows[i:i + fetch_size] for i in range(0, len(rows), fetch_size)] or [[]]
+        self.delay = delay
+        self.error = error
+        self.error_page = error_page
+        self.requested_pages = 1
+        self.delivered_pages = 0
+        self._callback = self._errback = None
+
+    @property
+    def has_more_pages(self):
+        return self.delivered_pages < len(self.pages)
+
+    def add_callbacks(self, callback, errback):
+        self._callback, self._errback = callback, errback
+        self._deliver()
+
+    def start_fetching_next_page(self):
+        assert self.has_more_pages, "no more pages"
+        self.requested_pages += 1
+        self._deliver()
+
+    def _deliver(self):
+        if self.delay is None:
+            self._deliver_page()
+        else:
+            threading.Timer(self.delay, self._deliver_page).start()
+
+    def _deliver_page(self):
+        page_number = self.delivered_pages
+        if self.error is not None and page_number == self.error_page:
+            self._errback(self.error)
+            return
+        self.delivered_pages += 1
+        self._callback(self.pages[page_number])
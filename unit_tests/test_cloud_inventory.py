@@ -0,0 +1,180 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+#
+# Copyright (c) 2022 ScyllaDB
+
+import time
+import datetime
+import tempfile
+import threading
+import unittest
+
+import boto3
+from botocore.stub import Stubber
+from libcloud.compute.drivers.gce import GCENodeImage
+
+from sdcm.utils.cloud_inventory import AWS_INSTANCE_STATES, AwsInventory, GceInventory, InventoryCache
+
+LAUNCH_TIME = datetime.datetime(2022, 1, 1, 10, 0, tzinfo=datetime.timezone.utc)
+
+
+def instance(instance_id, state="running"):
+    return {"InstanceId": instance_id, "State": {"Name": state}, "LaunchTime": LAUNCH_TIME,
+            "Tags": [{"Key": "TestId", "Value": "abc"}]}
+
+
+class CloudInventoryTestBase(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(self.cache_dir.cleanup)
+        self.cache = InventoryCache(self.cache_dir.name)
+
+
+class TestAwsInventory(CloudInventoryTestBase):
+    def setUp(self):
+        super().setUp()
+        self.client = boto3.client("ec2", region_name="eu-west-1", aws_access_key_id="key",
+                                   aws_secret_access_key="secret")
+        self.stubber = Stubber(self.client)
+        self.stubber.activate()
+        self.addCleanup(self.stubber.deactivate)
+        self.inventory = AwsInventory(cache=self.cache, client_factory=lambda region: self.client)
+
+    def test_instances_are_listed_by_pages_with_server_side_filters(self):
+        filters = [{"Name": "tag:TestId", "Values": ["abc"]},
+                   {"Name": "instance-state-name", "Values": list(AWS_INSTANCE_STATES)}]
+        self.stubber.add_response(
+            "describe_instances",
+            {"Reservations": [{"Instances": [instance("i-1"), instance("i-2", "stopped")]}], "NextToken": "page-2"},
+            {"Filters": filters, "MaxResults": 1000})
+        self.stubber.add_response(
+            "describe_instances",
+            {"Reservations": [{"Instances": [instance("i-3")]}, {"Instances": [instance("i-4")]}]},
+            {"Filters": filters, "MaxResults": 1000, "NextToken": "page-2"})
+
+        instances = self.inventory.list_instances(region="eu-west-1", tags_dict={"TestId": "abc"})
+        self.assertEqual([item["InstanceId"] for item in instances], ["i-1", "i-2", "i-3", "i-4"])
+        self.stubber.assert_no_pending_responses()
+
+        # No more API calls, the listing is taken from the cache as is.
+        self.assertEqual(self.inventory.list_instances(region="eu-west-1", tags_dict={"TestId": "abc"}, max_age=60),
+                         instances)
+        self.assertEqual(self.cache.stats, {"cached": 1, "fetched": 1})
+
+    def test_max_age_and_invalidation(self):
+        running_filter = [{"Name": "instance-state-name", "Values": ["running"]}]
+        for instance_id in ("i-1", "i-2", "i-3"):
+            self.stubber.add_response("describe_instances",
+                                      {"Reservations": [{"Instances": [instance(instance_id)]}]},
+                                      {"Filters": running_filter, "MaxResults": 1000})
+
+        def list_instance_ids(max_age):
+            return [item["InstanceId"]
+                    for item in self.inventory.list_instances(region="eu-west-1", running=True, max_age=max_age)]
+
+        self.assertEqual(list_instance_ids(max_age=0), ["i-1"])
+        self.assertEqual(list_instance_ids(max_age=0), ["i-2"])
+        self.assertEqual(list_instance_ids(max_age=60), ["i-2"])
+        self.inventory.invalidate(kind="instances", region="eu-west-1")
+        self.assertEqual(list_instance_ids(max_age=60), ["i-3"])
+        self.stubber.assert_no_pending_responses()
+
+    def test_images(self):
+        filters = [{"Name": "name", "Values": ["ScyllaDB *"]}]
+        self.stubber.add_response(
+            "describe_images",
+            {"Images": [{"ImageId": "ami-1", "Name": "ScyllaDB 5.0.0", "CreationDate": "2022-01-01T10:00:00.000Z"},
+                        {"ImageId": "ami-2", "Name": "ScyllaDB 5.0.1", "CreationDate": "2022-02-01T10:00:00.000Z"}]},
+            {"Filters": filters, "Owners": ["797456418907"], "MaxResults": 1000})
+
+        for _ in range(2):
+            images = self.inventory.get_images(region="eu-west-1", filters=filters, owners=["797456418907"])
+            self.assertEqual([(image.image_id, image.name) for image in images],
+                             [("ami-2", "ScyllaDB 5.0.1"), ("ami-1", "ScyllaDB 5.0.0")])
+        self.stubber.assert_no_pending_responses()
+
+
+class FakeGceDriver:
+    def __init__(self, images):
+        self.images = images
+        self.filters = []
+
+    def list_images(self):
+        return self.images
+
+    def ex_list(self, list_fn, ex_project):
+        assert ex_project == "scylla-images"
+        driver = self
+
+        class _List:
+            @staticmethod
+            def filter(expression):
+                driver.filters.append(expression)
+                return [list_fn()[:1], list_fn()[1:]]
+        return _List()
+
+
+class TestGceInventory(CloudInventoryTestBase):
+    def test_images(self):
+        driver = FakeGceDriver([
+            GCENodeImage(id="1", name="scylla-5-0-0", driver=None,
+                         extra={"creationTimestamp": "2022-01-01", "selfLink": "link-1", "licenses": [object()]}),
+            GCENodeImage(id="2", name="scylla-5-0-1", driver=None,
+                         extra={"creationTimestamp": "2022-02-01", "selfLink": "link-2", "labels": {"a": "b"}}),
+        ])
+        inventory = GceInventory(driver_factory=lambda: driver, cache=self.cache)
+        for _ in range(2):
+            images = inventory.list_images(project="scylla-images", filters="(family eq scylla)")
+            self.assertEqual([(image.name, image.extra) for image in images], [
+                ("scylla-5-0-1", {"creationTimestamp": "2022-02-01", "selfLink": "link-2", "labels": {"a": "b"}}),
+                ("scylla-5-0-0", {"creationTimestamp": "2022-01-01", "selfLink": "link-1"}),
+            ])
+        self.assertEqual(driver.filters, ["(family eq scylla)"])
+        self.assertIn("name=scylla-5-0-1", repr(images[0]))
+
+
+class TestInventoryCache(CloudInventoryTestBase):
+    def test_datetime_values(self):
+        self.cache.put("aws-instances", "eu-west-1", [], [instance("i-1")])
+        self.assertEqual(self.cache.get("aws-instances", "eu-west-1", [], max_age=60), [instance("i-1")])
+        self.assertIsNone(self.cache.get("aws-instances", "eu-west-1", [{"Name": "other"}], max_age=60))
+        self.assertIsNone(self.cache.get("aws-instances", "eu-west-1", [], max_age=0))
+
+    def test_concurrent_fetches_of_same_listing(self):
+        fetch_started = threading.Event()
+        calls = []
+
+        def fetch():
+            calls.append(threading.current_thread().name)
+            fetch_started.set()
+            time.sleep(0.2)
+            return [len(calls)]
+
+        results = {}
+
+        def get_or_fetch(max_age):
+            results[threading.current_thread().name] = self.cache.get_or_fetch(
+                kind="aws-regions", region="eu-west-1", params=None, fetch=fetch, max_age=max_age)
+
+        first = threading.Thread(target=get_or_fetch, args=(60, ), name="first")
+        first.start()
+        fetch_started.wait(timeout=10)
+        # Waits for the first listing and takes it, because it's fresh enough.
+        second = threading.Thread(target=get_or_fetch, args=(60, ), name="second")
+        second.start()
+        for thread in (first, second):
+            thread.join(timeout=10)
+        self.assertEqual(calls, ["first"])
+        self.assertEqual(results, {"first": [1], "second": [1]})
+
+        # The listing started before the call, so it's not taken with `max_age=0'.
+        get_or_fetch(max_age=0)
+        self.assertEqual(results["MainThread"], [2])
@@ -0,0 +1,139 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+#
+# Copyright (c) 2022 ScyllaDB
+
+import time
+import threading
+import unittest
+import unittest.mock
+
+from sdcm.sct_events.base import SctEvent
+from sdcm.utils.cluster_health import ClusterHealthEngine
+
+
+SCHEMA = "cbe15453-33f3-3387-aaf1-4120548f41e8"
+
+
+class FakeNode:  # pylint: disable=too-many-instance-attributes
+    GOSSIP_STATUSES_FILTER_OUT = ["LEFT", "removed", "BOOT", "shutdown"]
+
+    def __init__(self, cluster, index):
+        self.cluster = cluster
+        self.name = f"node{index}"
+        self.ip_address = f"127.0.0.{index}"
+        self.running_nemesis = None
+        self.calls = 0
+        self.running = 0
+
+    def _gather(self, func):
+        with self.cluster.lock:
+            self.calls += 1
+            self.cluster.running += 1
+            self.cluster.max_running = max(self.cluster.max_running, self.cluster.running)
+        time.sleep(0.05)
+        try:
+            return func()
+        finally:
+            with self.cluster.lock:
+                self.cluster.running -= 1
+
+    def get_nodes_status(self):
+        return self._gather(lambda: {node.ip_address: {"status": self.cluster.status.get(node.name, "UN"), "dc": "dc1"}
+                                     for node in self.cluster.nodes})
+
+    def get_gossip_info(self):
+        return {node.ip_address: {"schema": SCHEMA, "status": "NORMAL", "dc": "dc1"} for node in self.cluster.nodes}
+
+    def get_peers_info(self):
+        return {node.ip_address: {"schema_version": SCHEMA, "host_id": node.name}
+                for node in self.cluster.nodes if node is not self}
+
+    def print_node_running_nemesis(self, node_ip):  # pylint: disable=unused-argument,no-self-use
+        return " (not target node)"
+
+    def run_cqlsh(self, *args, **kwargs):
+        pass
+
+    def __repr__(self):
+        return self.name
+
+
+class FakeCluster:  # pylint: disable=too-few-public-methods
+    dead_nodes_ip_address_list = ()
+
+    def __init__(self, nodes_count):
+        self.lock = threading.Lock()
+        self.running = self.max_running = 0
+        self.status = {}
+        self.nodes = [FakeNode(self, index) for index in range(1, nodes_count + 1)]
+
+
+class TestClusterHealthEngine(unittest.TestCase):
+    def setUp(self):
+        self.published = []
+        patcher = unittest.mock.patch.object(SctEvent, "publish", autospec=True,
+                                             side_effect=lambda event, **_: self.published.append(event))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        delay_patcher = unittest.mock.patch("sdcm.utils.cluster_health.CHECK_NODE_HEALTH_RETRY_DELAY", 0)
+        delay_patcher.start()
+        self.addCleanup(delay_patcher.stop)
+
+    def test_snapshot_is_gathered_concurrently_and_cached(self):
+        cluster = FakeCluster(nodes_count=10)
+        engine = ClusterHealthEngine(cluster=cluster, snapshot_ttl=60)
+        snapshot = engine.get_snapshot()
+        self.assertEqual(sorted(snapshot.views), sorted(node.name for node in cluster.nodes))
+        self.assertGreater(cluster.max_running, 1)
+        self.assertLess(snapshot.duration, 0.05 * len(cluster.nodes))
+
+        self.assertIs(engine.get_snapshot(), snapshot)
+        self.assertIsNot(engine.get_snapshot(max_age=0), snapshot)
+        self.assertTrue(all(node.calls == 2 for node in cluster.nodes))
+
+    def test_healthy_cluster(self):
+        cluster = FakeCluster(nodes_count=3)
+        engine = ClusterHealthEngine(cluster=cluster)
+        self.assertEqual(engine.check(), [])
+        self.assertEqual(self.published, [])
+        self.assertTrue(all(node.calls == 1 for node in cluster.nodes))
+
+        # The snapshot is reused by a check which runs shortly after.
+        self.assertEqual(engine.check(nodes=cluster.nodes[:1]), [])
+        self.assertTrue(all(node.calls == 1 for node in cluster.nodes))
+
+    def test_only_unhealthy_nodes_are_rechecked(self):
+        cluster = FakeCluster(nodes_count=3)
+        cluster.status["node2"] = "DN"
+        engine = ClusterHealthEngine(cluster=cluster)
+        unhealthy = engine.check(retries=3)
+        self.assertEqual(unhealthy, cluster.nodes)
+        self.assertEqual([node.calls for node in cluster.nodes], [3, 3, 3])
+        # Events are published on the last attempt only.
+        self.assertEqual({event.node for event in self.published}, {"node1", "node2", "node3"})
+        self.assertTrue(all("127.0.0.2" in event.error for event in self.published))
+
+    def test_node_recovers_between_attempts(self):
+        cluster = FakeCluster(nodes_count=3)
+        cluster.status["node2"] = "DN"
+        node1 = cluster.nodes[0]
+        original = node1.get_nodes_status
+
+        def get_nodes_status():
+            if node1.calls:
+                cluster.status.clear()
+            return original()
+        node1.get_nodes_status = get_nodes_status
+
+        engine = ClusterHealthEngine(cluster=cluster)
+        self.assertEqual(engine.check(retries=3), [])
+        self.assertEqual(self.published, [])
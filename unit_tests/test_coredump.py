@@ -5,7 +5,8 @@ import tempfile
 from abc import abstractmethod
 
 from sdcm.cluster import BaseNode
-from sdcm.coredump import CoredumpExportSystemdThread, CoreDumpInfo, CoredumpExportFileThread, CoredumpThreadBase
+from sdcm.coredump import CoredumpExportSystemdThread, CoreDumpInfo, CoredumpExportFileThread, CoredumpThreadBase, \
+    get_backtrace_hash, get_build_id
 from unit_tests.lib.data_pickle import Pickler
 from unit_tests.lib.mock_remoter import MockRemoter
 
@@ -195,3 +196,72 @@ class CoredumpExportFileTest(CoredumpExportTestBase):
 
     def test_fail_get_list_test(self):
         self._run_coredump_with_fake_remoter('fail_get_list_test')
+
+
+COREDUMP_INFO = """
+           PID: {pid} (scylla)
+    Executable: /opt/scylladb/libexec/scylla
+       Storage: /var/lib/systemd/coredump/core.scylla.996.0dc7f4137d5f47a3bda07dd046937fc2.{pid}.1578998425000000.lz4
+       Message: Process {pid} (scylla) of user 996 dumped core.
+
+                Module /opt/scylladb/libexec/scylla with build-id 1f3b7a1a51b7c56b4e0f5bb2a0e8f3e8fc1c2a4c
+                Module linux-vdso.so.1 with build-id 63ba1e7e1ba7c3b4f3f1b8c8f2e4f52f1d5fd6b2
+                Stack trace of thread {pid}:
+                #0  0x00007ffc2e72{pid:04d} n/a (linux-vdso.so.1)
+                #1  0x0000000002ab94e5 _ZN7seastar7reactor3runEv (scylla)
+                #2  0x0000000000794222 main (scylla)
+
+                Stack trace of thread 1{pid}:
+                #0  0x00007f251c3082c3 __clock_gettime (libc.so.6)
+"""
+
+
+class CoredumpSignatureTestThread(CoredumpExportSystemdTestThread):
+    def __init__(self, node: 'BaseNode', max_core_upload_limit: int):
+        self.uploads = []
+        self.published = []
+        super().__init__(node, max_core_upload_limit)
+
+    def publish_event(self, core_info: CoreDumpInfo):
+        self.published.append((core_info.pid, core_info.download_url))
+
+    def update_coredump_info_with_more_information(self, core_info: CoreDumpInfo):
+        core_info.update(corefile=f"/var/lib/systemd/coredump/core.scylla.{core_info.pid}.lz4",
+                         executable="/opt/scylladb/libexec/scylla",
+                         coredump_info=COREDUMP_INFO.format(pid=int(core_info.pid)))
+        if core_info.pid == "3":
+            core_info.update(coredump_info=core_info.coredump_info.replace("main (scylla)", "abort (scylla)"))
+
+    def _upload_coredump(self, core_info: CoreDumpInfo):
+        self.uploads.append(core_info.pid)
+        core_info.update(download_url=f"https://storage.cloud.google.com/{core_info.pid}")
+
+
+class CoredumpSignatureTest(unittest.TestCase):
+    def test_signature(self):
+        core_info = CoreDumpInfo(pid="1")
+        self.assertIsNone(core_info.signature)
+        core_info.update(backtrace_hash=get_backtrace_hash(COREDUMP_INFO.format(pid=1)),
+                         build_id=get_build_id(COREDUMP_INFO.format(pid=1), "/opt/scylladb/libexec/scylla"))
+        self.assertEqual(core_info.signature, ("1f3b7a1a51b7c56b4e0f5bb2a0e8f3e8fc1c2a4c", core_info.backtrace_hash))
+        # Addresses of frames and traces of other threads don't change the hash
+        self.assertEqual(core_info.backtrace_hash, get_backtrace_hash(COREDUMP_INFO.format(pid=2)))
+        self.assertEqual(get_backtrace_hash("no stack traces"), "")
+        self.assertEqual(get_build_id(COREDUMP_INFO.format(pid=1), "linux-vdso.so.1"),
+                         "63ba1e7e1ba7c3b4f3f1b8c8f2e4f52f1d5fd6b2")
+
+    def test_duplicates_are_not_uploaded(self):
+        coredump_thread = CoredumpSignatureTestThread(FakeNode(None, tempfile.mkdtemp()), 5)
+        coredump_thread.in_progress = [CoreDumpInfo(pid=pid) for pid in ("1", "2", "3", "4")]
+        coredump_thread.process_coredumps()
+        self.assertEqual(coredump_thread.uploads, ["1", "3"])
+        self.assertEqual([core.pid for core in coredump_thread.completed], ["1", "2", "3", "4"])
+        self.assertEqual([core.pid for core in coredump_thread.uploaded], ["1", "3"])
+        self.assertEqual(coredump_thread.completed[3].download_url, "https://storage.cloud.google.com/1")
+        # Duplicates are reported with the link to the core of the same crash.
+        self.assertEqual(sorted(coredump_thread.published),
+                         [("1", "https://storage.cloud.google.com/1"), ("2", "https://storage.cloud.google.com/1"),
+                          ("3", "https://storage.cloud.google.com/3"), ("4", "https://storage.cloud.google.com/1")])
+        self.assertEqual(set(coredump_thread.get_stage_timings_summary()), {"metadata", "upload"})
+        self.assertEqual(coredump_thread.get_stage_timings_summary()["metadata"]["count"], 4)
+        self.assertEqual(set(coredump_thread.uploaded[0].stage_timings), {"metadata", "upload"})
@@ -0,0 +1,142 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+#
+# Copyright (c) 2022 ScyllaDB
+
+import os
+import re
+import sys
+import unittest
+import subprocess
+from collections import namedtuple
+
+from sdcm.utils.data_validator import \
+    LongevityDataValidator, KeysFingerprint, TOKEN_RING_MIN, TOKEN_RING_MAX, split_token_ring, \
+    compare_rows_in_token_order
+from unit_tests.lib.fake_response_future import FakeResponseFuture
+
+
+SchemaColumn = namedtuple("SchemaColumn", ["column_name", "kind", "position"])
+SELECT_RE = re.compile(r"SELECT token\((?P<pk>[^)]+)\), (?P<columns>.+) FROM \w+\.(?P<table>\w+) "
+                       r"WHERE token\([^)]+\) >= (?P<start>-?\d+) AND token\([^)]+\) <= (?P<end>-?\d+)")
+
+
+class FakeSession:
+    """Serve SELECTs by token ranges from in-memory tables: {name: (partition key, clustering key, rows)}."""
+
+    def __init__(self, tables):
+        self.tables = tables
+
+    @staticmethod
+    def token(values):
+        return hash(values) % 2 ** 64 + TOKEN_RING_MIN
+
+    def execute(self, statement, parameters=None):
+        if parameters:  # system_schema.columns query
+            partition_key, clustering_key, rows = self.tables[parameters[1]]
+            columns = [SchemaColumn(name, "partition_key", i) for i, name in enumerate(partition_key)]
+            columns += [SchemaColumn(name, "clustering", i) for i, name in enumerate(clustering_key)]
+            columns += [SchemaColumn(name, "regular", -1)
+                        for name in rows[0] if name not in partition_key + clustering_key]
+            return columns
+        raise AssertionError(f"Unexpected synchronous query: {statement}")
+
+    def execute_async(self, statement):
+        query = SELECT_RE.match(statement.query_string)
+        partition_key, _, rows = self.tables[query.group("table")]
+        columns = query.group("columns").split(", ")
+        result = []
+        for row in rows:
+            token = self.token(tuple(row[name] for name in partition_key))
+            if int(query.group("start")) <= token <= int(query.group("end")):
+                result.append((token, *(row[name] for name in columns)))
+        result.sort(key=lambda row: (row[0], row[1:]))
+        return FakeResponseFuture(rows=result, fetch_size=statement.fetch_size)
+
+
+class FakeTester:  # pylint: disable=too-few-public-methods
+    params = {}
+
+
+def make_rows(count, **overrides):
+    return [dict({"lwt_indicator": i % 50, "domain": i, "published_date": i % 7, "author": f"author{i}"}, **overrides)
+            for i in range(count)]
+
+
+class TestStreamingComparison(unittest.TestCase):
+    def test_split_token_ring(self):
+        ranges = split_token_ring(7)
+        self.assertEqual(ranges[0][0], TOKEN_RING_MIN)
+        self.assertEqual(ranges[-1][1], TOKEN_RING_MAX)
+        self.assertTrue(all(end + 1 == start for (_, end), (start, _) in zip(ranges, ranges[1:])))
+
+    def test_compare_rows_in_token_order(self):
+        actual = [(1, (1, ), (1, "a")), (2, (2, ), (2, "b")), (2, (3, ), (3, "c")), (5, (5, ), (5, "e"))]
+        expected = [(1, (1, ), (1, "a")), (2, (3, ), (3, "x")), (2, (2, ), (2, "b")), (4, (4, ), (4, "d"))]
+        comparison = compare_rows_in_token_order(iter(actual), iter(expected), max_mismatches=2)
+        self.assertEqual((comparison.actual_rows, comparison.expected_rows, comparison.mismatched_rows), (4, 4, 3))
+        self.assertEqual([mismatch.key for mismatch in comparison.mismatches], [(3, ), (4, )])
+        self.assertEqual(comparison.mismatches[0].actual, (3, "c"))
+        self.assertIsNone(comparison.mismatches[1].actual)
+
+    def test_keys_fingerprint_is_stable_across_processes(self):
+        fingerprint = KeysFingerprint(buckets=16)
+        for key in [(1, "a"), (2, "b"), (3, b"c")]:
+            fingerprint.add(key)
+        code = ("from sdcm.utils.data_validator import KeysFingerprint; fingerprint = KeysFingerprint(buckets=16); "
+                "[fingerprint.add(key) for key in [(1, 'a'), (2, 'b'), (3, b'c')]]; print(fingerprint.hashes)")
+        for seed in ("1", "2"):
+            result = subprocess.run([sys.executable, "-c", code], env={**os.environ, "PYTHONHASHSEED": seed},
+                                    cwd=os.path.dirname(os.path.dirname(__file__)), capture_output=True, text=True,
+                                    check=True)
+            self.assertEqual(result.stdout.strip(), str(fingerprint.hashes))
+
+
+class TestLongevityDataValidator(unittest.TestCase):
+    def make_validator(self, tables, validation_workers=1):
+        validator = LongevityDataValidator(longevity_self_object=FakeTester(), user_profile_name="c-s_lwt",
+                                           base_table_partition_keys=["domain", "published_date"],
+                                           validation_workers=validation_workers)
+        validator._keyspace_name = "ks"  # pylint: disable=protected-access
+        validator.DEFAULT_FETCH_SIZE = 64  # read tables by many pages
+        return validator, FakeSession(tables)
+
+    def test_compare_tables(self):
+        rows = make_rows(1000)
+        broken = make_rows(1000)
+        broken[10]["author"] = "changed"
+        del broken[20]
+        tables = {"view": (["lwt_indicator"], ["domain", "published_date"], rows),
+                  "expect": (["lwt_indicator"], ["domain", "published_date"], broken),
+                  "expect_copy": (["lwt_indicator"], ["domain", "published_date"], list(rows))}
+        for workers in (1, 3):
+            validator, session = self.make_validator(tables, validation_workers=workers)
+            self.assertFalse(validator.compare_tables(session, "view", "expect_copy").mismatched_rows)
+            comparison = validator.compare_tables(session, "view", "expect")
+            self.assertEqual((comparison.actual_rows, comparison.expected_rows), (1000, 999))
+            self.assertEqual(comparison.mismatched_rows, 2)
+            self.assertEqual(sorted(mismatch.key[1] for mismatch in comparison.mismatches), [10, 20])
+
+    def test_compare_keys(self):
+        rows = make_rows(1000)
+        tables = {"before": (["lwt_indicator"], ["domain", "published_date"], rows[:600]),
+                  "after": (["lwt_indicator"], ["domain", "published_date"], rows[600:990]),
+                  "expect": (["domain"], ["published_date"], rows)}
+        for workers in (1, 2):
+            validator, session = self.make_validator(tables, validation_workers=workers)
+            comparison = validator.compare_keys(session, actual_tables=["before", "after"], expected_tables=["expect"],
+                                                columns=["domain", "published_date"])
+            self.assertEqual((comparison.actual_rows, comparison.expected_rows), (990, 1000))
+            self.assertEqual(comparison.table_rows["after"], 390)
+            self.assertEqual(comparison.mismatched_rows, 10)
+            self.assertEqual(sorted(mismatch.expected for mismatch in comparison.mismatches),
+                             [(i, i % 7) for i in range(990, 1000)])
+            self.assertEqual(validator.count_rows(session, "expect"), 1000)
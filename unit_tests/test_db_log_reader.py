@@ -0,0 +1,89 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+#
+# Copyright (c) 2022 ScyllaDB
+
+import os
+import gzip
+import shutil
+import tempfile
+import unittest
+
+from sdcm.db_log_reader import DbLogReader
+from sdcm.sct_events.database import SYSTEM_ERROR_EVENTS_PATTERNS
+
+
+SYSTEM_LOG = os.path.join(os.path.dirname(__file__), "test_data", "system.log")
+
+
+class CollectingDbLogReader(DbLogReader):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.events = []
+
+    def _publish_backtraces(self, backtraces):
+        for backtrace in backtraces:
+            backtrace["event"].dont_publish()
+            self.events.append(backtrace["event"])
+
+
+def summary(events):
+    return [(event.type, event.line_number, event.raw_backtrace) for event in events]
+
+
+class TestDbLogReader(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.system_log = os.path.join(self.temp_dir, "system.log")
+        self.checkpoint_path = os.path.join(self.temp_dir, "db_log_reader.checkpoint")
+
+    def make_reader(self):
+        return CollectingDbLogReader(system_log=self.system_log,
+                                     remoter=None,
+                                     node_name="node1",
+                                     system_event_patterns=SYSTEM_ERROR_EVENTS_PATTERNS,
+                                     decoding_queue=None,
+                                     log_lines=False,
+                                     checkpoint_path=self.checkpoint_path)
+
+    def test_replay(self):
+        events = DbLogReader.replay(SYSTEM_LOG, node_name="node1")
+        self.assertEqual(len(events), 18)
+        self.assertTrue(all(event.node == "node1" for event in events))
+        self.assertEqual(events[-1].type, "REACTOR_STALLED")
+        self.assertEqual(events[-1].line_number, 579)
+
+        with open(SYSTEM_LOG, "rb") as log_file, gzip.open(f"{self.system_log}.gz", "wb") as gz_file:
+            shutil.copyfileobj(log_file, gz_file)
+        self.assertEqual(summary(DbLogReader.replay(f"{self.system_log}.gz", node_name="node1")), summary(events))
+
+    def test_continue_after_restart(self):
+        with open(SYSTEM_LOG, encoding="utf-8") as log_file:
+            lines = log_file.readlines()
+
+        with open(self.system_log, "w", encoding="utf-8") as log_file:
+            log_file.writelines(lines[:400])
+        reader = self.make_reader()
+        reader._read_and_publish_events()  # pylint: disable=protected-access
+        reader._read_and_publish_events()  # pylint: disable=protected-access
+        reader._save_checkpoint(force=True)  # pylint: disable=protected-access
+        reader.log_tail.close()
+        self.assertEqual(len(reader.events), 14)
+
+        with open(self.system_log, "a", encoding="utf-8") as log_file:
+            log_file.writelines(lines[400:])
+        restarted = self.make_reader()
+        restarted._read_and_publish_events()  # pylint: disable=protected-access
+        restarted.log_tail.close()
+
+        self.assertEqual(summary(reader.events + restarted.events),
+                         summary(DbLogReader.replay(SYSTEM_LOG, node_name="node1")))
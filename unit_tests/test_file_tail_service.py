@@ -0,0 +1,126 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+#
+# Copyright (c) 2022 ScyllaDB
+
+import os
+import time
+import tempfile
+import unittest
+import threading
+
+from sdcm.utils.common import FileFollowerThread
+from sdcm.utils.file_tail_service import FileTailService
+
+
+def wait_for(predicate, timeout=10):
+    deadline = time.perf_counter() + timeout
+    while not predicate():
+        if time.perf_counter() > deadline:
+            raise AssertionError("Timeout")
+        time.sleep(0.01)
+
+
+class LinesCollector(FileFollowerThread):
+    def __init__(self, filename):
+        super().__init__()
+        self.filename = filename
+        self.lines = []
+
+    @property
+    def followed_file(self):
+        return self.filename
+
+    def handle_line(self, line_number, line):
+        self.lines.append((line_number, line))
+
+
+class TestFileTailService(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(self.temp_dir.cleanup)
+
+    def path(self, name):
+        return os.path.join(self.temp_dir.name, name)
+
+    def write(self, name, data):
+        with open(self.path(name), "a", encoding="utf-8") as log_file:
+            log_file.write(data)
+
+    def test_many_files_in_one_thread(self):
+        service = FileTailService(rescan_interval=60)
+        if not service.uses_inotify:
+            self.skipTest("inotify is not available")
+        lines = {f"stress{i}.log": [] for i in range(20)}
+        threads = set()
+
+        def handler(name):
+            def handle_line(line_number, line):
+                threads.add(threading.current_thread())
+                lines[name].append((line_number, line))
+            return handle_line
+
+        threads_count = threading.active_count()
+        self.write("stress0.log", "existing line\n")
+        subscriptions = [service.subscribe(self.path(name), handler(name)) for name in lines]
+        self.assertEqual(threading.active_count(), threads_count + 1)
+
+        for name in lines:
+            self.write(name, "line\nincomplete ")
+        # Events are dispatched on inotify events, long before the next rescan.
+        wait_for(lambda: all(name_lines for name_lines in lines.values()) and len(lines["stress0.log"]) == 2)
+        self.write("stress1.log", "line\n")
+        wait_for(lambda: len(lines["stress1.log"]) == 2)
+        self.assertEqual(lines["stress1.log"], [(0, "line\n"), (1, "incomplete line\n")])
+        self.assertEqual(lines["stress0.log"], [(0, "existing line\n"), (1, "line\n")])
+
+        for subscription in subscriptions:
+            subscription.stop()
+            self.assertTrue(subscription.future.done())
+        self.assertEqual(len(threads), 1)
+        self.assertNotIn(threading.main_thread(), threads)
+        self.assertEqual(lines["stress0.log"][-1], (2, "incomplete "))  # the rest is dispatched on stop
+        wait_for(lambda: service.thread is None)
+        self.assertEqual(service.subscriptions, [])
+
+    def test_handler_failure(self):
+        service = FileTailService(rescan_interval=0.05)
+        lines = []
+
+        def handle_line(line_number, line):
+            if line_number == 1:
+                raise ValueError("bad line")
+            lines.append(line)
+
+        subscription = service.subscribe(self.path("stress.log"), handle_line)
+        self.write("stress.log", "line 0\nline 1\nline 2\n")
+        wait_for(lambda: len(lines) == 2)
+        subscription.stop()
+        self.assertEqual(lines, ["line 0\n", "line 2\n"])
+
+    def test_polling(self):
+        service = FileTailService(poll_interval=0.05)
+        if service.uses_inotify:
+            service._inotify.close()  # pylint: disable=protected-access
+            service._inotify = None  # pylint: disable=protected-access
+        lines = []
+        subscription = service.subscribe(self.path("stress.log"), lambda _, line: lines.append(line))
+        self.write("stress.log", "line 0\n")
+        wait_for(lambda: lines == ["line 0\n"])
+        subscription.stop()
+
+    def test_file_follower_thread(self):
+        collector = LinesCollector(self.path("stress.log"))
+        with collector:
+            self.write("stress.log", "line 0\nline 1\nline")
+            wait_for(lambda: len(collector.lines) == 2)
+        self.assertEqual(collector.lines, [(0, "line 0\n"), (1, "line 1\n"), (2, "line")])
+        self.assertTrue(collector.future.done())
@@ -0,0 +1,141 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+#
+# Copyright (c) 2022 ScyllaDB
+
+import logging
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from sdcm.db_stats import TestStatsMixin
+
+from sdcm.utils.hdr_histogram import (
+    HdrHistogram,
+    HdrHistogramError,
+    merge_histograms,
+    merge_hdr_intervals,
+    parse_hdr_log,
+    zigzag_leb128_decode,
+    zigzag_leb128_encode,
+)
+
+
+def latencies(seed, size=100_000, scale=13):
+    return np.random.default_rng(seed=seed).lognormal(scale, 1, size=size).astype(np.int64)
+
+
+class TestHdrHistogram(unittest.TestCase):
+    def test_percentiles(self):
+        values = latencies(seed=1)
+        histogram = HdrHistogram().record_values(values)
+        self.assertEqual(histogram.total_count, values.size)
+        for percentile in (0, 50, 90, 99, 99.9, 100):
+            expected = np.percentile(values, percentile, method="inverted_cdf")
+            self.assertAlmostEqual(histogram.get_value_at_percentile(percentile) / expected, 1, delta=0.001)
+        self.assertAlmostEqual(histogram.mean / values.mean(), 1, delta=0.001)
+        self.assertAlmostEqual(histogram.stdev / values.std(), 1, delta=0.001)
+        self.assertAlmostEqual(histogram.max / values.max(), 1, delta=0.001)
+        self.assertEqual(HdrHistogram().get_value_at_percentile(99), 0)
+
+    def test_leb128(self):
+        values = np.array([0, 1, -1, 63, -64, 64, 300, -300, 2 ** 40, -2 ** 55, 2 ** 62, -2 ** 63 + 1], dtype=np.int64)
+        self.assertEqual(zigzag_leb128_decode(zigzag_leb128_encode(values)).tolist(), values.tolist())
+        self.assertEqual(zigzag_leb128_decode(zigzag_leb128_encode(values[:8])).tolist(), values[:8].tolist())
+        with self.assertRaises(HdrHistogramError):
+            zigzag_leb128_decode(b"\x80\x80")
+
+    def test_encode_decode(self):
+        histogram = HdrHistogram().record_values(latencies(seed=2))
+        histogram.record_values([0, 0, 5])
+        encoded = histogram.encode()
+        self.assertTrue(encoded.startswith("HISTF"))
+        decoded = HdrHistogram.decode(encoded)
+        np.testing.assert_array_equal(decoded.counts, histogram.counts)
+        self.assertEqual(decoded.encode(), encoded)
+        self.assertEqual(HdrHistogram.decode(HdrHistogram().encode()).total_count, 0)
+        with self.assertRaises(HdrHistogramError):
+            HdrHistogram.decode("bm90IGEgaGlzdG9ncmFt")
+
+    def test_merge(self):
+        first, second = latencies(seed=3), latencies(seed=4, scale=15)
+        merged = merge_histograms([HdrHistogram().record_values(first), HdrHistogram().record_values(second)])
+        expected = HdrHistogram().record_values(np.concatenate((first, second)))
+        np.testing.assert_array_equal(merged.counts, expected.counts)
+
+        # Histograms with a different precision are merged with the precision of the first one.
+        coarse = HdrHistogram(significant_figures=2).record_values(second)
+        merged = merge_histograms([HdrHistogram().record_values(first), coarse])
+        self.assertEqual(merged.total_count, first.size + second.size)
+        self.assertAlmostEqual(merged.get_value_at_percentile(99) / np.percentile(np.concatenate((first, second)), 99),
+                               1, delta=0.01)
+        self.assertIsNone(merge_histograms([]))
+
+    def test_parse_hdr_log(self):
+        write = [HdrHistogram().record_values(latencies(seed=seed, size=1000)) for seed in range(3)]
+        read = HdrHistogram().record_values(latencies(seed=10, size=1000))
+        lines = [
+            "#[Histogram log format version 1.3]",
+            "#[StartTime: 1600000000.000 (seconds since epoch), Sun Sep 13 12:26:40 UTC 2020]",
+            '"StartTimestamp","Interval_Length","Interval_Max","Interval_Compressed_Histogram"',
+            f"Tag=WRITE-st,0.000,1.000,1.0,{write[0].encode()}",
+            f"Tag=WRITE-st,1.000,1.000,1.0,{write[1].encode()}",
+            f"Tag=READ-st,1.000,1.000,1.0,{read.encode()}",
+            "Tag=READ-st,1.000,1.000,1.0,broken",
+            f"Tag=WRITE-st,2.000,1.000,1.0,{write[2].encode()}",
+        ]
+        intervals = list(parse_hdr_log(lines))
+        self.assertEqual([(interval.tag, interval.start) for interval in intervals],
+                         [("WRITE-st", 1600000000), ("WRITE-st", 1600000001), ("READ-st", 1600000001),
+                          ("WRITE-st", 1600000002)])
+
+        histograms = merge_hdr_intervals(intervals)
+        np.testing.assert_array_equal(histograms["WRITE-st"].counts, merge_histograms(write).counts)
+        self.assertEqual(histograms["READ-st"].total_count, 1000)
+
+        window = merge_hdr_intervals(intervals, start=1600000001, end=1600000002)
+        np.testing.assert_array_equal(window["WRITE-st"].counts, write[1].counts)
+        self.assertEqual(set(window), {"WRITE-st", "READ-st"})
+
+
+class FakeTestStats(TestStatsMixin):  # pylint: disable=too-few-public-methods
+    def __init__(self):  # pylint: disable=super-init-not-called
+        self.log = logging.getLogger(__name__)
+        self._stats = self._init_stats()
+        self._hdr_log_files = []
+
+    def update(self, data):
+        pass
+
+
+class TestStressHistograms(unittest.TestCase):
+    def test_histograms_of_all_stress_queues_are_merged(self):
+        write = [HdrHistogram().record_values(latencies(seed=seed, size=1000)) for seed in range(2)]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            hdr_log_files = []
+            for index, histogram in enumerate(write):
+                hdr_log_file = Path(tmp_dir) / f"cassandra-stress-{index}.hdr"
+                hdr_log_file.write_text("\n".join([
+                    "#[StartTime: 1600000000.000 (seconds since epoch), Sun Sep 13 12:26:40 UTC 2020]",
+                    f"Tag=WRITE-st,{index}.000,1.000,1.0,{histogram.encode()}",
+                ]))
+                hdr_log_files.append(str(hdr_log_file))
+
+            stats = FakeTestStats()
+            stats.update_stress_histograms(hdr_log_files[:1])
+            latency_histograms = stats.update_stress_histograms(hdr_log_files[1:])
+            # The stats of the first stress queue are recalculated with the second one, and not replaced.
+            self.assertEqual(latency_histograms["total"]["WRITE-st"]["count"], 2000)
+            stats_average = stats._stats["results"]["stats_average"]  # pylint: disable=protected-access
+            self.assertEqual(stats_average["latency 99th percentile"],
+                             round(merge_histograms(write).summary()["p99"], 1))
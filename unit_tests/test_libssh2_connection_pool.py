@@ -0,0 +1,175 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+#
+# Copyright (c) 2022 ScyllaDB
+
+import sys
+import time
+import unittest
+import threading
+import multiprocessing
+
+from sdcm.remote.libssh2_client.exceptions import FailedToRunCommand, ConnectError
+from sdcm.remote.libssh2_client.pool import ConnectionPool, ConnectionPoolTimeout, PooledClient
+from sdcm.remote.remote_libssh_cmd_runner import RemoteLibSSH2CmdRunner
+
+
+class FakeClient:
+    def __init__(self, alive=True):
+        self.connected = False
+        self.alive = alive
+        self.running = 0
+        self.max_running = 0
+        self.lock = threading.Lock()
+
+    def connect(self):
+        self.connected = True
+
+    def disconnect(self):
+        self.connected = False
+
+    def check_if_alive(self):
+        return self.alive
+
+    def run(self, command, duration=0):
+        assert self.connected
+        if command == "break":
+            raise FailedToRunCommand(None, Exception("Socket error"))
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(duration)
+        with self.lock:
+            self.running -= 1
+        return command
+
+
+class TestConnectionPool(unittest.TestCase):
+    def make_pool(self, **kwargs):
+        clients = []
+
+        def client_factory():
+            clients.append(FakeClient())
+            return clients[-1]
+
+        return ConnectionPool(client_factory=client_factory, host="node1", **kwargs), clients
+
+    def run_in_threads(self, pool, count, duration=0.2):
+        client = PooledClient(pool)
+        threads = [threading.Thread(target=client.run, args=("true", duration)) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def test_connections_are_reused(self):
+        pool, clients = self.make_pool()
+        client = PooledClient(pool)
+        for _ in range(10):
+            self.assertEqual(client.run("true"), "true")
+        self.assertEqual(len(clients), 1)
+        self.assertEqual(pool.stats.leases, 10)
+
+    def test_channels_multiplexed(self):
+        pool, clients = self.make_pool(max_connections=2, max_channels=3)
+        self.run_in_threads(pool, count=6)
+        self.assertEqual(len(clients), 2)
+        self.assertEqual([client.max_running for client in clients], [3, 3])
+        self.assertEqual(pool.stats.waits, 0)
+
+    def test_wait_for_free_channel(self):
+        pool, clients = self.make_pool(max_connections=1, max_channels=2)
+        self.run_in_threads(pool, count=4)
+        self.assertEqual(len(clients), 1)
+        self.assertEqual(clients[0].max_running, 2)
+        self.assertEqual(pool.stats.waits, 2)
+        self.assertGreater(pool.stats.max_wait_time, 0.1)
+
+    def test_lease_timeout(self):
+        pool, _ = self.make_pool(max_connections=1, max_channels=1)
+        with pool.lease():
+            with self.assertRaises(ConnectionPoolTimeout):
+                with pool.lease(timeout=0.1):
+                    pass
+
+    def test_broken_connection_is_replaced(self):
+        pool, clients = self.make_pool()
+        client = PooledClient(pool)
+        client.run("true")
+        with self.assertRaises(FailedToRunCommand):
+            client.run("break")
+        self.assertFalse(clients[0].connected)
+        self.assertEqual(pool.connections, 0)
+        self.assertEqual(client.run("true"), "true")
+        self.assertEqual(len(clients), 2)
+        self.assertEqual(pool.stats.reconnects, 1)
+
+    def test_health_check(self):
+        pool, clients = self.make_pool(health_check_interval=0)
+        client = PooledClient(pool)
+        client.run("true")
+        clients[0].alive = False
+        self.assertEqual(client.run("true"), "true")
+        self.assertEqual(len(clients), 2)
+        self.assertFalse(clients[0].connected)
+
+    def test_idle_eviction(self):
+        pool, clients = self.make_pool(max_connections=2, idle_timeout=0.1)
+        self.run_in_threads(pool, count=2, duration=0.05)  # long enough to open both connections
+        self.assertEqual(len(clients), 2)
+        time.sleep(0.2)
+        PooledClient(pool).run("true")
+        self.assertEqual(pool.connections, 1)
+        self.assertEqual(pool.stats.evictions, 1)
+        self.assertEqual(sum(client.connected for client in clients), 1)
+
+    def test_reset(self):
+        pool, clients = self.make_pool()
+        with pool.lease() as client:
+            pool.reset()
+            self.assertTrue(client.connected)  # is in use
+        self.assertFalse(clients[0].connected)
+        self.assertEqual(pool.connections, 0)
+
+    def test_connect_error(self):
+        def client_factory():
+            client = FakeClient()
+            client.connect = lambda: (_ for _ in ()).throw(OSError("Connection refused"))
+            return client
+
+        pool = ConnectionPool(client_factory=client_factory, host="node1", max_connections=1)
+        for _ in range(2):  # the connection slot is released after a failure
+            with self.assertRaisesRegex(ConnectError, "Connection refused"):
+                PooledClient(pool).run("true")
+
+    def test_fork_while_lease_is_held(self):
+        pool, clients = self.make_pool(max_connections=1, max_channels=1)
+        runner = RemoteLibSSH2CmdRunner(hostname="node1")
+        runner._pooled_client = PooledClient(pool)  # pylint: disable=protected-access
+
+        def run_in_child():
+            # The connection and the lock of the pool are busy in the parent, the child uses a new connection.
+            with pool.lease(timeout=1) as client:
+                assert client.run("true") == "true"
+            assert len(clients) == 2 and pool.connections == 1
+            assert clients[0].connected  # the connection of the parent is not closed by the child
+            assert runner._pooled_client is None  # pylint: disable=protected-access
+            sys.exit(0)
+
+        with pool.lease():
+            with pool._lock:  # pylint: disable=protected-access
+                child = multiprocessing.get_context("fork").Process(target=run_in_child)
+                child.start()
+            child.join(timeout=30)
+        self.assertEqual(child.exitcode, 0)
+        self.assertEqual(pool.connections, 1)
+        self.assertTrue(clients[0].connected)
+
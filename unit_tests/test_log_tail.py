@@ -0,0 +1,118 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+#
+# Copyright (c) 2022 ScyllaDB
+
+import os
+import time
+import tempfile
+import unittest
+import threading
+
+from sdcm.utils.log_tail import LogCheckpoint, LogTail, FileChangeWatcher
+
+
+class TestLogTail(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(self.temp_dir.cleanup)
+        self.path = os.path.join(self.temp_dir.name, "system.log")
+
+    def write(self, data, mode="a", path=None):
+        with open(path or self.path, mode, encoding="utf-8") as log_file:
+            log_file.write(data)
+
+    @staticmethod
+    def read(tail):
+        return list(tail.read_lines())
+
+    def test_missing_file(self):
+        tail = LogTail(self.path)
+        self.assertEqual(self.read(tail), [])
+        self.write("line 0\n")
+        self.assertEqual(self.read(tail), [(0, "line 0\n")])
+
+    def test_incomplete_line_is_postponed(self):
+        tail = LogTail(self.path, chunk_size=4)
+        self.write("line 0\nline")
+        self.assertEqual(self.read(tail), [(0, "line 0\n")])
+        self.assertEqual(tail.checkpoint.offset, 7)
+        self.write(" 1\nline 2\n")
+        self.assertEqual(self.read(tail), [(1, "line 1\n"), (2, "line 2\n")])
+        self.assertEqual(self.read(tail), [])
+        self.write("line 3")
+        self.assertEqual(list(tail.read_to_end()), [(3, "line 3")])
+
+    def test_continue_from_checkpoint(self):
+        checkpoint_path = os.path.join(self.temp_dir.name, "checkpoint")
+        self.write("line 0\nline 1\n")
+        tail = LogTail(self.path)
+        self.assertEqual(len(self.read(tail)), 2)
+        tail.checkpoint.save(checkpoint_path)
+        tail.close()
+
+        self.write("line 2\n")
+        with LogTail(self.path, checkpoint=LogCheckpoint.load(checkpoint_path)) as tail:
+            self.assertEqual(self.read(tail), [(2, "line 2\n")])
+
+    def test_truncation(self):
+        tail = LogTail(self.path)
+        self.write("line 0\nline 1\n")
+        self.assertEqual(len(self.read(tail)), 2)
+        self.write("new 0\n", mode="w")
+        self.assertEqual(self.read(tail), [(0, "new 0\n")])
+
+    def test_rotation(self):
+        tail = LogTail(self.path)
+        self.write("line 0\n")
+        self.assertEqual(len(self.read(tail)), 1)
+        self.write("line 1\nline 2")
+        os.rename(self.path, f"{self.path}.1")
+        self.assertEqual(self.read(tail), [(1, "line 1\n")])  # the new file is not created yet
+        self.write("new 0\n")
+        self.assertEqual(self.read(tail), [(2, "line 2"), (0, "new 0\n")])
+
+    def test_rotation_while_stopped(self):
+        self.write("line 0\n")
+        tail = LogTail(self.path)
+        self.assertEqual(len(self.read(tail)), 1)
+        checkpoint = tail.checkpoint
+        tail.close()
+
+        self.write("line 1\n")
+        os.rename(self.path, f"{self.path}.1")
+        self.write("new 0\n")
+        with LogTail(self.path, checkpoint=checkpoint) as tail:
+            self.assertEqual(self.read(tail), [(1, "line 1\n"), (0, "new 0\n")])
+
+    def test_malformed_checkpoint(self):
+        checkpoint_path = os.path.join(self.temp_dir.name, "checkpoint")
+        self.write("{not json", path=checkpoint_path)
+        self.assertEqual(LogCheckpoint.load(checkpoint_path), LogCheckpoint())
+
+
+class TestFileChangeWatcher(unittest.TestCase):
+    def test_wait_for_change(self):
+        with tempfile.TemporaryDirectory() as temp_dir, \
+                FileChangeWatcher(os.path.join(temp_dir, "system.log")) as watcher:
+            if not watcher.uses_inotify:
+                self.skipTest("inotify is not available")
+            with open(os.path.join(temp_dir, "other.log"), "w", encoding="utf-8") as other_file:
+                other_file.write("not interesting")
+            self.assertFalse(watcher.wait(timeout=0.2))
+
+            def write():
+                with open(os.path.join(temp_dir, "system.log"), "w", encoding="utf-8") as log_file:
+                    log_file.write("line\n")
+            threading.Timer(0.2, write).start()
+            start = time.perf_counter()
+            self.assertTrue(watcher.wait(timeout=10))
+            self.assertLess(time.perf_counter() - start, 5)
@@ -0,0 +1,205 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+#
+# Copyright (c) 2022 ScyllaDB
+
+import io
+import os
+import time
+import shutil
+import tarfile
+import tempfile
+import unittest
+import threading
+import unittest.mock
+
+from sdcm.logcollector import LogCollector, LogCollectionState, BaseLogEntity, SCTLogCollector
+from sdcm.utils.common import S3MultipartUploadWriter
+
+
+class FakeS3Client:  # pylint: disable=invalid-name,unused-argument,too-many-arguments
+    def __init__(self, fail_on_part=None):
+        self.parts = {}
+        self.objects = {}
+        self.aborted = []
+        self.fail_on_part = fail_on_part
+
+    def create_multipart_upload(self, Bucket, Key):
+        return {"UploadId": f"upload-{Key}"}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        if PartNumber == self.fail_on_part:
+            raise ConnectionError("connection reset")
+        self.parts[(UploadId, PartNumber)] = Body
+        return {"ETag": f"etag-{PartNumber}"}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        self.objects[Key] = b"".join(self.parts[(UploadId, part["PartNumber"])] for part in MultipartUpload["Parts"])
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.aborted.append(Key)
+
+
+class FakeS3Storage:
+    client = None
+
+    def open_multipart_upload(self, file_name, dest_dir="", **kwargs):
+        writer = S3MultipartUploadWriter(client=self.client, bucket_name="bucket", key=f"{dest_dir}/{file_name}",
+                                         **kwargs)
+        writer.part_size = 64 * 1024  # make many parts
+        return writer
+
+    @staticmethod
+    def generate_url(file_path, dest_dir=""):
+        return f"https://bucket/{dest_dir}/{file_path}"
+
+    def set_public_access(self, key):
+        pass
+
+
+class FakeNode:  # pylint: disable=too-few-public-methods
+    remoter = None
+
+    def __init__(self, name):
+        self.name = name
+
+
+class FakeLogEntity(BaseLogEntity):
+    concurrent = True
+
+    def __init__(self, name, concurrent=True, fail=False):
+        super().__init__(name=name)
+        self.concurrent = concurrent
+        self.fail = fail
+        self.collected = []
+        self.running = 0
+        self.max_running = 0
+        self._lock = threading.Lock()
+
+    def collect(self, node, local_dst, remote_dst=None, local_search_path=None):
+        if self.fail:
+            raise RuntimeError("failed")
+        with self._lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(0.1)
+        with open(os.path.join(local_dst, self.name), "w", encoding="utf-8") as log_file:
+            log_file.write(f"{self.name} of {node.name}: {os.urandom(32 * 1024).hex()}\n")  # doesn't compress well
+        self.collected.append(node.name)
+        with self._lock:
+            self.running -= 1
+
+
+class TestS3MultipartUploadWriter(unittest.TestCase):
+    def test_upload(self):
+        client = FakeS3Client()
+        writer = S3MultipartUploadWriter(client=client, bucket_name="bucket", key="key", concurrency=2)
+        writer.part_size = 1000
+        data = os.urandom(10500)
+        for offset in range(0, len(data), 700):
+            writer.write(data[offset:offset + 700])
+        writer.close()
+        self.assertEqual(client.objects["key"], data)
+        self.assertEqual(len(client.parts), 11)
+        self.assertEqual(writer.bytes_uploaded, len(data))
+
+    def test_failed_part_aborts_upload(self):
+        client = FakeS3Client(fail_on_part=2)
+        writer = S3MultipartUploadWriter(client=client, bucket_name="bucket", key="key")
+        writer.part_size = 1000
+        with self.assertRaises(ConnectionError):
+            writer.write(os.urandom(5000))
+            writer.close()
+        self.assertEqual(client.aborted, ["key"])
+        self.assertNotIn("key", client.objects)
+
+
+class TestLogCollector(unittest.TestCase):
+    def setUp(self):
+        self.storage_dir = tempfile.mkdtemp()
+        self.s3_client = FakeS3Storage.client = FakeS3Client()
+        patcher = unittest.mock.patch("sdcm.logcollector.S3Storage", FakeS3Storage)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.storage_dir)
+
+    def make_collector(self, entities, nodes=3):
+        collector_class = type("FakeLogCollector", (LogCollector, ), {"log_entities": entities,
+                                                                      "cluster_log_type": "fake-cluster"})
+        return collector_class(nodes=[FakeNode(f"node{i}") for i in range(nodes)],
+                               test_id="12345678-test", storage_dir=self.storage_dir, params={})
+
+    def test_collect_and_stream_upload(self):
+        entities = [FakeLogEntity("a.log"), FakeLogEntity("b.log"), FakeLogEntity("c.log", concurrent=False)]
+        collector = self.make_collector(entities)
+        links = collector.collect_logs()
+        self.assertEqual(len(links), 1)
+        self.assertTrue(links[0].endswith(f"{os.path.basename(collector.local_dir)}.tar.gz"))
+        self.assertTrue(all(entity.max_running > 1 for entity in entities[:2]))
+        self.assertEqual(sorted(entities[2].collected), ["node0", "node1", "node2"])
+        archive, = self.s3_client.objects.values()
+        self.assertGreater(len(self.s3_client.parts), 1)
+        with tarfile.open(fileobj=io.BytesIO(archive), mode="r:gz") as tar:
+            names = {name for name in tar.getnames() if name.endswith(".log")}
+        self.assertEqual(len(names), 9)
+        self.assertFalse(os.path.exists(collector.local_dir))
+        self.assertFalse(os.path.exists(collector.state.path))
+
+    def test_resume_interrupted_collection(self):
+        collected = FakeLogEntity("a.log")
+        collector = self.make_collector([collected, FakeLogEntity("b.log", fail=True)])
+        with unittest.mock.patch.object(collector, "upload_archive", return_value=None):
+            self.assertEqual(collector.collect_logs(), [])
+        self.assertTrue(os.path.exists(collector.state.path))
+        self.assertEqual(len(collected.collected), 3)
+
+        with unittest.mock.patch.object(LogCollector, "_current_run", "another-run"):
+            resumed = self.make_collector([collected, FakeLogEntity("b.log")])
+        self.assertEqual(resumed.local_dir, collector.local_dir)
+        self.assertEqual(len(resumed.collect_logs()), 1)
+        self.assertEqual(len(collected.collected), 3)  # not collected again
+        self.assertFalse(os.path.exists(resumed.state.path))
+
+    def test_failed_uploads_are_skipped(self):
+        collector = SCTLogCollector(nodes=[], test_id="12345678-test", storage_dir=self.storage_dir, params={})
+        os.makedirs(collector.local_dir, exist_ok=True)
+        for name in ("sct.log", "events.log"):
+            with open(os.path.join(collector.local_dir, name), "w", encoding="utf-8") as log_file:
+                log_file.write(name)
+        with unittest.mock.patch.object(collector, "upload_archive", side_effect=[None, "https://bucket/uploaded"]):
+            self.assertEqual(collector.create_archive_per_file_and_upload(), ["https://bucket/uploaded"])
+        self.assertEqual(len(os.listdir(collector.local_dir)), 1)  # the file which failed to upload is kept
+        with unittest.mock.patch.object(collector, "upload_archive", return_value=None):
+            self.assertEqual(collector.create_single_archive_and_upload(), [])
+        self.assertTrue(os.path.exists(collector.local_dir))
+
+
+class TestLogCollectionState(unittest.TestCase):
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "state.json")
+            state = LogCollectionState(path)
+            state.start(run="20220101_000000")
+            state.mark_collected("node1", "system.log")
+            loaded = LogCollectionState(path)
+            self.assertEqual(loaded.run, "20220101_000000")
+            self.assertTrue(loaded.is_collected("node1", "system.log"))
+            self.assertFalse(loaded.is_collected("node2", "system.log"))
+            loaded.finish()
+            self.assertFalse(os.path.exists(path))
+
+    def test_malformed_state_is_ignored(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".json") as state_file:
+            state_file.write("{not json")
+            state_file.flush()
+            self.assertIsNone(LogCollectionState(state_file.name).run)
@@ -0,0 +1,206 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+#
+# Copyright (c) 2022 ScyllaDB
+
+import json
+import datetime
+import threading
+import unittest
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+from sdcm.mgmt import api as mgmt_api
+from sdcm.mgmt.api import ScyllaManagerApi, get_manager_api
+from sdcm.mgmt.cli import ManagerCluster, RepairTask, BackupTask
+from sdcm.mgmt.common import TaskStatus, HostStatus, HostSsl, HostRestStatus
+from sdcm.remote import LocalCmdRunner
+
+CLUSTER_ID = "1de39a6b-ce64-41be-a671-a7c621035c0f"
+REPAIR_ID = "2a4125d6-5d5a-45b9-9d8d-dec038b3732d"
+BACKUP_ID = "dd98f6ae-bcf4-4c98-8949-573d533bb789"
+RUN_ID = "e4f70414-ebe7-11e8-82c4-12c0dad619c2"
+ZERO_TIME = "0001-01-01T00:00:00Z"
+
+
+def task(task_type, task_id, status, next_activation=None):
+    return {"id": task_id, "type": task_type, "name": "", "enabled": True, "status": status,
+            "start_time": "2022-03-01T10:00:00.123456789Z", "end_time": ZERO_TIME,
+            "next_activation": next_activation, "retry": 0, "properties": {}}
+
+
+def run(task_type, task_id, status):
+    return {"id": RUN_ID, "task_id": task_id, "type": task_type, "status": status, "cause": "",
+            "start_time": "2022-03-01T10:00:00Z", "end_time": "2022-03-01T10:01:30Z"}
+
+
+REPAIR_PROGRESS = {
+    "run": run("repair", REPAIR_ID, "running"),
+    "progress": {"token_ranges": 400, "success": 100, "error": 0, "tables": [
+        {"keyspace": "keyspace1", "table": "standard1", "token_ranges": 200, "success": 100},
+        {"keyspace": "system_auth", "table": "roles", "token_ranges": 100, "success": 0},
+        {"keyspace": "system_auth", "table": "role_members", "token_ranges": 100, "success": 0},
+    ]},
+}
+BACKUP_PROGRESS = {
+    "run": run("backup", BACKUP_ID, "done"),
+    "progress": {"snapshot_tag": "sm_20220301100000UTC", "stage": "UPLOAD", "size": 1000, "uploaded": 200,
+                 "skipped": 50, "failed": 0},
+}
+CLUSTER_STATUS = [
+    {"dc": "dc1", "host": "192.168.100.11", "host_id": "a2b4200a", "cql_status": "UP", "cql_rtt_ms": 58.0,
+     "ssl": True, "rest_status": "UP", "rest_rtt_ms": 2.0},
+    {"dc": "dc2", "host": "192.168.100.23", "host_id": "08152d3d", "cql_status": "TIMEOUT", "ssl": False,
+     "rest_status": "HTTP", "rest_rtt_ms": 7.0, "rest_http_status_code": 503},
+]
+
+
+class FakeManagerHandler(BaseHTTPRequestHandler):
+    def _log_request(self, method, url):
+        self.server.requests.append((method, url.path, {key: value[0] for key, value in parse_qs(url.query).items()}))
+
+    def _reply(self, data, code=200):
+        body = b"" if data is None else json.dumps(data).encode()
+        self.send_response(code)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        url = urlparse(self.path)
+        with self.server.lock:
+            self._log_request("GET", url)
+            if url.path == "/ping":
+                self._reply(None, code=204)
+            elif url.path == f"/api/v1/cluster/{CLUSTER_ID}/tasks":
+                # Every listing returns the next state of the tasks, the last one is repeated.
+                self._reply(self.server.task_states[min(self.server.listings, len(self.server.task_states) - 1)])
+                self.server.listings += 1
+            elif url.path == f"/api/v1/cluster/{CLUSTER_ID}/task/repair/{REPAIR_ID}/latest":
+                self._reply(REPAIR_PROGRESS)
+            elif url.path == f"/api/v1/cluster/{CLUSTER_ID}/task/backup/{BACKUP_ID}/{RUN_ID}":
+                self._reply(BACKUP_PROGRESS)
+            elif url.path == f"/api/v1/cluster/{CLUSTER_ID}/task/backup/{BACKUP_ID}/history":
+                self._reply([run("backup", BACKUP_ID, "done")])
+            elif url.path == f"/api/v1/cluster/{CLUSTER_ID}/status":
+                self._reply(CLUSTER_STATUS)
+            else:
+                self._reply({"message": "not found"}, code=404)
+
+    def do_PUT(self):  # pylint: disable=invalid-name
+        url = urlparse(self.path)
+        with self.server.lock:
+            self._log_request("PUT", url)
+        self._reply(None)
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+
+class FakeManagerNode:  # pylint: disable=too-few-public-methods
+    """Manager node which runs `curl' locally, so the API is served by a fake HTTP server on the loopback address."""
+
+    name = "manager-node"
+
+    def __init__(self, port):
+        self.MANAGER_SERVER_PORT = port  # pylint: disable=invalid-name
+        self.remoter = LocalCmdRunner()
+
+    @staticmethod
+    def is_kubernetes():
+        return False
+
+
+class TestScyllaManagerApi(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), FakeManagerHandler)
+        self.server.lock = threading.Lock()
+        self.server.requests = []
+        self.server.listings = 0
+        self.server.task_states = [[task("repair", REPAIR_ID, "new"), task("backup", BACKUP_ID, "new")]]
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.addCleanup(mgmt_api._MANAGER_APIS.clear)  # pylint: disable=protected-access
+        self.node = FakeManagerNode(port=self.server.server_address[1])
+        self.api = get_manager_api(self.node)
+
+    def requests_to(self, path):
+        return [request for request in self.server.requests if request[1] == path]
+
+    def test_manager_api_is_shared(self):
+        self.assertIsInstance(self.api, ScyllaManagerApi)
+        self.assertEqual(self.api.url, f"http://127.0.0.1:{self.server.server_address[1]}")
+        self.assertIs(get_manager_api(self.node), self.api)
+        self.assertEqual(len(self.requests_to("/ping")), 1)
+
+    def test_task_status_is_cached_between_polls(self):
+        repair_task = RepairTask(task_id=f"repair/{REPAIR_ID}", cluster_id=CLUSTER_ID, manager_node=self.node)
+        backup_task = BackupTask(task_id=f"backup/{BACKUP_ID}", cluster_id=CLUSTER_ID, manager_node=self.node)
+        self.assertEqual(repair_task.status, TaskStatus.NEW)
+        self.assertEqual(backup_task.status, TaskStatus.NEW)
+        self.assertEqual(repair_task.progress, " 0%")
+        self.assertEqual(self.server.listings, 1)
+
+        repair_task.start(continue_task=False)
+        self.assertEqual(self.server.requests[-1],
+                         ("PUT", f"/api/v1/cluster/{CLUSTER_ID}/task/repair/{REPAIR_ID}/start", {"continue": "false"}))
+        # The listing is refreshed after the task is started.
+        self.assertEqual(repair_task.status, TaskStatus.NEW)
+        self.assertEqual(self.server.listings, 2)
+
+    def test_wait_for_many_tasks(self):
+        self.server.task_states = [
+            [task("repair", REPAIR_ID, "new"), task("backup", BACKUP_ID, "running")],
+            [task("repair", REPAIR_ID, "running"), task("backup", BACKUP_ID, "done")],
+            [task("repair", REPAIR_ID, "error", next_activation="2022-03-01T10:10:00Z"),
+             task("backup", BACKUP_ID, "done")],
+            [task("repair", REPAIR_ID, "error", next_activation=ZERO_TIME), task("backup", BACKUP_ID, "done")],
+        ]
+        tasks = [RepairTask(task_id=f"repair/{REPAIR_ID}", cluster_id=CLUSTER_ID, manager_node=self.node),
+                 BackupTask(task_id=f"backup/{BACKUP_ID}", cluster_id=CLUSTER_ID, manager_node=self.node)]
+        statuses = ManagerCluster(manager_node=self.node, cluster_id=CLUSTER_ID).wait_for_tasks(
+            tasks=tasks, list_status=[TaskStatus.DONE, TaskStatus.ERROR_FINAL], timeout=10, step=0.01)
+        self.assertEqual(statuses, {f"repair/{REPAIR_ID}": TaskStatus.ERROR_FINAL,
+                                    f"backup/{BACKUP_ID}": TaskStatus.DONE})
+        # One request per poll for all tasks.
+        self.assertEqual(self.server.listings, 4)
+
+    def test_progress(self):
+        repair_task = RepairTask(task_id=f"repair/{REPAIR_ID}", cluster_id=CLUSTER_ID, manager_node=self.node)
+        self.server.task_states = [[task("repair", REPAIR_ID, "running")]]
+        self.assertEqual(repair_task.progress, " 25%")
+        self.assertTrue(repair_task.has_progress_reached_percentage(25))
+        self.assertEqual(repair_task.per_keyspace_progress, {"keyspace1": 50.0, "system_auth": 0.0})
+        self.assertEqual(repair_task.duration, datetime.timedelta(seconds=90))
+
+        backup_task = BackupTask(task_id=f"backup/{BACKUP_ID}", cluster_id=CLUSTER_ID, manager_node=self.node)
+        self.assertEqual(backup_task.latest_run_id, RUN_ID)
+        for _ in range(2):
+            progress = self.api.get_task_progress(cluster_id=CLUSTER_ID, task_id=backup_task.id, run_id=RUN_ID)
+            self.assertEqual((progress.percent, progress.stage, progress.snapshot_tag),
+                             (25.0, "UPLOAD", "sm_20220301100000UTC"))
+        # Progress of a finished run is cached.
+        self.assertEqual(len(self.requests_to(f"/api/v1/cluster/{CLUSTER_ID}/task/backup/{BACKUP_ID}/{RUN_ID}")), 1)
+
+    def test_hosts_health(self):
+        hosts_health = ManagerCluster(manager_node=self.node, cluster_id=CLUSTER_ID).get_hosts_health()
+        self.assertEqual(
+            [(host, health.status, health.rtt, health.ssl, health.rest_status, health.rest_http_status_code)
+             for host, health in hosts_health.items()],
+            [("192.168.100.11", HostStatus.UP, 58.0, HostSsl.ON, HostRestStatus.UP, None),
+             ("192.168.100.23", HostStatus.TIMEOUT, None, HostSsl.OFF, HostRestStatus.HTTP, 503)])
+
+    def test_unreachable_manager(self):
+        self.server.shutdown()
+        self.server.server_close()
+        mgmt_api._MANAGER_APIS.clear()  # pylint: disable=protected-access
+        self.assertIsNone(get_manager_api(self.node))
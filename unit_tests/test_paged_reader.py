@@ -0,0 +1,66 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+#
+# Copyright (c) 2022 ScyllaDB
+
+import unittest
+
+from sdcm.utils.common import PagedReader, PageFetcher
+from unit_tests.lib.fake_response_future import FakeResponseFuture
+
+
+class TestPagedReader(unittest.TestCase):
+    def test_rows_in_order(self):
+        rows = list(range(1000))
+        for delay in (None, 0.001):
+            with self.subTest(delay=delay):
+                reader = PagedReader(FakeResponseFuture(rows=rows, fetch_size=30, delay=delay))
+                self.assertEqual(list(reader), rows)
+                self.assertEqual((reader.retrieved_pages, reader.retrieved_rows), (34, 1000))
+
+    def test_empty_result(self):
+        self.assertEqual(list(PagedReader(FakeResponseFuture(rows=[], fetch_size=10))), [])
+
+    def test_max_buffered_rows(self):
+        future = FakeResponseFuture(rows=list(range(100)), fetch_size=10)
+        rows = iter(PagedReader(future, max_buffered_rows=25))
+        self.assertEqual(future.requested_pages, 3)  # prefetched until the ceiling is reached
+        self.assertEqual(next(rows), 0)
+        self.assertEqual(future.requested_pages, 4)  # the first page is taken by the consumer
+        for _ in range(9):
+            next(rows)
+        self.assertEqual(future.requested_pages, 4)  # 30 rows are buffered
+        next(rows)
+        self.assertEqual(future.requested_pages, 5)
+        self.assertEqual(len(list(rows)), 89)
+        self.assertEqual(future.requested_pages, 10)
+
+    def test_error(self):
+        future = FakeResponseFuture(rows=list(range(100)), fetch_size=10, delay=0.001,
+                                    error=RuntimeError("read timeout"), error_page=2)
+        rows = []
+        with self.assertRaisesRegex(RuntimeError, "read timeout"):
+            for row in PagedReader(future):
+                rows.append(row)
+        self.assertEqual(rows, list(range(20)))
+
+    def test_page_timeout(self):
+        future = FakeResponseFuture(rows=list(range(100)), fetch_size=10, delay=5)
+        with self.assertRaises(TimeoutError):
+            list(PagedReader(future, page_timeout=0.1))
+
+
+class TestPageFetcher(unittest.TestCase):
+    def test_all_data(self):
+        future = FakeResponseFuture(rows=list(range(100)), fetch_size=10, delay=0.001)
+        fetcher = PageFetcher(future).request_all()
+        self.assertEqual(fetcher.all_data(), list(range(100)))
+        self.assertFalse(fetcher.has_more_pages)
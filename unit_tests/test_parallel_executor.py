@@ -0,0 +1,128 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+#
+# Copyright (c) 2022 ScyllaDB
+
+import time
+import threading
+import unittest
+from concurrent.futures import CancelledError, TimeoutError as FuturesTimeoutError
+
+from sdcm.utils.parallel_executor import ParallelExecutor, ParallelBatch, TaskState
+
+
+class TestParallelBatch(unittest.TestCase):
+    def setUp(self):
+        self.executor = ParallelExecutor(max_workers=4, idle_timeout=1)
+
+    def test_results_are_streamed(self):
+        batch = ParallelBatch(executor=self.executor)
+        for delay in (0.6, 0.1, 0.3):
+            batch.submit(delay, time.sleep, delay)
+        self.assertEqual([task.obj for task in batch.as_completed(timeout=5)], [0.1, 0.3, 0.6])
+
+    def test_concurrency_limit(self):
+        running, max_running, lock = [0], [0], threading.Lock()
+
+        def func(_):
+            with lock:
+                running[0] += 1
+                max_running[0] = max(max_running[0], running[0])
+            time.sleep(0.05)
+            with lock:
+                running[0] -= 1
+
+        batch = ParallelBatch(concurrency=2, executor=self.executor)
+        for i in range(10):
+            batch.submit(i, func, i)
+        tasks = list(batch.as_completed(timeout=5))
+        self.assertEqual(len(tasks), 10)
+        self.assertTrue(all(task.exc is None and task.duration >= 0.05 for task in tasks))
+        self.assertEqual(max_running[0], 2)
+
+    def test_task_timeout(self):
+        batch = ParallelBatch(concurrency=1, executor=self.executor)
+        batch.submit("slow", time.sleep, 2)
+        batch.submit("fast", time.sleep, 0)
+        start = time.perf_counter()
+        tasks = {task.obj: task for task in batch.as_completed(timeout=5, task_timeout=0.2)}
+        self.assertLess(time.perf_counter() - start, 1)
+        self.assertIsInstance(tasks["slow"].exc, FuturesTimeoutError)
+        self.assertIs(tasks["slow"].state, TaskState.TIMED_OUT)
+        self.assertIsNone(tasks["fast"].exc)
+
+    def test_global_timeout_cancels_queued_tasks(self):
+        calls = []
+        batch = ParallelBatch(concurrency=1, executor=self.executor)
+        batch.submit(1, lambda: time.sleep(0.5))
+        batch.submit(2, calls.append, 2)
+        tasks = {task.obj: task for task in batch.as_completed(timeout=0.2)}
+        self.assertIs(tasks[1].state, TaskState.TIMED_OUT)
+        self.assertIs(tasks[2].state, TaskState.CANCELLED)
+        self.assertIsInstance(tasks[2].exc, FuturesTimeoutError)
+        time.sleep(0.5)
+        self.assertEqual(calls, [])
+
+    def test_cancel(self):
+        calls = []
+        batch = ParallelBatch(concurrency=1, executor=self.executor)
+        batch.submit(1, time.sleep, 0.2)
+        for i in range(2, 5):
+            batch.submit(i, calls.append, i)
+        threading.Timer(0.05, batch.cancel).start()
+        tasks = {task.obj: task for task in batch.as_completed()}
+        self.assertIsNone(tasks[1].exc)
+        self.assertTrue(all(isinstance(tasks[i].exc, CancelledError) for i in range(2, 5)))
+        self.assertEqual(calls, [])
+
+    def test_nested_batches_dont_deadlock(self):
+        executor = ParallelExecutor(max_workers=2, idle_timeout=1)
+
+        def outer(i):
+            batch = ParallelBatch(executor=executor)
+            for j in range(3):
+                batch.submit(j, lambda i=i, j=j: i * 10 + j)
+            return sorted(task.result for task in batch.as_completed(timeout=5))
+
+        batch = ParallelBatch(executor=executor)
+        for i in range(4):
+            batch.submit(i, outer, i)
+        results = {task.obj: task.result for task in batch.as_completed(timeout=10)}
+        self.assertEqual(results, {i: [i * 10, i * 10 + 1, i * 10 + 2] for i in range(4)})
+
+    def test_idle_threads_are_reused_and_stopped(self):
+        executor = ParallelExecutor(max_workers=4, idle_timeout=0.2)
+        for _ in range(3):
+            batch = ParallelBatch(executor=executor)
+            for i in range(4):
+                batch.submit(i, time.sleep, 0.01)
+            list(batch.as_completed(timeout=5))
+        self.assertLessEqual(executor.threads, 4)
+        time.sleep(0.5)
+        self.assertEqual(executor.threads, 0)
+
+    def test_timed_out_tasks_free_their_slots(self):
+        executor = ParallelExecutor(max_workers=1, idle_timeout=1)
+        release = threading.Event()
+        self.addCleanup(release.set)
+        hung = ParallelBatch(executor=executor)
+        hung.submit("hung", release.wait)
+        self.assertIs(list(hung.as_completed(timeout=0.2))[0].state, TaskState.TIMED_OUT)
+        self.assertEqual(executor.abandoned, 1)
+
+        # The hung task still runs, but other batches get the slot.
+        batch = ParallelBatch(executor=executor)
+        batch.submit(1, time.sleep, 0)
+        self.assertIsNone(list(batch.as_completed(timeout=2))[0].exc)
+
+        release.set()
+        time.sleep(0.1)
+        self.assertEqual(executor.abandoned, 0)
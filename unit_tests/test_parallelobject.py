@@ -3,6 +3,7 @@ import time
 import logging
 import random
 import concurrent.futures
+from functools import partial
 
 
 from sdcm.utils.common import ParallelObject, ParallelObjectException
@@ -139,3 +140,23 @@ class ParallelObjectTester(unittest.TestCase):
         returned_results = [r.result for r in results]
         expected_results = [r[0][1] for r in self.list_as_arg]
         self.assertListEqual(returned_results, expected_results)
+
+    def test_as_completed_yields_results_when_ready(self):
+        parallel_object = ParallelObject([0.6, 0.1, 0.3], timeout=5, num_workers=3)
+        results = list(parallel_object.as_completed(dummy_func_return_single))
+        self.assertListEqual([r.result for r in results], [0.1, 0.3, 0.6])
+        for res_obj in results:
+            self.assertGreaterEqual(res_obj.duration, res_obj.obj)
+
+    def test_task_timeout(self):
+        parallel_object = ParallelObject([0, 3, 0], timeout=10, task_timeout=0.5)
+        start_time = time.time()
+        results = parallel_object.run(dummy_func_return_single, ignore_exceptions=True)
+        self.assertLess(time.time() - start_time, 2)
+        self.assertListEqual([r.result for r in results], [0, None, 0])
+        self.assertIsInstance(results[1].exc, concurrent.futures.TimeoutError)
+
+    def test_call_objects(self):
+        results = ParallelObject([partial(dummy_func_return_single, 0.1), partial(sum, (2, 3))],
+                                 timeout=5).call_objects()
+        self.assertListEqual([r.result for r in results], [0.1, 5])
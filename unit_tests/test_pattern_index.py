@@ -0,0 +1,94 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+#
+# Copyright (c) 2022 ScyllaDB
+
+import re
+import unittest
+from pathlib import Path
+
+from sdcm.sct_events.database import SYSTEM_ERROR_EVENTS_PATTERNS, get_pattern_to_event_to_func_mapping
+from sdcm.sct_events.system import INSTANCE_STATUS_EVENTS_PATTERNS
+from sdcm.utils.pattern_index import PatternIndex, required_literals
+
+
+TEST_DATA_DIR = Path(__file__).parent / "test_data"
+
+
+def first_match_one_by_one(patterns, line):
+    for pattern, value in patterns:
+        if pattern.search(line):
+            return value
+    return None
+
+
+class TestRequiredLiterals(unittest.TestCase):
+    def test_plain_literal(self):
+        self.assertEqual(required_literals(re.compile("Reactor stalled", re.IGNORECASE)), ["reactor stalled"])
+
+    def test_case_sensitive_literal(self):
+        self.assertEqual(required_literals(re.compile("Starting Scylla Server")), ["Starting Scylla Server"])
+
+    def test_longest_literal_is_chosen(self):
+        self.assertEqual(required_literals(re.compile(r"scylla.*State 'stop-sigterm' timed out")),
+                         ["State 'stop-sigterm' timed out"])
+
+    def test_branches(self):
+        self.assertEqual(required_literals(re.compile("Stopping Scylla Server|Failed to start")),
+                         ["Stopping Scylla Server", "Failed to start"])
+
+    def test_branch_without_literal(self):
+        self.assertIsNone(required_literals(re.compile(r"abc|\d+")))
+
+    def test_optional_group_ignored(self):
+        self.assertEqual(required_literals(re.compile("(optional)?x")), ["x"])
+        self.assertIsNone(required_literals(re.compile("(optional)?")))
+
+
+class TestPatternIndex(unittest.TestCase):
+    def test_empty_index(self):
+        self.assertIsNone(PatternIndex([]).search("some line"))
+
+    def test_first_pattern_in_order_wins(self):
+        index = PatternIndex([(re.compile("timed out for system.paxos"), 1), (re.compile("Exception "), 2)])
+        self.assertEqual(index.search("Exception timed out for system.paxos")[1], 1)
+        self.assertEqual(index.search("Exception happened")[1], 2)
+        self.assertIsNone(index.search("exception happened"))
+
+    def test_unconstrained_pattern(self):
+        index = PatternIndex([(re.compile(r"\d+ ms"), "ms"), (re.compile("abc"), "abc")])
+        self.assertEqual(index.search("abc took 10 ms")[1], "ms")
+        self.assertEqual(index.search("abc")[1], "abc")
+        self.assertIsNone(index.search("nothing"))
+
+    def test_match_object_has_groups(self):
+        index = PatternIndex((item.pattern, item) for item in get_pattern_to_event_to_func_mapping(node="node1"))
+        match, item = index.search(
+            "[shard 1] compaction - [Compact keyspace1.standard1 a05a9f50-8d4b-11ec-b2f3-ad1b5f5a3e9a] Compacting ")
+        self.assertEqual(item.event_class.__name__, "CompactionEvent")
+        self.assertEqual(match.group("shard"), "1")
+
+    def test_same_result_as_one_by_one_on_db_logs(self):
+        patterns = SYSTEM_ERROR_EVENTS_PATTERNS + INSTANCE_STATUS_EVENTS_PATTERNS
+        index = PatternIndex(patterns)
+        continuous_patterns = [(item.pattern, item) for item in get_pattern_to_event_to_func_mapping(node="node1")]
+        continuous_index = PatternIndex(continuous_patterns)
+        matched = 0
+        for log_file in TEST_DATA_DIR.glob("*.log"):
+            for line in log_file.read_text(encoding="utf-8").splitlines(keepends=True):
+                expected = first_match_one_by_one(patterns, line)
+                found = index.search(line)
+                self.assertIs(found and found[1], expected, line)
+                matched += expected is not None
+                expected = first_match_one_by_one(continuous_patterns, line)
+                found = continuous_index.search(line)
+                self.assertIs(found and found[1], expected, line)
+        self.assertGreater(matched, 0)
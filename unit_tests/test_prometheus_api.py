@@ -0,0 +1,142 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+#
+# Copyright (c) 2022 ScyllaDB
+
+import json
+import time
+import threading
+import unittest
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+import numpy as np
+
+from sdcm.db_stats import PrometheusDBStats
+from sdcm.utils.prometheus_api import PrometheusAPI, PROMETHEUS_MAX_POINTS_PER_SERIES, split_range
+
+
+PROMETHEUS_CONFIG = """
+scrape_configs:
+- job_name: scylla
+  scrape_interval: 20s
+- job_name: node_exporter
+  scrape_interval: 30s
+"""
+
+
+class FakePrometheusHandler(BaseHTTPRequestHandler):
+    def do_GET(self):  # pylint: disable=invalid-name
+        url = urlparse(self.path)
+        params = {key: value[0] for key, value in parse_qs(url.query).items()}
+        with self.server.lock:
+            self.server.requests.append((url.path, params))
+            self.server.max_points = max(self.server.max_points,
+                                         (float(params.get("end", 0)) - float(params.get("start", 0)))
+                                         / float(params.get("step", 1)) + 1)
+        if url.path == "/api/v1/status/config":
+            data = {"yaml": PROMETHEUS_CONFIG}
+        elif url.path == "/api/v1/query_range":
+            start, end, step = int(float(params["start"])), int(float(params["end"])), int(float(params["step"]))
+            data = {"resultType": "matrix", "result": [
+                {"metric": {"query": params["query"], "instance": f"10.0.0.{i}"},
+                 "values": [[ts, str(ts % 100 * i) if ts % 7 else "NaN"] for ts in range(start, end + 1, step)]}
+                for i in (1, 2)
+            ]}
+        else:
+            self.send_error(404)
+            return
+        body = json.dumps({"status": "success", "data": data}).encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+
+class TestPrometheusAPI(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), FakePrometheusHandler)
+        self.server.lock = threading.Lock()
+        self.server.requests = []
+        self.server.max_points = 0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.port = self.server.server_address[1]
+        self.api = PrometheusAPI(base_url=f"http://127.0.0.1:{self.port}/api/v1")
+
+    def query_range_requests(self):
+        return [params for path, params in self.server.requests if path == "/api/v1/query_range"]
+
+    def test_split_range(self):
+        day = 24 * 60 * 60
+        windows = split_range(0, day, 1)
+        self.assertEqual(len(windows), 8)
+        self.assertEqual(windows[0], (0, PROMETHEUS_MAX_POINTS_PER_SERIES - 1))
+        self.assertEqual(windows[-1][1], day)
+        for (_, prev_end), (start, end) in zip(windows, windows[1:]):
+            self.assertEqual(start, prev_end + 1)
+            self.assertLessEqual(end - start + 1, PROMETHEUS_MAX_POINTS_PER_SERIES)
+        self.assertEqual(split_range(10, 100, 30), [(10, 100)])
+
+    def test_long_window_is_fetched_in_chunks(self):
+        end = int(time.time()) - 3600
+        start = end - 24 * 60 * 60
+        series = self.api.query_range("up", start, end, 1)
+        self.assertEqual(len(self.query_range_requests()), 8)
+        self.assertLessEqual(self.server.max_points, PROMETHEUS_MAX_POINTS_PER_SERIES)
+        self.assertEqual([item.metric["instance"] for item in series], ["10.0.0.1", "10.0.0.2"])
+        timestamps = np.arange(start, end + 1, dtype=np.float64)
+        np.testing.assert_array_equal(series[1].timestamps, timestamps)
+        np.testing.assert_array_equal(series[1].values, np.where(timestamps % 7, timestamps % 100 * 2, np.nan))
+        self.assertEqual(series[1].valid_values.size, np.count_nonzero(timestamps % 7))
+
+        # Results of past windows are cached.
+        self.assertIs(self.api.query_range("up", start, end, 1), series)
+        self.assertEqual(len(self.query_range_requests()), 8)
+
+    def test_query_range_many(self):
+        end = int(time.time())
+        results = self.api.query_range_many([("a", end - 3600, end - 600, 60), ("b", end - 600, end, 60)])
+        self.assertEqual([[item.metric["query"] for item in result] for result in results], [["a", "a"], ["b", "b"]])
+        self.api.query_range_many([("a", end - 3600, end - 600, 60), ("b", end - 600, end, 60)])
+        # The recent window isn't cached.
+        self.assertEqual([params["query"] for params in self.query_range_requests()].count("a"), 1)
+        self.assertEqual([params["query"] for params in self.query_range_requests()].count("b"), 2)
+
+    def test_prometheus_db_stats(self):
+        stats = PrometheusDBStats(host="127.0.0.1", port=self.port)
+        self.assertEqual(stats.scylla_scrape_interval, 20)
+        self.assertEqual(PrometheusDBStats(host="127.0.0.1", port=self.port).scylla_scrape_interval, 20)
+        self.assertEqual(len([path for path, _ in self.server.requests if path == "/api/v1/status/config"]), 1)
+
+        end = int(time.time()) - 3600
+        result = stats.query("sum(irate(a{}[30s])) + sum(irate(b{}[30s]))", end - 140, end)
+        self.assertEqual(self.query_range_requests()[-1]["query"], "sum(irate(a{}[30s])) + sum(irate(b{}[30s]))")
+        self.assertEqual(self.query_range_requests()[-1]["step"], "20.0")
+        expected = [[ts, str(ts % 100) if ts % 7 else "NaN"] for ts in range(end - 140, end + 1, 20)]
+        self.assertEqual(result[0]["values"], expected)
+
+        throughput = stats.get_throughput(end - 140, end)
+        self.assertEqual(throughput.shape, (8, 2))
+        self.assertEqual(self.query_range_requests()[-1]["query"],
+                         "sum(irate(scylla_transport_requests_served{}[30s])) + sum(irate(scylla_thrift_served{}[30s]))")
+
+    def test_queries_are_sent_as_is(self):
+        stats = PrometheusDBStats(host="127.0.0.1", port=self.port)
+        end = int(time.time()) - 3600
+        stats.get_scylla_storage_proxy_replica_cross_shard_ops(end - 140, end)
+        query = self.query_range_requests()[-1]["query"]
+        self.assertIn('instance=~".+[0-9]{1,3}.[0-9]{1,3}.[0-9]{1,3}.[0-9]{1,3}.+"', query)
+        self.assertIn('shard=~"[0-9]+"', query)
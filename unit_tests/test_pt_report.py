@@ -0,0 +1,105 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+#
+# Copyright (c) 2022 ScyllaDB
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from sdcm.parallel_timeline_report.generate_pt_report import ParallelTimelinesReportGenerator, downsample_ranges
+
+NODE = "Node longevity-100gb-4h-master-db-node-6fb3995d-{} [13.49.80.25 | 10.0.1.221] (seed: True)"
+
+
+def event(base, event_id, timestamp, period_type="one-time", **kwargs):
+    data = {"base": base, "event_id": event_id, "type": "type", "period_type": period_type}
+    if period_type in ("begin", "end"):
+        data.update(begin_timestamp=timestamp, end_timestamp=timestamp if period_type == "end" else None)
+    else:
+        data["event_timestamp"] = timestamp
+    data.update(kwargs)
+    return data
+
+
+class TestParallelTimelinesReport(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(self.temp_dir.cleanup)
+        self.events_file = Path(self.temp_dir.name) / "raw_events.log"
+
+    def write_events(self, events):
+        with self.events_file.open("w", encoding="utf-8") as file:
+            for item in events:
+                file.write(json.dumps(item) + "\n")
+
+    def chart_data(self, **kwargs):
+        generator = ParallelTimelinesReportGenerator(events_file=self.events_file, **kwargs)
+        generator.read_events_file()
+        return generator, list(generator.iter_chart_data())
+
+    def test_groups_and_continuous_events(self):
+        self.write_events([
+            event("InfoEvent", "1", 100, message="TEST_START test_id=abc"),
+            event("DisruptionEvent", "2", 110, "begin", nemesis_name="StopStart", node=NODE.format(10)),
+            event("DatabaseLogEvent", "3", 120, node=NODE.format(2)),
+            event("DisruptionEvent", "2", 130, "end", nemesis_name="StopStart", node=NODE.format(10)),
+            event("DisruptionEvent", "4", 140, "begin", nemesis_name="RunUniqueSequence", node=NODE.format(2)),
+            event("ScyllaServerStatusEvent", "5", 150, "begin", node=NODE.format(2)),
+            event("RepairEvent", "6", 160, "begin", shard=1, node=NODE.format(2)),
+            event("CassandraStressEvent", "7", 170, stress_cmd="cassandra-stress write", node="loader-1"),
+            event("UnknownEvent", "8", 200),
+        ])
+        generator, chart_data = self.chart_data()
+        self.assertEqual(generator.test_id, "abc")
+        self.assertEqual(generator.cluster_name, "longevity-100gb-4h-master-db-cluster-6fb3995d")
+        self.assertEqual([group["group"] for group in chart_data], ["node-2", "node-10", "SCT events", "Stress events"])
+        node_2 = {label["label"]: label["data"] for label in chart_data[0]["data"]}
+        self.assertEqual(list(node_2), ["DatabaseLogEvent", "RepairEvent, shard: 1", "ScyllaServerStatusEvent"])
+        self.assertEqual(node_2["DatabaseLogEvent"], [{"timeRange": [120000, 120000], "val": "type: type"}])
+        self.assertEqual(node_2["RepairEvent, shard: 1"][0]["timeRange"], [160000, 160000])
+        self.assertEqual(node_2["ScyllaServerStatusEvent"][0]["timeRange"], [150000, 200000])
+        self.assertEqual(chart_data[1]["data"], [{"label": "DisruptionEvent, nemesis: StopStart",
+                                                  "data": [{"timeRange": [130000, 130000],
+                                                            "val": "nemesis: StopStart"}]}])
+
+        report_file = generator.create_report_file(report_file_name=Path(self.temp_dir.name) / "report.html")
+        report = report_file.read_text(encoding="utf-8")
+        self.assertEqual(report.count("eventsData.push("), 4)
+        self.assertIn("Test ID: abc", report)
+
+    def test_time_window_and_downsampling(self):
+        self.write_events([event("DatabaseLogEvent", str(i), 1000 + i, node=NODE.format(1), type=f"type{i % 2}")
+                           for i in range(1000)])
+        _, chart_data = self.chart_data(start=1100, end=1199.5)
+        ranges = chart_data[0]["data"][0]["data"]
+        self.assertEqual(len(ranges), 100)
+        self.assertEqual(ranges[0]["timeRange"], [1100000, 1100000])
+
+        _, chart_data = self.chart_data(max_ranges_per_label=10)
+        ranges = chart_data[0]["data"][0]["data"]
+        self.assertEqual(len(ranges), 20)
+        self.assertEqual(ranges[0], {"timeRange": [1000000, 1098000], "val": "type: type0 (50 events)"})
+
+    def test_downsample_ranges(self):
+        begins = np.array([5., 0., 1., 2., 9.])
+        values = np.array([0, 0, 1, 0, 0], dtype=np.uint32)
+        begins_, ends, values_, counts = downsample_ranges(begins, begins + 1, values, max_ranges=5)
+        self.assertEqual(begins_.tolist(), [0., 1., 2., 5., 9.])
+        self.assertEqual(counts.tolist(), [1] * 5)
+        begins_, ends, values_, counts = downsample_ranges(begins, begins + 1, values, max_ranges=2)
+        self.assertEqual(begins_.tolist(), [0., 1., 5.])
+        self.assertEqual(ends.tolist(), [3., 2., 10.])
+        self.assertEqual(values_.tolist(), [0, 1, 0])
+        self.assertEqual(counts.tolist(), [2, 1, 2])
@@ -0,0 +1,102 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+#
+# Copyright (c) 2022 ScyllaDB
+
+import math
+import unittest
+
+from sdcm.results_analyze.base import ClassBase, get_class_annotations
+from sdcm.results_analyze.metrics import MetricArray, LatencyMeanCassandraStressMetric, ScyllaTestMetrics, \
+    ThroughputCassandraStressMetric
+from sdcm.results_analyze.test import TestResultClass
+
+
+def es_doc(test_id, op_rate, latency_mean):
+    return {"_index": "performanceregressiontest", "_id": test_id, "_source": {
+        "test_details": {"test_id": f"main-{test_id}", "job_name": "perf-regression/write", "sub_type": "write",
+                         "time_completed": "2022-01-01 10:00"},
+        "versions": {"scylla-server": {"version": "5.0.0", "date": "20220101", "commit_id": "abcdef"}},
+        "results": {"stats_average": {"op rate": op_rate, "latency mean": latency_mean},
+                    "throughput": {"avg": op_rate, "max": op_rate * 2}},
+    }}
+
+
+class Parent(ClassBase):
+    _es_data_mapping = {"value": "a.b"}
+    value: int = None
+
+
+class Child(Parent):
+    _es_data_mapping = {"value": "a.b"}
+    value: int = None
+    name: str = None
+
+
+class GrandChild(Child):
+    pass
+
+
+class TestClassBaseSchema(unittest.TestCase):
+    def test_data_fields(self):
+        self.assertEqual(get_class_annotations(Parent), {"value": int})
+        self.assertEqual(get_class_annotations(Child), {"value": int, "name": str})
+        # Without own annotations a class has annotations of its base class, like its instances do
+        self.assertEqual(get_class_annotations(GrandChild), {"value": int, "name": str})
+        self.assertEqual([(field.name, field.es_data_path) for field in GrandChild._data_fields],
+                         [("value", ("a", "b")), ("name", None)])
+        child = GrandChild({"a": {"b": "5"}, "name": "child"})
+        self.assertEqual((child.value, child.name), (5, "child"))
+
+    def test_load_test_result(self):
+        test = TestResultClass(es_doc("test-1", op_rate=1000., latency_mean=1.5))
+        self.assertEqual(test.test_id, "test-1")
+        self.assertEqual(test.main_test_id, "main-test-1")
+        self.assertEqual(test.software.scylla_server_any.version.as_string, "5.0.0")
+        self.assertEqual(test.complete_time.value.strftime("%Y-%m-%d %H:%M"), "2022-01-01 10:00")
+        self.assertIsInstance(test.metrics, ScyllaTestMetrics)
+        self.assertEqual(test.metrics.cs_metrics.throughput.value, 1000.)
+        self.assertEqual(test.metrics.cs_metrics.throughput.subtype, None)
+        self.assertEqual(test.metrics.scylla_metrics.throughput.max.value, 2000.)
+        self.assertEqual(test.metrics.scylla_metrics.throughput.max.subtype, "max")
+
+
+class TestMetricArray(unittest.TestCase):
+    def setUp(self):
+        self.tests = [TestResultClass(es_doc(f"test-{idx}", op_rate=op_rate, latency_mean=latency_mean))
+                      for idx, (op_rate, latency_mean) in enumerate([(1000., 2.), (3000., 1.), (3000., 1.), (2000., 4.)])]
+        self.tests.append(TestResultClass({"_id": "test-4", "_source": {"test_details": {"test_id": "main-test-4"}}}))
+
+    def test_best_index(self):
+        throughput = MetricArray.from_instances(self.tests, "metrics.cs_metrics.throughput")
+        self.assertIs(throughput.metric_class, ThroughputCassandraStressMetric)
+        self.assertEqual(len(throughput), 5)
+        self.assertTrue(math.isnan(throughput.values[4]))
+        # The last one of the best, like the last one of instances sorted by betterness
+        self.assertEqual(throughput.best_index(), 2)
+        latency = MetricArray.from_instances(self.tests, "metrics.cs_metrics.latency_mean")
+        self.assertEqual(latency.best_index(), 2)
+        self.assertEqual(self.tests[3].metrics.cs_metrics.latency_mean.betterness, -4.)
+        self.assertIsNone(MetricArray.from_instances(self.tests, "metrics.cs_metrics.missing").best_index())
+
+    def test_comparisons(self):
+        latency = MetricArray.from_instances(self.tests, "metrics.cs_metrics.latency_mean")
+        base = self.tests[0].metrics.cs_metrics.latency_mean
+        self.assertEqual(latency.better(base).tolist(), [False, True, True, False, False])
+        self.assertEqual(latency.better(latency).tolist(), [False] * 5)
+        self.assertEqual(latency.rdiff(base)[:4].tolist(), [0., -100., -100., 50.])
+        self.assertEqual(latency.rdiff(base)[:4].tolist(),
+                         [test.metrics.cs_metrics.latency_mean.rdiff(base).value for test in self.tests[:4]])
+        self.assertEqual(latency.rate(base)[:4].tolist(), [100., 200., 200., 50.])
+        with self.assertRaises(ValueError):
+            latency.better(self.tests[0].metrics.cs_metrics.throughput)
+        with self.assertRaises(ValueError):
+            latency.rdiff(MetricArray(LatencyMeanCassandraStressMetric, [1.], subtype="avg"))
@@ -0,0 +1,103 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+#
+# Copyright (c) 2022 ScyllaDB
+
+import tempfile
+import unittest
+
+from sdcm.results_analyze.es_access import EsDocsCache, EsDocsReader, EsRecords, get_source_value
+from sdcm.results_analyze.test import TestResultClass
+
+
+def source(op_rate):
+    return {"results": {"stats_average": {"op rate": op_rate, "latency mean": 1.5}, "stats": [{"big": "data"}]},
+            "versions": {"scylla-server": {"version": "5.0.0", "date": "20220101"}}}
+
+
+class FakeEs:
+    def __init__(self, docs, page_size=2):
+        self.docs = docs  # {doc_id: (version, source)}
+        self.page_size = page_size
+        self.mget_calls = []
+
+    def _page(self, offset):
+        ids = list(self.docs)[offset:offset + self.page_size]
+        return {"_scroll_id": str(offset + self.page_size), "_shards": {"total": 1, "successful": 1, "skipped": 0},
+                "hits": {"hits": [{"_index": "performance", "_id": doc_id, "_version": self.docs[doc_id][0]}
+                                  for doc_id in ids]}}
+
+    def search(self, **kwargs):
+        assert kwargs["_source"] is False and kwargs["version"] is True
+        return self._page(0)
+
+    def scroll(self, scroll_id, **_):
+        return self._page(int(scroll_id))
+
+    def clear_scroll(self, **_):
+        pass
+
+    def mget(self, body, _source_includes=None, **_):
+        self.mget_calls.append([doc["_id"] for doc in body["docs"]])
+        docs = []
+        for doc in body["docs"]:
+            version, doc_source = self.docs[doc["_id"]]
+            if _source_includes:
+                doc_source = {path.split(".")[0]: doc_source[path.split(".")[0]] for path in _source_includes}
+            docs.append({"_index": doc["_index"], "_id": doc["_id"], "_version": version, "found": True,
+                         "_source": doc_source})
+        return {"docs": docs}
+
+
+class TestEsDocsReader(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(self.cache_dir.cleanup)
+        self.es = FakeEs({f"test-{idx}": (1, source(op_rate=1000. + idx)) for idx in range(5)})
+        self.reader = EsDocsReader(es=self.es, cache=EsDocsCache(self.cache_dir.name))
+
+    def test_docs_are_cached_by_version(self):
+        docs = list(self.reader.iter_docs(index="performance", query="*", source_includes=["versions"]))
+        self.assertEqual([doc["_id"] for doc in docs], [f"test-{idx}" for idx in range(5)])
+        self.assertEqual(self.es.mget_calls, [[f"test-{idx}" for idx in range(5)]])
+
+        self.es.docs["test-3"] = (2, source(op_rate=0.))
+        reader = EsDocsReader(es=self.es, cache=EsDocsCache(self.cache_dir.name))
+        docs[3]["_version"] = 2
+        self.assertEqual(list(reader.iter_docs(index="performance", query="*", source_includes=["versions"])), docs)
+        self.assertEqual(self.es.mget_calls[1:], [["test-3"]])
+        self.assertEqual(reader.stats, {"cached": 4, "fetched": 1})
+
+        # Sources with other paths are cached separately.
+        list(reader.iter_docs(index="performance", query="*", source_includes=["results"]))
+        self.assertEqual(len(self.es.mget_calls[-1]), 5)
+
+    def test_records(self):
+        paths = ["results.stats_average.op rate", "versions.scylla-server.version", "results.missing"]
+        records = self.reader.get_records(index="performance", query="*", paths=paths)
+        self.assertEqual(len(records), 5)
+        self.assertEqual(records.column("results.stats_average.op rate"), [1000., 1001., 1002., 1003., 1004.])
+        self.assertEqual(records.column("results.missing"), [None] * 5)
+        self.assertEqual(next(records.rows()), {"_id": "test-0", "results.stats_average.op rate": 1000.,
+                                                "versions.scylla-server.version": "5.0.0", "results.missing": None})
+        self.assertEqual(get_source_value(source(1.), "results.stats_average.latency mean"), 1.5)
+        self.assertEqual(EsRecords.from_docs([], paths).columns, {path: [] for path in paths})
+
+    def test_source_paths_of_test_result_class(self):
+        source_paths = TestResultClass.get_es_source_paths(["metrics.cs_metrics", "main_test_id"])
+        self.assertEqual(source_paths, {
+            "metrics.cs_metrics.latency_99": "results.stats_average.latency 99th percentile",
+            "metrics.cs_metrics.latency_mean": "results.stats_average.latency mean",
+            "metrics.cs_metrics.throughput": "results.stats_average.op rate",
+            "main_test_id": "test_details.test_id",
+        })
+        self.assertNotIn("test_id", TestResultClass.get_es_source_paths())
+        self.assertIn("setup_details", TestResultClass.get_es_source_paths().values())
@@ -0,0 +1,110 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+#
+# Copyright (c) 2022 ScyllaDB
+
+import time
+import shutil
+import tempfile
+import unittest
+import multiprocessing
+from pathlib import Path
+
+from sdcm.sct_events.buffered_writer import BufferedWriter, SnapshotWriter
+
+
+def write_lines(writer: BufferedWriter, prefix: str, count: int) -> None:
+    for i in range(count):
+        writer.write(f"{prefix} {i}\n".encode())
+
+
+class TestBufferedWriter(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.path = self.temp_dir / "test.log"
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_data_is_buffered_until_flush(self):
+        writer = BufferedWriter(path=self.path, flush_interval=60)
+        writer.write(b"line 1\n")
+        writer.write(b"line 2\n")
+        self.assertFalse(self.path.exists())
+        writer.flush()
+        self.assertEqual(self.path.read_bytes(), b"line 1\nline 2\n")
+        writer.close()
+
+    def test_flush_interval(self):
+        writer = BufferedWriter(path=self.path, flush_interval=0.1)
+        writer.write(b"line 1\n")
+        time.sleep(0.5)
+        self.assertEqual(self.path.read_bytes(), b"line 1\n")
+        writer.close()
+
+    def test_explicit_flush_and_zero_interval(self):
+        writer = BufferedWriter(path=self.path, flush_interval=60)
+        writer.write(b"line 1\n", flush=True)
+        self.assertEqual(self.path.read_bytes(), b"line 1\n")
+        writer = BufferedWriter(path=self.path, flush_interval=0)
+        writer.write(b"line 2\n")
+        self.assertEqual(self.path.read_bytes(), b"line 1\nline 2\n")
+
+    def test_max_buffer_size(self):
+        writer = BufferedWriter(path=self.path, flush_interval=60, max_buffer_size=10)
+        writer.write(b"12345\n")
+        self.assertFalse(self.path.exists())
+        writer.write(b"67890\n")
+        self.assertEqual(self.path.read_bytes(), b"12345\n67890\n")
+
+    def test_multiple_processes(self):
+        writer = BufferedWriter(path=self.path, flush_interval=60, lock=multiprocessing.RLock())
+        writer.write(b"parent\n")
+        processes = [multiprocessing.Process(target=write_lines, args=(writer, f"child{i}", 1000)) for i in range(4)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join(timeout=10)
+        writer.close()
+        lines = self.path.read_text().splitlines()
+        self.assertEqual(len(lines), 4001)
+        self.assertEqual(lines.count("parent"), 1)
+        for i in range(4):
+            # Each child's lines are flushed on its exit and keep their order.
+            self.assertEqual([line for line in lines if line.startswith(f"child{i} ")],
+                             [f"child{i} {j}" for j in range(1000)])
+
+    def test_snapshot_writer(self):
+        writer = SnapshotWriter(path=self.path, flush_interval=60)
+        writer.write(b"first")
+        writer.write(b"second")
+        writer.flush()
+        self.assertEqual(self.path.read_bytes(), b"second")
+        writer.write(b"third", flush=True)
+        self.assertEqual(self.path.read_bytes(), b"third")
+        self.assertEqual(list(self.temp_dir.iterdir()), [self.path])
+
+    def test_snapshot_writer_with_callable(self):
+        counter = {"events": 0}
+        dumps = []
+
+        def dump():
+            dumps.append(counter["events"])
+            return str(counter["events"]).encode()
+
+        writer = SnapshotWriter(path=self.path, flush_interval=60)
+        for _ in range(100):
+            counter["events"] += 1
+            writer.write(dump)
+        self.assertEqual(dumps, [])  # nothing is serialized before flush
+        writer.close()
+        self.assertEqual(self.path.read_bytes(), b"100")
+        self.assertEqual(dumps, [100])
@@ -16,7 +16,8 @@ import pickle
 import unittest
 
 from sdcm.sct_events import Severity
-from sdcm.sct_events.filters import DbEventsFilter, EventsFilter, EventsSeverityChangerFilter
+from sdcm.sct_events.base import FILTER_EVENT_DECAY_TIME
+from sdcm.sct_events.filters import DbEventsFilter, EventsFilter, EventsSeverityChangerFilter, EventsFiltersIndex
 from sdcm.sct_events.database import DatabaseLogEvent
 
 
@@ -125,3 +126,48 @@ class TestEventsSeverityChangerFilter(unittest.TestCase):
         self.assertEqual(event.severity, Severity.ERROR)
         db_events_filter.eval_filter(event)
         self.assertEqual(event.severity, Severity.NORMAL)
+
+
+class TestEventsFiltersIndex(unittest.TestCase):
+    def test_only_matching_filters_evaluated(self):
+        index = EventsFiltersIndex()
+        node_filter = DbEventsFilter(db_event=DatabaseLogEvent.BAD_ALLOC, node="node2")
+        class_filter = EventsFilter(event_class=DatabaseLogEvent.NO_SPACE_ERROR)
+        for filter_obj in (node_filter, class_filter):
+            index.add(filter_obj)
+        self.assertEqual(len(index), 2)
+        event1 = DatabaseLogEvent.BAD_ALLOC().add_info(node="node1", line="xyz", line_number=1)
+        event2 = DatabaseLogEvent.BAD_ALLOC().add_info(node="node2", line="xyz", line_number=1)
+        event3 = DatabaseLogEvent.NO_SPACE_ERROR().add_info(node="node1", line="xyz", line_number=1)
+        self.assertEqual(list(index._candidates(event1)), [])  # pylint: disable=protected-access
+        self.assertFalse(index.is_filtered(event1))
+        self.assertTrue(index.is_filtered(event2))
+        self.assertTrue(index.is_filtered(event3))
+        self.assertEqual(index.evaluated_events, 3)
+        self.assertGreater(index.filtering_time, 0)
+        index.remove(node_filter.uuid)
+        self.assertFalse(index.is_filtered(event2))
+
+    def test_filters_evaluated_in_order(self):
+        index = EventsFiltersIndex()
+        index.add(EventsSeverityChangerFilter(new_severity=Severity.WARNING, event_class=DatabaseLogEvent))
+        index.add(EventsFilter(regex=".*WARNING.*"))
+        index.add(EventsSeverityChangerFilter(new_severity=Severity.NORMAL, event_class=DatabaseLogEvent.BAD_ALLOC))
+        event = DatabaseLogEvent.BAD_ALLOC().add_info(node="node1", line="xyz", line_number=1)
+        self.assertTrue(index.is_filtered(event))
+        self.assertEqual(event.severity, Severity.WARNING)
+
+    def test_expire(self):
+        index = EventsFiltersIndex()
+        filter1 = DbEventsFilter(db_event=DatabaseLogEvent.BAD_ALLOC)
+        filter2 = DbEventsFilter(db_event=DatabaseLogEvent.BAD_ALLOC, node="node1")
+        index.add(filter1)
+        index.add(filter2)
+        index.set_expire_time(filter1.uuid, 1000)
+        index.set_expire_time(filter2.uuid, 1000)
+        index.set_expire_time(filter2.uuid, 2000)
+        self.assertEqual(index.expire(now=1000 + FILTER_EVENT_DECAY_TIME), 1)
+        self.assertNotIn(filter1.uuid, index)
+        self.assertIn(filter2.uuid, index)
+        self.assertEqual(index.expire(now=2000 + FILTER_EVENT_DECAY_TIME), 1)
+        self.assertEqual(len(index), 0)
@@ -0,0 +1,144 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+#
+# Copyright (c) 2022 ScyllaDB
+
+import ctypes
+import shutil
+import tempfile
+import unittest
+import threading
+import multiprocessing
+
+from sdcm.sct_events import Severity
+from sdcm.sct_events.system import SpotTerminationEvent, TestResultEvent
+from sdcm.sct_events.health import ClusterHealthValidatorEvent
+from sdcm.sct_events.filters import DbEventsFilter, EventsSeverityChangerFilter
+from sdcm.sct_events.database import DatabaseLogEvent
+from sdcm.sct_events.events_device import EventsDevice
+from sdcm.sct_events.events_processes import EventsProcessesRegistry
+from sdcm.sct_events.wire_format import \
+    WireFormatError, ENCODING_MARSHAL, ENCODING_PICKLE, encode_event, decode_event, event_topic, topic_prefixes
+
+
+class TestWireFormat(unittest.TestCase):
+    def test_log_event_roundtrip(self):
+        event = DatabaseLogEvent.REACTOR_STALLED().add_info(
+            node="node1", line="2021-04-06T13:03:28 Reactor stalled for 2000 ms", line_number=10)
+        event.dont_publish()
+        frames = encode_event(event)
+        self.assertEqual(frames[0], b"ERROR DatabaseLogEvent.REACTOR_STALLED")
+        self.assertEqual(frames[1][1:2], ENCODING_MARSHAL)
+        decoded = decode_event(frames)
+        self.assertIs(type(decoded), DatabaseLogEvent.REACTOR_STALLED)
+        self.assertEqual(decoded, event)
+        self.assertIs(decoded.severity, Severity.ERROR)
+        self.assertEqual(str(decoded), str(event))
+
+    def test_filter_roundtrip(self):
+        event = EventsSeverityChangerFilter(new_severity=Severity.WARNING,
+                                            event_class=DatabaseLogEvent.DATABASE_ERROR,
+                                            regex="some regex")
+        event.dont_publish()
+        frames = encode_event(event)
+        self.assertEqual(frames[0], b"SYSTEM EventsSeverityChangerFilter")
+        decoded = decode_event(frames)
+        self.assertEqual(decoded, event)
+        self.assertIs(decoded.new_severity, Severity.WARNING)
+        self.assertEqual(decoded.regex_flags, event.regex_flags)
+
+    def test_builtin_types_are_kept(self):
+        event = SpotTerminationEvent(node="node1", message="message")
+        event.message = ("a", "tuple", {1: {"set"}}, )
+        event.dont_publish()
+        frames = encode_event(event)
+        self.assertEqual(frames[1][1:2], ENCODING_MARSHAL)
+        self.assertEqual(decode_event(frames).message, ("a", "tuple", {1: {"set"}}, ))
+
+    def test_not_marshallable_event_is_pickled(self):
+        event = SpotTerminationEvent(node="node1", message="message")
+        event.message = [Severity.ERROR]
+        event.dont_publish()
+        frames = encode_event(event)
+        self.assertEqual(frames[1][1:2], ENCODING_PICKLE)
+        self.assertEqual(decode_event(frames).message, [Severity.ERROR])
+
+    def test_custom_pickling_event_is_pickled(self):
+        event = TestResultEvent(test_status="SUCCESS", events={})
+        frames = encode_event(event)
+        self.assertEqual(frames[1][1:2], ENCODING_PICKLE)
+        self.assertEqual(decode_event(frames).event_timestamp, event.event_timestamp)
+
+    def test_malformed_messages(self):
+        event = SpotTerminationEvent(node="node1", message="message")
+        event.dont_publish()
+        topic, header, payload = encode_event(event)
+        self.assertRaises(WireFormatError, decode_event, [topic, payload])
+        self.assertRaises(WireFormatError, decode_event, [topic, b"\xff" + header[1:], payload])
+        self.assertRaises(WireFormatError, decode_event, [topic, header[:1] + b"X" + header[2:], payload])
+
+    def test_topic_prefixes(self):
+        self.assertEqual(topic_prefixes(), [b""])
+        self.assertEqual(topic_prefixes(severities=[Severity.CRITICAL]), [b"CRITICAL ", b"SYSTEM "])
+        self.assertEqual(topic_prefixes(severities=[Severity.ERROR], event_classes=[DatabaseLogEvent],
+                                        system_events=False),
+                         [b"ERROR DatabaseLogEvent"])
+        event = DatabaseLogEvent.BACKTRACE().add_info(node="node1", line="backtrace", line_number=1)
+        event.dont_publish()
+        self.assertTrue(any(event_topic(event).startswith(prefix)
+                            for prefix in topic_prefixes(event_classes=[DatabaseLogEvent], system_events=False)))
+        self.assertFalse(any(event_topic(event).startswith(prefix)
+                             for prefix in topic_prefixes(event_classes=[SpotTerminationEvent])))
+
+
+class TestEventsDeviceTopics(unittest.TestCase):
+    temp_dir = None
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.temp_dir = tempfile.mkdtemp()
+        cls.events_processes_registry = EventsProcessesRegistry(log_dir=cls.temp_dir)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        shutil.rmtree(cls.temp_dir)
+
+    def test_subscribe_to_topics(self):
+        events_device = EventsDevice(_registry=self.events_processes_registry)
+        event1 = ClusterHealthValidatorEvent.NodeStatus()
+        event2 = SpotTerminationEvent(node="node1", message="message")
+        event2.severity = Severity.CRITICAL
+        event3 = DbEventsFilter(db_event=DatabaseLogEvent.BACKTRACE)
+
+        stop_event = threading.Event()
+        counter = multiprocessing.Value(ctypes.c_uint32, 0)
+
+        threading.Timer(interval=1.5, function=stop_event.set).start()  # stop subscriber in 1.5 seconds.
+        events_device.start_delay = 0.5
+        events_device.start()
+
+        try:
+            events_generator = events_device.outbound_events(stop_event=stop_event,
+                                                             events_counter=counter,
+                                                             topics=topic_prefixes(severities=[Severity.CRITICAL]))
+            threading.Timer(interval=0.5, function=lambda: [events_device.publish_event(event)
+                                                            for event in (event1, event2, event3)]).start()
+            event_class, event_received = next(events_generator)
+            self.assertEqual(event_class, "SpotTerminationEvent")
+            self.assertEqual(event_received, event2)
+            self.assertRaises(StopIteration, next, events_generator)
+        finally:
+            events_device.stop(timeout=1)
+            for event in (event1, event2, event3):
+                event.dont_publish()
+
+        # The filter is received too but it's not yielded by outbound_events().
+        self.assertEqual(counter.value, 2)
@@ -0,0 +1,62 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+#
+# Copyright (c) 2022 ScyllaDB
+
+import sys
+import json
+import unittest
+import subprocess
+from pathlib import Path
+
+SCT_DIR = Path(__file__).parents[1]
+
+# Modules which should be imported by the commands which use them, not by `import sct'.
+HEAVY_MODULES = (
+    "argus",
+    "azure",
+    "elasticsearch",
+    "google.cloud",
+    "googleapiclient",
+    "kubernetes",
+    "mypy_boto3_ec2",
+    "mypy_boto3_s3",
+    "pytest",
+    "sdcm.cluster",
+    "sdcm.localhost",
+    "sdcm.monitorstack",
+    "sdcm.results_analyze",
+    "sdcm.sct_provision",
+    "sdcm.sct_runner",
+    "sdcm.send_email",
+    "sdcm.tester",
+    "sdcm.utils.cloud_monitor",
+    "sdcm.utils.k8s",
+)
+
+IMPORT_SCT = """
+import sys, json
+import sct
+print(json.dumps(sorted(sys.modules)))
+"""
+
+
+def import_sct():
+    result = subprocess.run([sys.executable, "-c", IMPORT_SCT], cwd=SCT_DIR, capture_output=True, text=True,
+                            check=True)
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+class TestSctStartup(unittest.TestCase):
+    def test_heavy_modules_are_not_imported(self):
+        modules = import_sct()
+        self.assertEqual([name for name in modules if name.startswith(tuple(f"{module}." for module in HEAVY_MODULES))
+                          or name in HEAVY_MODULES], [])
@@ -0,0 +1,95 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+#
+# Copyright (c) 2022 ScyllaDB
+
+import unittest
+
+import numpy as np
+
+from sdcm.utils.latency import calculate_latency
+from sdcm.utils.series_stats import (
+    SERIES_STATS_PERCENTILES,
+    matrix_stats,
+    per_series_stats,
+    series_stats,
+    steady_state_window,
+    to_matrix,
+)
+
+
+class TestSeriesStats(unittest.TestCase):
+    def assert_stats_equal(self, stats, values):
+        values = np.asarray(values, dtype=np.float64)
+        self.assertEqual(stats.count, values.size)
+        self.assertAlmostEqual(stats.min, values.min())
+        self.assertAlmostEqual(stats.max, values.max())
+        self.assertAlmostEqual(stats.avg, values.mean())
+        self.assertAlmostEqual(stats.stdev, values.std())
+        cut = int(values.size * 0.05)
+        self.assertAlmostEqual(stats.trimmed_avg, np.sort(values)[cut:values.size - cut].mean())
+        np.testing.assert_allclose(list(stats.percentiles.values()), np.percentile(values, SERIES_STATS_PERCENTILES))
+
+    def test_series_stats(self):
+        values = np.random.default_rng(seed=1).lognormal(size=1001)
+        stats = series_stats(values)
+        self.assert_stats_equal(stats, values)
+        self.assertEqual(list(stats.percentiles), ["p50", "p90", "p95", "p99", "p999"])
+        self.assertEqual(set(stats.as_dict(ndigits=2)),
+                         {"count", "min", "max", "avg", "stdev", "trimmed_avg", "p50", "p90", "p95", "p99", "p999"})
+
+    def test_nan_and_inf_are_ignored(self):
+        values = np.arange(100, dtype=np.float64)
+        with_gaps = values.copy()
+        with_gaps[::10] = np.nan
+        with_gaps[5] = np.inf
+        self.assert_stats_equal(series_stats(with_gaps), np.delete(values, list(range(0, 100, 10)) + [5]))
+        self.assertIsNone(series_stats([np.nan, np.nan]))
+        self.assertIsNone(series_stats([]))
+
+    def test_per_series_stats(self):
+        rng = np.random.default_rng(seed=2)
+        series = {"node-1": rng.normal(10, 1, size=300),
+                  "node-2": rng.normal(20, 2, size=200),
+                  "node-3": [np.nan] * 10,
+                  "node-4": ["1.5", "2.5"]}
+        stats = per_series_stats(series)
+        self.assertEqual(list(stats), list(series))
+        self.assert_stats_equal(stats["node-1"], series["node-1"])
+        self.assert_stats_equal(stats["node-2"], series["node-2"])
+        self.assertIsNone(stats["node-3"])
+        self.assertEqual(stats["node-4"].avg, 2.0)
+        self.assertEqual(to_matrix(series.values()).shape, (4, 300))
+        self.assertEqual(matrix_stats(np.empty((0, 0))), [])
+
+    def test_steady_state_window(self):
+        rng = np.random.default_rng(seed=3)
+        ramp = np.linspace(0, 1000, 100)
+        steady = rng.normal(1000, 10, size=500)
+        noisy = rng.normal(500, 400, size=200)
+        start, end = steady_state_window(np.concatenate((ramp, steady, noisy)), window=60)
+        # Windows which overlap the end of the ramp or the beginning of the noise a bit are steady enough.
+        self.assertTrue(60 <= start <= 100, start)
+        self.assertTrue(600 <= end <= 620, end)
+        self.assertIsNone(steady_state_window(noisy, window=60))
+        self.assertIsNone(steady_state_window(steady[:10], window=60))
+        self.assertIsNone(steady_state_window(np.zeros(100), window=60))
+
+    def test_calculate_latency(self):
+        latency_results = {
+            "steady": {"read p99": 2.0},
+            "repair": {"cycles": [{"read p99": 4.0, "write p99": 1.0},
+                                  {"read p99": 8.0, "write p99": 2.0}]},
+        }
+        result = calculate_latency(latency_results)
+        self.assertEqual(result["repair"]["Cycles Average"], {"read p99": 6.0, "write p99": 1.5})
+        self.assertEqual(result["repair"]["Relative to Steady"], {"read p99": 4.0})
+        self.assertEqual(result["repair"]["color"], {"read p99": "red"})
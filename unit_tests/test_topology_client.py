@@ -0,0 +1,138 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+#
+# Copyright (c) 2022 ScyllaDB
+
+import json
+import shlex
+import unittest
+from types import SimpleNamespace
+
+from sdcm.rest.topology_client import TopologyClient, TopologyClientError, RESPONSE_SEPARATOR
+
+
+SCHEMA = "cbe15453-33f3-3387-aaf1-4120548f41e8"
+
+
+def gossip_endpoint(address, status, is_alive=True, dc="dc1", rack="rack1"):
+    return {
+        "addrs": address,
+        "is_alive": is_alive,
+        "generation": 1650000000,
+        "application_state": [
+            {"application_state": 0, "value": f"{status},-9223372036854775808", "version": 10},
+            {"application_state": 2, "value": SCHEMA, "version": 11},
+            {"application_state": 3, "value": dc, "version": 3},
+            {"application_state": 4, "value": rack, "version": 4},
+            {"application_state": 8, "value": address, "version": 5},
+            {"application_state": 12, "value": f"host-{address}", "version": 6},
+            {"application_state": 99, "value": "unknown state", "version": 7},
+        ],
+    }
+
+
+RESPONSES = {
+    "gossiper/endpoint/live/": ["10.0.0.1", "10.0.0.2", "10.0.0.4"],
+    "gossiper/endpoint/down/": ["10.0.0.3"],
+    "storage_service/nodes/joining": ["10.0.0.4"],
+    "storage_service/nodes/leaving": [],
+    "storage_service/nodes/moving": [],
+    "storage_service/load_map": [{"key": "10.0.0.1", "value": "1536"},
+                                 {"key": "10.0.0.2", "value": str(3 * 1024 ** 3)}],
+    "storage_service/host_id": [{"key": f"10.0.0.{i}", "value": f"host-10.0.0.{i}"} for i in (1, 2, 3)],
+    "storage_service/tokens_endpoint": [{"key": str(token), "value": f"10.0.0.{token % 3 + 1}"}
+                                        for token in range(12)],
+    "storage_service/ownership/": [{"key": f"10.0.0.{i}", "value": 1 / 3} for i in (1, 2, 3)],
+    "failure_detector/endpoints/": [gossip_endpoint("10.0.0.1", "NORMAL"),
+                                    gossip_endpoint("10.0.0.2", "NORMAL", dc="dc2"),
+                                    gossip_endpoint("10.0.0.3", "shutdown", is_alive=False),
+                                    gossip_endpoint("10.0.0.4", "BOOT")],
+    "storage_service/hostid/local": "host-10.0.0.1",
+    "storage_service/gossiping": True,
+    "storage_service/native_transport": True,
+    "storage_service/load": 1536.0,
+    "storage_service/generation_number": 1650000000,
+    "system/uptime_ms": 123456,
+    "snitch/datacenter": "dc1",
+    "snitch/rack": "rack1",
+    "storage_proxy/schema_versions": [{"key": SCHEMA, "value": ["10.0.0.1", "10.0.0.2"]}],
+}
+
+
+class FakeRemoter:  # pylint: disable=too-few-public-methods
+    def __init__(self, responses):
+        self.responses = responses
+        self.commands = []
+
+    def run(self, cmd, **_):
+        self.commands.append(cmd)
+        stdout = ""
+        for arg in shlex.split(cmd):
+            if arg.startswith("http://localhost:10000/"):
+                path = arg[len("http://localhost:10000/"):]
+                if path in self.responses:
+                    stdout += json.dumps(self.responses[path])
+                stdout += RESPONSE_SEPARATOR
+        return SimpleNamespace(stdout=stdout, stderr="curl: (22) The requested URL returned error: 404", ok=True)
+
+
+class TestTopologyClient(unittest.TestCase):
+    def setUp(self):
+        self.remoter = FakeRemoter(RESPONSES)
+        self.client = TopologyClient(node=SimpleNamespace(name="node1", remoter=self.remoter))
+
+    def test_status(self):
+        status = self.client.get_status()
+        self.assertEqual(len(self.remoter.commands), 1)  # everything is fetched by a single command
+        self.assertEqual(sorted(status), ["dc1", "dc2"])
+        self.assertEqual(sorted(status["dc1"]), ["10.0.0.1", "10.0.0.3", "10.0.0.4"])
+        self.assertEqual({ip: endpoint.status for dc_status in status.values() for ip, endpoint in dc_status.items()},
+                         {"10.0.0.1": "UN", "10.0.0.2": "UN", "10.0.0.3": "DN", "10.0.0.4": "UJ"})
+        self.assertEqual(status["dc2"]["10.0.0.2"].as_nodetool_status(), {
+            "state": "UN", "load": "3.00GB", "tokens": "4", "owns": "33.3%", "host_id": "host-10.0.0.2",
+            "rack": "rack1",
+        })
+        joining = status["dc1"]["10.0.0.4"]
+        self.assertEqual((joining.host_id, joining.tokens, joining.load, joining.ownership),
+                         ("host-10.0.0.4", 0, None, None))
+        self.assertEqual(status["dc1"]["10.0.0.1"].as_nodetool_status()["load"], "1.50KB")
+
+    def test_gossip(self):
+        gossip = self.client.get_gossip()
+        self.assertEqual({ip: (state.status, state.schema, state.datacenter) for ip, state in gossip.items()}, {
+            "10.0.0.1": ("NORMAL", SCHEMA, "dc1"),
+            "10.0.0.2": ("NORMAL", SCHEMA, "dc2"),
+            "10.0.0.3": ("shutdown", SCHEMA, "dc1"),
+            "10.0.0.4": ("BOOT", SCHEMA, "dc1"),
+        })
+        self.assertFalse(gossip["10.0.0.3"].is_alive)
+        self.assertEqual(gossip["10.0.0.1"].application_states["99"], "unknown state")
+
+    def test_node_info(self):
+        self.assertEqual(self.client.get_node_info().as_nodetool_info(), {
+            "ID": "host-10.0.0.1",
+            "Gossip active": True,
+            "Native Transport active": True,
+            "Load": "1.50KB",
+            "Generation No": 1650000000,
+            "Uptime (seconds)": 123,
+            "Data Center": "dc1",
+            "Rack": "rack1",
+        })
+
+    def test_schema_versions_and_host_ids(self):
+        self.assertEqual(self.client.get_schema_versions(), {SCHEMA: ["10.0.0.1", "10.0.0.2"]})
+        self.assertEqual(self.client.get_host_ids()["10.0.0.3"], "host-10.0.0.3")
+
+    def test_failed_request(self):
+        self.remoter.responses = {key: value for key, value in RESPONSES.items() if key != "storage_service/load_map"}
+        with self.assertRaisesRegex(TopologyClientError, "404"):
+            self.client.get_status()
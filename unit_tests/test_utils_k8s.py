@@ -1,6 +1,18 @@
+import json
+import time
+import queue
+import threading
 from copy import deepcopy
+from types import SimpleNamespace
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 
-from sdcm.utils.k8s import HelmValues
+import kubernetes as k8s
+import pytest
+import urllib3
+
+from sdcm.cluster_k8s import KubernetesCluster
+from sdcm.utils.k8s import ApiCallPriority, ApiCallRateLimiter, HelmValues, KubernetesInformer, KubernetesOps, \
+    api_call_priority, get_kubectl_call_priority, has_ready_condition
 
 
 BASE_HELM_VALUES = {
@@ -102,3 +114,196 @@ def test_helm_values_try_set_by_list_index():
     except ValueError:
         return
     assert False, "expected 'ValueError' exception was not raised"
+
+
+def k8s_pod(name, node_name=None, labels=None, ready=True, uid="uid"):
+    return k8s.client.V1Pod(
+        metadata=k8s.client.V1ObjectMeta(name=name, labels=labels, uid=uid),
+        spec=k8s.client.V1PodSpec(containers=[], node_name=node_name),
+        status=k8s.client.V1PodStatus(conditions=[
+            k8s.client.V1PodCondition(type="Ready", status="True" if ready else "False")]))
+
+
+def watch_event(event_type, obj, resource_version):
+    return {"type": event_type, "object": obj, "raw_object": {"metadata": {"resourceVersion": resource_version}}}
+
+
+class FakeKluster:  # pylint: disable=too-few-public-methods
+    def __init__(self, informer):
+        self.informer = informer
+
+    def get_informer(self, kind, namespace=None):
+        assert (kind, namespace) == ("pod", "scylla")
+        return self.informer
+
+
+@pytest.fixture
+def pods_informer():
+    informer = KubernetesInformer(kluster=None, kind="pod", namespace="scylla")
+    pods = [k8s_pod("pod-1", node_name="node-1", labels={"app": "scylla"}), k8s_pod("pod-2", node_name="node-2")]
+    informer._list(lambda watch, namespace: k8s.client.V1PodList(  # pylint: disable=protected-access
+        items=pods, metadata=k8s.client.V1ListMeta(resource_version="10")))
+    return informer
+
+
+def test_informer_indexes(pods_informer):  # pylint: disable=redefined-outer-name
+    assert pods_informer.resource_version == "10"
+    assert pods_informer.get("pod-1").spec.node_name == "node-1"
+    assert [pod.metadata.name for pod in pods_informer.list()] == ["pod-1", "pod-2"]
+    assert [pod.metadata.name for pod in pods_informer.list(labels={"app": "scylla"})] == ["pod-1"]
+
+    assert pods_informer.handle_event(watch_event("MODIFIED", k8s_pod("pod-1", node_name="node-2"), "11"))
+    assert pods_informer.handle_event(watch_event("ADDED", k8s_pod("pod-3", labels={"app": "scylla"}), "12"))
+    assert pods_informer.handle_event(watch_event("DELETED", k8s_pod("pod-2"), "13"))
+    assert pods_informer.handle_event({"type": "BOOKMARK", "object": None,
+                                       "raw_object": {"metadata": {"resourceVersion": "20"}}})
+    assert pods_informer.resource_version == "20"
+    assert pods_informer.get("pod-2") is None
+    assert [pod.metadata.name for pod in pods_informer.list(node_name="node-2")] == ["pod-1"]
+    assert [pod.metadata.name for pod in pods_informer.list(labels={"app": "scylla"})] == ["pod-3"]
+    assert pods_informer.stats == {"lists": 1, "watches": 0, "events": 4}
+
+    assert not pods_informer.handle_event({"type": "ERROR", "object": None, "raw_object": {"code": 410}})
+    assert pods_informer._relist_required  # pylint: disable=protected-access
+
+
+def test_informer_wait_for(pods_informer):  # pylint: disable=redefined-outer-name
+    timer = threading.Timer(0.1, pods_informer.handle_event,
+                            args=(watch_event("MODIFIED", k8s_pod("pod-2", ready=False), "11"), ))
+    timer.start()
+    assert pods_informer.wait_for(lambda informer: not has_ready_condition(informer.get("pod-2")), timeout=5)
+    timer.join()
+    with pytest.raises(TimeoutError):
+        KubernetesOps.wait_for_pods_readiness(FakeKluster(pods_informer), total_pods=2, readiness_timeout=0.01,
+                                              namespace="scylla")
+    pods_informer.handle_event(watch_event("MODIFIED", k8s_pod("pod-2"), "12"))
+    KubernetesOps.wait_for_pods_readiness(FakeKluster(pods_informer), total_pods=2, readiness_timeout=0.01,
+                                          namespace="scylla")
+    with pytest.raises(ValueError):
+        KubernetesInformer(kluster=None, kind="node", namespace="scylla")
+
+
+class HangingWatchHandler(BaseHTTPRequestHandler):
+    """Send one watch event and then keep the connection open without sending anything else."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        self.send_response(200)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        event = {"type": "ADDED", "object": k8s.client.ApiClient().sanitize_for_serialization(k8s_pod("pod-3"))}
+        line = json.dumps(event).encode() + b"\n"
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(line), line))
+        self.wfile.flush()
+        self.server.release.wait()
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+
+def test_informer_stop_interrupts_blocked_watch(pods_informer):  # pylint: disable=redefined-outer-name
+    server = ThreadingHTTPServer(("127.0.0.1", 0), HangingWatchHandler)
+    server.release = threading.Event()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    http = urllib3.PoolManager()
+
+    def list_namespaced_pod(watch, namespace, **kwargs):
+        """:return: V1PodList"""
+
+        assert watch and namespace == "scylla"
+        return http.request("GET", f"http://127.0.0.1:{server.server_address[1]}/",
+                            preload_content=kwargs["_preload_content"])
+
+    pods_informer.watch_timeout = pods_informer.resync_period = 300
+    thread = threading.Thread(target=pods_informer._watch_changes,  # pylint: disable=protected-access
+                              args=(list_namespaced_pod, ), daemon=True)
+    pods_informer.is_alive = thread.is_alive
+    pods_informer.join = thread.join
+    try:
+        thread.start()
+        pods_informer.wait_for(lambda informer: informer.get("pod-3"), timeout=5)
+        start_time = time.monotonic()
+        pods_informer.stop(timeout=5)
+        assert not thread.is_alive()
+        assert time.monotonic() - start_time < 5
+    finally:
+        server.release.set()
+        server.shutdown()
+        server.server_close()
+
+
+def test_no_informers_are_started_after_stop(pods_informer):  # pylint: disable=redefined-outer-name
+    kluster = SimpleNamespace(name="k8s-cluster", _informers={("pod", "scylla"): pods_informer},
+                              _informers_lock=threading.RLock(), _informers_stopped=False)
+    KubernetesCluster.stop_informers(kluster, timeout=0)
+    # The stopped informer keeps the last known state of objects and isn't replaced by a new one.
+    assert not pods_informer.is_alive()
+    assert KubernetesCluster.get_informer(kluster, "pod", namespace="scylla") is pods_informer
+    with pytest.raises(RuntimeError):
+        KubernetesCluster.get_informer(kluster, "node")
+
+
+def rate_limiter(rate_limit, queue_size=1000, burst=1):
+    return ApiCallRateLimiter(rate_limit=rate_limit, queue_size=queue_size, urllib_retry=0, urllib_backoff_factor=0,
+                              burst=burst)
+
+
+def test_rate_limiter_burst():
+    limiter = rate_limiter(rate_limit=10, burst=5)
+    start_time = time.monotonic()
+    for _ in range(5):
+        limiter.wait()
+    assert time.monotonic() - start_time < 0.05
+    limiter.wait()
+    assert time.monotonic() - start_time >= 0.09
+    assert limiter.stats == {("READINESS", "api"): {"calls": 6, "wait_time": pytest.approx(0.1, abs=0.05)}}
+
+
+def test_rate_limiter_queue_full():
+    limiter = rate_limiter(rate_limit=2, queue_size=1)
+    limiter.wait()
+    workers = [threading.Thread(target=limiter.wait) for _ in range(2)]
+    for worker in workers:
+        worker.start()
+        time.sleep(0.05)
+    # Two calls are ahead and the next token for this call is in 1.5s, while it can wait 0.5s only.
+    with pytest.raises(queue.Full):
+        limiter.wait(caller="late")
+    for worker in workers:
+        worker.join()
+    assert limiter.stats[("READINESS", "api")]["calls"] == 3
+
+
+def test_rate_limiter_priorities_share():
+    limiter = rate_limiter(rate_limit=400)
+    end_time = time.monotonic() + 1
+
+    def call_in_loop(priority, caller):
+        while time.monotonic() < end_time:
+            limiter.wait(priority=priority, caller=caller)
+
+    workers = [threading.Thread(target=call_in_loop, args=(priority, f"{priority.name}-{idx}"))
+               for priority in ApiCallPriority for idx in range(2)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    calls = {caller: stats["calls"] for (_, caller), stats in limiter.stats.items()}
+    total = sum(calls.values())
+    assert (calls["CONTROL_PLANE-0"] + calls["CONTROL_PLANE-1"]) / total == pytest.approx(0.6, abs=0.1)
+    assert (calls["BACKGROUND-0"] + calls["BACKGROUND-1"]) / total == pytest.approx(0.1, abs=0.05)
+    assert calls["READINESS-0"] == pytest.approx(calls["READINESS-1"], rel=0.2)
+
+
+def test_api_call_priority():
+    assert get_kubectl_call_priority("delete pod", "scylla-0") is ApiCallPriority.CONTROL_PLANE
+    assert get_kubectl_call_priority("rollout restart statefulset/scylla") is ApiCallPriority.CONTROL_PLANE
+    assert get_kubectl_call_priority("logs pod/scylla-0 -c scylla") is ApiCallPriority.BACKGROUND
+    assert get_kubectl_call_priority("wait --timeout=1m", "--for=condition=Ready pod") is None
+    limiter = rate_limiter(rate_limit=100, burst=10)
+    with api_call_priority(ApiCallPriority.BACKGROUND):
+        limiter.wait()
+        limiter.wait(priority=ApiCallPriority.CONTROL_PLANE)
+    limiter.wait()
+    assert set(limiter.stats) == {("BACKGROUND", "api"), ("CONTROL_PLANE", "api"), ("READINESS", "api")}
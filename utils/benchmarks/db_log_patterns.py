@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+#
+# Copyright (c) 2022 ScyllaDB
+
+"""
+Micro-benchmark of DbLogReader line classification.
+
+Compare checking of all patterns one by one (the way DbLogReader did it before) and PatternIndex
+on recorded system.log files.
+
+Usage:
+    python3 -m utils.benchmarks.db_log_patterns [--repeat N] [LOG_FILE ...]
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+from sdcm.sct_events.database import SYSTEM_ERROR_EVENTS_PATTERNS, BACKTRACE_RE, get_pattern_to_event_to_func_mapping
+from sdcm.sct_events.system import INSTANCE_STATUS_EVENTS_PATTERNS
+from sdcm.utils.pattern_index import PatternIndex
+
+DEFAULT_LOG_FILES = sorted((Path(__file__).parents[2] / "unit_tests" / "test_data").glob("system*.log"))
+
+
+def classify_one_by_one(lines, system_patterns, continuous_patterns):
+    matched = 0
+    for line in lines:
+        BACKTRACE_RE.search(line)
+        for item in continuous_patterns:
+            if item.pattern.search(line):
+                matched += 1
+                break
+        for pattern, _ in system_patterns:
+            if pattern.search(line):
+                matched += 1
+                break
+    return matched
+
+
+def classify_with_index(lines, system_patterns, continuous_patterns):
+    system_index = PatternIndex(system_patterns)
+    continuous_index = PatternIndex((item.pattern, item) for item in continuous_patterns)
+    matched = 0
+    for line in lines:
+        lowered_line = line.lower()
+        if "0x" in lowered_line:
+            BACKTRACE_RE.search(line)
+        if continuous_index.search(line, lowered_line):
+            matched += 1
+        if system_index.search(line, lowered_line):
+            matched += 1
+    return matched
+
+
+def run(log_files, repeat):
+    lines = []
+    for log_file in log_files:
+        lines.extend(Path(log_file).read_text(encoding="utf-8").splitlines(keepends=True))
+    lines *= repeat
+    system_patterns = SYSTEM_ERROR_EVENTS_PATTERNS + INSTANCE_STATUS_EVENTS_PATTERNS
+    continuous_patterns = get_pattern_to_event_to_func_mapping(node="node1")
+
+    results = {}
+    for name, func in (("one-by-one", classify_one_by_one), ("pattern index", classify_with_index), ):
+        start = time.perf_counter()
+        matched = func(lines, system_patterns, continuous_patterns)
+        elapsed = time.perf_counter() - start
+        results[name] = matched
+        print(f"{name:>15}: {len(lines)} lines in {elapsed:.3f}s, {len(lines) / elapsed:,.0f} lines/sec, "
+              f"{matched} matches")
+    if len(set(results.values())) != 1:
+        print("Number of matches is different!")
+        return 1
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("log_files", nargs="*", default=DEFAULT_LOG_FILES)
+    parser.add_argument("--repeat", type=int, default=20, help="how many times to replay the log files")
+    args = parser.parse_args()
+    return run(log_files=args.log_files, repeat=args.repeat)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+#
+# Copyright (c) 2022 ScyllaDB
+
+"""
+Replay N events through the events pipeline: EventsDevice -> EventsFileLogger.
+
+Print the time spent to publish the events (including writing of raw_events.log) and the time until all
+of them are written by EventsFileLogger.
+
+Usage:
+    python3 -m utils.benchmarks.events_pipeline [--events N]
+"""
+
+import sys
+import json
+import time
+import shutil
+import tempfile
+import argparse
+
+from sdcm.sct_events import Severity
+from sdcm.sct_events.system import SpotTerminationEvent
+from sdcm.sct_events.events_device import start_events_main_device, get_events_main_device
+from sdcm.sct_events.file_logger import start_events_logger, get_events_logger, get_logger_event_summary
+from sdcm.sct_events.events_processes import EventsProcessesRegistry
+
+SEVERITIES = (Severity.NORMAL, Severity.WARNING, Severity.ERROR, )
+
+
+def run(events_count: int, timeout: float) -> int:
+    temp_dir = tempfile.mkdtemp()
+    registry = EventsProcessesRegistry(log_dir=temp_dir)
+    try:
+        start_events_main_device(_registry=registry)
+        start_events_logger(_registry=registry)
+        device = get_events_main_device(_registry=registry)
+        file_logger = get_events_logger(_registry=registry)
+        time.sleep(3)  # give the subscriber a chance to connect
+
+        events = []
+        for i in range(events_count):
+            event = SpotTerminationEvent(node=f"node{i % 30}", message=f"message {i}")
+            event.severity = SEVERITIES[i % len(SEVERITIES)]
+            event.dont_publish()  # events are published directly to the device below
+            events.append(event)
+
+        start = time.perf_counter()
+        for event in events:
+            device.publish_event(event)
+        device.flush_raw_events_log()
+        published = time.perf_counter() - start
+
+        end_time = time.perf_counter() + timeout
+        while file_logger.events_counter < events_count and time.perf_counter() < end_time:
+            time.sleep(0.01)
+        written = time.perf_counter() - start
+
+        print(f"publish: {events_count} events in {published:.3f}s, {events_count / published:,.0f} events/sec")
+        print(f" logger: {file_logger.events_counter} events in {written:.3f}s, "
+              f"{file_logger.events_counter / written:,.0f} events/sec")
+
+        time.sleep(1)
+        print(f"summary: {json.dumps(get_logger_event_summary(_registry=registry))}")
+        with device.raw_events_log.open() as raw_events_log:
+            print(f"raw_events.log: {sum(1 for _ in raw_events_log)} lines")
+        return 0 if file_logger.events_counter == events_count else 1
+    finally:
+        for process in (get_events_logger(_registry=registry), get_events_main_device(_registry=registry)):
+            if process:
+                process.stop(timeout=10)
+        shutil.rmtree(temp_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=10000, help="number of events to replay")
+    parser.add_argument("--timeout", type=float, default=300, help="how long to wait for the file logger")
+    args = parser.parse_args()
+    return run(events_count=args.events, timeout=args.timeout)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+#
+# Copyright (c) 2022 ScyllaDB
+
+"""
+Throughput of the events bus.
+
+Events are built from the db log fixtures used by unit tests (unit_tests/test_data/*.log) and some events
+used in unit_tests/test_sct_events_* tests.  The benchmark measures encoding/decoding of events (compared
+to pickle) and end to end events/sec from `EventsDevice.publish_event()' to a subscriber.
+
+Usage:
+    python3 -m utils.benchmarks.events_wire_format [--events N]
+"""
+
+import sys
+import time
+import logging
+import ctypes
+import pickle
+import shutil
+import tempfile
+import argparse
+import threading
+import itertools
+import multiprocessing
+from pathlib import Path
+
+from sdcm.sct_events import Severity
+from sdcm.sct_events.system import SpotTerminationEvent
+from sdcm.sct_events.health import ClusterHealthValidatorEvent
+from sdcm.sct_events.database import SYSTEM_ERROR_EVENTS_PATTERNS
+from sdcm.sct_events.events_device import EventsDevice
+from sdcm.sct_events.events_processes import EventsProcessesRegistry
+from sdcm.sct_events.wire_format import encode_event, decode_event
+
+TEST_DATA_DIR = Path(__file__).parents[2] / "unit_tests" / "test_data"
+
+
+def build_events(count: int) -> list:
+    samples = [ClusterHealthValidatorEvent.NodeStatus(), ClusterHealthValidatorEvent.NodePeersNulls(),
+               SpotTerminationEvent(node="node1", message="message")]
+    for log_file in sorted(TEST_DATA_DIR.glob("*.log")):
+        for line_number, line in enumerate(log_file.read_text(encoding="utf-8").splitlines()):
+            for pattern, event in SYSTEM_ERROR_EVENTS_PATTERNS:
+                if pattern.search(line):
+                    samples.append(event.clone().add_info(node="node1", line=line, line_number=line_number))
+                    break
+    events = list(itertools.islice(itertools.cycle(samples), count))
+    for event in samples:
+        event.dont_publish()
+    return events
+
+
+def measure(name: str, count: int, func) -> None:
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"{name:>20}: {count} events in {elapsed:.3f}s, {count / elapsed:,.0f} events/sec")
+
+
+def run_codec(events: list) -> None:
+    pickled = [pickle.dumps(event) for event in events]
+    encoded = [encode_event(event) for event in events]
+    print(f"{'pickle size':>20}: {sum(map(len, pickled)) / len(events):.0f} bytes/event")
+    print(f"{'wire format size':>20}: {sum(sum(map(len, frames)) for frames in encoded) / len(events):.0f} bytes/event")
+    measure("pickle.dumps", len(events), lambda: [pickle.dumps(event) for event in events])
+    measure("encode_event", len(events), lambda: [encode_event(event) for event in events])
+    measure("pickle.loads", len(events), lambda: [pickle.loads(data) for data in pickled])
+    measure("decode_event", len(events), lambda: [decode_event(frames) for frames in encoded])
+
+
+def run_end_to_end(events: list, severity_filter: bool) -> None:
+    temp_dir = tempfile.mkdtemp()
+    try:
+        device = EventsDevice(_registry=EventsProcessesRegistry(log_dir=temp_dir))
+        device.start()
+        stop_event = threading.Event()
+        counter = multiprocessing.Value(ctypes.c_uint32, 0)
+        topics = [b"ERROR ", b"CRITICAL ", b"SYSTEM "] if severity_filter else None
+        expected = sum(1 for event in events if event.severity in (Severity.ERROR, Severity.CRITICAL)) \
+            if severity_filter else len(events)
+        received = []
+
+        def subscriber():
+            for _, event in device.outbound_events(stop_event=stop_event, events_counter=counter, topics=topics):
+                received.append(event)
+                if len(received) == expected:
+                    stop_event.set()
+
+        thread = threading.Thread(target=subscriber, daemon=True)
+        thread.start()
+        time.sleep(2)  # let the subscriber to connect
+
+        def publish_and_wait():
+            for event in events:
+                device.publish_event(event)
+            thread.join(timeout=300)
+
+        name = "end to end (filtered)" if severity_filter else "end to end"
+        measure(name, len(events), publish_and_wait)
+        print(f"{'received':>20}: {len(received)} events")
+        stop_event.set()
+        device.stop(timeout=10)
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=10000, help="number of events to send")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)  # don't print max severity limit warnings for every event
+    events = build_events(args.events)
+    run_codec(events)
+    run_end_to_end(events, severity_filter=False)
+    run_end_to_end(events, severity_filter=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+#
+# Copyright (c) 2022 ScyllaDB
+
+"""
+Micro-benchmark of the k8s API call rate limiter under contention.
+
+Threads of every priority class call the limiter in a loop for some time.  Report the share of the rate each
+class got (compare with the class weights), wait times, and the Jain's fairness index of calls made by threads
+of the same class (1.0 means the threads got exactly the same number of calls.)
+
+Usage:
+    python3 -m utils.benchmarks.k8s_api_rate_limiter [--rate N] [--burst N] [--duration SECONDS] [--threads N]
+"""
+
+import sys
+import time
+import argparse
+import threading
+
+from sdcm.utils.k8s import ApiCallPriority, ApiCallRateLimiter
+
+
+def jain_index(values):
+    return sum(values) ** 2 / (len(values) * sum(value ** 2 for value in values)) if any(values) else 1.0
+
+
+def call_in_loop(limiter, priority, caller, end_time):
+    while time.monotonic() < end_time:
+        limiter.wait(priority=priority, caller=caller)
+
+
+def run(rate, burst, duration, threads):
+    limiter = ApiCallRateLimiter(rate_limit=rate, queue_size=int(rate * duration * 10), urllib_retry=0,
+                                 urllib_backoff_factor=0, burst=burst)
+    limiter.start()
+    end_time = time.monotonic() + duration
+    workers = [threading.Thread(target=call_in_loop, args=(limiter, priority, f"{priority.name}-{idx}", end_time))
+               for priority in ApiCallPriority for idx in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    limiter.stop()
+
+    total_calls = sum(stats["calls"] for stats in limiter.stats.values())
+    total_weight = sum(limiter.priority_weights.values())
+    print(f"{total_calls / duration:.1f} calls/s with rate limit {rate}/s and burst {burst}, "
+          f"{threads} threads per priority class")
+    print(f"{'priority':>14} {'weight share':>12} {'calls share':>12} {'mean wait':>10} {'fairness':>9}")
+    shares = {}
+    for priority in ApiCallPriority:
+        calls = [stats["calls"] for (name, _), stats in limiter.stats.items() if name == priority.name]
+        wait_time = sum(stats["wait_time"] for (name, _), stats in limiter.stats.items() if name == priority.name)
+        shares[priority.name] = sum(calls) / total_calls
+        print(f"{priority.name:>14} {limiter.priority_weights[priority] / total_weight:12.2f} "
+              f"{shares[priority.name]:12.2f} {wait_time / max(sum(calls), 1):9.3f}s {jain_index(calls):9.3f}")
+    return shares
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rate", type=float, default=200, help="calls per second (default: %(default)s)")
+    parser.add_argument("--burst", type=int, default=10, help="bucket size (default: %(default)s)")
+    parser.add_argument("--duration", type=float, default=5, help="seconds (default: %(default)s)")
+    parser.add_argument("--threads", type=int, default=4, help="threads per priority class (default: %(default)s)")
+    args = parser.parse_args()
+    run(rate=args.rate, burst=args.burst, duration=args.duration, threads=args.threads)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
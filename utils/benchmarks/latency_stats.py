@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+#
+# Copyright (c) 2022 ScyllaDB
+
+"""
+Micro-benchmark of latency/throughput statistics.
+
+Compare the per-element Python loops over Prometheus string values (the way performance tests calculated
+statistics before) and sdcm.utils.series_stats on synthetic series with one point per second.  Parsing of
+responses into arrays is done once by the Prometheus API client and is reported separately.
+
+Usage:
+    python3 -m utils.benchmarks.latency_stats [--hours N] [--nodes N]
+"""
+
+import sys
+import math
+import time
+import argparse
+
+import numpy as np
+
+from sdcm.utils.prometheus_api import PrometheusSeries
+from sdcm.utils.series_stats import per_series_stats, steady_state_window
+
+
+def generate_results(hours, nodes):
+    """Prometheus-like results: a series of [timestamp, "value"] pairs per node with a ramp-up and gaps."""
+
+    rng = np.random.default_rng(seed=0)
+    points = hours * 60 * 60
+    timestamps = np.arange(points) + 1_600_000_000
+    results = []
+    for node in range(nodes):
+        values = rng.normal(1000 * (node + 1), 50, size=points) * np.minimum(1, np.arange(1, points + 1) / 600)
+        values = [str(value) for value in values]
+        for gap in rng.integers(0, points, size=points // 1000):
+            values[gap] = "NaN"
+        results.append({"metric": {"instance": f"10.0.0.{node}"}, "values": list(zip(timestamps.tolist(), values))})
+    return results
+
+
+def python_loops(results):
+    stats = {}
+    for result in results:
+        values = [float(value) for _, value in result["values"] if value != "NaN"]
+        avg = sum(values) / len(values)
+        stdev = math.sqrt(sum((value - avg) ** 2 for value in values) / len(values))
+        ordered = sorted(values)
+        stats[result["metric"]["instance"]] = {"min": ordered[0], "max": ordered[-1], "avg": avg, "stdev": stdev,
+                                               "p99": ordered[int((len(ordered) - 1) * 0.99)]}
+    return stats
+
+
+def parse(results):
+    return [PrometheusSeries.from_result(result) for result in results]
+
+
+def vectorized(results):
+    series = {item.metric["instance"]: item.values for item in results}
+    stats = {instance: node_stats.as_dict() for instance, node_stats in per_series_stats(series).items()}
+    for instance, values in series.items():
+        stats[instance]["steady_state"] = steady_state_window(values)
+    return stats
+
+
+def run(hours, nodes):
+    results = generate_results(hours=hours, nodes=nodes)
+    start = time.perf_counter()
+    parsed = parse(results)
+    print(f"{'parsing':>14}: {time.perf_counter() - start:8.3f}s")
+    timings = {}
+    for name, func, data in (("python loops", python_loops, results), ("series_stats", vectorized, parsed), ):
+        start = time.perf_counter()
+        stats = func(data)
+        timings[name] = time.perf_counter() - start
+        print(f"{name:>14}: {timings[name]:8.3f}s  (node 0 avg={stats['10.0.0.0']['avg']:.2f})")
+    print(f"{'speedup':>14}: {timings['python loops'] / timings['series_stats']:8.1f}x")
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hours", type=int, default=24, help="length of series (default: %(default)s)")
+    parser.add_argument("--nodes", type=int, default=6, help="number of series (default: %(default)s)")
+    args = parser.parse_args()
+    print(f"{args.nodes} series x {args.hours * 60 * 60} points")
+    run(hours=args.hours, nodes=args.nodes)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+#
+# Copyright (c) 2022 ScyllaDB
+
+"""
+Micro-benchmark of loading prior test results.
+
+Build TestResultClass instances from synthetic ES documents shaped like performance test results and report load
+time and memory per 1000 documents, for full sources and for sources filtered to the paths mapped by the class.
+Then find the best run for each metric the way the multi-baseline regression report does: by sorting instances
+and with MetricArray.
+
+Usage:
+    python3 -m utils.benchmarks.results_analyze_load [--docs N]
+"""
+
+import sys
+import time
+import random
+import argparse
+import tracemalloc
+
+from sdcm.results_analyze.es_access import get_source_value
+from sdcm.results_analyze.metrics import MetricArray
+from sdcm.results_analyze.test import TestResultClass
+from test_lib.utils import MagicList
+
+METRICS = ("metrics.cs_metrics.latency_mean", "metrics.cs_metrics.latency_99", "metrics.cs_metrics.throughput",
+           "metrics.scylla_metrics.throughput.avg", "metrics.scylla_metrics.read_latency_99.max", )
+
+
+def generate_docs(count):
+    rng = random.Random(0)
+    docs = []
+    for idx in range(count):
+        stats = {"op rate": rng.uniform(1e4, 1e5), "latency mean": rng.uniform(1, 3),
+                 "latency 99th percentile": rng.uniform(5, 15), "latency 95th percentile": rng.uniform(3, 6)}
+        docs.append({"_index": "performanceregressiontest", "_id": f"test-{idx}", "_source": {
+            "test_details": {"test_name": "performance_regression_test.PerformanceRegressionTest.test_write",
+                             "job_name": "scylla-master/perf-regression/write", "sub_type": "write",
+                             "start_time": 1_600_000_000 + idx * 3600, "time_completed": "2022-01-01 10:00",
+                             "test_id": f"main-{idx // 4}", "job_url": f"https://jenkins/job/{idx}",
+                             "cassandra-stress": {"raw_cmd": "cassandra-stress write no-warmup cl=QUORUM n=100",
+                                                  "command": "write", "cl": "QUORUM", "n": 100, "mode": "cql3"}},
+            "setup_details": {**{f"param_{param}": f"value_{param}" for param in range(150)},
+                              "n_db_nodes": 3, "n_loaders": 4, "n_monitor_nodes": 1, "instance_type_db": "i3.4xlarge",
+                              "instance_type_loader": "c5.2xlarge", "instance_type_monitor": "t3.large"},
+            "versions": {"scylla-server": {"version": f"5.{idx % 3}.0", "date": "20220101", "commit_id": "abcdef"}},
+            "results": {
+                "stats_average": stats, "stats_total": {"op rate": stats["op rate"] * 4, "Total errors": 0},
+                "throughput": {"min": 1e4, "avg": rng.uniform(1e4, 1e5), "max": 1e5, "stdev": 1e3},
+                "latency_read_99": {"min": 1., "avg": rng.uniform(1, 5), "max": rng.uniform(5, 10), "stdev": 1.},
+                "latency_write_99": {"min": 1., "avg": rng.uniform(1, 5), "max": rng.uniform(5, 10), "stdev": 1.},
+                "stats": [{**stats, "loader_idx": loader, "cpu_idx": cpu, "keyspace_idx": 0}
+                          for loader in range(4) for cpu in range(8)],
+            }}})
+    return docs
+
+
+def filter_source(doc, source_paths):
+    source = {}
+    for path in source_paths:
+        value = get_source_value(doc["_source"], path)
+        if value is None:
+            continue
+        current = source
+        *parents, key = path.split(".")
+        for parent in parents:
+            current = current.setdefault(parent, {})
+        current[key] = value
+    return {**doc, "_source": source}
+
+
+def load(docs):
+    tracemalloc.start()
+    start = time.perf_counter()
+    tests = [TestResultClass(doc) for doc in docs]
+    duration = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return tests, duration, peak
+
+
+def best_by_sorting(tests):
+    return {metric_path: MagicList(tests).sort_by(f"{metric_path}.betterness")[-1].test_id for metric_path in METRICS}
+
+
+def best_by_metric_array(tests):
+    return {metric_path: tests[MetricArray.from_instances(tests, metric_path).best_index()].test_id
+            for metric_path in METRICS}
+
+
+def run(count):
+    docs = generate_docs(count)
+    source_paths = sorted(set(TestResultClass.get_es_source_paths().values()))
+    filtered = [filter_source(doc, source_paths) for doc in docs]
+    per_1000 = 1000 / count
+    for name, data in (("full source", docs), ("filtered source", filtered), ):
+        tests, duration, peak = load(data)
+        print(f"{name:>16}: {duration * per_1000:8.3f}s, {peak * per_1000 / 2 ** 20:8.1f} MiB per 1000 docs")
+    timings = {}
+    results = {}
+    for name, func in (("sort_by", best_by_sorting), ("MetricArray", best_by_metric_array), ):
+        start = time.perf_counter()
+        results[name] = func(tests)
+        timings[name] = time.perf_counter() - start
+        print(f"{name:>16}: {timings[name]:8.3f}s to find the best of {len(METRICS)} metrics")
+    assert results["sort_by"] == results["MetricArray"], results
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=1000, help="number of test documents (default: %(default)s)")
+    args = parser.parse_args()
+    run(count=args.docs)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+#
+# Copyright (c) 2022 ScyllaDB
+
+"""
+Benchmark of `sct.py' startup time.
+
+Run `python -X importtime sct.py <command> --help' for every command and report wall time, total import time,
+the number of imported modules and the heaviest top-level imports.  `--help' of a command runs the code of the
+CLI group callback (`cli()') and parsing of the command's options, so it's a good estimate of the overhead which
+every invocation of the command pays before doing its work.
+
+With `--budget SECONDS' the time of `import sct' is checked as well, and the exit code is non-zero if it's over
+the budget (it was about 2.5s when all backends were imported, and it's less than 1s with the lazy imports.)
+
+Usage:
+    python3 -m utils.benchmarks.sct_startup [--repeat N] [--top N] [--budget SECONDS] [COMMAND ...]
+"""
+
+import re
+import sys
+import time
+import argparse
+import subprocess
+from pathlib import Path
+
+SCT_PY = Path(__file__).parents[2] / "sct.py"
+COMMANDS = ("", "conf", "list-ami-versions", "list-resources", "clean-resources", "investigate show-events",
+            "lint-yamls", "run-test", "send-email", )
+IMPORT_SCT = "import time; start = time.perf_counter(); import sct; print(time.perf_counter() - start)"
+IMPORT_TIME_RE = re.compile(r"^import time:\s+(?P<self>\d+) \|\s+(?P<cumulative>\d+) \|(?P<indent>\s+)(?P<name>\S+)$")
+
+
+def parse_import_times(output):
+    """Top-level imports with cumulative times in seconds and the number of all imported modules."""
+
+    top_level = {}
+    modules = 0
+    for line in output.splitlines():
+        if match := IMPORT_TIME_RE.match(line):
+            modules += 1
+            if len(match["indent"]) == 1:
+                top_level[match["name"]] = int(match["cumulative"]) / 1e6
+    return top_level, modules
+
+
+def measure(command):
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-X", "importtime", str(SCT_PY), *command.split(), "--help"],
+                            cwd=SCT_PY.parent, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+                            check=True)
+    wall_time = time.perf_counter() - start
+    top_level, modules = parse_import_times(result.stderr)
+    return wall_time, top_level, modules
+
+
+def measure_import_sct():
+    result = subprocess.run([sys.executable, "-c", IMPORT_SCT], cwd=SCT_PY.parent, capture_output=True, text=True,
+                            check=True)
+    return float(result.stdout.splitlines()[-1])
+
+
+def run(commands, repeat, top):
+    results = {}
+    for command in commands:
+        runs = [measure(command) for _ in range(repeat)]
+        wall_time, top_level, modules = min(runs, key=lambda run_result: run_result[0])
+        results[command] = wall_time, sum(top_level.values())
+        print(f"{'sct.py ' + command:>32}: {wall_time:6.3f}s wall, {sum(top_level.values()):6.3f}s import, "
+              f"{modules:5d} modules")
+        for name, cumulative in sorted(top_level.items(), key=lambda item: item[1], reverse=True)[:top]:
+            print(f"{'':>34}{cumulative:6.3f}s {name}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="runs of each command, the fastest is reported (default: %(default)s)")
+    parser.add_argument("--top", type=int, default=5,
+                        help="number of the heaviest imports to show (default: %(default)s)")
+    parser.add_argument("--budget", type=float, default=None,
+                        help="fail if `import sct' takes longer than this number of seconds")
+    parser.add_argument("commands", nargs="*", default=COMMANDS, metavar="COMMAND",
+                        help="sct.py commands, in quotes if have spaces (default: some frequently used ones)")
+    args = parser.parse_args()
+    run(commands=args.commands, repeat=args.repeat, top=args.top)
+    if args.budget is not None:
+        import_time = min(measure_import_sct() for _ in range(args.repeat))
+        print(f"{'import sct':>32}: {import_time:6.3f}s, budget is {args.budget:.3f}s")
+        if import_time > args.budget:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
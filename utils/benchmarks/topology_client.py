@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+#
+# Copyright (c) 2022 ScyllaDB
+
+"""
+Benchmark of cluster topology queries on a live Scylla node.
+
+Compare latency per call of nodetool commands (the way BaseNode helpers did it before) and TopologyClient
+which uses the REST API of the node.  Both run over the same SSH connection.
+
+Usage:
+    python3 -m utils.benchmarks.topology_client --host 10.0.0.1 [--user centos] [--key-file ~/.ssh/key] [--repeat N]
+"""
+
+import sys
+import time
+import argparse
+import statistics
+from types import SimpleNamespace
+
+from sdcm.remote import RemoteCmdRunnerBase
+from sdcm.rest.topology_client import TopologyClient
+
+
+def measure(name, func, repeat):
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - start)
+    print(f"{name:>30}: median {statistics.median(latencies) * 1000:8.1f}ms, "
+          f"max {max(latencies) * 1000:8.1f}ms ({repeat} calls)")
+    return statistics.median(latencies)
+
+
+def run(host, user, key_file, repeat):
+    remoter = RemoteCmdRunnerBase.create_remoter(hostname=host, user=user, key_file=key_file)
+    node = SimpleNamespace(name=host, remoter=remoter)
+    client = TopologyClient(node=node)
+    remoter.run("true")  # establish the SSH connection before measuring.
+
+    for name, nodetool_cmd, rest_call in (
+            ("status", "nodetool status", client.get_status),
+            ("info", "nodetool info", client.get_node_info),
+            ("gossip", "nodetool gossipinfo", client.get_gossip),
+            ("schema versions", "nodetool describecluster", client.get_schema_versions), ):
+        nodetool = measure(f"{nodetool_cmd}", lambda cmd=nodetool_cmd: remoter.run(cmd, verbose=False), repeat)
+        rest = measure(f"REST {name}", rest_call, repeat)
+        print(f"{'speedup':>30}: {nodetool / rest:.1f}x")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", required=True, help="address of a Scylla node")
+    parser.add_argument("--user", default="centos")
+    parser.add_argument("--key-file", default="~/.ssh/scylla-qa-ec2")
+    parser.add_argument("--repeat", type=int, default=10, help="how many times to run every query")
+    args = parser.parse_args()
+    return run(host=args.host, user=args.user, key_file=args.key_file, repeat=args.repeat)
+
+
+if __name__ == "__main__":
+    sys.exit(main())